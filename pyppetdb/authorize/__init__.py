@@ -82,6 +82,7 @@ PERM_NODES_GROUPS_CREATE = "NODES:GROUPS::CREATE"
 PERM_NODES_GROUPS_UPDATE = "NODES:GROUPS::UPDATE"
 PERM_NODES_GROUPS_DELETE = "NODES:GROUPS::DELETE"
 PERM_NODES_GROUPS_GET = "NODES:GROUPS::GET"
+PERM_NODES_FACTS_INDEXES_GET = "NODES:FACTS_INDEXES::GET"
 PERM_NODES_SECRETS_REDACTOR_CREATE = "NODES:SECRETS_REDACTOR::CREATE"
 PERM_NODES_SECRETS_REDACTOR_DELETE = "NODES:SECRETS_REDACTOR::DELETE"
 
@@ -23,10 +23,30 @@ log_levels = typing.Literal[
 ]
 
 
+class ConfigAppFactsIndexAdvisor(BaseModel):
+    enable: bool = True
+    autoManage: bool = False
+    interval: int = 300
+    maxIndexes: int = 10
+    minQueries: int = 100
+    unusedTtl: int = 604800
+
+
+class ConfigAppFactsKeys(BaseModel):
+    enable: bool = False
+    interval: int = 3600
+    maxDepth: int = 6
+    samples: int = 10
+
+
 class ConfigAppFacts(BaseModel):
     index: typing.Optional[typing.List[str]] = None
+    indexAdvisor: ConfigAppFactsIndexAdvisor = ConfigAppFactsIndexAdvisor()
+    keys: ConfigAppFactsKeys = ConfigAppFactsKeys()
+    histogram: typing.Optional[typing.List[str]] = None
+    histogramInterval: int = 3600
 
-    @field_validator("index", mode="before")
+    @field_validator("index", "histogram", mode="before")
     @classmethod
     def parse_index(cls, v):
         if isinstance(v, str):
@@ -34,6 +54,56 @@ class ConfigAppFacts(BaseModel):
         return v
 
 
+class ConfigAppExport(BaseModel):
+    batchSize: int = 2000
+
+
+class ConfigAppHttp(BaseModel):
+    compress: bool = True
+    compressLevel: int = 6
+    compressMinSize: int = 1024
+    etag: bool = True
+
+
+class ConfigAppNodesGroups(BaseModel):
+    reevaluationBatchSize: int = 1000
+    reevaluationInterval: int = 5
+
+
+class ConfigAppPlacementMigration(BaseModel):
+    batchSize: int = 500
+    doneTtl: int = 86400
+    interval: int = 5
+    rate: int = 1000
+
+
+class ConfigAppRedaction(BaseModel):
+    cacheSize: int = 100000
+    cacheMaxLength: int = 1024
+    processes: int = 0
+    rebuildDelay: float = 1.0
+
+
+class ConfigAppReportsRollups(BaseModel):
+    enable: bool = True
+    hourTtl: int = 2592000
+    dayTtl: int = 63072000
+    durationBuckets: typing.List[int] = [10, 30, 60, 120, 300, 600, 1800]
+
+    @field_validator("durationBuckets", mode="before")
+    @classmethod
+    def parse_duration_buckets(cls, v):
+        if isinstance(v, str):
+            return json.loads(v)
+        return v
+
+
+class ConfigAppSearch(BaseModel):
+    cacheSize: int = 1000
+    cacheTtl: int = 10
+    groupByTimeout: int = 30
+
+
 class ConfigAppSSL(BaseModel):
     ca: typing.Optional[str] = None
     cert: str
@@ -41,11 +111,43 @@ class ConfigAppSSL(BaseModel):
 
 
 class ConfigAppStoreHistory(BaseModel):
+    reportsBucket: typing.Optional[typing.Literal["hour", "day"]] = None
     catalog: typing.Optional[bool] = True
     catalogUnchanged: typing.Optional[bool] = False
     catalogNoReportTtl: typing.Optional[int] = 3600
+    facts: typing.Optional[bool] = False
+    factsExclude: typing.Optional[list[str]] = [
+        "load_averages",
+        "memory.swap.available",
+        "memory.swap.available_bytes",
+        "memory.swap.capacity",
+        "memory.swap.used",
+        "memory.swap.used_bytes",
+        "memory.system.available",
+        "memory.system.available_bytes",
+        "memory.system.capacity",
+        "memory.system.used",
+        "memory.system.used_bytes",
+        "memoryfree",
+        "memoryfree_mb",
+        "swapfree",
+        "swapfree_mb",
+        "system_uptime",
+        "uptime",
+        "uptime_days",
+        "uptime_hours",
+        "uptime_seconds",
+    ]
+    factsKeyframeInterval: int = 50
     ttl: typing.Optional[int] = 7776000
 
+    @field_validator("factsExclude", mode="before")
+    @classmethod
+    def parse_facts_exclude(cls, v):
+        if isinstance(v, str):
+            return json.loads(v)
+        return v
+
 
 class ConfigAppHiera(BaseModel):
     keyModels: typing.Optional[typing.List[str]] = None
@@ -60,10 +162,17 @@ class ConfigAppHiera(BaseModel):
 
 class ConfigAppMain(BaseModel):
     enable: bool = True
+    export: ConfigAppExport = ConfigAppExport()
     facts: ConfigAppFacts = ConfigAppFacts()
     hiera: ConfigAppHiera = ConfigAppHiera()
     host: str = "0.0.0.0"
+    http: ConfigAppHttp = ConfigAppHttp()
+    nodesGroups: ConfigAppNodesGroups = ConfigAppNodesGroups()
+    placementMigration: ConfigAppPlacementMigration = ConfigAppPlacementMigration()
     port: int = 8000
+    redaction: ConfigAppRedaction = ConfigAppRedaction()
+    reportsRollups: ConfigAppReportsRollups = ConfigAppReportsRollups()
+    search: ConfigAppSearch = ConfigAppSearch()
     ssl: typing.Optional[ConfigAppSSL] = None
     storeHistory: ConfigAppStoreHistory = ConfigAppStoreHistory()
     interApiIdleTimeout: int = 300
@@ -100,6 +209,8 @@ class ConfigAppPuppetdb(BaseModel):
     timeout: int = 60
     trustedCns: typing.Optional[list[str]] = []
     resourceQueryInternal: bool = True
+    resourceQueryCacheSize: int = 10000
+    queryInternal: bool = True
 
     @field_validator("trustedCns", mode="before")
     @classmethod
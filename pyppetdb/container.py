@@ -20,6 +20,7 @@ from pyppetdb.config import Config
 from pyppetdb.crud.manager import CrudManager
 from pyppetdb.crud.nodes_catalog_cache import NodesDataProtector
 from pyppetdb.crud.nodes_secrets_redactor import NodesSecretsRedactor
+from pyppetdb.crud.nodes_secrets_redactor import NodesSecretsRedactorPool
 from pyppetdb.crud.nodes_reports import NodesReportsRedactor
 from pyppetdb.crud.nodes_catalogs import NodesCatalogsRedactor
 from pyppetdb.crud.ldap import CrudLdap
@@ -30,11 +31,21 @@ from pyppetdb.crud.jobs_definitions import CrudJobsDefinitions
 from pyppetdb.crud.jobs_nodes_jobs import CrudJobsNodeJobs
 from pyppetdb.crud.jobs_jobs import CrudJobs
 from pyppetdb.crud.nodes_catalog_cache import CrudNodesCatalogCache
+from pyppetdb.crud.nodes_generation import CrudNodesGeneration
 from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.crud.nodes_facts_histogram import CrudNodesFactsHistogram
+from pyppetdb.crud.nodes_facts_keys import CrudNodesFactsKeys
+from pyppetdb.crud.nodes_facts_history import CrudNodesFactsHistory
+from pyppetdb.crud.nodes_facts_queries import CrudNodesFactsQueries
 from pyppetdb.crud.nodes_secrets_redactor import CrudNodesSecretsRedactor
 from pyppetdb.crud.nodes_catalogs import CrudNodesCatalogs
 from pyppetdb.crud.nodes_groups import CrudNodesGroups
+from pyppetdb.crud.nodes_groups_reevaluations import CrudNodesGroupsReevaluations
+from pyppetdb.crud.nodes_placement_migrations import CrudNodesPlacementMigrations
 from pyppetdb.crud.nodes_reports import CrudNodesReports
+from pyppetdb.crud.nodes_reports_rollups import CrudNodesReportsRollups
+from pyppetdb.crud.nodes_resources_exported import CrudNodesResourcesExported
+from pyppetdb.crud.nodes_resources_generations import CrudNodesResourcesGenerations
 from pyppetdb.crud.pyppetdb_nodes import CrudPyppetDBNodes
 from pyppetdb.crud.teams import CrudTeams
 from pyppetdb.crud.users import CrudUsers
@@ -48,6 +59,7 @@ from pyppetdb.jobs.service import JobService
 from pyppetdb.authorize import AuthorizeClientCert
 from pyppetdb.ws.hub import WsHub
 from pyppetdb.hiera import PyHiera
+from pyppetdb.pql.engine import PqlEngine
 from pyppetdb.crud.hiera_key_models_dynamic import CrudHieraKeyModelsDynamic
 from pyppetdb.crud.hiera_keys import CrudHieraKeys
 from pyppetdb.crud.hiera_key_models_static import CrudHieraKeyModelsStatic
@@ -87,16 +99,30 @@ class AppContainer:
         self.nodes_secrets_redactor = NodesSecretsRedactor(
             protector=self.nodes_data_protector,
             log=log,
+            cache_size=config.app.main.redaction.cacheSize,
+            cache_max_length=config.app.main.redaction.cacheMaxLength,
         )
 
+        self.nodes_secrets_redactor_pool = None
+        if config.app.main.redaction.processes > 0:
+            self.nodes_secrets_redactor_pool = NodesSecretsRedactorPool(
+                log=log,
+                redactor=self.nodes_secrets_redactor,
+                processes=config.app.main.redaction.processes,
+                cache_size=config.app.main.redaction.cacheSize,
+                cache_max_length=config.app.main.redaction.cacheMaxLength,
+            )
+
         self.nodes_reports_redactor = NodesReportsRedactor(
             redactor=self.nodes_secrets_redactor,
             log=log,
+            pool=self.nodes_secrets_redactor_pool,
         )
 
         self.nodes_catalogs_redactor = NodesCatalogsRedactor(
             redactor=self.nodes_secrets_redactor,
             log=log,
+            pool=self.nodes_secrets_redactor_pool,
         )
 
         self.crud_ldap = CrudLdap(
@@ -156,22 +182,81 @@ class AppContainer:
             )
         )
 
+        self.crud_nodes_generation = self.crud_manager.register(
+            crud=CrudNodesGeneration(
+                config=config,
+                log=log,
+                coll=mongo_db["nodes_generation"],
+            )
+        )
+
+        self.crud_nodes = self.crud_manager.register(
+            crud=CrudNodes(
+                config=config,
+                log=log,
+                coll=mongo_db["nodes"],
+                crud_nodes_generation=self.crud_nodes_generation,
+            )
+        )
+
         self.crud_nodes_catalog_cache = self.crud_manager.register(
             crud=CrudNodesCatalogCache(
                 config=config,
                 log=log,
                 coll=mongo_db["nodes_catalog_cache"],
                 protector=self.nodes_data_protector,
+                crud_nodes=self.crud_nodes,
             )
         )
 
-        self.crud_nodes = self.crud_manager.register(
-            crud=CrudNodes(
+        self.crud_pyppetdb_nodes = self.crud_manager.register(
+            crud=CrudPyppetDBNodes(
                 config=config,
                 log=log,
-                coll=mongo_db["nodes"],
+                coll=mongo_db["pyppetdb_nodes"],
+            )
+        )
+
+        self.crud_nodes_facts_histogram = self.crud_manager.register(
+            crud=CrudNodesFactsHistogram(
+                config=config,
+                log=log,
+                coll=mongo_db["nodes_facts_histogram"],
+                crud_nodes=self.crud_nodes,
+                crud_pyppetdb_nodes=self.crud_pyppetdb_nodes,
+            )
+        )
+        if self.crud_nodes_facts_histogram.facts:
+            self.crud_nodes.add_facts_listener(
+                listener=self.crud_nodes_facts_histogram.update_facts,
+                facts=self.crud_nodes_facts_histogram.facts,
+            )
+
+        self.crud_nodes_facts_keys = self.crud_manager.register(
+            crud=CrudNodesFactsKeys(
+                config=config,
+                log=log,
+                coll=mongo_db["nodes_facts_keys"],
+                crud_nodes=self.crud_nodes,
+                crud_pyppetdb_nodes=self.crud_pyppetdb_nodes,
+            )
+        )
+        if self.crud_nodes_facts_keys.enabled:
+            self.crud_nodes.add_facts_listener(
+                listener=self.crud_nodes_facts_keys.update_facts,
+            )
+
+        self.crud_nodes_facts_history = self.crud_manager.register(
+            crud=CrudNodesFactsHistory(
+                config=config,
+                log=log,
+                coll=mongo_db["nodes_facts_history"],
             )
         )
+        if self.crud_nodes_facts_history.enabled:
+            self.crud_nodes.add_facts_listener(
+                listener=self.crud_nodes_facts_history.update_facts,
+            )
 
         self.crud_nodes_secrets_redactor = self.crud_manager.register(
             crud=CrudNodesSecretsRedactor(
@@ -196,6 +281,7 @@ class AppContainer:
                 config=config,
                 log=log,
                 coll=mongo_db["nodes_groups"],
+                crud_nodes=self.crud_nodes,
             )
         )
 
@@ -208,14 +294,72 @@ class AppContainer:
             )
         )
 
-        self.crud_pyppetdb_nodes = self.crud_manager.register(
-            crud=CrudPyppetDBNodes(
+        self.crud_nodes_reports_rollups = self.crud_manager.register(
+            crud=CrudNodesReportsRollups(
                 config=config,
                 log=log,
-                coll=mongo_db["pyppetdb_nodes"],
+                coll=mongo_db["nodes_reports_rollups"],
             )
         )
 
+        self.crud_nodes_resources_generations = self.crud_manager.register(
+            crud=CrudNodesResourcesGenerations(
+                config=config,
+                log=log,
+                coll=mongo_db["nodes_resources_generations"],
+            )
+        )
+
+        self.crud_nodes_resources_exported = self.crud_manager.register(
+            crud=CrudNodesResourcesExported(
+                config=config,
+                log=log,
+                coll=mongo_db["nodes_resources_exported"],
+                crud_nodes=self.crud_nodes,
+                crud_nodes_resources_generations=self.crud_nodes_resources_generations,
+            )
+        )
+
+        self.crud_nodes_facts_queries = self.crud_manager.register(
+            crud=CrudNodesFactsQueries(
+                config=config,
+                log=log,
+                coll=mongo_db["nodes_facts_queries"],
+                crud_nodes=self.crud_nodes,
+                crud_pyppetdb_nodes=self.crud_pyppetdb_nodes,
+            )
+        )
+        self.crud_nodes.add_query_listener(self.crud_nodes_facts_queries.record)
+
+        self.crud_nodes_groups_reevaluations = self.crud_manager.register(
+            crud=CrudNodesGroupsReevaluations(
+                config=config,
+                log=log,
+                coll=mongo_db["nodes_groups_reevaluations"],
+                crud_nodes=self.crud_nodes,
+                crud_nodes_groups=self.crud_nodes_groups,
+                crud_pyppetdb_nodes=self.crud_pyppetdb_nodes,
+            )
+        )
+
+        self.crud_nodes_placement_migrations = self.crud_manager.register(
+            crud=CrudNodesPlacementMigrations(
+                config=config,
+                log=log,
+                coll=mongo_db["nodes_placement_migrations"],
+                crud_nodes_catalog_cache=self.crud_nodes_catalog_cache,
+                crud_nodes_catalogs=self.crud_nodes_catalogs,
+                crud_nodes_reports=self.crud_nodes_reports,
+                crud_pyppetdb_nodes=self.crud_pyppetdb_nodes,
+            )
+        )
+
+        self.pql_engine = PqlEngine(
+            log=log,
+            crud_nodes=self.crud_nodes,
+            crud_nodes_resources_exported=self.crud_nodes_resources_exported,
+        )
+
         self.crud_teams = self.crud_manager.register(
             crud=CrudTeams(
                 config=config,
@@ -445,6 +589,10 @@ class AppContainer:
             self.log.info(msg="Closing LDAP pool...")
             await self.ldap_pool.close()
 
+        if self.nodes_secrets_redactor_pool:
+            self.log.info(msg="Stopping redaction worker processes...")
+            self.nodes_secrets_redactor_pool.close()
+
         if self.http:
             self.log.info(msg="Closing HTTP client...")
             await self.http.aclose()
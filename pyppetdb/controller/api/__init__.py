@@ -37,10 +37,18 @@ from pyppetdb.crud.jobs_nodes_jobs import CrudJobsNodeJobs
 from pyppetdb.crud.ldap import CrudLdap
 from pyppetdb.crud.nodes import CrudNodes
 from pyppetdb.crud.nodes_catalog_cache import CrudNodesCatalogCache
+from pyppetdb.crud.nodes_placement_migrations import CrudNodesPlacementMigrations
 from pyppetdb.crud.nodes_catalogs import CrudNodesCatalogs
 from pyppetdb.crud.nodes_groups import CrudNodesGroups
+from pyppetdb.crud.nodes_groups_reevaluations import CrudNodesGroupsReevaluations
 from pyppetdb.crud.nodes_reports import CrudNodesReports
+from pyppetdb.crud.nodes_reports_rollups import CrudNodesReportsRollups
 from pyppetdb.crud.pyppetdb_nodes import CrudPyppetDBNodes
+from pyppetdb.crud.nodes_resources_exported import CrudNodesResourcesExported
+from pyppetdb.crud.nodes_facts_histogram import CrudNodesFactsHistogram
+from pyppetdb.crud.nodes_facts_keys import CrudNodesFactsKeys
+from pyppetdb.crud.nodes_facts_history import CrudNodesFactsHistory
+from pyppetdb.crud.nodes_facts_queries import CrudNodesFactsQueries
 from pyppetdb.crud.nodes_secrets_redactor import CrudNodesSecretsRedactor
 from pyppetdb.crud.nodes_secrets_redactor import NodesSecretsRedactor
 from pyppetdb.crud.teams import CrudTeams
@@ -70,11 +78,19 @@ class ControllerApi:
         crud_node_jobs: CrudJobsNodeJobs,
         crud_nodes: CrudNodes,
         crud_nodes_catalog_cache: CrudNodesCatalogCache,
+        crud_nodes_placement_migrations: CrudNodesPlacementMigrations,
         crud_nodes_catalogs: CrudNodesCatalogs,
         crud_nodes_groups: CrudNodesGroups,
+        crud_nodes_groups_reevaluations: CrudNodesGroupsReevaluations,
         crud_nodes_reports: CrudNodesReports,
+        crud_nodes_reports_rollups: CrudNodesReportsRollups,
         crud_nodes_secrets_redactor: CrudNodesSecretsRedactor,
         crud_pyppetdb_nodes: CrudPyppetDBNodes,
+        crud_nodes_resources_exported: CrudNodesResourcesExported,
+        crud_nodes_facts_histogram: CrudNodesFactsHistogram,
+        crud_nodes_facts_keys: CrudNodesFactsKeys,
+        crud_nodes_facts_history: CrudNodesFactsHistory,
+        crud_nodes_facts_queries: CrudNodesFactsQueries,
         crud_teams: CrudTeams,
         crud_users: CrudUsers,
         crud_users_credentials: CrudCredentials,
@@ -109,11 +125,19 @@ class ControllerApi:
                 crud_node_jobs=crud_node_jobs,
                 crud_nodes=crud_nodes,
                 crud_nodes_catalog_cache=crud_nodes_catalog_cache,
+                crud_nodes_placement_migrations=crud_nodes_placement_migrations,
                 crud_nodes_catalogs=crud_nodes_catalogs,
                 crud_nodes_groups=crud_nodes_groups,
+                crud_nodes_groups_reevaluations=crud_nodes_groups_reevaluations,
                 crud_nodes_reports=crud_nodes_reports,
+                crud_nodes_reports_rollups=crud_nodes_reports_rollups,
                 crud_nodes_secrets_redactor=crud_nodes_secrets_redactor,
                 crud_pyppetdb_nodes=crud_pyppetdb_nodes,
+                crud_nodes_resources_exported=crud_nodes_resources_exported,
+                crud_nodes_facts_histogram=crud_nodes_facts_histogram,
+                crud_nodes_facts_keys=crud_nodes_facts_keys,
+                crud_nodes_facts_history=crud_nodes_facts_history,
+                crud_nodes_facts_queries=crud_nodes_facts_queries,
                 crud_teams=crud_teams,
                 crud_users=crud_users,
                 crud_users_credentials=crud_users_credentials,
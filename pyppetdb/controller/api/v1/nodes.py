@@ -13,11 +13,15 @@
 # limitations under the License.
 
 import logging
+from typing import AsyncIterator
 from typing import Set
 
+from datetime import datetime
+
 from fastapi import APIRouter
 from fastapi import Query
 from fastapi import Request
+from fastapi.responses import StreamingResponse
 
 from pyppetdb.authorize import AuthorizePyppetDB
 from pyppetdb.authorize import PERM_NODES_CREATE
@@ -28,16 +32,33 @@ from pyppetdb.authorize import PERM_NODES_CATALOG_CACHE_DELETE
 from pyppetdb.crud.nodes import CrudNodes
 from pyppetdb.crud.nodes_catalog_cache import CrudNodesCatalogCache
 from pyppetdb.crud.nodes_catalogs import CrudNodesCatalogs
+from pyppetdb.crud.nodes_facts_histogram import CrudNodesFactsHistogram
+from pyppetdb.crud.nodes_facts_keys import CrudNodesFactsKeys
 from pyppetdb.crud.nodes_groups import CrudNodesGroups
+from pyppetdb.crud.nodes_placement_migrations import CrudNodesPlacementMigrations
 from pyppetdb.crud.nodes_reports import CrudNodesReports
+from pyppetdb.crud.nodes_reports_rollups import CrudNodesReportsRollups
+from pyppetdb.crud.nodes_resources_exported import CrudNodesResourcesExported
 from pyppetdb.crud.teams import CrudTeams
 from pyppetdb.crud.jobs_jobs import CrudJobs
 from pyppetdb.crud.jobs_nodes_jobs import CrudJobsNodeJobs
 from pyppetdb.ca.service import CAService
 
+from pyppetdb.helpers.arrow import ARROW_MEDIA_TYPES
+from pyppetdb.helpers.arrow import arrow_columns
+from pyppetdb.helpers.arrow import arrow_format_literal
+from pyppetdb.helpers.arrow import arrow_required
+from pyppetdb.helpers.arrow import arrow_stream
+from pyppetdb.helpers.ndjson import ndjson_stream
+
 from pyppetdb.model.common import DataDelete
 from pyppetdb.model.common import sort_order_literal
 from pyppetdb.model.common import filter_complex_search
+from pyppetdb.model.nodes import export_kind_literal
+from pyppetdb.model.nodes import fact_key_filter_list
+from pyppetdb.model.nodes import fact_key_filter_literal
+from pyppetdb.model.nodes import fact_key_sort_literal
+from pyppetdb.model.nodes import fact_key_type_literal
 from pyppetdb.model.nodes import filter_list
 from pyppetdb.model.nodes import filter_literal
 from pyppetdb.model.nodes import sort_literal
@@ -46,7 +67,19 @@ from pyppetdb.model.nodes import NodeGetMulti
 from pyppetdb.model.nodes import NodePut
 from pyppetdb.model.nodes import NodePutInternal
 from pyppetdb.model.nodes import NodeGetDistinctFactValues
+from pyppetdb.model.nodes import NodeGetFactKeys
 from pyppetdb.model.nodes import NodeGetCatalogResources
+from pyppetdb.model.nodes import NodeGetGroupBy
+from pyppetdb.model.nodes_placement_migrations import migration_filter_list
+from pyppetdb.model.nodes_placement_migrations import migration_filter_literal
+from pyppetdb.model.nodes_placement_migrations import migration_sort_literal
+from pyppetdb.model.nodes_placement_migrations import migration_status_literal
+from pyppetdb.model.nodes_placement_migrations import NodePlacementMigrationGetMulti
+from pyppetdb.model.nodes_reports import rollup_filter_list
+from pyppetdb.model.nodes_reports import rollup_filter_literal
+from pyppetdb.model.nodes_reports import rollup_period_literal
+from pyppetdb.model.nodes_reports import rollup_sort_literal
+from pyppetdb.model.nodes_reports import NodeReportRollupGetMulti
 from pyppetdb.model.ca_certificates import CACertificatePut
 
 
@@ -58,9 +91,14 @@ class ControllerApiV1Nodes:
         authorize: AuthorizePyppetDB,
         crud_nodes: CrudNodes,
         crud_nodes_catalog_cache: CrudNodesCatalogCache,
+        crud_nodes_placement_migrations: CrudNodesPlacementMigrations,
         crud_nodes_catalogs: CrudNodesCatalogs,
+        crud_nodes_facts_histogram: CrudNodesFactsHistogram,
+        crud_nodes_facts_keys: CrudNodesFactsKeys,
         crud_nodes_groups: CrudNodesGroups,
         crud_nodes_reports: CrudNodesReports,
+        crud_nodes_reports_rollups: CrudNodesReportsRollups,
+        crud_nodes_resources_exported: CrudNodesResourcesExported,
         crud_teams: CrudTeams,
         crud_jobs: CrudJobs,
         crud_node_jobs: CrudJobsNodeJobs,
@@ -69,9 +107,14 @@ class ControllerApiV1Nodes:
         self._authorize = authorize
         self._crud_nodes = crud_nodes
         self._crud_nodes_catalog_cache = crud_nodes_catalog_cache
+        self._crud_nodes_placement_migrations = crud_nodes_placement_migrations
         self._crud_nodes_catalogs = crud_nodes_catalogs
+        self._crud_nodes_facts_histogram = crud_nodes_facts_histogram
+        self._crud_nodes_facts_keys = crud_nodes_facts_keys
         self._crud_nodes_groups = crud_nodes_groups
         self._crud_nodes_reports = crud_nodes_reports
+        self._crud_nodes_reports_rollups = crud_nodes_reports_rollups
+        self._crud_nodes_resources_exported = crud_nodes_resources_exported
         self._crud_teams = crud_teams
         self._crud_jobs = crud_jobs
         self._crud_node_jobs = crud_node_jobs
@@ -96,6 +139,33 @@ class ControllerApiV1Nodes:
             response_model_exclude_unset=True,
             methods=["GET"],
         )
+        self.router.add_api_route(
+            "/_fact_keys",
+            self.fact_keys,
+            response_model=NodeGetFactKeys,
+            response_model_exclude_unset=True,
+            methods=["GET"],
+        )
+        self.router.add_api_route(
+            "/_group_by",
+            self.group_by,
+            response_model=NodeGetGroupBy,
+            methods=["GET"],
+        )
+        self.router.add_api_route(
+            "/_placement_migrations",
+            self.placement_migrations,
+            response_model=NodePlacementMigrationGetMulti,
+            response_model_exclude_unset=True,
+            methods=["GET"],
+        )
+        self.router.add_api_route(
+            "/_report_rollups",
+            self.report_rollups,
+            response_model=NodeReportRollupGetMulti,
+            response_model_exclude_unset=True,
+            methods=["GET"],
+        )
         self.router.add_api_route(
             "/_exported_resources",
             self.exported_resources,
@@ -103,6 +173,18 @@ class ControllerApiV1Nodes:
             response_model_exclude_unset=True,
             methods=["GET"],
         )
+        self.router.add_api_route(
+            "/_export/{kind}",
+            self.export,
+            response_class=StreamingResponse,
+            methods=["GET"],
+        )
+        self.router.add_api_route(
+            "/_export_facts/{export_format}",
+            self.export_facts,
+            response_class=StreamingResponse,
+            methods=["GET"],
+        )
         self.router.add_api_route(
             "/_catalog_cache_wipe",
             self.catalog_cache_wipe,
@@ -152,10 +234,22 @@ class ControllerApiV1Nodes:
     def crud_nodes_catalog_cache(self):
         return self._crud_nodes_catalog_cache
 
+    @property
+    def crud_nodes_placement_migrations(self):
+        return self._crud_nodes_placement_migrations
+
     @property
     def crud_nodes_catalogs(self):
         return self._crud_nodes_catalogs
 
+    @property
+    def crud_nodes_facts_histogram(self):
+        return self._crud_nodes_facts_histogram
+
+    @property
+    def crud_nodes_facts_keys(self):
+        return self._crud_nodes_facts_keys
+
     @property
     def crud_nodes_groups(self):
         return self._crud_nodes_groups
@@ -164,6 +258,14 @@ class ControllerApiV1Nodes:
     def crud_nodes_reports(self):
         return self._crud_nodes_reports
 
+    @property
+    def crud_nodes_reports_rollups(self):
+        return self._crud_nodes_reports_rollups
+
+    @property
+    def crud_nodes_resources_exported(self):
+        return self._crud_nodes_resources_exported
+
     @property
     def crud_teams(self):
         return self._crud_teams
@@ -212,8 +314,10 @@ class ControllerApiV1Nodes:
             fields=[],
         )
 
-        await self.crud_nodes_groups.delete_node_from_nodes_groups(node_id=node_id)
-        placement = await self.crud_nodes.get_placement(_id=node_id)
+        placement = await self.crud_nodes_placement_migrations.read_placement(
+            node_id=node_id,
+            placement=await self.crud_nodes.get_placement(_id=node_id),
+        )
         await self.crud_nodes_catalogs.delete_all_from_node(
             node_id=node_id,
             placement=placement,
@@ -222,6 +326,8 @@ class ControllerApiV1Nodes:
             node_id=node_id,
             placement=placement,
         )
+        await self.crud_nodes_placement_migrations.delete(node_id=node_id)
+        await self.crud_nodes_resources_exported.delete_all_from_node(node_id=node_id)
         await self.crud_jobs.remove_node_from_jobs(node_id=node_id)
         await self.crud_node_jobs.delete_by_node(node_id=node_id)
 
@@ -241,21 +347,13 @@ class ControllerApiV1Nodes:
         user_node_groups = await self.authorize.get_user_node_groups(
             request=request, user=user
         )
-        node = await self.crud_nodes.get(
+        return await self.crud_nodes.get(
             _id=node_id,
             user_node_groups=user_node_groups,
             fields=list(fields),
             outdated_threshold=outdated_threshold,
         )
 
-        if "catalog_cached" in fields:
-            cached_node_ids = await self.crud_nodes_catalog_cache.get_cached_node_ids(
-                [node_id]
-            )
-            node.catalog_cached = node_id in cached_node_ids
-
-        return node
-
     async def distinct_fact_values(
         self,
         request: Request,
@@ -269,6 +367,18 @@ class ControllerApiV1Nodes:
         user_node_groups = await self.authorize.get_user_node_groups(
             request=request, user=user
         )
+        if (
+            user_node_groups is None
+            and disabled is None
+            and not environment
+            and not fact
+            and not report_status
+        ):
+            result = await self.crud_nodes_facts_histogram.distinct_fact_values(
+                fact_id=fact_id,
+            )
+            if result is not None:
+                return result
         return await self.crud_nodes.distinct_fact_values(
             user_node_groups=user_node_groups,
             fact_id=fact_id,
@@ -278,6 +388,156 @@ class ControllerApiV1Nodes:
             report_status=report_status,
         )
 
+    async def fact_keys(
+        self,
+        request: Request,
+        prefix: str = Query(description="fact path prefix", default=None),
+        fact_type: fact_key_type_literal = Query(alias="type", default=None),
+        fields: Set[fact_key_filter_literal] = Query(default=fact_key_filter_list),
+        sort: fact_key_sort_literal = Query(default="path"),
+        sort_order: sort_order_literal = Query(default="ascending"),
+        page: int = Query(default=0, ge=0, description="pagination index"),
+        limit: int = Query(
+            default=100,
+            ge=10,
+            le=1000,
+            description="pagination limit, min value 10, max value 1000",
+        ),
+    ):
+        user = await self.authorize.require_user(request=request)
+        user_node_groups = await self.authorize.get_user_node_groups(
+            request=request, user=user
+        )
+        if user_node_groups is not None:
+            fields = set(fields) - {"samples"}
+        return await self.crud_nodes_facts_keys.search(
+            prefix=prefix,
+            _type=fact_type,
+            fields=list(fields),
+            sort=sort,
+            sort_order=sort_order,
+            page=page,
+            limit=limit,
+        )
+
+    async def group_by(
+        self,
+        request: Request,
+        group_by: list[str] = Query(
+            description="node field or facts.<fact path>, repeat to group by several"
+        ),
+        node_id: str = Query(description="filter: regular_expressions", default=None),
+        disabled: bool = Query(default=None),
+        environment: str = Query(
+            description="filter: regular_expressions", default=None
+        ),
+        fact: filter_complex_search = Query(default=None),
+        report_status: str = Query(
+            description="filter: regular_expressions", default=None
+        ),
+        outdated_threshold: str = Query(
+            default=None,
+            description="ISO timestamp for outdated threshold (defaults to now-2h)",
+        ),
+        limit: int = Query(default=None, ge=1),
+        stream: bool = Query(default=False, description="stream rows as ndjson"),
+        compress: bool = Query(default=False, description="gzip the ndjson stream"),
+    ):
+        user = await self.authorize.require_user(request=request)
+        user_node_groups = await self.authorize.get_user_node_groups(
+            request=request, user=user
+        )
+        rows = self.crud_nodes.group_by(
+            group_by=group_by,
+            _id=node_id,
+            user_node_groups=user_node_groups,
+            disabled=disabled,
+            environment=environment,
+            fact=fact,
+            report_status=report_status,
+            outdated_threshold=outdated_threshold,
+            limit=limit,
+        )
+        if stream:
+            headers = {}
+            if compress:
+                headers["Content-Encoding"] = "gzip"
+            return StreamingResponse(
+                content=ndjson_stream(docs=rows, compress=compress),
+                media_type="application/x-ndjson",
+                headers=headers,
+            )
+        result = [list(row.values()) async for row in rows]
+        return NodeGetGroupBy(
+            columns=[*dict.fromkeys(group_by), "count"],
+            rows=result,
+            meta={"result_size": len(result)},
+        )
+
+    async def placement_migrations(
+        self,
+        request: Request,
+        node_id: str = Query(description="filter: regular_expressions", default=None),
+        status: migration_status_literal = Query(default=None),
+        fields: Set[migration_filter_literal] = Query(default=migration_filter_list),
+        sort: migration_sort_literal = Query(default="requested"),
+        sort_order: sort_order_literal = Query(default="ascending"),
+        page: int = Query(default=0, ge=0, description="pagination index"),
+        limit: int = Query(
+            default=100,
+            ge=10,
+            le=1000,
+            description="pagination limit, min value 10, max value 1000",
+        ),
+    ):
+        await self.authorize.require_admin(request=request)
+        return await self.crud_nodes_placement_migrations.search(
+            node_id=node_id,
+            status=status,
+            fields=list(fields),
+            sort=sort,
+            sort_order=sort_order,
+            page=page,
+            limit=limit,
+        )
+
+    async def report_rollups(
+        self,
+        request: Request,
+        period: rollup_period_literal = Query(default="hour"),
+        start: datetime = Query(
+            default=None, description="first bucket start, inclusive"
+        ),
+        end: datetime = Query(default=None, description="last bucket start, exclusive"),
+        environment: str = Query(
+            description="filter: regular_expressions", default=None
+        ),
+        status: str = Query(description="filter: regular_expressions", default=None),
+        fields: Set[rollup_filter_literal] = Query(default=rollup_filter_list),
+        sort: rollup_sort_literal = Query(default="start"),
+        sort_order: sort_order_literal = Query(default="ascending"),
+        page: int = Query(default=0, ge=0, description="pagination index"),
+        limit: int = Query(
+            default=100,
+            ge=10,
+            le=1000,
+            description="pagination limit, min value 10, max value 1000",
+        ),
+    ):
+        await self.authorize.require_admin(request=request)
+        return await self.crud_nodes_reports_rollups.search(
+            period=period,
+            start=start,
+            end=end,
+            environment=environment,
+            status=status,
+            fields=list(fields),
+            sort=sort,
+            sort_order=sort_order,
+            page=page,
+            limit=limit,
+        )
+
     async def exported_resources(
         self,
         request: Request,
@@ -292,14 +552,107 @@ class ControllerApiV1Nodes:
         user_node_groups = await self.authorize.get_user_node_groups(
             request=request, user=user
         )
-        return await self.crud_nodes.exported_resources(
-            user_node_groups=user_node_groups,
+        return await self.crud_nodes_resources_exported.search(
             resource_type=resource_type,
             resource_title=resource_title,
             resource_tags=resource_tags,
+            environment=environment,
+            user_node_groups=user_node_groups,
+            disabled=disabled,
+            fact=fact,
+        )
+
+    async def export(
+        self,
+        request: Request,
+        kind: export_kind_literal,
+        node_id: str = Query(description="filter: regular_expressions", default=None),
+        disabled: bool = Query(default=None),
+        environment: str = Query(
+            description="filter: regular_expressions", default=None
+        ),
+        fact: filter_complex_search = Query(default=None),
+        report_status: str = Query(
+            description="filter: regular_expressions", default=None
+        ),
+        fields: Set[filter_literal] = Query(
+            default=filter_list,
+            description="projected fields, only used for the nodes export",
+        ),
+        compress: bool = Query(default=False, description="gzip the ndjson stream"),
+    ):
+        user = await self.authorize.require_user(request=request)
+        user_node_groups = await self.authorize.get_user_node_groups(
+            request=request, user=user
+        )
+        docs = self.crud_nodes.export(
+            kind=kind,
+            fields=list(fields),
+            _id=node_id,
+            user_node_groups=user_node_groups,
+            disabled=disabled,
+            environment=environment,
+            fact=fact,
+            report_status=report_status,
+        )
+        if kind == "catalogs":
+            docs = self._redact_catalogs(docs=docs)
+        headers = {"Content-Disposition": f'attachment; filename="{kind}.ndjson"'}
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(
+            content=ndjson_stream(docs=docs, compress=compress),
+            media_type="application/x-ndjson",
+            headers=headers,
+        )
+
+    async def _redact_catalogs(self, docs: AsyncIterator[dict]) -> AsyncIterator[dict]:
+        async for doc in docs:
+            yield await self.crud_nodes_catalogs.redact(doc)
+
+    async def export_facts(
+        self,
+        request: Request,
+        export_format: arrow_format_literal,
+        columns: list[str] = Query(
+            description="fact path with optional :str, :int, :float or :bool type"
+        ),
+        node_id: str = Query(description="filter: regular_expressions", default=None),
+        disabled: bool = Query(default=None),
+        environment: str = Query(
+            description="filter: regular_expressions", default=None
+        ),
+        fact: filter_complex_search = Query(default=None),
+        report_status: str = Query(
+            description="filter: regular_expressions", default=None
+        ),
+    ):
+        arrow_required()
+        columns = arrow_columns(columns)
+        user = await self.authorize.require_user(request=request)
+        user_node_groups = await self.authorize.get_user_node_groups(
+            request=request, user=user
+        )
+        docs = self.crud_nodes.export(
+            kind="facts",
+            facts=[path for path, _ in columns],
+            _id=node_id,
+            user_node_groups=user_node_groups,
             disabled=disabled,
             environment=environment,
             fact=fact,
+            report_status=report_status,
+        )
+        return StreamingResponse(
+            content=arrow_stream(
+                docs=docs,
+                columns=columns,
+                export_format=export_format,
+            ),
+            media_type=ARROW_MEDIA_TYPES[export_format],
+            headers={
+                "Content-Disposition": f'attachment; filename="facts.{export_format}"'
+            },
         )
 
     async def search(
@@ -320,6 +673,7 @@ class ControllerApiV1Nodes:
         ),
         remote_agent_connected: bool = Query(default=None),
         remote_agent_via: str = Query(default=None),
+        catalog_cached: bool = Query(default=None),
         fields: Set[filter_literal] = Query(default=filter_list),
         sort: sort_literal = Query(default="id"),
         sort_order: sort_order_literal = Query(default="ascending"),
@@ -335,7 +689,7 @@ class ControllerApiV1Nodes:
         user_node_groups = await self.authorize.get_user_node_groups(
             request=request, user=user
         )
-        result = await self.crud_nodes.search(
+        return await self.crud_nodes.search(
             _id=node_id,
             user_node_groups=user_node_groups,
             disabled=disabled,
@@ -345,6 +699,7 @@ class ControllerApiV1Nodes:
             outdated_threshold=outdated_threshold,
             remote_agent_connected=remote_agent_connected,
             remote_agent_via=remote_agent_via,
+            catalog_cached=catalog_cached,
             fields=list(fields),
             sort=sort,
             sort_order=sort_order,
@@ -352,17 +707,6 @@ class ControllerApiV1Nodes:
             limit=limit,
         )
 
-        if "catalog_cached" in fields and "id" in fields:
-            node_ids = [node.id for node in result.result if node.id]
-            cached_node_ids = await self.crud_nodes_catalog_cache.get_cached_node_ids(
-                node_ids
-            )
-
-            for node in result.result:
-                node.catalog_cached = node.id in cached_node_ids
-
-        return result
-
     async def update(
         self,
         data: NodePut,
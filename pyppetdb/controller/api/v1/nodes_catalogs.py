@@ -23,6 +23,7 @@ from fastapi import Request
 from pyppetdb.authorize import AuthorizePyppetDB
 
 from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.crud.nodes_placement_migrations import CrudNodesPlacementMigrations
 from pyppetdb.crud.nodes_catalogs import CrudNodesCatalogs
 
 from pyppetdb.model.common import sort_order_literal
@@ -39,10 +40,12 @@ class ControllerApiV1NodesCatalogs:
         log: logging.Logger,
         authorize: AuthorizePyppetDB,
         crud_nodes: CrudNodes,
+        crud_nodes_placement_migrations: CrudNodesPlacementMigrations,
         crud_nodes_catalogs: CrudNodesCatalogs,
     ):
         self._authorize = authorize
         self._crud_nodes = crud_nodes
+        self._crud_nodes_placement_migrations = crud_nodes_placement_migrations
         self._crud_nodes_catalogs = crud_nodes_catalogs
         self._log = log
         self._router = APIRouter(
@@ -73,6 +76,10 @@ class ControllerApiV1NodesCatalogs:
     def crud_nodes(self):
         return self._crud_nodes
 
+    @property
+    def crud_nodes_placement_migrations(self):
+        return self._crud_nodes_placement_migrations
+
     @property
     def crud_nodes_catalogs(self):
         return self._crud_nodes_catalogs
@@ -99,7 +106,10 @@ class ControllerApiV1NodesCatalogs:
         await self.crud_nodes.resource_exists(
             _id=node_id, user_node_groups=user_node_groups
         )
-        placement = await self.crud_nodes.get_placement(_id=node_id)
+        placement = await self.crud_nodes_placement_migrations.read_placement(
+            node_id=node_id,
+            placement=await self.crud_nodes.get_placement(_id=node_id),
+        )
         return await self.crud_nodes_catalogs.get(
             _id=catalog_id,
             node_id=node_id,
@@ -132,7 +142,10 @@ class ControllerApiV1NodesCatalogs:
         await self.crud_nodes.resource_exists(
             _id=node_id, user_node_groups=user_node_groups
         )
-        placement = await self.crud_nodes.get_placement(_id=node_id)
+        placement = await self.crud_nodes_placement_migrations.read_placement(
+            node_id=node_id,
+            placement=await self.crud_nodes.get_placement(_id=node_id),
+        )
         return await self.crud_nodes_catalogs.search(
             node_id=node_id,
             catalog_status=catalog_status,
@@ -0,0 +1,137 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime
+import logging
+from typing import Set
+
+from fastapi import APIRouter
+from fastapi import Query
+from fastapi import Request
+
+from pyppetdb.authorize import AuthorizePyppetDB
+from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.crud.nodes_facts_history import CrudNodesFactsHistory
+from pyppetdb.model.common import sort_order_literal
+from pyppetdb.model.nodes_facts_history import filter_list
+from pyppetdb.model.nodes_facts_history import filter_literal
+from pyppetdb.model.nodes_facts_history import sort_literal
+from pyppetdb.model.nodes_facts_history import NodeFactsHistoryGetMulti
+from pyppetdb.model.nodes_facts_history import NodeFactsHistoryState
+
+
+class ControllerApiV1NodesFactsHistory:
+    def __init__(
+        self,
+        log: logging.Logger,
+        authorize: AuthorizePyppetDB,
+        crud_nodes: CrudNodes,
+        crud_nodes_facts_history: CrudNodesFactsHistory,
+    ):
+        self._authorize = authorize
+        self._crud_nodes = crud_nodes
+        self._crud_nodes_facts_history = crud_nodes_facts_history
+        self._log = log
+        self._router = APIRouter(
+            prefix="/nodes/{node_id}/facts_history",
+            tags=["nodes_facts_history"],
+        )
+
+        self.router.add_api_route(
+            "",
+            self.search,
+            response_model=NodeFactsHistoryGetMulti,
+            response_model_exclude_unset=True,
+            methods=["GET"],
+        )
+        self.router.add_api_route(
+            "/_state",
+            self.get_state,
+            response_model=NodeFactsHistoryState,
+            methods=["GET"],
+        )
+
+    @property
+    def authorize(self):
+        return self._authorize
+
+    @property
+    def crud_nodes(self):
+        return self._crud_nodes
+
+    @property
+    def crud_nodes_facts_history(self):
+        return self._crud_nodes_facts_history
+
+    @property
+    def log(self):
+        return self._log
+
+    @property
+    def router(self):
+        return self._router
+
+    async def get_state(
+        self,
+        node_id: str,
+        request: Request,
+        at: datetime = Query(
+            default=None,
+            description="point in time to reconstruct, defaults to the latest state",
+        ),
+    ):
+        user = await self.authorize.require_user(request=request)
+        user_node_groups = await self.authorize.get_user_node_groups(
+            request=request, user=user
+        )
+        await self.crud_nodes.resource_exists(
+            _id=node_id, user_node_groups=user_node_groups
+        )
+        return await self.crud_nodes_facts_history.get_state(node_id=node_id, at=at)
+
+    async def search(
+        self,
+        request: Request,
+        node_id: str,
+        fact: str = Query(
+            description="filter: only changes touching this dotted fact path",
+            default=None,
+        ),
+        fields: Set[filter_literal] = Query(default=filter_list),
+        sort: sort_literal = Query(default="id"),
+        sort_order: sort_order_literal = Query(default="descending"),
+        page: int = Query(default=0, ge=0, description="pagination index"),
+        limit: int = Query(
+            default=10,
+            ge=10,
+            le=1000,
+            description="pagination limit, min value 10, max value 1000",
+        ),
+    ):
+        user = await self.authorize.require_user(request=request)
+        user_node_groups = await self.authorize.get_user_node_groups(
+            request=request, user=user
+        )
+        await self.crud_nodes.resource_exists(
+            _id=node_id, user_node_groups=user_node_groups
+        )
+        return await self.crud_nodes_facts_history.search(
+            node_id=node_id,
+            fact=fact,
+            fields=list(fields),
+            sort=sort,
+            sort_order=sort_order,
+            page=page,
+            limit=limit,
+        )
@@ -0,0 +1,61 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+from fastapi import APIRouter
+from fastapi import Request
+
+from pyppetdb.authorize import AuthorizePyppetDB
+from pyppetdb.authorize import PERM_NODES_FACTS_INDEXES_GET
+from pyppetdb.crud.nodes_facts_queries import CrudNodesFactsQueries
+from pyppetdb.model.nodes_facts_indexes import NodesFactsIndexGetMulti
+
+
+class ControllerApiV1NodesFactsIndexes:
+    def __init__(
+        self,
+        log: logging.Logger,
+        authorize: AuthorizePyppetDB,
+        crud_nodes_facts_queries: CrudNodesFactsQueries,
+    ):
+        self._authorize = authorize
+        self._crud_nodes_facts_queries = crud_nodes_facts_queries
+        self._log = log
+        self._router = APIRouter(
+            prefix="/nodes_facts_indexes",
+            tags=["nodes_facts_indexes"],
+        )
+
+        self.router.add_api_route(
+            "",
+            self.search,
+            response_model=NodesFactsIndexGetMulti,
+            response_model_exclude_unset=True,
+            methods=["GET"],
+        )
+
+    @property
+    def router(self):
+        return self._router
+
+    async def search(
+        self,
+        request: Request,
+    ):
+        await self._authorize.require_perm(
+            request=request, permission=PERM_NODES_FACTS_INDEXES_GET
+        )
+        await self._crud_nodes_facts_queries.flush()
+        return await self._crud_nodes_facts_queries.get_advice()
@@ -26,6 +26,7 @@ from pyppetdb.authorize import PERM_NODES_GROUPS_GET
 from pyppetdb.authorize import PERM_NODES_GROUPS_UPDATE
 from pyppetdb.crud.nodes import CrudNodes
 from pyppetdb.crud.nodes_groups import CrudNodesGroups
+from pyppetdb.crud.nodes_groups_reevaluations import CrudNodesGroupsReevaluations
 from pyppetdb.crud.teams import CrudTeams
 from pyppetdb.model.common import DataDelete
 from pyppetdb.model.common import sort_order_literal
@@ -34,6 +35,7 @@ from pyppetdb.model.nodes_groups import filter_literal
 from pyppetdb.model.nodes_groups import sort_literal
 from pyppetdb.model.nodes_groups import NodeGroupGet
 from pyppetdb.model.nodes_groups import NodeGroupGetMulti
+from pyppetdb.model.nodes_groups import NodeGroupReevaluationGet
 from pyppetdb.model.nodes_groups import NodeGroupUpdate
 from pyppetdb.model.nodes_groups import NodeGroupUpdateInternal
 
@@ -46,11 +48,13 @@ class ControllerApiV1NodesGroups:
         authorize: AuthorizePyppetDB,
         crud_nodes: CrudNodes,
         crud_nodes_groups: CrudNodesGroups,
+        crud_nodes_groups_reevaluations: CrudNodesGroupsReevaluations,
         crud_teams: CrudTeams,
     ):
         self._authorize = authorize
         self._crud_nodes = crud_nodes
         self._crud_nodes_groups = crud_nodes_groups
+        self._crud_nodes_groups_reevaluations = crud_nodes_groups_reevaluations
         self._crud_teams = crud_teams
         self._log = log
         self._router = APIRouter(
@@ -94,6 +98,13 @@ class ControllerApiV1NodesGroups:
             response_model_exclude_unset=True,
             methods=["PUT"],
         )
+        self.router.add_api_route(
+            "/{node_group_id}/_reevaluation",
+            self.get_reevaluation,
+            response_model=NodeGroupReevaluationGet,
+            response_model_exclude_unset=True,
+            methods=["GET"],
+        )
 
     @property
     def authorize(self):
@@ -107,6 +118,10 @@ class ControllerApiV1NodesGroups:
     def crud_nodes_groups(self):
         return self._crud_nodes_groups
 
+    @property
+    def crud_nodes_groups_reevaluations(self):
+        return self._crud_nodes_groups_reevaluations
+
     @property
     def crud_teams(self):
         return self._crud_teams
@@ -125,14 +140,10 @@ class ControllerApiV1NodesGroups:
         data: NodeGroupUpdate,
     ):
         data = NodeGroupUpdateInternal(**data.model_dump())
-        await self.add_nodes_from_filter(node_group=data)
         if data.teams:
             data.teams = list(set(data.teams))
             for team in data.teams:
                 await self.crud_teams.resource_exists(_id=team)
-        await self.crud_nodes.update_nodegroup(
-            node_group_id=node_group_id, nodes=data.nodes
-        )
         return NodeGroupUpdateInternal(**data.model_dump())
 
     async def create(
@@ -152,6 +163,9 @@ class ControllerApiV1NodesGroups:
             payload=data,
             fields=list(fields),
         )
+        await self.crud_nodes_groups_reevaluations.schedule(
+            node_group_id=node_group_id
+        )
         return result
 
     async def delete(
@@ -163,26 +177,11 @@ class ControllerApiV1NodesGroups:
             request=request, permission=PERM_NODES_GROUPS_DELETE
         )
         await self.crud_nodes.delete_node_group_from_all(node_group_id=node_group_id)
+        await self.crud_nodes_groups_reevaluations.delete(node_group_id=node_group_id)
         return await self.crud_nodes_groups.delete(
             _id=node_group_id,
         )
 
-    async def add_nodes_from_filter(
-        self,
-        node_group: NodeGroupGet | NodeGroupUpdateInternal,
-    ):
-        query = self.crud_nodes_groups.compile_filters_from_node_group(
-            node_group=node_group
-        )
-        nodes = await self.crud_nodes.search(
-            query=query,
-            fields=["id"],
-        )
-        result = list()
-        for node in nodes.result:
-            result.append(node.id)
-        node_group.nodes = result
-
     async def get(
         self,
         node_group_id: str,
@@ -197,6 +196,16 @@ class ControllerApiV1NodesGroups:
         )
         return result
 
+    async def get_reevaluation(
+        self,
+        node_group_id: str,
+        request: Request,
+    ):
+        await self.authorize.require_perm(
+            request=request, permission=PERM_NODES_GROUPS_GET
+        )
+        return await self.crud_nodes_groups_reevaluations.get(_id=node_group_id)
+
     async def search(
         self,
         request: Request,
@@ -241,9 +250,20 @@ class ControllerApiV1NodesGroups:
             request=request, permission=PERM_NODES_GROUPS_UPDATE
         )
         data = await self._upsert_data(node_group_id=node_group_id, data=data)
+        # only a filter change can move nodes in or out of the group
+        filters_changed = False
+        if data.filters is not None:
+            stored = await self.crud_nodes_groups.get(
+                _id=node_group_id, fields=["filters"]
+            )
+            filters_changed = stored.filters != data.filters
         result = await self.crud_nodes_groups.update(
             _id=node_group_id,
             payload=data,
             fields=list(fields),
         )
+        if filters_changed:
+            await self.crud_nodes_groups_reevaluations.schedule(
+                node_group_id=node_group_id
+            )
         return result
@@ -22,6 +22,7 @@ from fastapi import Request
 
 from pyppetdb.authorize import AuthorizePyppetDB
 from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.crud.nodes_placement_migrations import CrudNodesPlacementMigrations
 from pyppetdb.crud.nodes_reports import CrudNodesReports
 from pyppetdb.model.common import sort_order_literal
 from pyppetdb.model.nodes_reports import filter_list
@@ -37,10 +38,12 @@ class ControllerApiV1NodesReports:
         log: logging.Logger,
         authorize: AuthorizePyppetDB,
         crud_nodes: CrudNodes,
+        crud_nodes_placement_migrations: CrudNodesPlacementMigrations,
         crud_nodes_reports: CrudNodesReports,
     ):
         self._authorize = authorize
         self._crud_nodes = crud_nodes
+        self._crud_nodes_placement_migrations = crud_nodes_placement_migrations
         self._crud_nodes_reports = crud_nodes_reports
         self._log = log
         self._router = APIRouter(
@@ -71,6 +74,10 @@ class ControllerApiV1NodesReports:
     def crud_nodes(self):
         return self._crud_nodes
 
+    @property
+    def crud_nodes_placement_migrations(self):
+        return self._crud_nodes_placement_migrations
+
     @property
     def crud_nodes_reports(self):
         return self._crud_nodes_reports
@@ -97,7 +104,10 @@ class ControllerApiV1NodesReports:
         await self.crud_nodes.resource_exists(
             _id=node_id, user_node_groups=user_node_groups
         )
-        placement = await self.crud_nodes.get_placement(_id=node_id)
+        placement = await self.crud_nodes_placement_migrations.read_placement(
+            node_id=node_id,
+            placement=await self.crud_nodes.get_placement(_id=node_id),
+        )
         return await self.crud_nodes_reports.get(
             _id=report_id,
             node_id=node_id,
@@ -131,7 +141,10 @@ class ControllerApiV1NodesReports:
         await self.crud_nodes.resource_exists(
             _id=node_id, user_node_groups=user_node_groups
         )
-        placement = await self.crud_nodes.get_placement(_id=node_id)
+        placement = await self.crud_nodes_placement_migrations.read_placement(
+            node_id=node_id,
+            placement=await self.crud_nodes.get_placement(_id=node_id),
+        )
         return await self.crud_nodes_reports.search(
             node_id=node_id,
             report_catalog_uuid=report_catalog_uuid,
@@ -51,6 +51,7 @@ from pyppetdb.authorize import PERM_NODES_GROUPS_CREATE
 from pyppetdb.authorize import PERM_NODES_GROUPS_UPDATE
 from pyppetdb.authorize import PERM_NODES_GROUPS_DELETE
 from pyppetdb.authorize import PERM_NODES_GROUPS_GET
+from pyppetdb.authorize import PERM_NODES_FACTS_INDEXES_GET
 from pyppetdb.authorize import PERM_NODES_SECRETS_REDACTOR_CREATE
 from pyppetdb.authorize import PERM_NODES_SECRETS_REDACTOR_DELETE
 from pyppetdb.authorize import PERM_PYPPETDB_NODES_GET
@@ -112,6 +113,7 @@ STATIC_PERMISSIONS = sorted(
         PERM_NODES_GROUPS_UPDATE,
         PERM_NODES_GROUPS_DELETE,
         PERM_NODES_GROUPS_GET,
+        PERM_NODES_FACTS_INDEXES_GET,
         PERM_NODES_SECRETS_REDACTOR_CREATE,
         PERM_NODES_SECRETS_REDACTOR_DELETE,
         PERM_PYPPETDB_NODES_GET,
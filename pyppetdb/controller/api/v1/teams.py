@@ -55,6 +55,7 @@ from pyppetdb.authorize import PERM_NODES_GROUPS_CREATE
 from pyppetdb.authorize import PERM_NODES_GROUPS_UPDATE
 from pyppetdb.authorize import PERM_NODES_GROUPS_DELETE
 from pyppetdb.authorize import PERM_NODES_GROUPS_GET
+from pyppetdb.authorize import PERM_NODES_FACTS_INDEXES_GET
 from pyppetdb.authorize import PERM_PYPPETDB_NODES_GET
 from pyppetdb.authorize import PERM_PYPPETDB_NODES_DELETE
 from pyppetdb.authorize import PERM_USERS_CREATE
@@ -226,6 +227,7 @@ class ControllerApiV1Teams:
             rf"^{PERM_NODES_GROUPS_UPDATE}$": None,
             rf"^{PERM_NODES_GROUPS_DELETE}$": None,
             rf"^{PERM_NODES_GROUPS_GET}$": None,
+            rf"^{PERM_NODES_FACTS_INDEXES_GET}$": None,
             rf"^{PERM_PYPPETDB_NODES_GET}$": None,
             rf"^{PERM_PYPPETDB_NODES_DELETE}$": None,
             rf"^{PERM_TEAMS_CREATE}$": None,
@@ -22,10 +22,14 @@ from pyppetdb.controller.pdb.cmd import ControllerPdbCmd
 from pyppetdb.controller.pdb.query import ControllerPdbQuery
 
 from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.pql.engine import PqlEngine
+from pyppetdb.crud.nodes_resources_exported import CrudNodesResourcesExported
 from pyppetdb.crud.nodes_catalog_cache import CrudNodesCatalogCache
+from pyppetdb.crud.nodes_placement_migrations import CrudNodesPlacementMigrations
 from pyppetdb.crud.nodes_catalogs import CrudNodesCatalogs
 from pyppetdb.crud.nodes_groups import CrudNodesGroups
 from pyppetdb.crud.nodes_reports import CrudNodesReports
+from pyppetdb.crud.nodes_reports_rollups import CrudNodesReportsRollups
 
 
 class ControllerPdb:
@@ -34,10 +38,14 @@ class ControllerPdb:
         log: logging.Logger,
         config: Config,
         crud_nodes: CrudNodes,
+        pql_engine: PqlEngine,
+        crud_nodes_resources_exported: CrudNodesResourcesExported,
         crud_nodes_catalog_cache: CrudNodesCatalogCache,
+        crud_nodes_placement_migrations: CrudNodesPlacementMigrations,
         crud_nodes_catalogs: CrudNodesCatalogs,
         crud_nodes_groups: CrudNodesGroups,
         crud_nodes_reports: CrudNodesReports,
+        crud_nodes_reports_rollups: CrudNodesReportsRollups,
         authorize_client_cert: AuthorizeClientCert,
     ):
         self._log = log
@@ -48,10 +56,13 @@ class ControllerPdb:
                 log=log,
                 config=config,
                 crud_nodes=crud_nodes,
+                crud_nodes_resources_exported=crud_nodes_resources_exported,
                 crud_nodes_catalog_cache=crud_nodes_catalog_cache,
+                crud_nodes_placement_migrations=crud_nodes_placement_migrations,
                 crud_nodes_catalogs=crud_nodes_catalogs,
                 crud_nodes_groups=crud_nodes_groups,
                 crud_nodes_reports=crud_nodes_reports,
+                crud_nodes_reports_rollups=crud_nodes_reports_rollups,
                 authorize_client_cert=authorize_client_cert,
             ).router,
             prefix="/cmd",
@@ -63,6 +74,8 @@ class ControllerPdb:
                 log=log,
                 config=config,
                 crud_nodes=crud_nodes,
+                pql_engine=pql_engine,
+                crud_nodes_resources_exported=crud_nodes_resources_exported,
                 authorize_client_cert=authorize_client_cert,
             ).router,
             prefix="/query",
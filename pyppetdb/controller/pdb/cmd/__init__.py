@@ -20,10 +20,13 @@ from pyppetdb.config import Config
 from pyppetdb.authorize import AuthorizeClientCert
 from pyppetdb.controller.pdb.cmd.v1 import ControllerPdbCmdV1
 from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.crud.nodes_resources_exported import CrudNodesResourcesExported
 from pyppetdb.crud.nodes_catalog_cache import CrudNodesCatalogCache
+from pyppetdb.crud.nodes_placement_migrations import CrudNodesPlacementMigrations
 from pyppetdb.crud.nodes_catalogs import CrudNodesCatalogs
 from pyppetdb.crud.nodes_groups import CrudNodesGroups
 from pyppetdb.crud.nodes_reports import CrudNodesReports
+from pyppetdb.crud.nodes_reports_rollups import CrudNodesReportsRollups
 
 
 class ControllerPdbCmd:
@@ -32,10 +35,13 @@ class ControllerPdbCmd:
         log: logging.Logger,
         config: Config,
         crud_nodes: CrudNodes,
+        crud_nodes_resources_exported: CrudNodesResourcesExported,
         crud_nodes_catalog_cache: CrudNodesCatalogCache,
+        crud_nodes_placement_migrations: CrudNodesPlacementMigrations,
         crud_nodes_catalogs: CrudNodesCatalogs,
         crud_nodes_groups: CrudNodesGroups,
         crud_nodes_reports: CrudNodesReports,
+        crud_nodes_reports_rollups: CrudNodesReportsRollups,
         authorize_client_cert: AuthorizeClientCert,
     ):
         self._log = log
@@ -46,10 +52,13 @@ class ControllerPdbCmd:
                 log=log,
                 config=config,
                 crud_nodes=crud_nodes,
+                crud_nodes_resources_exported=crud_nodes_resources_exported,
                 crud_nodes_catalog_cache=crud_nodes_catalog_cache,
+                crud_nodes_placement_migrations=crud_nodes_placement_migrations,
                 crud_nodes_catalogs=crud_nodes_catalogs,
                 crud_nodes_groups=crud_nodes_groups,
                 crud_nodes_reports=crud_nodes_reports,
+                crud_nodes_reports_rollups=crud_nodes_reports_rollups,
                 authorize_client_cert=authorize_client_cert,
             ).router
         )
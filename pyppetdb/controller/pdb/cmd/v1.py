@@ -30,10 +30,13 @@ from pyppetdb.config import Config
 from pyppetdb.authorize import AuthorizeClientCert
 
 from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.crud.nodes_resources_exported import CrudNodesResourcesExported
 from pyppetdb.crud.nodes_catalog_cache import CrudNodesCatalogCache
 from pyppetdb.crud.nodes_catalogs import CrudNodesCatalogs
 from pyppetdb.crud.nodes_groups import CrudNodesGroups
+from pyppetdb.crud.nodes_placement_migrations import CrudNodesPlacementMigrations
 from pyppetdb.crud.nodes_reports import CrudNodesReports
+from pyppetdb.crud.nodes_reports_rollups import CrudNodesReportsRollups
 
 from pyppetdb.helpers.placement import calculate_placement
 from pyppetdb.errors import ResourceNotFound
@@ -52,20 +55,26 @@ class ControllerPdbCmdV1:
         log: logging.Logger,
         config: Config,
         crud_nodes: CrudNodes,
+        crud_nodes_resources_exported: CrudNodesResourcesExported,
         crud_nodes_catalog_cache: CrudNodesCatalogCache,
+        crud_nodes_placement_migrations: CrudNodesPlacementMigrations,
         crud_nodes_catalogs: CrudNodesCatalogs,
         crud_nodes_groups: CrudNodesGroups,
         crud_nodes_reports: CrudNodesReports,
+        crud_nodes_reports_rollups: CrudNodesReportsRollups,
         authorize_client_cert: AuthorizeClientCert,
     ):
         self._log = log
         self._http = None
         self._config = config
         self._crud_nodes = crud_nodes
+        self._crud_nodes_resources_exported = crud_nodes_resources_exported
         self._crud_nodes_catalog_cache = crud_nodes_catalog_cache
+        self._crud_nodes_placement_migrations = crud_nodes_placement_migrations
         self._crud_nodes_catalogs = crud_nodes_catalogs
         self._crud_nodes_groups = crud_nodes_groups
         self._crud_nodes_reports = crud_nodes_reports
+        self._crud_nodes_reports_rollups = crud_nodes_reports_rollups
         self._authorize_client_cert = authorize_client_cert
         self._router = APIRouter(
             prefix="/v1",
@@ -93,6 +102,10 @@ class ControllerPdbCmdV1:
     def crud_nodes(self):
         return self._crud_nodes
 
+    @property
+    def crud_nodes_resources_exported(self):
+        return self._crud_nodes_resources_exported
+
     @property
     def crud_nodes_catalogs(self):
         return self._crud_nodes_catalogs
@@ -101,6 +114,10 @@ class ControllerPdbCmdV1:
     def crud_nodes_catalog_cache(self):
         return self._crud_nodes_catalog_cache
 
+    @property
+    def crud_nodes_placement_migrations(self):
+        return self._crud_nodes_placement_migrations
+
     @property
     def crud_nodes_group(self):
         return self._crud_nodes_groups
@@ -109,6 +126,10 @@ class ControllerPdbCmdV1:
     def crud_nodes_reports(self):
         return self._crud_nodes_reports
 
+    @property
+    def crud_nodes_reports_rollups(self):
+        return self._crud_nodes_reports_rollups
+
     @property
     def log(self):
         return self._log
@@ -199,6 +220,14 @@ class ControllerPdbCmdV1:
                     return_none=True,
                 )
             )
+            asyncio.create_task(
+                self.crud_nodes_resources_exported.replace(
+                    node_id=certname,
+                    environment=data_decomp["environment"],
+                    catalog_uuid=data_decomp["catalog_uuid"],
+                    resources=exported_resources,
+                )
+            )
             if self.config.app.main.storeHistory.catalog:
                 placement = await self.crud_nodes.get_placement(_id=certname)
                 asyncio.create_task(
@@ -253,6 +282,14 @@ class ControllerPdbCmdV1:
                     return_none=True,
                 )
             )
+            if self.crud_nodes_reports_rollups.enabled:
+                asyncio.create_task(
+                    self.crud_nodes_reports_rollups.record(
+                        timestamp=_datetime,
+                        environment=data_decomp["environment"],
+                        report=result["report"],
+                    )
+                )
             if self.config.app.main.storeHistory.catalog:
                 if self.config.app.main.storeHistory.catalogUnchanged:
                     asyncio.create_task(
@@ -305,29 +342,24 @@ class ControllerPdbCmdV1:
         except ResourceNotFound:
             pass
 
-        await self.crud_nodes.update(
-            _id=node_id,
-            payload=payload,
-            fields=["id"],
-            upsert=True,
-            return_none=True,
-        )
-
+        # the migration is queued before the node switches placement, reads
+        # then already cover both placements until the worker is done
         if payload.facts is not None:
             new_placement = calculate_placement(
                 config=self.config,
                 facts=payload.facts,
             )
             if old_placement != new_placement:
-                await self.crud_nodes_reports.update_placement(
-                    node_id=node_id,
-                    placement=new_placement,
-                )
-                await self.crud_nodes_catalogs.update_placement(
-                    node_id=node_id,
-                    placement=new_placement,
-                )
-                await self.crud_nodes_catalog_cache.update_placement(
+                await self.crud_nodes_placement_migrations.schedule(
                     node_id=node_id,
                     placement=new_placement,
+                    placement_old=old_placement,
                 )
+
+        await self.crud_nodes.update(
+            _id=node_id,
+            payload=payload,
+            fields=["id"],
+            upsert=True,
+            return_none=True,
+        )
@@ -19,9 +19,12 @@ from fastapi import APIRouter
 from pyppetdb.config import Config
 from pyppetdb.authorize import AuthorizeClientCert
 from pyppetdb.controller.pdb.query.v4 import ControllerPdbQueryV4
+from pyppetdb.controller.pdb.query.v4.root import ControllerPdbQueryV4Root
 
 
 from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.pql.engine import PqlEngine
+from pyppetdb.crud.nodes_resources_exported import CrudNodesResourcesExported
 
 
 class ControllerPdbQuery:
@@ -30,6 +33,8 @@ class ControllerPdbQuery:
         log: logging.Logger,
         config: Config,
         crud_nodes: CrudNodes,
+        pql_engine: PqlEngine,
+        crud_nodes_resources_exported: CrudNodesResourcesExported,
         authorize_client_cert: AuthorizeClientCert,
     ):
         self._log = log
@@ -41,6 +46,19 @@ class ControllerPdbQuery:
                 log=log,
                 config=config,
                 crud_nodes=crud_nodes,
+                pql_engine=pql_engine,
+                crud_nodes_resources_exported=crud_nodes_resources_exported,
+                authorize_client_cert=authorize_client_cert,
+            ).router,
+            prefix="/v4",
+            responses={404: {"description": "Not found"}},
+        )
+
+        self.router.include_router(
+            ControllerPdbQueryV4Root(
+                log=log,
+                config=config,
+                pql_engine=pql_engine,
                 authorize_client_cert=authorize_client_cert,
             ).router,
             prefix="/v4",
@@ -19,6 +19,8 @@ from fastapi import APIRouter
 from pyppetdb.config import Config
 from pyppetdb.authorize import AuthorizeClientCert
 from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.pql.engine import PqlEngine
+from pyppetdb.crud.nodes_resources_exported import CrudNodesResourcesExported
 from pyppetdb.controller.pdb.query.v4.resources import ControllerPdbQueryV4Resources
 
 
@@ -28,6 +30,8 @@ class ControllerPdbQueryV4:
         log: logging.Logger,
         config: Config,
         crud_nodes: CrudNodes,
+        pql_engine: PqlEngine,
+        crud_nodes_resources_exported: CrudNodesResourcesExported,
         authorize_client_cert: AuthorizeClientCert,
     ):
         self._log = log
@@ -39,6 +43,8 @@ class ControllerPdbQueryV4:
                 log=log,
                 config=config,
                 crud_nodes=crud_nodes,
+                pql_engine=pql_engine,
+                crud_nodes_resources_exported=crud_nodes_resources_exported,
                 authorize_client_cert=authorize_client_cert,
             ).router
         )
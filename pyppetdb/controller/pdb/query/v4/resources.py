@@ -23,6 +23,9 @@ import httpx
 from pyppetdb.config import Config
 from pyppetdb.authorize import AuthorizeClientCert
 from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.pql.engine import PqlEngine
+from pyppetdb.crud.nodes_resources_exported import CrudNodesResourcesExported
+from pyppetdb.errors import InvalidQuery
 
 
 class ControllerPdbQueryV4Resources:
@@ -31,13 +34,17 @@ class ControllerPdbQueryV4Resources:
         log: logging.Logger,
         config: Config,
         crud_nodes: CrudNodes,
+        crud_nodes_resources_exported: CrudNodesResourcesExported,
         authorize_client_cert: AuthorizeClientCert,
+        pql_engine: PqlEngine,
     ):
         self._log = log
         self._http = None
         self._config = config
         self._crud_nodes = crud_nodes
+        self._crud_nodes_resources_exported = crud_nodes_resources_exported
         self._authorize_client_cert = authorize_client_cert
+        self._pql_engine = pql_engine
         self._router = APIRouter(
             prefix="/resources",
             tags=["pdb_query_v4_resources"],
@@ -87,6 +94,14 @@ class ControllerPdbQueryV4Resources:
     def crud_nodes(self):
         return self._crud_nodes
 
+    @property
+    def crud_nodes_resources_exported(self):
+        return self._crud_nodes_resources_exported
+
+    @property
+    def pql_engine(self):
+        return self._pql_engine
+
     @property
     def router(self):
         return self._router
@@ -102,14 +117,20 @@ class ControllerPdbQueryV4Resources:
             if query_str:
                 try:
                     ast = json.loads(query_str)
+                    result = await self.crud_nodes_resources_exported.query(ast)
+                    if result is not None:
+                        return result
                     translated_query = self.crud_nodes.translate_resource_query(ast)
                     if translated_query is not None:
                         result = await self.crud_nodes.query_exported_resources(
                             translated_query
                         )
                         return result
+                    return await self.pql_engine.query(query=ast, entity="resources")
                 except (json.JSONDecodeError, TypeError) as e:
                     self.log.error(f"Failed to parse or translate resource query: {e}")
+                except InvalidQuery as e:
+                    self.log.error(f"Unsupported resource query: {e.detail}")
             return []
 
         if not self.config.app.puppetdb.serverurl:
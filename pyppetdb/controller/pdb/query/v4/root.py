@@ -0,0 +1,148 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import ssl
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi import Request
+import httpx
+
+from pyppetdb.config import Config
+from pyppetdb.authorize import AuthorizeClientCert
+from pyppetdb.errors import InvalidQuery
+from pyppetdb.pql.engine import PqlEngine
+
+
+class ControllerPdbQueryV4Root:
+    def __init__(
+        self,
+        log: logging.Logger,
+        config: Config,
+        pql_engine: PqlEngine,
+        authorize_client_cert: AuthorizeClientCert,
+    ):
+        self._log = log
+        self._http = None
+        self._config = config
+        self._pql_engine = pql_engine
+        self._authorize_client_cert = authorize_client_cert
+        self._router = APIRouter(
+            tags=["pdb_query_v4"],
+        )
+
+        self.router.add_api_route(
+            "",
+            self.get_root,
+            response_model=None,
+            methods=["GET"],
+            status_code=200,
+        )
+        self.router.add_api_route(
+            "/nodes",
+            self.get_nodes,
+            response_model=None,
+            methods=["GET"],
+            status_code=200,
+        )
+        self.router.add_api_route(
+            "/facts",
+            self.get_facts,
+            response_model=None,
+            methods=["GET"],
+            status_code=200,
+        )
+        self.router.add_api_route(
+            "/inventory",
+            self.get_inventory,
+            response_model=None,
+            methods=["GET"],
+            status_code=200,
+        )
+
+    @property
+    def authorize_client_cert(self):
+        return self._authorize_client_cert
+
+    @property
+    def log(self):
+        return self._log
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if not self._http:
+            if self.config.app.main.ssl:
+                ssl_ctx = ssl.create_default_context(cafile=self.config.app.main.ssl.ca)
+                ssl_ctx.load_cert_chain(
+                    certfile=self.config.app.main.ssl.cert,
+                    keyfile=self.config.app.main.ssl.key,
+                )
+                self._http = httpx.AsyncClient(
+                    verify=ssl_ctx,
+                    timeout=self.config.app.puppetdb.timeout,
+                )
+            else:
+                self._http = httpx.AsyncClient(
+                    timeout=self.config.app.puppetdb.timeout,
+                )
+        return self._http
+
+    @property
+    def config(self):
+        return self._config
+
+    @property
+    def pql_engine(self):
+        return self._pql_engine
+
+    @property
+    def router(self):
+        return self._router
+
+    async def _query(self, request: Request, entity: Optional[str], path: str):
+        await self.authorize_client_cert.require_cn_trusted(request)
+
+        if self.config.app.puppetdb.queryInternal:
+            query = request.query_params.get("query")
+            if not query:
+                if entity is None:
+                    raise InvalidQuery("missing query parameter")
+                query = ["from", entity]
+            return await self.pql_engine.query(query=query, entity=entity)
+
+        if not self.config.app.puppetdb.serverurl:
+            return []
+        resp = await self.http.get(
+            url=f"{self.config.app.puppetdb.serverurl}/pdb/query/v4{path}",
+            params=request.query_params,
+            headers=request.headers,
+        )
+        return resp.json()
+
+    async def get_root(self, request: Request):
+        return await self._query(request=request, entity=None, path="")
+
+    async def get_nodes(self, request: Request):
+        return await self._query(request=request, entity="nodes", path="/nodes")
+
+    async def get_facts(self, request: Request):
+        return await self._query(request=request, entity="facts", path="/facts")
+
+    async def get_inventory(self, request: Request):
+        return await self._query(
+            request=request,
+            entity="inventory",
+            path="/inventory",
+        )
@@ -22,6 +22,7 @@ from pyppetdb.config import Config
 from pyppetdb.controller.puppet.v3 import ControllerPuppetV3
 from pyppetdb.crud.nodes import CrudNodes
 from pyppetdb.crud.nodes_catalog_cache import CrudNodesCatalogCache
+from pyppetdb.crud.nodes_placement_migrations import CrudNodesPlacementMigrations
 
 
 class ControllerPuppet:
@@ -33,6 +34,7 @@ class ControllerPuppet:
         authorize_client_cert: AuthorizeClientCert,
         crud_nodes: CrudNodes,
         crud_nodes_catalog_cache: CrudNodesCatalogCache,
+        crud_nodes_placement_migrations: CrudNodesPlacementMigrations,
     ):
         self._log = log
         self._router = APIRouter()
@@ -45,6 +47,7 @@ class ControllerPuppet:
                 authorize_client_cert=authorize_client_cert,
                 crud_nodes=crud_nodes,
                 crud_nodes_catalog_cache=crud_nodes_catalog_cache,
+                crud_nodes_placement_migrations=crud_nodes_placement_migrations,
             ).router,
             prefix="/puppet/v3",
             responses={404: {"description": "Not found"}},
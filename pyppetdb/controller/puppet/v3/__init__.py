@@ -30,6 +30,7 @@ from pyppetdb.controller.puppet.v3.node import ControllerPuppetV3Node
 from pyppetdb.controller.puppet.v3.report import ControllerPuppetV3Report
 from pyppetdb.crud.nodes import CrudNodes
 from pyppetdb.crud.nodes_catalog_cache import CrudNodesCatalogCache
+from pyppetdb.crud.nodes_placement_migrations import CrudNodesPlacementMigrations
 
 
 class ControllerPuppetV3:
@@ -41,6 +42,7 @@ class ControllerPuppetV3:
         authorize_client_cert: AuthorizeClientCert,
         crud_nodes: CrudNodes,
         crud_nodes_catalog_cache: CrudNodesCatalogCache,
+        crud_nodes_placement_migrations: CrudNodesPlacementMigrations,
     ):
         self._log = log
         self._authorize_client_cert = authorize_client_cert
@@ -54,6 +56,7 @@ class ControllerPuppetV3:
                 authorize_client_cert=authorize_client_cert,
                 crud_nodes=crud_nodes,
                 crud_nodes_catalog_cache=crud_nodes_catalog_cache,
+                crud_nodes_placement_migrations=crud_nodes_placement_migrations,
             ).router,
             responses={404: {"description": "Not found"}},
         )
@@ -29,6 +29,7 @@ from pyppetdb.config import Config
 from pyppetdb.controller.puppet.v3._base import ControllerPuppetV3Base
 from pyppetdb.crud.nodes import CrudNodes
 from pyppetdb.crud.nodes_catalog_cache import CrudNodesCatalogCache
+from pyppetdb.crud.nodes_placement_migrations import CrudNodesPlacementMigrations
 from pyppetdb.errors import ResourceNotFound
 from pyppetdb.helpers.placement import calculate_placement
 
@@ -43,6 +44,7 @@ class ControllerPuppetV3Catalog(ControllerPuppetV3Base):
         authorize_client_cert: AuthorizeClientCert,
         crud_nodes: CrudNodes,
         crud_nodes_catalog_cache: CrudNodesCatalogCache,
+        crud_nodes_placement_migrations: CrudNodesPlacementMigrations,
     ):
         super().__init__(
             config=config,
@@ -52,6 +54,7 @@ class ControllerPuppetV3Catalog(ControllerPuppetV3Base):
         )
         self._crud_nodes = crud_nodes
         self._crud_nodes_catalog_cache = crud_nodes_catalog_cache
+        self._crud_nodes_placement_migrations = crud_nodes_placement_migrations
         self._router = APIRouter(
             prefix="/catalog",
             tags=["puppet_v3_catalog"],
@@ -81,6 +84,10 @@ class ControllerPuppetV3Catalog(ControllerPuppetV3Base):
     def crud_nodes_catalog_cache(self):
         return self._crud_nodes_catalog_cache
 
+    @property
+    def crud_nodes_placement_migrations(self):
+        return self._crud_nodes_placement_migrations
+
     @staticmethod
     def _extract_nested_fact(
         facts: typing.Dict,
@@ -141,7 +148,10 @@ class ControllerPuppetV3Catalog(ControllerPuppetV3Base):
         await self.authorize_client_cert.require_cn_match(request, nodename)
 
         if self.config.app.puppet.catalogCache:
-            placement = await self.crud_nodes.get_placement(_id=nodename)
+            placement = await self.crud_nodes_placement_migrations.read_placement(
+                node_id=nodename,
+                placement=await self.crud_nodes.get_placement(_id=nodename),
+            )
             if cached_catalog := await self.crud_nodes_catalog_cache.get(
                 node_id=nodename,
                 placement=placement,
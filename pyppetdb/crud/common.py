@@ -451,6 +451,28 @@ class CrudMongo(
             self.log.error(f"backend error: {err}")
             raise BackendError
 
+    async def _update_placement(
+        self,
+        query: dict,
+        placement: dict[str, str],
+        limit: int,
+    ) -> int:
+        query = {**query, "placement": {"$ne": placement}}
+        try:
+            docs = await self._coll.find(
+                filter=query, projection={"_id": 1}, limit=limit
+            ).to_list(limit)
+            if not docs:
+                return 0
+            result = await self._coll.update_many(
+                filter={"_id": {"$in": [doc["_id"] for doc in docs]}},
+                update={"$set": {"placement": placement}},
+            )
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        return result.modified_count
+
     async def _update(
         self,
         query: dict,
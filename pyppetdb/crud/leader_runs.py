@@ -0,0 +1,169 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import logging
+import socket
+from datetime import datetime
+from datetime import timezone
+from typing import Optional
+
+from bson.objectid import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+import pymongo
+import pymongo.errors
+
+from pyppetdb.config import Config
+from pyppetdb.crud.common import CrudMongo
+from pyppetdb.crud.pyppetdb_nodes import CrudPyppetDBNodes
+from pyppetdb.errors import BackendError
+
+IN_FLIGHT = ["pending", "running"]
+
+
+class CrudLeaderRuns(CrudMongo):
+    run_label = "run"
+
+    def __init__(
+        self,
+        config: Config,
+        log: logging.Logger,
+        coll: AsyncIOMotorCollection,
+        crud_pyppetdb_nodes: CrudPyppetDBNodes,
+    ):
+        super(CrudLeaderRuns, self).__init__(
+            config=config,
+            log=log,
+            coll=coll,
+        )
+        self._crud_pyppetdb_nodes = crud_pyppetdb_nodes
+        self._instance_id = f"{socket.getfqdn()}:{config.app.main.port}"
+        self._indices.extend(
+            [
+                pymongo.IndexModel(
+                    [("id", pymongo.ASCENDING)], unique=True, name="idx_id"
+                ),
+                pymongo.IndexModel([("status", pymongo.ASCENDING)], name="idx_status"),
+            ]
+        )
+
+    @property
+    def run_interval(self) -> int:
+        raise NotImplementedError
+
+    async def process(self, run: dict) -> None:
+        raise NotImplementedError
+
+    async def _schedule(
+        self,
+        _id: str,
+        fields: dict,
+        update: Optional[dict] = None,
+    ) -> None:
+        # a new run id supersedes a run that is still in flight, its next
+        # checkpoint no longer matches and it stops without touching progress
+        try:
+            await self.coll.update_one(
+                filter={"id": _id},
+                update={
+                    "$set": {
+                        "run": ObjectId(),
+                        "status": "pending",
+                        "owner": None,
+                        **fields,
+                        "requested": datetime.now(timezone.utc),
+                        "started": None,
+                        "finished": None,
+                    },
+                    **(update or {}),
+                },
+                upsert=True,
+            )
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+
+    async def run_pending(self) -> None:
+        try:
+            cursor = self.coll.find(
+                filter={"status": {"$in": IN_FLIGHT}},
+            ).sort([("requested", pymongo.ASCENDING)])
+            runs = await cursor.to_list(None)
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        for run in runs:
+            if not await self._leading(run=run):
+                return
+            if await self._claim(run=run):
+                await self.process(run=run)
+
+    async def _claim(self, run: dict) -> bool:
+        # checkpoints filter on the owner, claiming a run left behind by a
+        # previous leader makes the checkpoints of that leader stop matching
+        try:
+            result = await self.coll.update_one(
+                filter={"id": run["id"], "run": run["run"]},
+                update={"$set": {"owner": self._instance_id}},
+            )
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        if result.matched_count == 0:
+            self.log.info(f"{self.run_label} of {run['id']} superseded")
+            return False
+        return True
+
+    async def _leading(self, run: dict) -> bool:
+        leader = await self._crud_pyppetdb_nodes.get_leader()
+        if leader == self._instance_id:
+            return True
+        self.log.info(
+            f"{self.run_label} of {run['id']} paused, I am not the leader (Leader: {leader}, Me: {self._instance_id})"
+        )
+        return False
+
+    async def _checkpoint(self, run: dict, update: dict) -> bool:
+        try:
+            result = await self.coll.update_one(
+                filter={
+                    "id": run["id"],
+                    "run": run["run"],
+                    "owner": self._instance_id,
+                },
+                update=update,
+            )
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        if result.matched_count == 0:
+            self.log.info(f"{self.run_label} of {run['id']} superseded")
+            return False
+        return True
+
+    async def worker(self) -> None:
+        self.log.info(f"starting {self.run_label} worker")
+        while True:
+            try:
+                leader = await self._crud_pyppetdb_nodes.get_leader()
+                if leader == self._instance_id:
+                    await self.run_pending()
+                else:
+                    self.log.debug(
+                        f"Skipping {self.run_label}, I am not the leader (Leader: {leader}, Me: {self._instance_id})"
+                    )
+            except Exception as e:
+                self.log.error(f"Error in {self.run_label} worker: {e}")
+            await asyncio.sleep(delay=self.run_interval)
@@ -43,6 +43,15 @@ class FilterMixIn(object):
         else:
             query[field] = {"$in": selector}
 
+    @staticmethod
+    def _filter_placement(query, placement):
+        if not placement:
+            return
+        if isinstance(placement, list):
+            query["placement"] = {"$in": placement}
+        else:
+            query["placement"] = placement
+
     @staticmethod
     def _filter_re(query, field, selector, list_filter=None):
         if selector and list_filter is not None:
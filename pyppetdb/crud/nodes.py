@@ -12,12 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import logging
+import time
 from datetime import datetime
 from datetime import timedelta
+from datetime import UTC
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
 from typing import Optional
 
 from bson.objectid import ObjectId
+from cachetools import TTLCache
 from motor.motor_asyncio import AsyncIOMotorCollection
 import pymongo
 import pymongo.errors
@@ -25,9 +32,11 @@ import pymongo.errors
 from pyppetdb.config import Config
 
 from pyppetdb.crud.common import CrudMongo
+from pyppetdb.crud.nodes_generation import CrudNodesGeneration
 
 from pyppetdb.model.common import DataDelete
 from pyppetdb.model.common import sort_order_literal
+from pyppetdb.model.nodes import export_kind_literal
 from pyppetdb.model.nodes import NodeGet
 from pyppetdb.model.nodes import NodeGetMulti
 from pyppetdb.model.nodes import NodeGetMultiMeta
@@ -39,9 +48,23 @@ from pyppetdb.model.nodes import NodeGetCatalogResources
 
 
 from pyppetdb.errors import BackendError
+from pyppetdb.errors import InvalidQuery
+from pyppetdb.errors import QueryParamValidationError
+from pyppetdb.errors import ResourceNotFound
 
 from pyppetdb.helpers.placement import calculate_placement
 
+ID_REGEX_META = set("\\^$*+?()[]{}|")
+
+GROUP_BY_FIELDS = {
+    "disabled": "disabled",
+    "environment": "environment",
+    "report.status": "report.status",
+    "report_status": "report_status_computed",
+    "remote_agent.connected": "remote_agent.connected",
+    "remote_agent.via": "remote_agent.via",
+}
+
 
 class PuppetDBASTParser:
     def __init__(self):
@@ -119,11 +142,7 @@ class PuppetDBASTParser:
         if not target:
             return None
 
-        if (
-            target == "catalog.resources_exported.exported"
-            and op == "="
-            and val is True
-        ):
+        if field == "exported" and op == "=" and val is True:
             return {}
 
         if op == "=":
@@ -176,6 +195,17 @@ class PuppetDBASTParser:
             return f"catalog.resources_exported.parameters.{field[1]}"
         return None
 
+    def references_facts(self, node) -> bool:
+        if not isinstance(node, list) or not node:
+            return False
+        if node[0] in ("and", "or", "not"):
+            return any(self.references_facts(x) for x in node[1:])
+        return (
+            len(node) > 1
+            and isinstance(node[1], str)
+            and node[1].startswith("fact_")
+        )
+
     def _cleanup(self, q: dict) -> dict:
         if not isinstance(q, dict):
             return q
@@ -194,11 +224,28 @@ class PuppetDBASTParser:
 
 
 class CrudNodes(CrudMongo):
+    export_fields = {
+        "facts": ["id", "environment", "change_facts", "facts"],
+        "reports": ["id", "environment", "change_report", "report"],
+        # the node document holds the unredacted resources, only the fields
+        # the nodes API exposes are exported
+        "catalogs": [
+            "id",
+            "environment",
+            "change_catalog",
+            "catalog.catalog_uuid",
+            "catalog.num_resources",
+            "catalog.num_resources_exported",
+            "catalog.resources_exported",
+        ],
+    }
+
     def __init__(
         self,
         log: logging.Logger,
         config: Config,
         coll: AsyncIOMotorCollection,
+        crud_nodes_generation: CrudNodesGeneration,
     ):
         super(CrudNodes, self).__init__(
             config=config,
@@ -206,11 +253,29 @@ class CrudNodes(CrudMongo):
             coll=coll,
         )
         self._ast_parser = PuppetDBASTParser()
+        self._crud_nodes_generation = crud_nodes_generation
+        self._search_results = None
+        search = config.app.main.search
+        if search.cacheSize > 0 and search.cacheTtl > 0:
+            self._search_results = TTLCache(
+                maxsize=search.cacheSize,
+                ttl=search.cacheTtl,
+            )
+        self._query_listeners: list[Callable[[dict, float], None]] = []
+        self._facts_listeners: list[
+            tuple[
+                Callable[[str, Optional[dict], Optional[dict]], Awaitable[None]],
+                Optional[list[str]],
+            ]
+        ] = []
         self._indices.extend(
             [
                 pymongo.IndexModel(
                     [("id", pymongo.ASCENDING)], unique=True, name="idx_id"
                 ),
+                pymongo.IndexModel(
+                    [("id_trigrams", pymongo.ASCENDING)], name="idx_id_trigrams"
+                ),
                 pymongo.IndexModel(
                     [("disabled", pymongo.ASCENDING)], name="idx_disabled"
                 ),
@@ -232,6 +297,10 @@ class CrudNodes(CrudMongo):
                 pymongo.IndexModel(
                     [("report.status", pymongo.ASCENDING)], name="idx_report_status"
                 ),
+                pymongo.IndexModel(
+                    [("catalog_cache_expires_at", pymongo.ASCENDING)],
+                    name="idx_catalog_cache_expires_at",
+                ),
                 pymongo.IndexModel(
                     [("remote_agent.connected", pymongo.ASCENDING)],
                     name="idx_remote_agent_connected",
@@ -253,6 +322,10 @@ class CrudNodes(CrudMongo):
             ]
         )
 
+    @property
+    def crud_nodes_generation(self):
+        return self._crud_nodes_generation
+
     async def _create_index(self) -> None:
         await super()._create_index()
         if self.config.app.main.facts.index:
@@ -267,6 +340,86 @@ class CrudNodes(CrudMongo):
                     )
                 )
 
+    async def _migrate(self) -> None:
+        await super()._migrate()
+        await self._migrate_id_trigrams()
+
+    async def _migrate_id_trigrams(self) -> None:
+        query = {"id_trigrams": {"$exists": False}}
+        count = await self.coll.count_documents(query)
+        if count == 0:
+            return
+        self.log.info(f"Adding name search trigrams to {count} nodes")
+        while True:
+            batch = await self.coll.find(query, {"id": 1}).to_list(length=1000)
+            if not batch:
+                break
+            await self.coll.bulk_write(
+                [
+                    pymongo.UpdateOne(
+                        {"_id": doc["_id"]},
+                        {"$set": {"id_trigrams": self._trigrams(doc["id"])}},
+                    )
+                    for doc in batch
+                ],
+                ordered=False,
+            )
+
+    @staticmethod
+    def _trigrams(value: str) -> list[str]:
+        value = value.lower()
+        return sorted({value[i : i + 3] for i in range(len(value) - 2)})
+
+    def _filter_id(self, query: dict, selector: Optional[str]) -> None:
+        if not selector:
+            return
+        query["id"] = {"$regex": selector}
+        if any(char in ID_REGEX_META for char in selector):
+            return
+        trigrams = set()
+        for part in selector.split("."):
+            trigrams.update(self._trigrams(part))
+        if trigrams:
+            query["id_trigrams"] = {"$all": sorted(trigrams)}
+
+    def add_query_listener(self, listener: Callable[[dict, float], None]) -> None:
+        self._query_listeners.append(listener)
+
+    def _notify_query(self, query: dict, started: float) -> None:
+        duration_ms = (time.perf_counter() - started) * 1000
+        for listener in self._query_listeners:
+            try:
+                listener(query, duration_ms)
+            except Exception as err:
+                self.log.error(f"query listener failed: {err}")
+
+    def add_facts_listener(
+        self,
+        listener: Callable[[str, Optional[dict], Optional[dict]], Awaitable[None]],
+        facts: Optional[list[str]] = None,
+    ) -> None:
+        self._facts_listeners.append((listener, facts))
+
+    def _facts_listeners_fields(self) -> list[str]:
+        fields = ["id"]
+        for _, facts in self._facts_listeners:
+            if facts is None:
+                return ["id", "facts"]
+            fields.extend(f"facts.{fact}" for fact in facts)
+        return fields
+
+    async def _notify_facts(
+        self,
+        _id: str,
+        old_facts: Optional[dict],
+        new_facts: Optional[dict],
+    ) -> None:
+        for listener, _ in self._facts_listeners:
+            try:
+                await listener(_id, old_facts, new_facts)
+            except Exception as err:
+                self.log.error(f"facts listener failed: {err}")
+
     def translate_resource_query(self, ast: list) -> Optional[dict]:
         return self._ast_parser.parse(ast)
 
@@ -291,21 +444,84 @@ class CrudNodes(CrudMongo):
                 }
             },
         ]
+        started = time.perf_counter()
         cursor = self.coll.aggregate(pipeline)
         result = []
         async for doc in cursor:
             result.append(doc)
+        self._notify_query(query, started)
         self.log.debug(f"Aggregation result: {len(result)} resources")
         return result
 
+    async def query_aggregate(self, query: dict, pipeline: list) -> list:
+        started = time.perf_counter()
+        cursor = self.coll.aggregate(pipeline, allowDiskUse=True)
+        result = await cursor.to_list(length=None)
+        self._notify_query(query, started)
+        return result
+
+    async def query_distinct(self, field: str, query: dict) -> list:
+        started = time.perf_counter()
+        result = await self.coll.distinct(field, query)
+        self._notify_query(query, started)
+        return result
+
     async def delete(
         self,
         _id: str,
     ) -> DataDelete:
         query = {"id": _id}
-        await self._delete(query=query)
+        if not self._facts_listeners:
+            await self._delete(query=query)
+            await self.crud_nodes_generation.bump()
+            return DataDelete()
+        try:
+            previous = await self._coll.find_one_and_delete(
+                filter=query,
+                projection=self._projection(fields=self._facts_listeners_fields()),
+            )
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        if previous is None:
+            raise ResourceNotFound
+        await self.crud_nodes_generation.bump()
+        await self._notify_facts(_id, previous.get("facts", {}), None)
         return DataDelete()
 
+    async def node_groups_members(
+        self,
+        node_group_ids: list[str],
+    ) -> dict[str, list[str]]:
+        result = {node_group_id: [] for node_group_id in node_group_ids}
+        if not node_group_ids:
+            return result
+        pipeline = [
+            {"$match": {"node_groups": {"$in": node_group_ids}}},
+            {"$project": {"_id": 0, "id": 1, "node_groups": 1}},
+            {"$unwind": "$node_groups"},
+            {"$match": {"node_groups": {"$in": node_group_ids}}},
+            {"$sort": {"id": 1}},
+            {"$group": {"_id": "$node_groups", "nodes": {"$push": "$id"}}},
+        ]
+        try:
+            async for item in self.coll.aggregate(pipeline, allowDiskUse=True):
+                result[item["_id"]] = item["nodes"]
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        return result
+
+    async def node_groups_of_nodes(self, node_id_regex: str) -> list[str]:
+        try:
+            return await self.coll.distinct(
+                "node_groups",
+                filter={"id": {"$regex": node_id_regex}},
+            )
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+
     async def delete_node_group_from_all(self, node_group_id: str):
         await self.coll.update_many(
             filter={"node_groups": node_group_id},
@@ -313,6 +529,7 @@ class CrudNodes(CrudMongo):
                 "$pull": {"node_groups": node_group_id},
             },
         )
+        await self.crud_nodes_generation.bump()
 
     @staticmethod
     def _compute_report_status(
@@ -348,6 +565,53 @@ class CrudNodes(CrudMongo):
         node.report_status_computed = status_computed
         return node
 
+    @staticmethod
+    def _report_status_expression(outdated_threshold: Optional[str] = None) -> dict:
+        if outdated_threshold:
+            threshold_dt = datetime.fromisoformat(
+                outdated_threshold.replace("Z", "+00:00")
+            )
+        else:
+            threshold_dt = datetime.now() - timedelta(hours=4)
+
+        return {
+            "$cond": {
+                "if": {
+                    "$and": [
+                        {"$ne": ["$disabled", True]},
+                        {"$ne": ["$change_report", None]},
+                        {"$lt": ["$change_report", threshold_dt]},
+                    ]
+                },
+                "then": "outdated",
+                "else": {
+                    "$cond": {
+                        "if": {"$eq": ["$report.status", None]},
+                        "then": "unreported",
+                        "else": "$report.status",
+                    }
+                },
+            }
+        }
+
+    @staticmethod
+    def _compute_catalog_cached(node: NodeGet) -> NodeGet:
+        expires_at = node.catalog_cache_expires_at
+        if expires_at is not None and expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=UTC)
+        node.catalog_cached = expires_at is not None and expires_at > datetime.now(UTC)
+        return node
+
+    @staticmethod
+    def _filter_catalog_cached(query: dict, catalog_cached: Optional[bool]) -> None:
+        if catalog_cached is None:
+            return
+        cached = {"$gt": datetime.now(UTC)}
+        if catalog_cached:
+            query["catalog_cache_expires_at"] = cached
+        else:
+            query["catalog_cache_expires_at"] = {"$not": cached}
+
     async def get(
         self,
         _id: str,
@@ -357,8 +621,16 @@ class CrudNodes(CrudMongo):
     ) -> NodeGet:
         query = {"id": _id}
         self._filter_list(query, "node_groups", user_node_groups)
+        catalog_cached = "catalog_cached" in fields
+        expires_at = "catalog_cache_expires_at" in fields
+        if catalog_cached and not expires_at:
+            fields = [*fields, "catalog_cache_expires_at"]
         result = await self._get(query=query, fields=fields)
         result = NodeGet(**result)
+        if catalog_cached:
+            self._compute_catalog_cached(result)
+            if not expires_at:
+                result.catalog_cache_expires_at = None
 
         return self._compute_report_status(
             node=result,
@@ -416,7 +688,9 @@ class CrudNodes(CrudMongo):
             {"$group": {"_id": None, "results": {"$push": "$resources_exported"}}},
         ]
         result = list()
+        started = time.perf_counter()
         _results = await self.coll.aggregate(pipeline).to_list(length=None)
+        self._notify_query(query, started)
         for _result in _results:
             for item in _result["results"]:
                 result.append(NodeGetCatalogResource(**item))
@@ -460,12 +734,111 @@ class CrudNodes(CrudMongo):
             {"$sort": {"_id": 1}},  # Optional: sort by descending order of frequency
         ]
         result = list()
-        for item in await self.coll.aggregate(pipeline).to_list(length=None):
+        started = time.perf_counter()
+        items = await self.coll.aggregate(pipeline).to_list(length=None)
+        self._notify_query(query, started)
+        for item in items:
             result.append(NodeDistinctFactValue(value=item["_id"], count=item["count"]))
         return NodeGetDistinctFactValues(
             **{"result": result, "meta": {"result_size": len(result)}}
         )
 
+    @staticmethod
+    def _group_by_path(field: str) -> str:
+        if field in GROUP_BY_FIELDS:
+            return GROUP_BY_FIELDS[field]
+        fact_id = field.removeprefix("facts.")
+        if (
+            fact_id != field
+            and fact_id
+            and "$" not in fact_id
+            and "" not in fact_id.split(".")
+        ):
+            return field
+        raise QueryParamValidationError(f"invalid group_by field: {field}")
+
+    def group_by(
+        self,
+        group_by: list[str],
+        _id: Optional[str] = None,
+        user_node_groups: Optional[list[str]] = None,
+        disabled: Optional[bool] = None,
+        environment: Optional[str] = None,
+        fact: Optional[set[str]] = None,
+        report_status: Optional[str] = None,
+        outdated_threshold: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        if not group_by:
+            raise QueryParamValidationError("at least one group_by field is required")
+        columns = list(dict.fromkeys(group_by))
+        paths = [self._group_by_path(column) for column in columns]
+
+        query = {}
+        self._filter_list(query, "node_groups", user_node_groups)
+        self._filter_complex_search(query, base_attribute="facts", complex_search=fact)
+        self._filter_boolean(query, "disabled", disabled)
+        self._filter_re(query, "environment", environment)
+        self._filter_id(query, _id)
+
+        pipeline = [{"$match": query}]
+        if report_status or "report_status_computed" in paths:
+            pipeline.append(
+                {
+                    "$addFields": {
+                        "report_status_computed": self._report_status_expression(
+                            outdated_threshold
+                        )
+                    }
+                }
+            )
+        if report_status:
+            pipeline.append(
+                {"$match": {"report_status_computed": {"$regex": report_status}}}
+            )
+        pipeline.append(
+            {
+                "$group": {
+                    "_id": {f"g{idx}": f"${path}" for idx, path in enumerate(paths)},
+                    "count": {"$sum": 1},
+                }
+            }
+        )
+        pipeline.append({"$sort": {"_id": 1}})
+        if limit:
+            pipeline.append({"$limit": limit})
+        return self._group_by_rows(query=query, pipeline=pipeline, columns=columns)
+
+    async def _group_by_rows(
+        self,
+        query: dict,
+        pipeline: list,
+        columns: list[str],
+    ) -> AsyncIterator[dict]:
+        started = time.perf_counter()
+        cursor = self.coll.aggregate(
+            pipeline,
+            allowDiskUse=True,
+            maxTimeMS=self.config.app.main.search.groupByTimeout * 1000,
+            batchSize=self.config.app.main.export.batchSize,
+        )
+        try:
+            async for doc in cursor:
+                row = {
+                    column: doc["_id"].get(f"g{idx}")
+                    for idx, column in enumerate(columns)
+                }
+                row["count"] = doc["count"]
+                yield row
+        except pymongo.errors.ExecutionTimeout:
+            raise InvalidQuery("group by exceeded its time budget, narrow the filters")
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        finally:
+            await cursor.close()
+        self._notify_query(query, started)
+
     async def count(
         self,
         user_node_groups: Optional[list[str]] = None,
@@ -486,7 +859,10 @@ class CrudNodes(CrudMongo):
         self._filter_re(query, "report.status", report_status)
         self._filter_boolean(query, "remote_agent.connected", remote_agent_connected)
         self._filter_re(query, "remote_agent.via", remote_agent_via)
-        return await self.coll.count_documents(query)
+        started = time.perf_counter()
+        result = await self.coll.count_documents(query)
+        self._notify_query(query, started)
+        return result
 
     async def search(
         self,
@@ -499,6 +875,7 @@ class CrudNodes(CrudMongo):
         outdated_threshold: Optional[str] = None,
         remote_agent_connected: Optional[bool] = None,
         remote_agent_via: Optional[str] = None,
+        catalog_cached: Optional[bool] = None,
         fields: Optional[list] = None,
         sort: Optional[str] = None,
         sort_order: Optional[sort_order_literal] = None,
@@ -506,46 +883,52 @@ class CrudNodes(CrudMongo):
         limit: Optional[int] = None,
         query: Optional[dict] = None,
     ) -> NodeGetMulti:
+        key = None
+        if self._search_results is not None:
+            key = self._search_cache_key(
+                _id=_id,
+                user_node_groups=user_node_groups,
+                disabled=disabled,
+                environment=environment,
+                fact=fact,
+                report_status=report_status,
+                outdated_threshold=outdated_threshold,
+                remote_agent_connected=remote_agent_connected,
+                remote_agent_via=remote_agent_via,
+                catalog_cached=catalog_cached,
+                fields=fields,
+                sort=sort,
+                sort_order=sort_order,
+                page=page,
+                limit=limit,
+                query=query,
+            )
+            generation = await self.crud_nodes_generation.get()
+            cached = self._search_results.get(key)
+            if cached is not None and cached[0] == generation:
+                return cached[1]
+
         if not query:
             query = {}
         self._filter_list(query, "node_groups", user_node_groups)
         self._filter_complex_search(query, base_attribute="facts", complex_search=fact)
         self._filter_boolean(query, "disabled", disabled)
         self._filter_re(query, "environment", environment)
-        self._filter_re(query, "id", _id)
+        self._filter_id(query, _id)
         self._filter_boolean(query, "remote_agent.connected", remote_agent_connected)
         self._filter_re(query, "remote_agent.via", remote_agent_via)
-
-        if outdated_threshold:
-            threshold_dt = datetime.fromisoformat(
-                outdated_threshold.replace("Z", "+00:00")
-            )
-        else:
-            threshold_dt = datetime.now() - timedelta(hours=4)
+        self._filter_catalog_cached(query, catalog_cached)
 
         pipeline = [
             {"$match": query},
             {
                 "$addFields": {
-                    "report_status_computed": {
-                        "$cond": {
-                            "if": {
-                                "$and": [
-                                    {"$ne": ["$disabled", True]},
-                                    {"$ne": ["$change_report", None]},
-                                    {"$lt": ["$change_report", threshold_dt]},
-                                ]
-                            },
-                            "then": "outdated",
-                            "else": {
-                                "$cond": {
-                                    "if": {"$eq": ["$report.status", None]},
-                                    "then": "unreported",
-                                    "else": "$report.status",
-                                }
-                            },
-                        }
-                    }
+                    "report_status_computed": self._report_status_expression(
+                        outdated_threshold
+                    ),
+                    "catalog_cached": {
+                        "$gt": ["$catalog_cache_expires_at", datetime.now(UTC)]
+                    },
                 }
             },
         ]
@@ -587,7 +970,9 @@ class CrudNodes(CrudMongo):
             }
         )
 
+        started = time.perf_counter()
         results = await self.coll.aggregate(pipeline).to_list(length=None)
+        self._notify_query(query, started)
 
         if not results:
             return NodeGetMulti(
@@ -623,7 +1008,108 @@ class CrudNodes(CrudMongo):
         formatted_result["meta"]["page"] = page
         formatted_result["meta"]["limit"] = limit
 
-        return NodeGetMulti(**formatted_result)
+        result = NodeGetMulti(**formatted_result)
+        if key is not None:
+            self._search_results[key] = (generation, result)
+        return result
+
+    @staticmethod
+    def _search_cache_key(**kwargs) -> str:
+        for name, value in kwargs.items():
+            if isinstance(value, (list, set)):
+                kwargs[name] = sorted(value)
+        return json.dumps(kwargs, sort_keys=True, default=str)
+
+    async def export(
+        self,
+        kind: export_kind_literal,
+        fields: Optional[list] = None,
+        _id: Optional[str] = None,
+        user_node_groups: Optional[list[str]] = None,
+        disabled: Optional[bool] = None,
+        environment: Optional[str] = None,
+        fact: Optional[set[str]] = None,
+        report_status: Optional[str] = None,
+        facts: Optional[list[str]] = None,
+    ) -> AsyncIterator[dict]:
+        query = {}
+        self._filter_list(query, "node_groups", user_node_groups)
+        self._filter_complex_search(query, base_attribute="facts", complex_search=fact)
+        self._filter_boolean(query, "disabled", disabled)
+        self._filter_re(query, "environment", environment)
+        self._filter_id(query, _id)
+        if report_status:
+            # same computed status as search, so unreported and outdated match
+            query["$expr"] = {
+                "$regexMatch": {
+                    "input": self._report_status_expression(),
+                    "regex": report_status,
+                }
+            }
+
+        if kind == "facts" and facts:
+            fields = ["id", "environment"]
+            for path in sorted(f"facts.{path}" for path in set(facts)):
+                if not any(path.startswith(f"{field}.") for field in fields):
+                    fields.append(path)
+        elif kind in self.export_fields:
+            fields = list(self.export_fields[kind])
+        elif fields:
+            fields = [field for field in fields if field != "catalog_cached"]
+            if "id" not in fields:
+                fields.append("id")
+
+        cursor = self.coll.find(
+            filter=query,
+            projection=self._projection(fields),
+            batch_size=self.config.app.main.export.batchSize,
+        ).sort([("id", pymongo.ASCENDING)])
+        try:
+            async for doc in cursor:
+                yield self._format(doc)
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        finally:
+            await cursor.close()
+
+    async def update_catalog_cache_expires_at(
+        self,
+        node_ids: list[str],
+        expires_at: Optional[datetime],
+    ) -> None:
+        if not node_ids:
+            return
+        if expires_at is None:
+            update = {"$unset": {"catalog_cache_expires_at": ""}}
+        else:
+            update = {"$set": {"catalog_cache_expires_at": expires_at}}
+        try:
+            await self.coll.update_many(
+                filter={"id": {"$in": node_ids}},
+                update=update,
+            )
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        await self.crud_nodes_generation.bump()
+
+    async def backfill_catalog_cache_expires_at(
+        self,
+        expires_at: dict[str, datetime],
+    ) -> None:
+        if not expires_at:
+            return
+        await self.coll.bulk_write(
+            [
+                pymongo.UpdateOne(
+                    {"id": node_id, "catalog_cache_expires_at": {"$exists": False}},
+                    {"$set": {"catalog_cache_expires_at": node_expires_at}},
+                )
+                for node_id, node_expires_at in expires_at.items()
+            ],
+            ordered=False,
+        )
 
     async def get_placement(self, _id: str) -> dict[str, str]:
         if not self.config.mongodb.placementFacts:
@@ -647,11 +1133,13 @@ class CrudNodes(CrudMongo):
     ) -> NodeGet:
         data = payload.model_dump()
         data["id"] = _id
+        data["id_trigrams"] = self._trigrams(_id)
 
         result = await self._create(
             payload=data,
             fields=fields,
         )
+        await self.crud_nodes_generation.bump()
         return self._compute_report_status(node=NodeGet(**result))
 
     async def update(
@@ -665,16 +1153,56 @@ class CrudNodes(CrudMongo):
         query = {"id": _id}
         data = payload.model_dump()
 
+        if payload.facts is not None and self._facts_listeners:
+            previous = await self._update_previous(
+                query=query,
+                payload=data,
+                upsert=upsert,
+            )
+            await self.crud_nodes_generation.bump()
+            old_facts = previous.get("facts", {}) if previous is not None else None
+            await self._notify_facts(_id, old_facts, payload.facts)
+            if return_none:
+                return None
+            result = await self._get(query=query, fields=fields)
+            return self._compute_report_status(node=NodeGet(**result))
+
         result = await self._update(
             query=query,
             fields=fields,
             payload=data,
             upsert=upsert,
+            set_on_insert={"id_trigrams": self._trigrams(_id)} if upsert else None,
         )
+        await self.crud_nodes_generation.bump()
         if return_none:
             return None
         return self._compute_report_status(node=NodeGet(**result))
 
+    async def _update_previous(
+        self,
+        query: dict,
+        payload: dict,
+        upsert: bool = False,
+    ) -> Optional[dict]:
+        update = {"$set": {k: v for k, v in payload.items() if v is not None}}
+        if upsert:
+            update["$setOnInsert"] = {"id_trigrams": self._trigrams(query["id"])}
+        try:
+            previous = await self._coll.find_one_and_update(
+                filter=query,
+                update=update,
+                projection=self._projection(fields=self._facts_listeners_fields()),
+                return_document=pymongo.ReturnDocument.BEFORE,
+                upsert=upsert,
+            )
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        if previous is None and not upsert:
+            raise ResourceNotFound
+        return previous
+
     async def update_remote_agent_status(
         self,
         node_id: str,
@@ -689,6 +1217,7 @@ class CrudNodes(CrudMongo):
             filter={"id": node_id},
             update={"$set": update_data},
         )
+        await self.crud_nodes_generation.bump()
 
     async def update_remote_agent_current_job_id(
         self,
@@ -702,6 +1231,7 @@ class CrudNodes(CrudMongo):
             filter={"id": node_id},
             update={"$set": update_data},
         )
+        await self.crud_nodes_generation.bump()
 
     async def cleanup_remote_agents(self, via: str):
         self.log.info(f"Cleaning up remote agents for instance '{via}'")
@@ -714,25 +1244,56 @@ class CrudNodes(CrudMongo):
                 }
             },
         )
+        await self.crud_nodes_generation.bump()
+
+    async def node_groups_chunk(
+        self,
+        after: Optional[str],
+        limit: int,
+        facts: list[str],
+    ) -> list[dict]:
+        query = {} if after is None else {"id": {"$gt": after}}
+        projection = self._projection(
+            ["id", "node_groups", *(f"facts.{fact}" for fact in facts)]
+        )
+        projection["_id"] = 0
+        try:
+            cursor = (
+                self.coll.find(filter=query, projection=projection)
+                .sort([("id", pymongo.ASCENDING)])
+                .limit(limit)
+            )
+            return await cursor.to_list(limit)
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
 
     async def update_nodegroup(
         self,
         node_group_id: str,
-        nodes: list[str],
-    ):
-        await self.coll.update_many(
-            filter={"id": {"$nin": nodes}, "node_groups": node_group_id},
-            update={
-                "$pull": {"node_groups": node_group_id},
-            },
-        )
-        if nodes:
-            await self.coll.update_many(
-                filter={
-                    "id": {"$in": nodes},
-                    "node_groups": {"$ne": node_group_id},
-                },
-                update={
-                    "$addToSet": {"node_groups": node_group_id},
-                },
+        add: list[str],
+        remove: list[str],
+    ) -> None:
+        requests = list()
+        if add:
+            requests.append(
+                pymongo.UpdateMany(
+                    filter={"id": {"$in": add}},
+                    update={"$addToSet": {"node_groups": node_group_id}},
+                )
             )
+        if remove:
+            requests.append(
+                pymongo.UpdateMany(
+                    filter={"id": {"$in": remove}},
+                    update={"$pull": {"node_groups": node_group_id}},
+                )
+            )
+        if not requests:
+            return
+        try:
+            await self.coll.bulk_write(requests, ordered=False)
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        await self.crud_nodes_generation.bump()
@@ -19,9 +19,7 @@ import json
 import logging
 import random
 from typing import Any
-from typing import List
 from typing import Optional
-from typing import Set
 import zlib
 
 from cryptography.fernet import Fernet
@@ -31,6 +29,7 @@ import pymongo.errors
 
 from pyppetdb.config import Config
 from pyppetdb.crud.common import CrudMongo
+from pyppetdb.crud.nodes import CrudNodes
 from pyppetdb.model.common import DataDelete
 from pyppetdb.model.nodes_catalog_cache import NodeCatalogCachePutInternal
 
@@ -75,6 +74,7 @@ class CrudNodesCatalogCache(CrudMongo):
         log: logging.Logger,
         coll: AsyncIOMotorCollection,
         protector: NodesDataProtector,
+        crud_nodes: CrudNodes,
     ):
         super(CrudNodesCatalogCache, self).__init__(
             config=config,
@@ -82,6 +82,7 @@ class CrudNodesCatalogCache(CrudMongo):
             coll=coll,
         )
         self._protector = protector
+        self._crud_nodes = crud_nodes
         self._indices.extend(
             [
                 pymongo.IndexModel(
@@ -100,17 +101,38 @@ class CrudNodesCatalogCache(CrudMongo):
             ]
         )
 
+    @property
+    def crud_nodes(self):
+        return self._crud_nodes
+
     async def _create_index(self) -> None:
         await super()._create_index()
 
+    async def _migrate(self) -> None:
+        await super()._migrate()
+        await self._migrate_catalog_cache_expires_at()
+
+    async def _migrate_catalog_cache_expires_at(self) -> None:
+        cursor = self.coll.find(
+            {"ttl": {"$gt": datetime.now(UTC)}},
+            {"id": 1, "ttl": 1},
+            batch_size=1000,
+        )
+        batch = {}
+        async for doc in cursor:
+            batch[doc["id"]] = doc["ttl"]
+            if len(batch) >= 1000:
+                await self.crud_nodes.backfill_catalog_cache_expires_at(batch)
+                batch = {}
+        await self.crud_nodes.backfill_catalog_cache_expires_at(batch)
+
     async def get(
         self,
         node_id: str,
-        placement: dict[str, str],
+        placement: dict[str, str] | list[dict[str, str]],
     ) -> Any | None:
         query = {"id": node_id}
-        if placement:
-            query["placement"] = placement
+        self._filter_placement(query, placement)
         try:
             result = await self._coll.find_one(
                 filter=query,
@@ -156,32 +178,25 @@ class CrudNodesCatalogCache(CrudMongo):
             update={"$set": data},
             upsert=True,
         )
+        await self.crud_nodes.update_catalog_cache_expires_at(
+            node_ids=[node_id],
+            expires_at=ttl,
+        )
 
     async def delete(
         self,
         node_id: str,
-        placement: dict[str, str],
+        placement: dict[str, str] | list[dict[str, str]],
     ) -> DataDelete:
         query = {"id": node_id}
-        if placement:
-            query["placement"] = placement
+        self._filter_placement(query, placement)
         await self._delete(query=query)
+        await self.crud_nodes.update_catalog_cache_expires_at(
+            node_ids=[node_id],
+            expires_at=None,
+        )
         return DataDelete()
 
-    async def get_cached_node_ids(
-        self,
-        node_ids: List[str],
-    ) -> Set[str]:
-        if not node_ids:
-            return set()
-
-        query = {"id": {"$in": node_ids}}
-        cursor = self.coll.find(filter=query, projection={"id": 1})
-        cached_ids = set()
-        async for doc in cursor:
-            cached_ids.add(doc["id"])
-        return cached_ids
-
     async def delete_many_by_filter(
         self,
         node_id: Optional[str] = None,
@@ -193,15 +208,22 @@ class CrudNodesCatalogCache(CrudMongo):
         self._filter_complex_search(query, base_attribute="facts", complex_search=fact)
         self._filter_literal(query, "environment", environment)
 
+        node_ids = await self.coll.distinct("id", filter=query)
         result = await self.coll.delete_many(filter=query)
+        await self.crud_nodes.update_catalog_cache_expires_at(
+            node_ids=node_ids,
+            expires_at=None,
+        )
         return result.deleted_count
 
     async def update_placement(
         self,
         node_id: str,
         placement: dict[str, str],
-    ):
-        await self._coll.update_many(
-            filter={"id": node_id},
-            update={"$set": {"placement": placement}},
+        limit: int,
+    ) -> int:
+        return await self._update_placement(
+            query={"id": node_id},
+            placement=placement,
+            limit=limit,
         )
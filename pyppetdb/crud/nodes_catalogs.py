@@ -24,6 +24,7 @@ import pymongo.errors
 from pyppetdb.config import Config
 from pyppetdb.crud.common import CrudMongo
 from pyppetdb.crud.nodes_secrets_redactor import NodesSecretsRedactor
+from pyppetdb.crud.nodes_secrets_redactor import NodesSecretsRedactorPool
 
 from pyppetdb.model.common import sort_order_literal
 from pyppetdb.model.nodes_catalogs import NodeCatalogGet
@@ -32,9 +33,20 @@ from pyppetdb.model.nodes_catalogs import NodeCatalogPostInternal
 
 
 class NodesCatalogsRedactor:
-    def __init__(self, log: logging.Logger, redactor: NodesSecretsRedactor):
+    def __init__(
+        self,
+        log: logging.Logger,
+        redactor: NodesSecretsRedactor,
+        pool: Optional[NodesSecretsRedactorPool] = None,
+    ):
         self.log = log
         self._redactor = redactor
+        self._pool = pool
+
+    async def redact_async(self, data: dict) -> dict:
+        if self._pool is None:
+            return self.redact(data)
+        return await self._pool.redact(redact_cls=NodesCatalogsRedactor, data=data)
 
     def redact(self, data: dict) -> dict:
         if not isinstance(data, dict):
@@ -99,6 +111,9 @@ class CrudNodesCatalogs(CrudMongo):
             index_name="ttl_catalog_history",
         )
 
+    async def redact(self, data: dict) -> dict:
+        return await self._secret_manager.redact_async(data)
+
     async def create(
         self,
         _id: datetime,
@@ -108,7 +123,7 @@ class CrudNodesCatalogs(CrudMongo):
         return_none: bool = False,
     ) -> NodeCatalogGet | None:
         data = payload.model_dump()
-        data = self._secret_manager.redact(data)
+        data = await self._secret_manager.redact_async(data)
         data["id"] = _id
         data["node_id"] = node_id
 
@@ -121,25 +136,23 @@ class CrudNodesCatalogs(CrudMongo):
     async def delete_all_from_node(
         self,
         node_id: str,
-        placement: dict[str, str],
+        placement: dict[str, str] | list[dict[str, str]],
     ):
         query = {"node_id": node_id}
-        if placement:
-            query["placement"] = placement
+        self._filter_placement(query, placement)
         await self._coll.delete_many(filter=query)
 
     async def drop_created_no_report_ttl(
         self,
         _id: datetime,
         node_id: str,
-        placement: dict[str, str],
+        placement: dict[str, str] | list[dict[str, str]],
     ):
         query = {
             "id": _id,
             "node_id": node_id,
         }
-        if placement:
-            query["placement"] = placement
+        self._filter_placement(query, placement)
         await self._coll.update_one(
             filter=query,
             update={"$unset": {"created_no_report_ttl": ""}},
@@ -149,15 +162,14 @@ class CrudNodesCatalogs(CrudMongo):
         self,
         _id: datetime | str,
         node_id: str,
-        placement: dict[str, str],
+        placement: dict[str, str] | list[dict[str, str]],
         fields: list,
     ) -> NodeCatalogGet:
         query = {
             "id": _id,
             "node_id": node_id,
         }
-        if placement:
-            query["placement"] = placement
+        self._filter_placement(query, placement)
         result = await self._get(
             query=query,
             fields=fields,
@@ -168,20 +180,19 @@ class CrudNodesCatalogs(CrudMongo):
         self,
         _id: datetime,
         node_id: str,
-        placement: dict[str, str],
+        placement: dict[str, str] | list[dict[str, str]],
     ) -> ObjectId:
         query = {
             "id": _id,
             "node_id": node_id,
         }
-        if placement:
-            query["placement"] = placement
+        self._filter_placement(query, placement)
         return await self._resource_exists(query=query)
 
     async def search(
         self,
         node_id: str,
-        placement: dict[str, str],
+        placement: dict[str, str] | list[dict[str, str]],
         catalog_status: Optional[str] = None,
         fields: Optional[list] = None,
         sort: Optional[str] = None,
@@ -190,8 +201,7 @@ class CrudNodesCatalogs(CrudMongo):
         limit: Optional[int] = None,
     ) -> NodeCatalogGetMulti:
         query = {"node_id": node_id}
-        if placement:
-            query["placement"] = placement
+        self._filter_placement(query, placement)
         self._filter_re(
             query=query,
             field="catalog.status",
@@ -212,8 +222,10 @@ class CrudNodesCatalogs(CrudMongo):
         self,
         node_id: str,
         placement: dict[str, str],
-    ):
-        await self._coll.update_many(
-            filter={"node_id": node_id},
-            update={"$set": {"placement": placement}},
+        limit: int,
+    ) -> int:
+        return await self._update_placement(
+            query={"node_id": node_id},
+            placement=placement,
+            limit=limit,
         )
@@ -0,0 +1,199 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import socket
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+from typing import Optional
+
+import pymongo
+import pymongo.errors
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from pyppetdb.config import Config
+from pyppetdb.crud.common import CrudMongo
+from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.crud.pyppetdb_nodes import CrudPyppetDBNodes
+from pyppetdb.errors import BackendError
+from pyppetdb.model.nodes import NodeDistinctFactValue
+from pyppetdb.model.nodes import NodeGetDistinctFactValues
+
+
+class CrudNodesFactsHistogram(CrudMongo):
+    def __init__(
+        self,
+        config: Config,
+        log: logging.Logger,
+        coll: AsyncIOMotorCollection,
+        crud_nodes: CrudNodes,
+        crud_pyppetdb_nodes: CrudPyppetDBNodes,
+    ):
+        super(CrudNodesFactsHistogram, self).__init__(
+            config=config,
+            log=log,
+            coll=coll,
+        )
+        self._crud_nodes = crud_nodes
+        self._crud_pyppetdb_nodes = crud_pyppetdb_nodes
+        self._instance_id = f"{socket.getfqdn()}:{config.app.main.port}"
+        self._indices.extend(
+            [
+                pymongo.IndexModel(
+                    [
+                        ("fact", pymongo.ASCENDING),
+                        ("value", pymongo.ASCENDING),
+                    ],
+                    unique=True,
+                    name="idx_fact_value",
+                ),
+            ]
+        )
+
+    @property
+    def facts(self) -> list[str]:
+        return self.config.app.main.facts.histogram or []
+
+    async def _create_index(self) -> None:
+        await super()._create_index()
+        await self.coll.delete_many(filter={"fact": {"$nin": self.facts}})
+        for fact in self.facts:
+            claim = await self.coll.update_one(
+                filter={"fact": fact, "built": True},
+                update={"$setOnInsert": {"created": datetime.now(tz=timezone.utc)}},
+                upsert=True,
+            )
+            if claim.upserted_id is None:
+                continue
+            self.log.info(f"building fact histogram for {fact}")
+            await self.rebuild(fact=fact)
+
+    @staticmethod
+    def _value(facts: Optional[dict], fact: str) -> Any:
+        value = facts
+        for key in fact.split("."):
+            value = value.get(key) if isinstance(value, dict) else None
+        if isinstance(value, (str, int, float, bool, datetime)):
+            return value
+        return None
+
+    async def rebuild(self, fact: str) -> None:
+        pipeline = [
+            {
+                "$match": {
+                    f"facts.{fact}": {"$type": ["string", "number", "bool", "date"]}
+                }
+            },
+            {"$group": {"_id": f"$facts.{fact}", "count": {"$sum": 1}}},
+        ]
+        values = list()
+        requests = list()
+        async for item in self._crud_nodes.coll.aggregate(pipeline):
+            values.append(item["_id"])
+            requests.append(
+                pymongo.UpdateOne(
+                    filter={"fact": fact, "value": item["_id"]},
+                    update={"$set": {"count": item["count"]}},
+                    upsert=True,
+                )
+            )
+        # counts are overwritten, not incremented, so a rebuild also repairs
+        # drift; an ingest racing the aggregation is fixed by the next pass
+        requests.append(
+            pymongo.DeleteMany(
+                filter={
+                    "fact": fact,
+                    "value": {"$nin": values},
+                    "built": {"$exists": False},
+                }
+            )
+        )
+        await self.coll.bulk_write(requests, ordered=False)
+
+    async def rebuild_worker(self) -> None:
+        self.log.info("starting fact histogram rebuild worker")
+        while True:
+            await asyncio.sleep(delay=self.config.app.main.facts.histogramInterval)
+            try:
+                leader = await self._crud_pyppetdb_nodes.get_leader()
+                if leader == self._instance_id:
+                    for fact in self.facts:
+                        await self.rebuild(fact=fact)
+                else:
+                    self.log.debug(
+                        f"Skipping fact histogram rebuild, I am not the leader (Leader: {leader}, Me: {self._instance_id})"
+                    )
+            except Exception as e:
+                self.log.error(f"Error in fact histogram rebuild worker: {e}")
+
+    async def update_facts(
+        self,
+        node_id: str,
+        old_facts: Optional[dict],
+        new_facts: Optional[dict],
+    ) -> None:
+        requests = list()
+        for fact in self.facts:
+            old = self._value(old_facts, fact)
+            new = self._value(new_facts, fact)
+            if type(old) is type(new) and old == new:
+                continue
+            if old is not None:
+                requests.append(
+                    pymongo.UpdateOne(
+                        filter={"fact": fact, "value": old},
+                        update={"$inc": {"count": -1}},
+                    )
+                )
+                requests.append(
+                    pymongo.DeleteOne(
+                        filter={"fact": fact, "value": old, "count": {"$lte": 0}}
+                    )
+                )
+            if new is not None:
+                requests.append(
+                    pymongo.UpdateOne(
+                        filter={"fact": fact, "value": new},
+                        update={"$inc": {"count": 1}},
+                        upsert=True,
+                    )
+                )
+        if not requests:
+            return
+        try:
+            await self.coll.bulk_write(requests, ordered=True)
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+
+    async def distinct_fact_values(
+        self,
+        fact_id: str,
+    ) -> Optional[NodeGetDistinctFactValues]:
+        if fact_id not in self.facts:
+            return None
+        cursor = self.coll.find(
+            filter={"fact": fact_id, "count": {"$gt": 0}},
+            projection={"_id": 0, "value": 1, "count": 1},
+        ).sort([("value", pymongo.ASCENDING)])
+        result = list()
+        async for item in cursor:
+            result.append(
+                NodeDistinctFactValue(value=item["value"], count=item["count"])
+            )
+        return NodeGetDistinctFactValues(
+            **{"result": result, "meta": {"result_size": len(result)}}
+        )
@@ -0,0 +1,208 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime
+from datetime import UTC
+import hashlib
+import json
+import logging
+import re
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+import pymongo
+import pymongo.errors
+
+from pyppetdb.config import Config
+from pyppetdb.crud.common import CrudMongo
+from pyppetdb.errors import BackendError
+from pyppetdb.errors import ResourceNotFound
+from pyppetdb.helpers.json_patch import json_patch_apply
+from pyppetdb.helpers.json_patch import json_patch_diff
+from pyppetdb.helpers.json_patch import json_pointer
+from pyppetdb.helpers.ndjson import json_default
+from pyppetdb.model.common import sort_order_literal
+from pyppetdb.model.nodes_facts_history import NodeFactsHistoryGetMulti
+from pyppetdb.model.nodes_facts_history import NodeFactsHistoryState
+
+
+class CrudNodesFactsHistory(CrudMongo):
+    def __init__(
+        self,
+        config: Config,
+        log: logging.Logger,
+        coll: AsyncIOMotorCollection,
+    ):
+        super(CrudNodesFactsHistory, self).__init__(
+            config=config,
+            log=log,
+            coll=coll,
+        )
+        self._indices.extend(
+            [
+                pymongo.IndexModel(
+                    [
+                        ("node_id", pymongo.ASCENDING),
+                        ("id", pymongo.DESCENDING),
+                    ],
+                    unique=True,
+                    name="idx_node_id_id",
+                ),
+                pymongo.IndexModel(
+                    [
+                        ("node_id", pymongo.ASCENDING),
+                        ("keyframe", pymongo.ASCENDING),
+                        ("id", pymongo.DESCENDING),
+                    ],
+                    name="idx_node_id_keyframe_id",
+                ),
+            ]
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config.app.main.storeHistory.facts)
+
+    async def _create_index(self) -> None:
+        await super()._create_index()
+        await self._create_ttl_index(
+            field="created",
+            ttl_seconds=self.config.app.main.storeHistory.ttl,
+            index_name="ttl_facts_history",
+        )
+
+    def _strip(self, facts: dict) -> dict:
+        facts = json.loads(json.dumps(facts, default=json_default))
+        for path in self.config.app.main.storeHistory.factsExclude or []:
+            *parents, last = path.split(".")
+            target = facts
+            for key in parents:
+                target = target.get(key) if isinstance(target, dict) else None
+            if isinstance(target, dict):
+                target.pop(last, None)
+        return facts
+
+    @staticmethod
+    def _digest(facts: dict) -> str:
+        serialized = json.dumps(facts, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(serialized.encode()).hexdigest()
+
+    async def update_facts(
+        self,
+        node_id: str,
+        old_facts: Optional[dict],
+        new_facts: Optional[dict],
+    ) -> None:
+        if new_facts is None:
+            await self.delete_all_from_node(node_id=node_id)
+            return
+        new = self._strip(new_facts)
+        try:
+            latest = await self.coll.find_one(
+                filter={"node_id": node_id},
+                projection={"since_keyframe": 1, "digest": 1},
+                sort=[("id", pymongo.DESCENDING)],
+            )
+            old = self._strip(old_facts) if old_facts is not None else None
+            chained = (
+                latest is not None
+                and old is not None
+                and latest.get("digest") == self._digest(old)
+            )
+            patch = json_patch_diff(old, new) if chained else []
+            if chained and not patch:
+                return
+            now = datetime.now(UTC)
+            doc = {
+                "id": now,
+                "node_id": node_id,
+                "created": now,
+                "digest": self._digest(new),
+                "patch": patch,
+            }
+            interval = self.config.app.main.storeHistory.factsKeyframeInterval
+            if not chained or latest["since_keyframe"] + 1 >= interval:
+                doc["keyframe"] = True
+                doc["since_keyframe"] = 0
+                doc["facts"] = new
+            else:
+                doc["keyframe"] = False
+                doc["since_keyframe"] = latest["since_keyframe"] + 1
+            await self.coll.insert_one(doc)
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+
+    async def get_state(
+        self,
+        node_id: str,
+        at: Optional[datetime] = None,
+    ) -> NodeFactsHistoryState:
+        query = {"node_id": node_id}
+        if at is not None:
+            query["id"] = {"$lte": at}
+        try:
+            keyframe = await self.coll.find_one(
+                filter={**query, "keyframe": True},
+                projection={"id": 1, "facts": 1},
+                sort=[("id", pymongo.DESCENDING)],
+            )
+            if keyframe is None:
+                raise ResourceNotFound
+            facts = keyframe["facts"]
+            state_id = keyframe["id"]
+            query["id"] = {**query.get("id", {}), "$gt": keyframe["id"]}
+            cursor = self.coll.find(
+                filter=query,
+                projection={"id": 1, "patch": 1},
+                sort=[("id", pymongo.ASCENDING)],
+            )
+            async for doc in cursor:
+                facts = json_patch_apply(facts, doc["patch"])
+                state_id = doc["id"]
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        return NodeFactsHistoryState(id=state_id, node_id=node_id, facts=facts)
+
+    async def search(
+        self,
+        node_id: str,
+        fact: Optional[str] = None,
+        fields: Optional[list] = None,
+        sort: Optional[str] = None,
+        sort_order: Optional[sort_order_literal] = None,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> NodeFactsHistoryGetMulti:
+        query = {"node_id": node_id}
+        if fact:
+            pointer = re.escape(json_pointer(fact))
+            query["patch.path"] = {"$regex": f"^{pointer}(/|$)"}
+        result = await self._search(
+            query=query,
+            fields=fields,
+            sort=sort,
+            sort_order=sort_order,
+            page=page,
+            limit=limit,
+        )
+        return NodeFactsHistoryGetMulti(**result)
+
+    async def delete_all_from_node(self, node_id: str) -> None:
+        try:
+            await self.coll.delete_many(filter={"node_id": node_id})
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
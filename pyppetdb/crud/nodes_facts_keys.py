@@ -0,0 +1,268 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import re
+import socket
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+from typing import Optional
+
+import pymongo
+import pymongo.errors
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from pyppetdb.config import Config
+from pyppetdb.crud.common import CrudMongo
+from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.crud.pyppetdb_nodes import CrudPyppetDBNodes
+from pyppetdb.errors import BackendError
+from pyppetdb.model.common import sort_order_literal
+from pyppetdb.model.nodes import NodeGetFactKeys
+
+SAMPLE_MAX_LENGTH = 256
+
+
+class CrudNodesFactsKeys(CrudMongo):
+    def __init__(
+        self,
+        config: Config,
+        log: logging.Logger,
+        coll: AsyncIOMotorCollection,
+        crud_nodes: CrudNodes,
+        crud_pyppetdb_nodes: CrudPyppetDBNodes,
+    ):
+        super(CrudNodesFactsKeys, self).__init__(
+            config=config,
+            log=log,
+            coll=coll,
+        )
+        self._crud_nodes = crud_nodes
+        self._crud_pyppetdb_nodes = crud_pyppetdb_nodes
+        self._instance_id = f"{socket.getfqdn()}:{config.app.main.port}"
+        self._indices.extend(
+            [
+                pymongo.IndexModel(
+                    [
+                        ("path", pymongo.ASCENDING),
+                        ("type", pymongo.ASCENDING),
+                    ],
+                    unique=True,
+                    name="idx_path_type",
+                ),
+            ]
+        )
+
+    @property
+    def keys_config(self):
+        return self.config.app.main.facts.keys
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.keys_config.enable)
+
+    async def _create_index(self) -> None:
+        await super()._create_index()
+        if self.enabled:
+            claim = await self.coll.update_one(
+                filter={"path": None, "type": None},
+                update={"$setOnInsert": {"created": datetime.now(tz=timezone.utc)}},
+                upsert=True,
+            )
+            if claim.upserted_id is not None:
+                await self.rebuild()
+        else:
+            await self.coll.delete_many(filter={})
+
+    @staticmethod
+    def _type(value: Any) -> str:
+        if value is None:
+            return "null"
+        if isinstance(value, bool):
+            return "bool"
+        if isinstance(value, int):
+            return "int"
+        if isinstance(value, float):
+            return "float"
+        if isinstance(value, str):
+            return "str"
+        if isinstance(value, list):
+            return "list"
+        if isinstance(value, dict):
+            return "dict"
+        return type(value).__name__
+
+    def _keys(
+        self,
+        facts: Optional[dict],
+        prefix: str = "",
+        depth: int = 1,
+    ) -> dict[tuple[str, str], Any]:
+        result = dict()
+        if not isinstance(facts, dict):
+            return result
+        for key, value in facts.items():
+            path = f"{prefix}{key}"
+            if isinstance(value, dict) and value and depth < self.keys_config.maxDepth:
+                result.update(self._keys(value, prefix=f"{path}.", depth=depth + 1))
+            else:
+                result[(path, self._type(value))] = value
+        return result
+
+    @staticmethod
+    def _sample(value: Any) -> Optional[Any]:
+        if isinstance(value, str):
+            return value if len(value) <= SAMPLE_MAX_LENGTH else None
+        if isinstance(value, (bool, int, float)):
+            return value
+        return None
+
+    def _sample_request(self, path: str, _type: str, value: Any):
+        sample = self._sample(value)
+        samples = self.keys_config.samples
+        if sample is None or not samples:
+            return None
+        return pymongo.UpdateOne(
+            filter={
+                "path": path,
+                "type": _type,
+                f"samples.{samples - 1}": {"$exists": False},
+            },
+            update={"$addToSet": {"samples": sample}},
+        )
+
+    async def rebuild(self) -> None:
+        self.log.info("building fact key catalog")
+        existing = set()
+        async for item in self.coll.find(
+            filter={"path": {"$ne": None}}, projection={"_id": 0, "path": 1, "type": 1}
+        ):
+            existing.add((item["path"], item["type"]))
+        counts: dict[tuple[str, str], int] = dict()
+        samples: dict[tuple[str, str], list] = dict()
+        cursor = self._crud_nodes.coll.find(
+            filter={"facts": {"$type": "object"}},
+            projection={"_id": 0, "facts": 1},
+        )
+        async for node in cursor:
+            for key, value in self._keys(node["facts"]).items():
+                counts[key] = counts.get(key, 0) + 1
+                sample = self._sample(value)
+                key_samples = samples.setdefault(key, [])
+                if (
+                    sample is not None
+                    and len(key_samples) < self.keys_config.samples
+                    and sample not in key_samples
+                ):
+                    key_samples.append(sample)
+        # counts are overwritten, not incremented, so a rebuild also repairs
+        # drift; an ingest racing the scan is fixed by the next pass
+        requests = list()
+        for (path, _type), count in counts.items():
+            requests.append(
+                pymongo.UpdateOne(
+                    filter={"path": path, "type": _type},
+                    update={
+                        "$set": {"count": count, "samples": samples[(path, _type)]}
+                    },
+                    upsert=True,
+                )
+            )
+        for path, _type in existing - counts.keys():
+            requests.append(pymongo.DeleteOne(filter={"path": path, "type": _type}))
+        if requests:
+            await self.coll.bulk_write(requests, ordered=False)
+        self.log.info(f"built fact key catalog with {len(counts)} keys")
+
+    async def rebuild_worker(self) -> None:
+        self.log.info("starting fact key catalog rebuild worker")
+        while True:
+            await asyncio.sleep(delay=self.keys_config.interval)
+            try:
+                leader = await self._crud_pyppetdb_nodes.get_leader()
+                if leader == self._instance_id:
+                    await self.rebuild()
+                else:
+                    self.log.debug(
+                        f"Skipping fact key catalog rebuild, I am not the leader (Leader: {leader}, Me: {self._instance_id})"
+                    )
+            except Exception as e:
+                self.log.error(f"Error in fact key catalog rebuild worker: {e}")
+
+    async def update_facts(
+        self,
+        node_id: str,
+        old_facts: Optional[dict],
+        new_facts: Optional[dict],
+    ) -> None:
+        old_keys = self._keys(old_facts)
+        new_keys = self._keys(new_facts)
+        requests = list()
+        for path, _type in old_keys.keys() - new_keys.keys():
+            requests.append(
+                pymongo.UpdateOne(
+                    filter={"path": path, "type": _type},
+                    update={"$inc": {"count": -1}},
+                )
+            )
+            requests.append(
+                pymongo.DeleteOne(
+                    filter={"path": path, "type": _type, "count": {"$lte": 0}}
+                )
+            )
+        for path, _type in new_keys.keys() - old_keys.keys():
+            requests.append(
+                pymongo.UpdateOne(
+                    filter={"path": path, "type": _type},
+                    update={"$inc": {"count": 1}},
+                    upsert=True,
+                )
+            )
+            sample = self._sample_request(path, _type, new_keys[(path, _type)])
+            if sample is not None:
+                requests.append(sample)
+        if not requests:
+            return
+        try:
+            await self.coll.bulk_write(requests, ordered=True)
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+
+    async def search(
+        self,
+        prefix: Optional[str] = None,
+        _type: Optional[str] = None,
+        fields: Optional[list] = None,
+        sort: Optional[str] = None,
+        sort_order: Optional[sort_order_literal] = None,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> NodeGetFactKeys:
+        query = {"count": {"$gt": 0}}
+        if prefix:
+            query["path"] = {"$regex": f"^{re.escape(prefix)}"}
+        if _type:
+            query["type"] = _type
+        result = await self._search(
+            query=query,
+            fields=fields,
+            sort=sort,
+            sort_order=sort_order,
+            page=page,
+            limit=limit,
+        )
+        return NodeGetFactKeys(**result)
@@ -0,0 +1,275 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import socket
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Optional
+
+import pymongo
+import pymongo.errors
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from pyppetdb.config import Config
+from pyppetdb.crud.common import CrudMongo
+from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.crud.pyppetdb_nodes import CrudPyppetDBNodes
+from pyppetdb.model.nodes_facts_indexes import NodesFactsIndexGet
+from pyppetdb.model.nodes_facts_indexes import NodesFactsIndexGetMulti
+
+AUTO_INDEX_PREFIX = "idx_fact_auto_"
+
+
+class CrudNodesFactsQueries(CrudMongo):
+    def __init__(
+        self,
+        config: Config,
+        log: logging.Logger,
+        coll: AsyncIOMotorCollection,
+        crud_nodes: CrudNodes,
+        crud_pyppetdb_nodes: CrudPyppetDBNodes,
+    ):
+        super(CrudNodesFactsQueries, self).__init__(
+            config=config,
+            log=log,
+            coll=coll,
+        )
+        self._crud_nodes = crud_nodes
+        self._crud_pyppetdb_nodes = crud_pyppetdb_nodes
+        self._instance_id = f"{socket.getfqdn()}:{config.app.main.port}"
+        self._pending: dict[tuple[str, str], dict] = {}
+        self._indices.extend(
+            [
+                pymongo.IndexModel(
+                    [
+                        ("fact", pymongo.ASCENDING),
+                        ("operator", pymongo.ASCENDING),
+                    ],
+                    unique=True,
+                    name="idx_fact_operator",
+                ),
+            ]
+        )
+
+    @property
+    def advisor_config(self):
+        return self.config.app.main.facts.indexAdvisor
+
+    async def _create_index(self) -> None:
+        await super()._create_index()
+        await self._create_ttl_index(
+            field="last_seen",
+            ttl_seconds=self.advisor_config.unusedTtl,
+            index_name="ttl_last_seen",
+        )
+
+    @staticmethod
+    def _extract_fact_predicates(query: dict) -> list[tuple[str, str]]:
+        result = list()
+        if not isinstance(query, dict):
+            return result
+        for key, value in query.items():
+            if key in ("$and", "$or", "$nor") and isinstance(value, list):
+                for item in value:
+                    result.extend(CrudNodesFactsQueries._extract_fact_predicates(item))
+                continue
+            if not key.startswith("facts."):
+                continue
+            fact = key[len("facts.") :]
+            operators = list()
+            if isinstance(value, dict):
+                operators = [
+                    op[1:]
+                    for op in value
+                    if op.startswith("$") and op != "$options"
+                ]
+            if not operators:
+                operators = ["eq"]
+            for op in operators:
+                result.append((fact, op))
+        return result
+
+    def record(self, query: dict, duration_ms: float) -> None:
+        if not self.advisor_config.enable:
+            return
+        now = datetime.now(tz=timezone.utc)
+        for fact, op in set(self._extract_fact_predicates(query)):
+            stats = self._pending.setdefault(
+                (fact, op),
+                {"count": 0, "duration_ms_total": 0.0, "duration_ms_max": 0.0},
+            )
+            stats["count"] += 1
+            stats["duration_ms_total"] += duration_ms
+            stats["duration_ms_max"] = max(stats["duration_ms_max"], duration_ms)
+            stats["last_seen"] = now
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = {}
+        requests = list()
+        for (fact, op), stats in pending.items():
+            requests.append(
+                pymongo.UpdateOne(
+                    filter={"fact": fact, "operator": op},
+                    update={
+                        "$inc": {
+                            "count": stats["count"],
+                            "duration_ms_total": stats["duration_ms_total"],
+                        },
+                        "$max": {"duration_ms_max": stats["duration_ms_max"]},
+                        "$set": {"last_seen": stats["last_seen"]},
+                    },
+                    upsert=True,
+                )
+            )
+        await self.coll.bulk_write(requests, ordered=False)
+
+    async def _fact_indexes(self) -> tuple[set[str], set[str], bool]:
+        indexed = set()
+        managed = set()
+        wildcard = False
+        async for index in self._crud_nodes.coll.list_indexes():
+            keys = list(index["key"].keys())
+            if not keys:
+                continue
+            if keys[0] == "facts.$**":
+                wildcard = True
+                continue
+            if not keys[0].startswith("facts."):
+                continue
+            fact = keys[0][len("facts.") :]
+            indexed.add(fact)
+            if index["name"].startswith(AUTO_INDEX_PREFIX):
+                managed.add(fact)
+        return indexed, managed, wildcard
+
+    async def get_advice(self) -> NodesFactsIndexGetMulti:
+        pipeline = [
+            {
+                "$group": {
+                    "_id": "$fact",
+                    "operators": {"$addToSet": "$operator"},
+                    "count": {"$sum": "$count"},
+                    "duration_ms_total": {"$sum": "$duration_ms_total"},
+                    "duration_ms_max": {"$max": "$duration_ms_max"},
+                    "last_seen": {"$max": "$last_seen"},
+                }
+            },
+            {"$sort": {"count": -1}},
+        ]
+        stats = await self.coll.aggregate(pipeline).to_list(length=None)
+        indexed, managed, wildcard = await self._fact_indexes()
+        threshold = datetime.now(tz=timezone.utc) - timedelta(
+            seconds=self.advisor_config.unusedTtl
+        )
+
+        result = list()
+        seen = set()
+        managed_count = len(managed)
+        for item in stats:
+            fact = item["_id"]
+            seen.add(fact)
+            last_seen = item.get("last_seen")
+            if last_seen and last_seen.tzinfo is None:
+                last_seen = last_seen.replace(tzinfo=timezone.utc)
+            suggestion = None
+            if fact in managed and last_seen and last_seen < threshold:
+                suggestion = "drop"
+            elif (
+                fact not in indexed
+                and not wildcard
+                and item["count"] >= self.advisor_config.minQueries
+                and managed_count < self.advisor_config.maxIndexes
+            ):
+                suggestion = "create"
+                managed_count += 1
+            result.append(
+                NodesFactsIndexGet(
+                    fact=fact,
+                    operators=sorted(item["operators"]),
+                    count=item["count"],
+                    duration_ms_avg=(
+                        item["duration_ms_total"] / item["count"]
+                        if item["count"]
+                        else 0.0
+                    ),
+                    duration_ms_max=item["duration_ms_max"],
+                    last_seen=last_seen,
+                    indexed=fact in indexed or wildcard,
+                    managed=fact in managed,
+                    suggestion=suggestion,
+                )
+            )
+        for fact in sorted(managed - seen):
+            result.append(
+                NodesFactsIndexGet(
+                    fact=fact,
+                    indexed=True,
+                    managed=True,
+                    suggestion="drop",
+                )
+            )
+        return NodesFactsIndexGetMulti(
+            result=result,
+            meta={"result_size": len(result)},
+        )
+
+    async def apply(self, advice: Optional[NodesFactsIndexGetMulti] = None) -> None:
+        if not advice:
+            advice = await self.get_advice()
+        for item in advice.result:
+            name = f"{AUTO_INDEX_PREFIX}{item.fact}"
+            if item.suggestion == "create":
+                self.log.info(f"creating fact index {name}")
+                await self._crud_nodes._sync_index(
+                    pymongo.IndexModel(
+                        [
+                            (f"facts.{item.fact}", pymongo.ASCENDING),
+                            ("node_groups", pymongo.ASCENDING),
+                        ],
+                        name=name,
+                        partialFilterExpression={
+                            f"facts.{item.fact}": {"$exists": True}
+                        },
+                    )
+                )
+            elif item.suggestion == "drop" and item.managed:
+                self.log.info(f"dropping unused fact index {name}")
+                try:
+                    await self._crud_nodes.coll.drop_index(name)
+                except pymongo.errors.OperationFailure as err:
+                    self.log.error(f"failed to drop fact index {name}: {err}")
+
+    async def index_advisor_worker(self) -> None:
+        self.log.info("starting fact index advisor worker")
+        while True:
+            await asyncio.sleep(delay=self.advisor_config.interval)
+            try:
+                await self.flush()
+                if not self.advisor_config.autoManage:
+                    continue
+                leader = await self._crud_pyppetdb_nodes.get_leader()
+                if leader == self._instance_id:
+                    await self.apply()
+                else:
+                    self.log.debug(
+                        f"Skipping fact index management, I am not the leader (Leader: {leader}, Me: {self._instance_id})"
+                    )
+            except Exception as e:
+                self.log.error(f"Error in fact index advisor worker: {e}")
@@ -0,0 +1,66 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+import pymongo
+import pymongo.errors
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from pyppetdb.config import Config
+from pyppetdb.crud.common import CrudMongo
+from pyppetdb.errors import BackendError
+
+NODES_GENERATION_ID = "nodes"
+
+
+class CrudNodesGeneration(CrudMongo):
+    def __init__(
+        self,
+        config: Config,
+        log: logging.Logger,
+        coll: AsyncIOMotorCollection,
+    ):
+        super(CrudNodesGeneration, self).__init__(
+            config=config,
+            log=log,
+            coll=coll,
+        )
+        self._indices.append(
+            pymongo.IndexModel([("id", pymongo.ASCENDING)], unique=True, name="idx_id")
+        )
+
+    async def get(self) -> int:
+        try:
+            result = await self.coll.find_one(
+                filter={"id": NODES_GENERATION_ID},
+                projection={"_id": 0, "generation": 1},
+            )
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        if result is None:
+            return 0
+        return result["generation"]
+
+    async def bump(self) -> None:
+        try:
+            await self.coll.update_one(
+                filter={"id": NODES_GENERATION_ID},
+                update={"$inc": {"generation": 1}},
+                upsert=True,
+            )
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
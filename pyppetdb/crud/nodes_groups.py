@@ -14,6 +14,8 @@
 
 import asyncio
 import logging
+from typing import Any
+from typing import Iterable
 from typing import Optional
 
 from bson.objectid import ObjectId
@@ -23,26 +25,77 @@ import pymongo.errors
 
 from pyppetdb.config import Config
 from pyppetdb.crud.common import CrudMongo
+from pyppetdb.crud.nodes import CrudNodes
 from pyppetdb.model.common import DataDelete
 from pyppetdb.model.common import sort_order_literal
 from pyppetdb.model.nodes_groups import NodeGroupGet
 from pyppetdb.model.nodes_groups import NodeGroupGetMulti
-from pyppetdb.model.nodes_groups import NodeGroupUpdate
 from pyppetdb.model.nodes_groups import NodeGroupUpdateInternal
 from pyppetdb.model.pdb_facts import PuppetDBFacts
 
 
+class CrudNodesGroupsMatcher:
+    def __init__(self, groups: Iterable[NodeGroupGet]):
+        self._always: set[str] = set()
+        self._facts: dict[str, list[str]] = dict()
+        self._index: dict[tuple[str, str], list[tuple[str, int]]] = dict()
+        self._rules: dict[tuple[str, int], int] = dict()
+        for group in groups:
+            for rule_idx, rule in enumerate(group.filters or []):
+                if not rule.part:
+                    self._always.add(group.id)
+                    continue
+                rule_key = (group.id, rule_idx)
+                self._rules[rule_key] = len(rule.part)
+                for part in rule.part:
+                    self._facts.setdefault(part.fact, part.fact.split("."))
+                    for value in set(part.values):
+                        self._index.setdefault((part.fact, value), []).append(
+                            rule_key
+                        )
+
+    @staticmethod
+    def _value(values: dict, path: list[str]) -> Any:
+        value = values
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                return None
+            value = value[key]
+        return value
+
+    def match(self, values: dict) -> list[str]:
+        groups = set(self._always)
+        hits: dict[tuple[str, int], int] = dict()
+        for fact, path in self._facts.items():
+            value = self._value(values, path)
+            if not isinstance(value, str):
+                continue
+            for rule_key in self._index.get((fact, value), ()):
+                hits[rule_key] = hits.get(rule_key, 0) + 1
+        for rule_key, count in hits.items():
+            if count == self._rules[rule_key]:
+                groups.add(rule_key[0])
+        return sorted(groups)
+
+
 class CrudNodesGroupsCache:
     def __init__(self, log: logging.Logger, coll: AsyncIOMotorCollection):
         self._coll = coll
         self._log = log
         self._cache = {}
+        self._matcher: Optional[CrudNodesGroupsMatcher] = None
         self._initialized = False
 
     @property
     def cache(self) -> dict["str", NodeGroupGet]:
         return self._cache
 
+    @property
+    def matcher(self) -> CrudNodesGroupsMatcher:
+        if self._matcher is None:
+            self._matcher = CrudNodesGroupsMatcher(groups=self.cache.values())
+        return self._matcher
+
     @property
     def coll(self):
         return self._coll
@@ -88,11 +141,13 @@ class CrudNodesGroupsCache:
             doc = change.get("fullDocument")
             if doc:
                 self.cache[doc_id] = NodeGroupGet(**doc)
+                self._matcher = None
             else:
                 self.log.warning(f"No fullDocument in {operation} change for {doc_id}")
 
         elif operation == "delete":
             self.cache.pop(doc_id, None)
+            self._matcher = None
 
         else:
             self.log.warning(f"Unhandled operation type: {operation}")
@@ -106,6 +161,7 @@ class CrudNodesGroupsCache:
                 if doc_id not in self.cache:
                     self.cache[doc_id] = NodeGroupGet(**doc)
                     count += 1
+            self._matcher = None
 
             self.log.info(f"Loaded {count} initial documents into nodes_groups cache")
 
@@ -128,6 +184,7 @@ class CrudNodesGroups(CrudMongo):
         config: Config,
         log: logging.Logger,
         coll: AsyncIOMotorCollection,
+        crud_nodes: CrudNodes,
     ):
         super(CrudNodesGroups, self).__init__(
             config=config,
@@ -135,12 +192,12 @@ class CrudNodesGroups(CrudMongo):
             coll=coll,
         )
         self._cache = CrudNodesGroupsCache(log=log, coll=coll)
+        self._crud_nodes = crud_nodes
         self._indices.extend(
             [
                 pymongo.IndexModel(
                     [("id", pymongo.ASCENDING)], unique=True, name="idx_id"
                 ),
-                pymongo.IndexModel([("nodes", pymongo.ASCENDING)], name="idx_nodes"),
                 pymongo.IndexModel([("teams", pymongo.ASCENDING)], name="idx_teams"),
             ]
         )
@@ -149,10 +206,49 @@ class CrudNodesGroups(CrudMongo):
     def cache(self):
         return self._cache
 
+    @property
+    def crud_nodes(self):
+        return self._crud_nodes
+
     async def _create_index(self) -> None:
         await super()._create_index()
         await self.cache.run()
 
+    async def _migrate(self) -> None:
+        await super()._migrate()
+        await self._migrate_nodes_membership()
+
+    async def _migrate_nodes_membership(self) -> None:
+        result = await self.coll.update_many(
+            filter={"nodes": {"$exists": True}},
+            update={"$unset": {"nodes": ""}},
+        )
+        if result.modified_count:
+            self.log.info(
+                f"Removed node lists from {result.modified_count} node groups, "
+                "membership is read from the nodes"
+            )
+        indexes = await self.coll.index_information()
+        if "idx_nodes" in indexes:
+            await self.coll.drop_index("idx_nodes")
+
+    @staticmethod
+    def _fields(fields: Optional[list]) -> Optional[list]:
+        if fields and "nodes" in fields and "id" not in fields:
+            return [*fields, "id"]
+        return fields
+
+    async def _add_nodes(self, groups: list[dict], fields: Optional[list]) -> None:
+        if fields and "nodes" not in fields:
+            return
+        members = await self.crud_nodes.node_groups_members(
+            node_group_ids=[group["id"] for group in groups]
+        )
+        for group in groups:
+            group["nodes"] = members.get(group["id"], [])
+            if fields and "id" not in fields:
+                group.pop("id")
+
     async def create(
         self,
         _id: str,
@@ -161,7 +257,8 @@ class CrudNodesGroups(CrudMongo):
     ) -> NodeGroupGet | None:
         data = payload.model_dump()
         data["id"] = _id
-        result = await self._create(payload=data, fields=fields)
+        result = await self._create(payload=data, fields=self._fields(fields))
+        await self._add_nodes(groups=[result], fields=fields)
         return NodeGroupGet(**result)
 
     async def delete(
@@ -172,14 +269,6 @@ class CrudNodesGroups(CrudMongo):
         await self._delete(query=query)
         return DataDelete()
 
-    async def delete_node_from_nodes_groups(self, node_id):
-        query = {}
-        update = {"$pull": {"nodes": node_id}}
-        await self._coll.update_many(
-            filter=query,
-            update=update,
-        )
-
     async def delete_team_from_nodes_groups(self, team_id):
         query = {}
         update = {"$pull": {"teams": team_id}}
@@ -188,66 +277,8 @@ class CrudNodesGroups(CrudMongo):
             update=update,
         )
 
-    @staticmethod
-    def compile_filters_from_node_group(node_group: NodeGroupGet | NodeGroupUpdate):
-        or_filter = []
-        if not node_group.filters:
-            return {"id": None}
-        for _filter in node_group.filters:
-            and_filter = []
-            for _filter_part in _filter.part:
-                and_filter.append(
-                    {f"facts.{_filter_part.fact}": {"$in": _filter_part.values}}
-                )
-            or_filter.append({"$and": and_filter})
-        return {"$or": or_filter}
-
     async def reevaluate_node_membership(self, node_id: str, node_facts: PuppetDBFacts):
-        _groups = list()
-        for group_data in self.cache.cache.values():
-            if not group_data.filters:
-                continue
-            group_matches = False
-            for filter_rule in group_data.filters:
-                filter_matches = True
-                for filter_part in filter_rule.part:
-                    if not self._evaluate_filter_part(filter_part, node_facts.values):
-                        filter_matches = False
-                        break
-                if filter_matches:
-                    group_matches = True
-                    break
-            if group_matches:
-                _groups.append(group_data.id)
-        updates = [
-            pymongo.UpdateMany(
-                filter={"id": {"$nin": _groups}},
-                update={"$pull": {"nodes": node_id}},
-            )
-        ]
-        if _groups:
-            updates.append(
-                pymongo.UpdateMany(
-                    filter={"id": {"$in": _groups}},
-                    update={"$addToSet": {"nodes": node_id}},
-                )
-            )
-        await self.coll.bulk_write(updates)
-        return _groups
-
-    @staticmethod
-    def _evaluate_filter_part(filter_part, node_facts_values):
-        try:
-            fact_path = filter_part.fact.split(".")
-            current_value = node_facts_values
-            for key in fact_path:
-                if isinstance(current_value, dict) and key in current_value:
-                    current_value = current_value[key]
-                else:
-                    return False
-            return current_value in filter_part.values
-        except (KeyError, TypeError, AttributeError):
-            return False
+        return self.cache.matcher.match(node_facts.values)
 
     async def get(
         self,
@@ -255,7 +286,8 @@ class CrudNodesGroups(CrudMongo):
         fields: list,
     ) -> NodeGroupGet:
         query = {"id": _id}
-        result = await self._get(query=query, fields=fields)
+        result = await self._get(query=query, fields=self._fields(fields))
+        await self._add_nodes(groups=[result], fields=fields)
         return NodeGroupGet(**result)
 
     async def resource_exists(
@@ -278,19 +310,24 @@ class CrudNodesGroups(CrudMongo):
         limit: Optional[int] = None,
     ) -> NodeGroupGetMulti:
         query = {}
+        node_groups = None
+        if nodes:
+            node_groups = await self.crud_nodes.node_groups_of_nodes(
+                node_id_regex=nodes
+            )
         self._filter_list(query, "teams", teams_list)
-        self._filter_re(query, "id", _id)
-        self._filter_re(query, "nodes", nodes)
+        self._filter_re(query, "id", _id, node_groups)
         self._filter_re(query, "teams", teams)
 
         result = await self._search(
             query=query,
-            fields=fields,
+            fields=self._fields(fields),
             sort=sort,
             sort_order=sort_order,
             page=page,
             limit=limit,
         )
+        await self._add_nodes(groups=result["result"], fields=fields)
         return NodeGroupGetMulti(**result)
 
     async def update(
@@ -301,5 +338,8 @@ class CrudNodesGroups(CrudMongo):
     ) -> NodeGroupGet:
         query = {"id": _id}
         data = payload.model_dump()
-        result = await self._update(query=query, fields=fields, payload=data)
+        result = await self._update(
+            query=query, fields=self._fields(fields), payload=data
+        )
+        await self._add_nodes(groups=[result], fields=fields)
         return NodeGroupGet(**result)
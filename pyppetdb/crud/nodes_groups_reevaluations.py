@@ -0,0 +1,151 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from datetime import datetime
+from datetime import timezone
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from pyppetdb.config import Config
+from pyppetdb.crud.leader_runs import CrudLeaderRuns
+from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.crud.nodes_groups import CrudNodesGroups
+from pyppetdb.crud.nodes_groups import CrudNodesGroupsMatcher
+from pyppetdb.crud.pyppetdb_nodes import CrudPyppetDBNodes
+from pyppetdb.errors import ResourceNotFound
+from pyppetdb.model.nodes_groups import NodeGroupReevaluationGet
+
+
+class CrudNodesGroupsReevaluations(CrudLeaderRuns):
+    run_label = "node group re-evaluation"
+
+    def __init__(
+        self,
+        config: Config,
+        log: logging.Logger,
+        coll: AsyncIOMotorCollection,
+        crud_nodes: CrudNodes,
+        crud_nodes_groups: CrudNodesGroups,
+        crud_pyppetdb_nodes: CrudPyppetDBNodes,
+    ):
+        super(CrudNodesGroupsReevaluations, self).__init__(
+            config=config,
+            log=log,
+            coll=coll,
+            crud_pyppetdb_nodes=crud_pyppetdb_nodes,
+        )
+        self._crud_nodes = crud_nodes
+        self._crud_nodes_groups = crud_nodes_groups
+
+    @property
+    def crud_nodes(self):
+        return self._crud_nodes
+
+    @property
+    def crud_nodes_groups(self):
+        return self._crud_nodes_groups
+
+    @property
+    def reevaluation_config(self):
+        return self.config.app.main.nodesGroups
+
+    @property
+    def run_interval(self) -> int:
+        return self.reevaluation_config.reevaluationInterval
+
+    async def schedule(self, node_group_id: str) -> None:
+        await self._schedule(
+            _id=node_group_id,
+            fields={
+                "total": None,
+                "processed": 0,
+                "added": 0,
+                "removed": 0,
+                "last_node_id": None,
+            },
+        )
+
+    async def delete(self, node_group_id: str) -> None:
+        await self._delete_many(query={"id": node_group_id})
+
+    async def get(self, _id: str) -> NodeGroupReevaluationGet:
+        result = await self._get(query={"id": _id}, fields=[])
+        return NodeGroupReevaluationGet(**result)
+
+    async def process(self, run: dict) -> None:
+        await self.reevaluate(run=run)
+
+    async def reevaluate(self, run: dict) -> None:
+        node_group_id = run["id"]
+        try:
+            node_group = await self.crud_nodes_groups.get(
+                _id=node_group_id, fields=["id", "filters"]
+            )
+        except ResourceNotFound:
+            await self.delete(node_group_id=node_group_id)
+            return
+        matcher = CrudNodesGroupsMatcher(groups=[node_group])
+        facts = sorted(
+            {part.fact for rule in node_group.filters or [] for part in rule.part}
+        )
+        batch_size = self.reevaluation_config.reevaluationBatchSize
+
+        if run["status"] == "pending":
+            started = {
+                "status": "running",
+                "started": datetime.now(timezone.utc),
+                "total": await self.crud_nodes.count(),
+            }
+            if not await self._checkpoint(run=run, update={"$set": started}):
+                return
+            self.log.info(f"re-evaluating membership of node group {node_group_id}")
+
+        after = run.get("last_node_id")
+        while True:
+            if not await self._leading(run=run):
+                return
+            nodes = await self.crud_nodes.node_groups_chunk(
+                after=after, limit=batch_size, facts=facts
+            )
+            add, remove = list(), list()
+            for node in nodes:
+                member = node_group_id in (node.get("node_groups") or [])
+                if matcher.match(node.get("facts") or {}):
+                    if not member:
+                        add.append(node["id"])
+                elif member:
+                    remove.append(node["id"])
+            await self.crud_nodes.update_nodegroup(
+                node_group_id=node_group_id, add=add, remove=remove
+            )
+            if nodes:
+                after = nodes[-1]["id"]
+            update = {
+                "$set": {"last_node_id": after},
+                "$inc": {
+                    "processed": len(nodes),
+                    "added": len(add),
+                    "removed": len(remove),
+                },
+            }
+            done = len(nodes) < batch_size
+            if done:
+                update["$set"]["status"] = "done"
+                update["$set"]["finished"] = datetime.now(timezone.utc)
+            if not await self._checkpoint(run=run, update=update):
+                return
+            if done:
+                self.log.info(f"re-evaluated membership of node group {node_group_id}")
+                return
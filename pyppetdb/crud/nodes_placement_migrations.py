@@ -0,0 +1,184 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from datetime import datetime
+from datetime import timezone
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+import pymongo.errors
+
+from pyppetdb.config import Config
+from pyppetdb.crud.leader_runs import CrudLeaderRuns
+from pyppetdb.crud.leader_runs import IN_FLIGHT
+from pyppetdb.crud.nodes_catalog_cache import CrudNodesCatalogCache
+from pyppetdb.crud.nodes_catalogs import CrudNodesCatalogs
+from pyppetdb.crud.nodes_reports import CrudNodesReports
+from pyppetdb.crud.pyppetdb_nodes import CrudPyppetDBNodes
+from pyppetdb.errors import BackendError
+from pyppetdb.model.common import sort_order_literal
+from pyppetdb.model.nodes_placement_migrations import NodePlacementMigrationGetMulti
+
+
+class CrudNodesPlacementMigrations(CrudLeaderRuns):
+    run_label = "placement migration"
+
+    def __init__(
+        self,
+        config: Config,
+        log: logging.Logger,
+        coll: AsyncIOMotorCollection,
+        crud_nodes_catalog_cache: CrudNodesCatalogCache,
+        crud_nodes_catalogs: CrudNodesCatalogs,
+        crud_nodes_reports: CrudNodesReports,
+        crud_pyppetdb_nodes: CrudPyppetDBNodes,
+    ):
+        super(CrudNodesPlacementMigrations, self).__init__(
+            config=config,
+            log=log,
+            coll=coll,
+            crud_pyppetdb_nodes=crud_pyppetdb_nodes,
+        )
+        self._targets = {
+            "nodes_catalog_cache": crud_nodes_catalog_cache,
+            "nodes_catalogs": crud_nodes_catalogs,
+            "nodes_reports": crud_nodes_reports,
+        }
+
+    @property
+    def migration_config(self):
+        return self.config.app.main.placementMigration
+
+    @property
+    def targets(self):
+        return self._targets
+
+    @property
+    def run_interval(self) -> int:
+        return self.migration_config.interval
+
+    async def _create_index(self) -> None:
+        await super()._create_index()
+        await self._create_ttl_index(
+            field="finished",
+            ttl_seconds=self.migration_config.doneTtl,
+            index_name="ttl_finished",
+        )
+
+    async def schedule(
+        self,
+        node_id: str,
+        placement: dict[str, str],
+        placement_old: dict[str, str],
+    ) -> None:
+        # the worker moves every document not yet in the new placement, so
+        # the sources of a superseded run stay covered
+        await self._schedule(
+            _id=node_id,
+            fields={
+                "placement": placement,
+                "migrated": {target: 0 for target in self.targets},
+            },
+            update={"$addToSet": {"placements_old": placement_old}},
+        )
+
+    async def delete(self, node_id: str) -> None:
+        await self._delete_many(query={"id": node_id})
+
+    async def read_placement(
+        self,
+        node_id: str,
+        placement: dict[str, str],
+    ) -> dict[str, str] | list[dict[str, str]]:
+        if not self.config.mongodb.placementFacts:
+            return placement
+        try:
+            run = await self.coll.find_one(
+                filter={"id": node_id, "status": {"$in": IN_FLIGHT}},
+                projection={"placement": 1, "placements_old": 1},
+            )
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        if not run:
+            return placement
+        placements = [placement]
+        for item in [run.get("placement"), *(run.get("placements_old") or [])]:
+            if item is not None and item not in placements:
+                placements.append(item)
+        return placements
+
+    async def search(
+        self,
+        node_id: Optional[str] = None,
+        status: Optional[str] = None,
+        fields: Optional[list] = None,
+        sort: Optional[str] = None,
+        sort_order: Optional[sort_order_literal] = None,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> NodePlacementMigrationGetMulti:
+        query = {}
+        self._filter_re(query, "id", node_id)
+        self._filter_literal(query, "status", status)
+        result = await self._search(
+            query=query,
+            fields=fields,
+            sort=sort,
+            sort_order=sort_order,
+            page=page,
+            limit=limit,
+        )
+        return NodePlacementMigrationGetMulti(**result)
+
+    async def process(self, run: dict) -> None:
+        await self.migrate(run=run)
+
+    async def _throttle(self, writes: int) -> None:
+        if writes and self.migration_config.rate > 0:
+            await asyncio.sleep(writes / self.migration_config.rate)
+
+    async def migrate(self, run: dict) -> None:
+        node_id = run["id"]
+        if run["status"] == "pending":
+            started = {"status": "running", "started": datetime.now(timezone.utc)}
+            if not await self._checkpoint(run=run, update={"$set": started}):
+                return
+            self.log.info(f"migrating node {node_id} to placement {run['placement']}")
+
+        for target, crud in self.targets.items():
+            while True:
+                if not await self._leading(run=run):
+                    return
+                migrated = await crud.update_placement(
+                    node_id=node_id,
+                    placement=run["placement"],
+                    limit=self.migration_config.batchSize,
+                )
+                if not migrated:
+                    break
+                update = {"$inc": {f"migrated.{target}": migrated}}
+                if not await self._checkpoint(run=run, update=update):
+                    return
+                await self._throttle(writes=migrated)
+
+        finished = {
+            "status": "done",
+            "finished": datetime.now(timezone.utc),
+            "placements_old": [],
+        }
+        if await self._checkpoint(run=run, update={"$set": finished}):
+            self.log.info(f"migrated node {node_id} to placement {run['placement']}")
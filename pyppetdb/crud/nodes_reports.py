@@ -12,8 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
 import logging
+import re
+import time
 from typing import Optional
 
 from bson.objectid import ObjectId
@@ -25,7 +30,10 @@ from pyppetdb.config import Config
 
 from pyppetdb.crud.common import CrudMongo
 from pyppetdb.crud.nodes_secrets_redactor import NodesSecretsRedactor
+from pyppetdb.crud.nodes_secrets_redactor import NodesSecretsRedactorPool
 
+from pyppetdb.errors import BackendError
+from pyppetdb.errors import ResourceNotFound
 from pyppetdb.model.common import DataDelete
 from pyppetdb.model.common import sort_order_literal
 from pyppetdb.model.nodes_reports import NodeReportGet
@@ -34,9 +42,20 @@ from pyppetdb.model.nodes_reports import NodeReportPostInternal
 
 
 class NodesReportsRedactor:
-    def __init__(self, log: logging.Logger, redactor: NodesSecretsRedactor):
+    def __init__(
+        self,
+        log: logging.Logger,
+        redactor: NodesSecretsRedactor,
+        pool: Optional[NodesSecretsRedactorPool] = None,
+    ):
         self.log = log
         self._redactor = redactor
+        self._pool = pool
+
+    async def redact_async(self, data: dict) -> dict:
+        if self._pool is None:
+            return self.redact(data)
+        return await self._pool.redact(redact_cls=NodesReportsRedactor, data=data)
 
     def redact(self, data: dict) -> dict:
         if not isinstance(data, dict):
@@ -69,6 +88,37 @@ class NodesReportsRedactor:
         return data
 
 
+BUCKET_FORMATS = {
+    8: ("%Y%m%d", timedelta(days=1)),
+    10: ("%Y%m%d%H", timedelta(hours=1)),
+}
+BUCKET_NAMES_TTL = 60
+# stays below the server limit of 1000 stages per pipeline
+BUCKET_UNION_CHUNK = 500
+
+
+class CrudNodesReportsBucket(CrudMongo):
+    def __init__(
+        self,
+        config: Config,
+        log: logging.Logger,
+        coll: AsyncIOMotorCollection,
+        indices: list[pymongo.IndexModel],
+    ):
+        super(CrudNodesReportsBucket, self).__init__(
+            config=config,
+            log=log,
+            coll=coll,
+        )
+        self._indices = list(indices)
+        self._indexed = False
+
+    async def ensure_index(self) -> None:
+        if not self._indexed:
+            await self._create_index()
+            self._indexed = True
+
+
 class CrudNodesReports(CrudMongo):
     def __init__(
         self,
@@ -83,6 +133,9 @@ class CrudNodesReports(CrudMongo):
             coll=coll,
         )
         self._secret_manager = secret_manager
+        self._buckets: dict[str, CrudNodesReportsBucket] = {}
+        self._bucket_names_cache: set[str] = set()
+        self._bucket_names_expires = 0.0
         self._indices.extend(
             [
                 pymongo.IndexModel(
@@ -100,6 +153,10 @@ class CrudNodesReports(CrudMongo):
             ]
         )
 
+    @property
+    def bucket(self) -> Optional[str]:
+        return self.config.app.main.storeHistory.reportsBucket
+
     async def _create_index(self) -> None:
         await super()._create_index()
         await self._create_ttl_index(
@@ -108,6 +165,104 @@ class CrudNodesReports(CrudMongo):
             index_name="ttl_report_history",
         )
 
+    @staticmethod
+    def _utc(ts: datetime) -> datetime:
+        if ts.tzinfo is None:
+            return ts.replace(tzinfo=timezone.utc)
+        return ts.astimezone(timezone.utc)
+
+    def _bucket_name(self, ts: datetime) -> str:
+        fmt = "%Y%m%d%H" if self.bucket == "hour" else "%Y%m%d"
+        return f"{self.resource_type}_{self._utc(ts).strftime(fmt)}"
+
+    def _bucket_range(self, name: str) -> Optional[tuple[datetime, datetime]]:
+        prefix = f"{self.resource_type}_"
+        suffix = name[len(prefix) :]
+        if not name.startswith(prefix) or len(suffix) not in BUCKET_FORMATS:
+            return None
+        fmt, length = BUCKET_FORMATS[len(suffix)]
+        try:
+            start = datetime.strptime(suffix, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+        return start, start + length
+
+    def _bucket_crud(self, name: str) -> CrudNodesReportsBucket:
+        crud = self._buckets.get(name)
+        if crud is None:
+            crud = CrudNodesReportsBucket(
+                config=self.config,
+                log=self.log,
+                coll=self.coll.database[name],
+                indices=self._indices,
+            )
+            self._buckets[name] = crud
+        return crud
+
+    async def _bucket_names(self, refresh: bool = False) -> list[str]:
+        if refresh or self._bucket_names_expires <= time.monotonic():
+            pattern = f"^{re.escape(self.resource_type)}_[0-9]+$"
+            try:
+                names = await self.coll.database.list_collection_names(
+                    filter={"name": {"$regex": pattern}}
+                )
+            except pymongo.errors.ConnectionFailure as err:
+                self.log.error(f"backend error: {err}")
+                raise BackendError()
+            self._bucket_names_cache = {
+                name for name in names if self._bucket_range(name)
+            }
+            self._bucket_names_expires = time.monotonic() + BUCKET_NAMES_TTL
+        # another instance may have created the current bucket since the
+        # last listing, reading a missing collection is cheap
+        names = self._bucket_names_cache | {
+            self._bucket_name(datetime.now(timezone.utc))
+        }
+        return sorted(names, key=self._bucket_range)
+
+    async def _read_cruds(
+        self,
+        descending: bool = True,
+        ts: Optional[datetime] = None,
+    ) -> list[CrudMongo]:
+        # the collection without a bucket suffix holds reports stored before
+        # bucketing was enabled, it is older than every bucket
+        if not self.bucket:
+            return [self]
+        names = await self._bucket_names()
+        if ts is not None:
+            ts = self._utc(ts)
+            names = [
+                name
+                for name in names
+                if self._bucket_range(name)[0] <= ts < self._bucket_range(name)[1]
+            ]
+        cruds = [self, *(self._bucket_crud(name) for name in names)]
+        if descending:
+            cruds.reverse()
+        return cruds
+
+    async def expire_buckets(self) -> None:
+        expired = datetime.now(timezone.utc) - timedelta(
+            seconds=self.config.app.main.storeHistory.ttl
+        )
+        for name in await self._bucket_names(refresh=True):
+            if self._bucket_range(name)[1] > expired:
+                break
+            self.log.info(f"dropping expired report bucket {name}")
+            await self.coll.database.drop_collection(name)
+            self._buckets.pop(name, None)
+            self._bucket_names_cache.discard(name)
+
+    async def bucket_retention_worker(self) -> None:
+        self.log.info("starting report bucket retention worker")
+        while True:
+            try:
+                await self.expire_buckets()
+            except Exception as e:
+                self.log.error(f"Error in report bucket retention worker: {e}")
+            await asyncio.sleep(delay=300)
+
     async def create(
         self,
         _id: datetime,
@@ -117,78 +272,99 @@ class CrudNodesReports(CrudMongo):
         return_none: bool = False,
     ) -> NodeReportGet | None:
         data = payload.model_dump()
-        data = self._secret_manager.redact(data)
+        data = await self._secret_manager.redact_async(data)
         data["id"] = _id
         data["node_id"] = node_id
 
+        crud = self
+        if self.bucket:
+            name = self._bucket_name(_id)
+            crud = self._bucket_crud(name)
+            await crud.ensure_index()
+            self._bucket_names_cache.add(name)
         if return_none:
-            await self._create_base(payload=data)
+            await crud._create_base(payload=data)
             return None
-        result = await self._create(fields=fields, payload=data)
+        result = await crud._create(fields=fields, payload=data)
         return NodeReportGet(**result)
 
     async def delete(
         self,
         _id: datetime,
         node_id: str,
-        placement: dict[str, str],
+        placement: dict[str, str] | list[dict[str, str]],
     ) -> DataDelete:
         query = {
             "id": _id,
             "node_id": node_id,
         }
-        if placement:
-            query["placement"] = placement
-        await self._delete(query=query)
-        return DataDelete()
+        self._filter_placement(query, placement)
+        for crud in await self._read_cruds(ts=_id):
+            try:
+                await crud._delete(query=query)
+                return DataDelete()
+            except ResourceNotFound:
+                continue
+        raise ResourceNotFound(
+            details=f"Resource {self.resource_type} {query} not found"
+        )
 
     async def delete_all_from_node(
         self,
         node_id: str,
-        placement: dict[str, str],
+        placement: dict[str, str] | list[dict[str, str]],
     ):
         query = {"node_id": node_id}
-        if placement:
-            query["placement"] = placement
-        await self._coll.delete_many(filter=query)
+        self._filter_placement(query, placement)
+        for crud in await self._read_cruds():
+            await crud.coll.delete_many(filter=query)
 
     async def get(
         self,
         _id: datetime,
         node_id: str,
-        placement: dict[str, str],
+        placement: dict[str, str] | list[dict[str, str]],
         fields: list,
     ) -> NodeReportGet:
         query = {
             "id": _id,
             "node_id": node_id,
         }
-        if placement:
-            query["placement"] = placement
-        result = await self._get(
-            query=query,
-            fields=fields,
+        self._filter_placement(query, placement)
+        for crud in await self._read_cruds(ts=_id):
+            try:
+                result = await crud._get(query=query, fields=fields)
+                return NodeReportGet(**result)
+            except ResourceNotFound:
+                continue
+        raise ResourceNotFound(
+            details=f"Resource {self.resource_type} {query} not found"
         )
-        return NodeReportGet(**result)
 
     async def resource_exists(
         self,
         _id: datetime,
         node_id: str,
-        placement: dict[str, str],
+        placement: dict[str, str] | list[dict[str, str]],
     ) -> ObjectId:
         query = {
             "id": _id,
             "node_id": node_id,
         }
-        if placement:
-            query["placement"] = placement
-        return await self._resource_exists(query=query)
+        self._filter_placement(query, placement)
+        for crud in await self._read_cruds(ts=_id):
+            try:
+                return await crud._resource_exists(query=query)
+            except ResourceNotFound:
+                continue
+        raise ResourceNotFound(
+            details=f"Resource {self.resource_type} {query} not found"
+        )
 
     async def search(
         self,
         node_id: str,
-        placement: dict[str, str],
+        placement: dict[str, str] | list[dict[str, str]],
         report_catalog_uuid: Optional[str] = None,
         report_status: Optional[str] = None,
         fields: Optional[list] = None,
@@ -198,8 +374,7 @@ class CrudNodesReports(CrudMongo):
         limit: Optional[int] = None,
     ) -> NodeReportGetMulti:
         query = {"node_id": node_id}
-        if placement:
-            query["placement"] = placement
+        self._filter_placement(query, placement)
         self._filter_literal(
             query=query,
             field="report.catalog_uuid",
@@ -211,22 +386,171 @@ class CrudNodesReports(CrudMongo):
             selector=report_status,
         )
 
-        result = await self._search(
-            query=query,
-            fields=fields,
-            sort=sort,
-            sort_order=sort_order,
-            page=page,
-            limit=limit,
-        )
+        if not self.bucket:
+            result = await self._search(
+                query=query,
+                fields=fields,
+                sort=sort,
+                sort_order=sort_order,
+                page=page,
+                limit=limit,
+            )
+            return NodeReportGetMulti(**result)
+
+        cruds = await self._read_cruds(descending=sort_order != "ascending")
+        try:
+            if sort and sort != "id":
+                result = await self._search_union(
+                    cruds=cruds,
+                    query=query,
+                    fields=fields,
+                    sort=sort,
+                    sort_order=sort_order,
+                    page=page,
+                    limit=limit,
+                )
+            else:
+                result = await self._search_buckets(
+                    cruds=cruds,
+                    query=query,
+                    fields=fields,
+                    sort_order=sort_order,
+                    page=page,
+                    limit=limit,
+                )
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
         return NodeReportGetMulti(**result)
 
+    async def _count_buckets(self, cruds: list[CrudMongo], query: dict) -> list[int]:
+        # one aggregation per chunk of buckets instead of one count per bucket,
+        # every bucket contributes a single document with its index and count
+        counts = [0] * len(cruds)
+        for offset in range(0, len(cruds), BUCKET_UNION_CHUNK):
+            chunk = cruds[offset : offset + BUCKET_UNION_CHUNK]
+            pipeline = list()
+            for index, crud in enumerate(chunk, start=offset):
+                stages = [
+                    {"$match": query},
+                    {"$count": "count"},
+                    {"$addFields": {"bucket": index}},
+                ]
+                if not pipeline:
+                    pipeline.extend(stages)
+                else:
+                    pipeline.append(
+                        {"$unionWith": {"coll": crud.resource_type, "pipeline": stages}}
+                    )
+            async for item in chunk[0].coll.aggregate(pipeline):
+                counts[item["bucket"]] = item["count"]
+        return counts
+
+    async def _search_buckets(
+        self,
+        cruds: list[CrudMongo],
+        query: dict,
+        fields: Optional[list],
+        sort_order: Optional[sort_order_literal],
+        page: Optional[int],
+        limit: Optional[int],
+    ) -> dict:
+        # buckets hold disjoint id ranges and come ordered by id, so a page
+        # sorted by id only reads from the buckets it overlaps
+        counts = await self._count_buckets(cruds=cruds, query=query)
+        skip = self._pagination_skip(page, limit) if page and limit else 0
+        projection = self._projection(fields)
+        result = list()
+        for crud, count in zip(cruds, counts):
+            if limit and len(result) >= limit:
+                break
+            if skip >= count:
+                skip -= count
+                continue
+            cursor = crud.coll.find(filter=query, projection=projection)
+            cursor.sort(self._sort(sort="id", sort_order=sort_order))
+            cursor.skip(skip)
+            if limit:
+                cursor.limit(limit - len(result))
+            result.extend(await cursor.to_list(None))
+            skip = 0
+        return self._format_multi(result, count=sum(counts))
+
+    async def _search_union(
+        self,
+        cruds: list[CrudMongo],
+        query: dict,
+        fields: Optional[list],
+        sort: str,
+        sort_order: Optional[sort_order_literal],
+        page: Optional[int],
+        limit: Optional[int],
+    ) -> dict:
+        counts = await self._count_buckets(cruds=cruds, query=query)
+        skip = self._pagination_skip(page, limit) if page and limit else 0
+        projection = self._projection(fields)
+        chunks = [
+            cruds[offset : offset + BUCKET_UNION_CHUNK]
+            for offset in range(0, len(cruds), BUCKET_UNION_CHUNK)
+        ]
+        # more buckets than fit into one pipeline are merged per chunk, every
+        # chunk returns its first skip + limit documents and the page is cut
+        # after merging them here
+        merged = len(chunks) > 1
+        result = list()
+        for chunk in chunks:
+            pipeline = [{"$match": query}]
+            for crud in chunk[1:]:
+                pipeline.append(
+                    {
+                        "$unionWith": {
+                            "coll": crud.resource_type,
+                            "pipeline": [{"$match": query}],
+                        }
+                    }
+                )
+            pipeline.append(
+                {"$sort": dict(self._sort(sort=sort, sort_order=sort_order))}
+            )
+            if merged:
+                if limit:
+                    pipeline.append({"$limit": skip + limit})
+                pipeline.append({"$addFields": {"_sort": f"${sort}"}})
+            else:
+                if skip:
+                    pipeline.append({"$skip": skip})
+                if limit:
+                    pipeline.append({"$limit": limit})
+            if projection:
+                pipeline.append(
+                    {"$project": {**projection, **({"_sort": 1} if merged else {})}}
+                )
+            cursor = chunk[0].coll.aggregate(pipeline)
+            result.extend(await cursor.to_list(None))
+        if merged:
+            # missing values sort first, like they do on the server
+            result.sort(
+                key=lambda doc: (doc.get("_sort") is not None, doc.get("_sort") or ""),
+                reverse=sort_order != "ascending",
+            )
+            result = result[skip : skip + limit if limit else None]
+            for doc in result:
+                doc.pop("_sort", None)
+        return self._format_multi(result, count=sum(counts))
+
     async def update_placement(
         self,
         node_id: str,
         placement: dict[str, str],
-    ):
-        await self._coll.update_many(
-            filter={"node_id": node_id},
-            update={"$set": {"placement": placement}},
-        )
+        limit: int,
+    ) -> int:
+        # one batch from the first bucket that still has documents to move
+        for crud in await self._read_cruds():
+            migrated = await crud._update_placement(
+                query={"node_id": node_id},
+                placement=placement,
+                limit=limit,
+            )
+            if migrated:
+                return migrated
+        return 0
@@ -0,0 +1,187 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+import pymongo
+import pymongo.errors
+
+from pyppetdb.config import Config
+from pyppetdb.crud.common import CrudMongo
+from pyppetdb.errors import BackendError
+from pyppetdb.model.common import sort_order_literal
+from pyppetdb.model.nodes_reports import NodeReportRollupGetMulti
+from pyppetdb.model.nodes_reports import rollup_period_literal
+
+PERIODS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+
+class CrudNodesReportsRollups(CrudMongo):
+    def __init__(
+        self,
+        config: Config,
+        log: logging.Logger,
+        coll: AsyncIOMotorCollection,
+    ):
+        super(CrudNodesReportsRollups, self).__init__(
+            config=config,
+            log=log,
+            coll=coll,
+        )
+        self._indices.extend(
+            [
+                pymongo.IndexModel(
+                    [
+                        ("period", pymongo.ASCENDING),
+                        ("start", pymongo.ASCENDING),
+                        ("environment", pymongo.ASCENDING),
+                        ("status", pymongo.ASCENDING),
+                    ],
+                    unique=True,
+                    name="idx_period_start_environment_status",
+                ),
+            ]
+        )
+
+    @property
+    def rollups_config(self):
+        return self.config.app.main.reportsRollups
+
+    @property
+    def enabled(self) -> bool:
+        return self.rollups_config.enable
+
+    async def _create_index(self) -> None:
+        await super()._create_index()
+        await self._create_ttl_index(
+            field="expires",
+            ttl_seconds=0,
+            index_name="ttl_expires",
+        )
+
+    @staticmethod
+    def _start(timestamp: datetime, period: str) -> datetime:
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        timestamp = timestamp.astimezone(timezone.utc)
+        timestamp = timestamp.replace(minute=0, second=0, microsecond=0)
+        if period == "day":
+            timestamp = timestamp.replace(hour=0)
+        return timestamp
+
+    def _ttl(self, period: str) -> timedelta:
+        if period == "hour":
+            return timedelta(seconds=self.rollups_config.hourTtl)
+        return timedelta(seconds=self.rollups_config.dayTtl)
+
+    def _duration_bucket(self, duration: float) -> str:
+        for bound in sorted(self.rollups_config.durationBuckets):
+            if duration <= bound:
+                return f"le_{bound}"
+        return "le_inf"
+
+    def _increments(self, report: dict) -> tuple[dict, Optional[float]]:
+        inc = {
+            "count": 1,
+            "noop": int(bool(report.get("noop"))),
+            "corrective_change": int(bool(report.get("corrective_change"))),
+        }
+        duration = None
+        for metric in report.get("metrics") or []:
+            value = metric.get("value")
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if metric.get("category") == "resources":
+                inc[f"resources.{metric.get('name')}"] = value
+            elif metric.get("category") == "time" and metric.get("name") == "total":
+                duration = float(value)
+        if duration is not None:
+            inc["duration.sum"] = duration
+            inc[f"duration.buckets.{self._duration_bucket(duration)}"] = 1
+        return inc, duration
+
+    async def record(
+        self,
+        timestamp: datetime,
+        environment: Optional[str],
+        report: dict,
+    ) -> None:
+        inc, duration = self._increments(report)
+        requests = list()
+        for period, length in PERIODS.items():
+            start = self._start(timestamp, period)
+            update = {
+                "$inc": inc,
+                "$set": {"expires": start + length + self._ttl(period)},
+            }
+            if duration is not None:
+                update["$min"] = {"duration.min": duration}
+                update["$max"] = {"duration.max": duration}
+            requests.append(
+                pymongo.UpdateOne(
+                    filter={
+                        "period": period,
+                        "start": start,
+                        "environment": environment,
+                        "status": report.get("status"),
+                    },
+                    update=update,
+                    upsert=True,
+                )
+            )
+        try:
+            await self.coll.bulk_write(requests, ordered=False)
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+
+    async def search(
+        self,
+        period: rollup_period_literal,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        environment: Optional[str] = None,
+        status: Optional[str] = None,
+        fields: Optional[list] = None,
+        sort: Optional[str] = None,
+        sort_order: Optional[sort_order_literal] = None,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> NodeReportRollupGetMulti:
+        query = {"period": period}
+        if start or end:
+            query["start"] = {}
+            if start:
+                query["start"]["$gte"] = start
+            if end:
+                query["start"]["$lt"] = end
+        self._filter_re(query, "environment", environment)
+        self._filter_re(query, "status", status)
+        result = await self._search(
+            query=query,
+            fields=fields,
+            sort=sort,
+            sort_order=sort_order,
+            page=page,
+            limit=limit,
+        )
+        return NodeReportRollupGetMulti(**result)
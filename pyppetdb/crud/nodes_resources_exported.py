@@ -0,0 +1,366 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+from datetime import datetime
+from datetime import timezone
+from typing import Optional
+
+import pymongo
+import pymongo.errors
+from cachetools import LRUCache
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from pyppetdb.config import Config
+from pyppetdb.crud.common import CrudMongo
+from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.crud.nodes import PuppetDBASTParser
+from pyppetdb.crud.nodes_resources_generations import CrudNodesResourcesGenerations
+from pyppetdb.model.nodes import NodeGetCatalogResource
+from pyppetdb.model.nodes import NodeGetCatalogResources
+
+RESOURCE_FIELDS = (
+    "environment",
+    "type",
+    "title",
+    "tags",
+    "parameters",
+    "exported",
+    "file",
+    "line",
+)
+
+
+class PuppetDBResourceASTParser(PuppetDBASTParser):
+    @staticmethod
+    def _map_field(field) -> Optional[str]:
+        if isinstance(field, str):
+            if field in ["type", "title", "file", "line", "exported", "environment"]:
+                return field
+            elif field == "tag":
+                return "tags"
+            elif field == "certname":
+                return "node_id"
+        elif isinstance(field, list) and len(field) == 2 and field[0] == "parameter":
+            return f"parameters.{field[1]}"
+        return None
+
+
+class CrudNodesResourcesExported(CrudMongo):
+    def __init__(
+        self,
+        config: Config,
+        log: logging.Logger,
+        coll: AsyncIOMotorCollection,
+        crud_nodes: CrudNodes,
+        crud_nodes_resources_generations: CrudNodesResourcesGenerations,
+    ):
+        super(CrudNodesResourcesExported, self).__init__(
+            config=config,
+            log=log,
+            coll=coll,
+        )
+        self._crud_nodes = crud_nodes
+        self._generations = crud_nodes_resources_generations
+        self._ast_parser = PuppetDBResourceASTParser()
+        self._results = None
+        if config.app.puppetdb.resourceQueryCacheSize > 0:
+            self._results = LRUCache(maxsize=config.app.puppetdb.resourceQueryCacheSize)
+        self._indices.extend(
+            [
+                pymongo.IndexModel(
+                    [
+                        ("node_id", pymongo.ASCENDING),
+                        ("type", pymongo.ASCENDING),
+                        ("title", pymongo.ASCENDING),
+                    ],
+                    unique=True,
+                    name="idx_node_id_type_title",
+                ),
+                pymongo.IndexModel(
+                    [
+                        ("type", pymongo.ASCENDING),
+                        ("title", pymongo.ASCENDING),
+                    ],
+                    name="idx_type_title",
+                ),
+                pymongo.IndexModel(
+                    [
+                        ("type", pymongo.ASCENDING),
+                        ("tags", pymongo.ASCENDING),
+                    ],
+                    name="idx_type_tags",
+                ),
+            ]
+        )
+
+    async def _create_index(self) -> None:
+        await super()._create_index()
+        await self._backfill()
+
+    async def _backfill(self) -> None:
+        if await self.coll.find_one(filter={}, projection={"_id": 1}):
+            return
+        self.log.info("backfilling exported resources from nodes")
+        cursor = self._crud_nodes.coll.find(
+            filter={"catalog.resources_exported.0": {"$exists": True}},
+            projection={
+                "id": 1,
+                "environment": 1,
+                "catalog.catalog_uuid": 1,
+                "catalog.resources_exported": 1,
+            },
+        )
+        async for node in cursor:
+            await self.replace(
+                node_id=node["id"],
+                environment=node.get("environment"),
+                catalog_uuid=node["catalog"].get("catalog_uuid"),
+                resources=node["catalog"]["resources_exported"],
+            )
+
+    def translate_resource_query(self, ast: list) -> Optional[dict]:
+        if self._ast_parser.references_facts(ast):
+            return None
+        return self._ast_parser.parse(ast)
+
+    @classmethod
+    def _normalize_ast(cls, ast):
+        if not isinstance(ast, list) or not ast:
+            return ast
+        items = [cls._normalize_ast(item) for item in ast[1:]]
+        if ast[0] in ("and", "or"):
+            items.sort(key=lambda item: json.dumps(item, sort_keys=True, default=str))
+        return [ast[0], *items]
+
+    @staticmethod
+    def _query_types(ast: list) -> Optional[set[str]]:
+        conditions = ast[1:] if ast and ast[0] == "and" else [ast]
+        for item in conditions:
+            if not isinstance(item, list) or len(item) != 3 or item[1] != "type":
+                continue
+            if item[0] == "=" and isinstance(item[2], str):
+                return {item[2]}
+            if (
+                item[0] == "in"
+                and isinstance(item[2], list)
+                and len(item[2]) == 2
+                and item[2][0] == "array"
+            ):
+                return set(item[2][1])
+        return None
+
+    async def query(self, ast: list) -> Optional[list]:
+        query = self.translate_resource_query(ast)
+        if query is None:
+            return None
+        if self._results is None:
+            return await self.query_exported_resources(query)
+        key = json.dumps(self._normalize_ast(ast), sort_keys=True, default=str)
+        generation = self._generations.get(self._query_types(ast))
+        cached = self._results.get(key)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        result = await self.query_exported_resources(query)
+        self._results[key] = (generation, result)
+        return result
+
+    async def replace(
+        self,
+        node_id: str,
+        environment: Optional[str],
+        catalog_uuid: Optional[str],
+        resources: list[dict],
+    ) -> None:
+        now = datetime.now(tz=timezone.utc)
+        current = dict()
+        for resource in resources:
+            current[(resource["type"], resource["title"])] = {
+                "environment": environment,
+                "type": resource["type"],
+                "title": resource["title"],
+                "tags": resource.get("tags", []),
+                "parameters": resource.get("parameters", {}),
+                "exported": resource.get("exported", True),
+                "file": resource.get("file"),
+                "line": resource.get("line"),
+            }
+        previous = dict()
+        cursor = self.coll.find(
+            filter={"node_id": node_id},
+            projection={"_id": 0, **{field: 1 for field in RESOURCE_FIELDS}},
+        )
+        async for doc in cursor:
+            previous[(doc["type"], doc["title"])] = doc
+        changed = {key[0] for key in previous.keys() ^ current.keys()}
+        for key in previous.keys() & current.keys():
+            if previous[key] != current[key]:
+                changed.add(key[0])
+        if not changed:
+            return
+
+        requests = list()
+        for (resource_type, title), resource in current.items():
+            requests.append(
+                pymongo.ReplaceOne(
+                    filter={
+                        "node_id": node_id,
+                        "type": resource_type,
+                        "title": title,
+                    },
+                    replacement={
+                        "node_id": node_id,
+                        "catalog_uuid": catalog_uuid,
+                        **resource,
+                        "updated": now,
+                    },
+                    upsert=True,
+                )
+            )
+        # delete exactly the resources that left the catalog, a catalog sent
+        # again with the same or without a uuid must still drop them
+        for resource_type, title in previous.keys() - current.keys():
+            requests.append(
+                pymongo.DeleteOne(
+                    filter={
+                        "node_id": node_id,
+                        "type": resource_type,
+                        "title": title,
+                    }
+                )
+            )
+        try:
+            await self._bulk_write_transactional(requests)
+        except pymongo.errors.PyMongoError as err:
+            self.log.error(f"failed to replace exported resources of {node_id}: {err}")
+        # bump even on failure, a partial write must not be served from cache
+        await self._generations.bump(changed)
+
+    async def _bulk_write_transactional(self, requests: list) -> None:
+        async def _write(session) -> None:
+            await self.coll.bulk_write(requests, ordered=True, session=session)
+
+        try:
+            async with await self.coll.database.client.start_session() as session:
+                await session.with_transaction(_write)
+        except (
+            pymongo.errors.OperationFailure,
+            pymongo.errors.ConfigurationError,
+        ) as e:
+            # transactions need a replica set, fall back on standalone servers
+            if isinstance(e, pymongo.errors.OperationFailure) and e.code != 20:
+                raise
+            self.log.debug(
+                f"Transactions not supported for {self.resource_type}, running without"
+            )
+            await self.coll.bulk_write(requests, ordered=True)
+
+    async def delete_all_from_node(self, node_id: str) -> None:
+        resource_types = await self.coll.distinct("type", {"node_id": node_id})
+        await self._delete_many(query={"node_id": node_id})
+        await self._generations.bump(resource_types)
+
+    async def query_exported_resources(self, query: dict) -> list:
+        self.log.debug(f"Executing exported resources query: {query}")
+        cursor = self.coll.find(
+            filter=query,
+            projection={
+                "_id": 0,
+                "node_id": 1,
+                "environment": 1,
+                "exported": 1,
+                "type": 1,
+                "title": 1,
+                "tags": 1,
+                "parameters": 1,
+                "file": 1,
+                "line": 1,
+            },
+        )
+        result = []
+        async for doc in cursor:
+            result.append({"certname": doc.pop("node_id"), **doc})
+        self.log.debug(f"Exported resources query result: {len(result)} resources")
+        return result
+
+    async def query_aggregate(self, query: dict, pipeline: list) -> list:
+        cursor = self.coll.aggregate(pipeline, allowDiskUse=True)
+        return await cursor.to_list(length=None)
+
+    async def query_distinct(self, field: str, query: dict) -> list:
+        return await self.coll.distinct(field, query)
+
+    async def count(self, query: dict) -> int:
+        return await self.coll.count_documents(query)
+
+    async def search(
+        self,
+        resource_type: str,
+        resource_title: Optional[str] = None,
+        resource_tags: Optional[list[str]] = None,
+        environment: Optional[str] = None,
+        user_node_groups: Optional[list[str]] = None,
+        disabled: Optional[bool] = None,
+        fact: Optional[set[str]] = None,
+    ) -> NodeGetCatalogResources:
+        query = {"type": resource_type}
+        self._filter_literal(query, "title", resource_title)
+        if resource_tags:
+            query["tags"] = {"$all": resource_tags}
+        self._filter_literal(query, "environment", environment)
+        node_query = {}
+        self._filter_list(node_query, "node_groups", user_node_groups)
+        self._filter_complex_search(
+            node_query, base_attribute="facts", complex_search=fact
+        )
+        self._filter_boolean(node_query, "disabled", disabled)
+        pipeline = [{"$match": query}]
+        if node_query:
+            # semi-join on the server instead of shipping every node id in $in
+            pipeline.extend(
+                [
+                    {
+                        "$lookup": {
+                            "from": self._crud_nodes.coll.name,
+                            "localField": "node_id",
+                            "foreignField": "id",
+                            "pipeline": [
+                                {"$match": node_query},
+                                {"$project": {"_id": 1}},
+                            ],
+                            "as": "node",
+                        }
+                    },
+                    {"$match": {"node": {"$ne": []}}},
+                ]
+            )
+        pipeline.append(
+            {
+                "$project": {
+                    "_id": 0,
+                    "exported": 1,
+                    "type": 1,
+                    "title": 1,
+                    "tags": 1,
+                    "parameters": 1,
+                }
+            }
+        )
+        result = list()
+        async for item in self.coll.aggregate(pipeline):
+            result.append(NodeGetCatalogResource(**item))
+        return NodeGetCatalogResources(
+            **{"result": result, "meta": {"result_size": len(result)}}
+        )
@@ -0,0 +1,167 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from typing import Iterable
+from typing import Optional
+
+import pymongo
+import pymongo.errors
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from pyppetdb.config import Config
+from pyppetdb.crud.common import CrudMongo
+from pyppetdb.errors import BackendError
+
+ALL_TYPES = "*"
+
+
+class CrudNodesResourcesGenerationsCache:
+    def __init__(self, log: logging.Logger, coll: AsyncIOMotorCollection):
+        self._coll = coll
+        self._log = log
+        self._cache: dict[str, int] = {}
+        self._initialized = False
+
+    @property
+    def cache(self) -> dict[str, int]:
+        return self._cache
+
+    @property
+    def coll(self):
+        return self._coll
+
+    @property
+    def log(self):
+        return self._log
+
+    def set(self, resource_type: str, generation: int) -> None:
+        if generation > self.cache.get(resource_type, 0):
+            self.cache[resource_type] = generation
+
+    async def _watch_changes(self):
+        try:
+            pipeline = [
+                {
+                    "$project": {
+                        "fullDocument.type": 1,
+                        "fullDocument.generation": 1,
+                        "operationType": 1,
+                    }
+                }
+            ]
+
+            async with self.coll.watch(
+                full_document="updateLookup",
+                pipeline=pipeline,
+            ) as change_stream:
+                self.log.info(
+                    "Change stream watcher started for nodes_resources_generations"
+                )
+                async for change in change_stream:
+                    await self._handle_change(change)
+
+        except pymongo.errors.PyMongoError as err:
+            self.log.error(f"Error in nodes_resources_generations change stream: {err}")
+        except Exception as err:
+            self.log.error(
+                f"Unexpected error in nodes_resources_generations change stream: {err}"
+            )
+
+        await asyncio.sleep(5)
+        asyncio.create_task(self._watch_changes())
+
+    async def _handle_change(self, change):
+        operation = change["operationType"]
+        if operation in ("insert", "replace", "update"):
+            doc = change.get("fullDocument")
+            if doc:
+                self.set(doc["type"], doc["generation"])
+        else:
+            self.log.warning(f"Unhandled operation type: {operation}")
+
+    async def _load_initial_data(self):
+        try:
+            cursor = self.coll.find({}, {"_id": 0, "type": 1, "generation": 1})
+            async for doc in cursor:
+                self.set(doc["type"], doc["generation"])
+            self.log.info(
+                f"Loaded {len(self.cache)} resource type generations into cache"
+            )
+        except pymongo.errors.PyMongoError as err:
+            self.log.error(f"Error loading initial data: {err}")
+            raise
+
+    async def run(self):
+        if self._initialized:
+            return
+        asyncio.create_task(self._watch_changes())
+        await self._load_initial_data()
+        self._initialized = True
+        self.log.info("NodesResourcesGenerationsCache initialized successfully")
+
+
+class CrudNodesResourcesGenerations(CrudMongo):
+    def __init__(
+        self,
+        config: Config,
+        log: logging.Logger,
+        coll: AsyncIOMotorCollection,
+    ):
+        super(CrudNodesResourcesGenerations, self).__init__(
+            config=config,
+            log=log,
+            coll=coll,
+        )
+        self._cache = CrudNodesResourcesGenerationsCache(log=log, coll=coll)
+        self._indices.append(
+            pymongo.IndexModel(
+                [("type", pymongo.ASCENDING)], unique=True, name="idx_type"
+            )
+        )
+
+    @property
+    def cache(self):
+        return self._cache
+
+    async def _create_index(self) -> None:
+        await super()._create_index()
+        await self.cache.run()
+
+    def get(self, resource_types: Optional[Iterable[str]]) -> tuple:
+        if resource_types is None:
+            resource_types = [ALL_TYPES]
+        return tuple(
+            (resource_type, self.cache.cache.get(resource_type, 0))
+            for resource_type in sorted(resource_types)
+        )
+
+    async def bump(self, resource_types: Iterable[str]) -> None:
+        resource_types = set(resource_types)
+        if not resource_types:
+            return
+        resource_types.add(ALL_TYPES)
+        try:
+            for resource_type in sorted(resource_types):
+                result = await self.coll.find_one_and_update(
+                    filter={"type": resource_type},
+                    update={"$inc": {"generation": 1}},
+                    upsert=True,
+                    return_document=pymongo.ReturnDocument.AFTER,
+                )
+                self.cache.set(resource_type, result["generation"])
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
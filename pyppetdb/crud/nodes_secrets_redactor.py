@@ -13,13 +13,20 @@
 # limitations under the License.
 
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from datetime import timezone
 import hashlib
+from itertools import islice
 import logging
+import multiprocessing
+import os
+from typing import Any
 from typing import Optional
 
 import ahocorasick
+from cachetools import LRUCache
 from motor.motor_asyncio import AsyncIOMotorCollection
 import pymongo
 import pymongo.errors
@@ -32,19 +39,49 @@ from pyppetdb.model.nodes_secrets_redactor import NodesSecretsRedactorGet
 from pyppetdb.model.nodes_secrets_redactor import NodesSecretsRedactorGetMulti
 from pyppetdb.model.nodes_secrets_redactor import NodesSecretsRedactorPost
 
+_NOT_CACHED = object()
+
 
 class NodesSecretsRedactor:
-    def __init__(self, log: logging.Logger, protector: NodesDataProtector):
+    def __init__(
+        self,
+        log: logging.Logger,
+        protector: NodesDataProtector,
+        cache_size: int = 100000,
+        cache_max_length: int = 1024,
+    ):
         self.log = log
         self._protector = protector
 
         self._automaton = ahocorasick.Automaton()
+        self._secrets: frozenset[str] = frozenset()
         self._secrets_count = 0
+        self._min_length = 0
+        self._generation = 0
+        self._memo: Optional[LRUCache] = None
+        self._memo_max_length = cache_max_length
+        if cache_size > 0:
+            self._memo = LRUCache(maxsize=cache_size)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
 
     @property
     def protector(self) -> NodesDataProtector:
         return self._protector
 
+    @property
+    def secrets(self) -> frozenset[str]:
+        return self._secrets
+
+    def _bump_generation(self):
+        # memoized results are only valid for the secret set they were
+        # computed with
+        self._generation += 1
+        if self._memo is not None:
+            self._memo.clear()
+
     def encrypt(self, cleartext: str) -> str:
         return self.protector.encrypt_string(cleartext)
 
@@ -52,34 +89,56 @@ class NodesSecretsRedactor:
         return self.protector.decrypt_string(ciphertext)
 
     def add_secret(self, secret: str):
-        if not secret:
+        if not secret or secret in self._secrets:
             return
 
-        self._automaton.add_word(secret, len(secret))
-        self._automaton.make_automaton()
-        self._secrets_count += 1
-        self.log.info(f"Secret added to automaton. Total: {self._secrets_count}")
+        self.rebuild([*self._secrets, secret])
 
-    def rebuild(self, cleartext_secrets: list[str]):
-        new_automaton = ahocorasick.Automaton()
-        count = 0
-        unique_secrets = {s for s in cleartext_secrets if s}
+    @staticmethod
+    def _build(
+        cleartext_secrets: list[str],
+    ) -> tuple[ahocorasick.Automaton, frozenset[str]]:
+        automaton = ahocorasick.Automaton()
+        unique_secrets = frozenset(s for s in cleartext_secrets if s)
 
         for secret in unique_secrets:
-            new_automaton.add_word(secret, len(secret))
-            count += 1
+            automaton.add_word(secret, len(secret))
+
+        if unique_secrets:
+            automaton.make_automaton()
+        return automaton, unique_secrets
+
+    def _swap(self, automaton: ahocorasick.Automaton, secrets: frozenset[str]):
+        # runs on the event loop only, redaction never sees a partly built automaton
+        self._automaton = automaton
+        self._secrets = secrets
+        self._secrets_count = len(secrets)
+        self._min_length = min((len(s) for s in secrets), default=0)
+        self._bump_generation()
+        self.log.info(f"Aho-Corasick automaton rebuilt with {len(secrets)} secrets")
 
-        if count > 0:
-            new_automaton.make_automaton()
+    def rebuild(self, cleartext_secrets: list[str]):
+        self._swap(*self._build(cleartext_secrets))
 
-        self._automaton = new_automaton
-        self._secrets_count = count
-        self.log.info(f"Aho-Corasick automaton rebuilt with {count} secrets")
+    async def rebuild_async(self, cleartext_secrets: list[str]):
+        built = await asyncio.to_thread(self._build, list(cleartext_secrets))
+        self._swap(*built)
 
     def _redact_string(self, text: str) -> str:
-        if not text or self._secrets_count == 0:
+        if not text or self._secrets_count == 0 or len(text) < self._min_length:
             return text
 
+        if self._memo is None or len(text) > self._memo_max_length:
+            return self._scan(text)
+        # clean strings are memoized as None, so the caller always gets its
+        # own object back and can tell by identity that nothing changed
+        result = self._memo.get(text, _NOT_CACHED)
+        if result is _NOT_CACHED:
+            result = self._scan(text)
+            self._memo[text] = None if result is text else result
+        return text if result is None else result
+
+    def _scan(self, text: str) -> str:
         matches = []
         for end_index, length in self._automaton.iter(text):
             start_index = end_index - length + 1
@@ -109,25 +168,153 @@ class NodesSecretsRedactor:
 
         return "".join(result)
 
-    def redact(self, data: dict | list | str | tuple) -> dict | list | str | tuple:
-        if self._secrets_count == 0:
+    def _redact_dict(self, data: dict) -> dict:
+        result = None
+        for idx, (key, value) in enumerate(data.items()):
+            new_key = self._redact_string(key) if isinstance(key, str) else key
+            new_value = self._redact_value(value)
+            if result is None:
+                if new_key is key and new_value is value:
+                    continue
+                result = dict(islice(data.items(), idx))
+            result[new_key] = new_value
+        return data if result is None else result
+
+    def _redact_sequence(self, data: list | tuple) -> list | tuple:
+        result = None
+        for idx, value in enumerate(data):
+            new_value = self._redact_value(value)
+            if result is None:
+                if new_value is value:
+                    continue
+                result = list(data[:idx])
+            result.append(new_value)
+        if result is None:
             return data
+        return tuple(result) if isinstance(data, tuple) else result
 
+    def _redact_value(self, data):
         if isinstance(data, str):
             return self._redact_string(data)
-
         elif isinstance(data, dict):
-            return {
-                self._redact_string(str(k)): self.redact(v) for k, v in data.items()
-            }
+            return self._redact_dict(data)
+        elif isinstance(data, (list, tuple)):
+            return self._redact_sequence(data)
+        return data
 
-        elif isinstance(data, list):
-            return [self.redact(item) for item in data]
+    def redact(self, data: dict | list | str | tuple) -> dict | list | str | tuple:
+        # copy on write: containers are only copied along the path to a
+        # redacted leaf, a document without secrets is returned as is
+        if self._secrets_count == 0:
+            return data
+        return self._redact_value(data)
+
+
+_pool_redactor: Optional[NodesSecretsRedactor] = None
+_pool_generation: Optional[int] = None
+
+
+def _pool_init(cache_size: int, cache_max_length: int):
+    global _pool_redactor
+    _pool_redactor = NodesSecretsRedactor(
+        log=logging.getLogger("pyppetdb.redactor"),
+        protector=None,
+        cache_size=cache_size,
+        cache_max_length=cache_max_length,
+    )
+
+
+def _pool_redact(
+    redact_cls: type,
+    generation: int,
+    secrets: Optional[frozenset[str]],
+    data: Any,
+) -> tuple[int, bool, Any]:
+    # each worker holds its own automaton, it is rebuilt the first time a
+    # worker sees a task for a newer generation of the secret set. the pid
+    # tells the pool which workers are known to be up to date
+    global _pool_generation
+    if _pool_generation != generation:
+        if secrets is None:
+            return os.getpid(), False, None
+        _pool_redactor.rebuild(list(secrets))
+        _pool_generation = generation
+    redactor = redact_cls(log=_pool_redactor.log, redactor=_pool_redactor)
+    return os.getpid(), True, redactor.redact(data)
+
+
+class NodesSecretsRedactorPool:
+    def __init__(
+        self,
+        log: logging.Logger,
+        redactor: NodesSecretsRedactor,
+        processes: int,
+        cache_size: int = 100000,
+        cache_max_length: int = 1024,
+    ):
+        self.log = log
+        self._redactor = redactor
+        self._processes = processes
+        self._cache_size = cache_size
+        self._cache_max_length = cache_max_length
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._synced_generation: Optional[int] = None
+        self._synced_workers: set[int] = set()
 
-        elif isinstance(data, tuple):
-            return tuple(self.redact(item) for item in data)
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self.log.info(f"starting {self._processes} redaction worker processes")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_pool_init,
+                initargs=(self._cache_size, self._cache_max_length),
+            )
+        return self._executor
 
-        return data
+    async def redact(self, redact_cls: type, data: Any) -> Any:
+        generation = self._redactor.generation
+        secrets = self._redactor.secrets
+        if not secrets:
+            return data
+        if self._synced_generation != generation:
+            self._synced_generation = generation
+            self._synced_workers = set()
+        # the secrets travel with every task until each worker has reported
+        # the current generation, so a stale worker rebuilds on its first task
+        # instead of bouncing the payload back
+        shipped = secrets if len(self._synced_workers) < self._processes else None
+        loop = asyncio.get_running_loop()
+        try:
+            pid, done, result = await loop.run_in_executor(
+                self.executor, _pool_redact, redact_cls, generation, shipped, data
+            )
+            if not done:
+                # a replaced worker, only possible once the pool counted as synced
+                self._synced_workers.discard(pid)
+                pid, done, result = await loop.run_in_executor(
+                    self.executor,
+                    _pool_redact,
+                    redact_cls,
+                    generation,
+                    secrets,
+                    data,
+                )
+            if self._synced_generation == generation:
+                self._synced_workers.add(pid)
+        except BrokenProcessPool as err:
+            # a worker died, the next call starts a fresh pool
+            self.log.error(f"redaction worker pool broken, redacting inline: {err}")
+            self.close()
+            return redact_cls(log=self.log, redactor=self._redactor).redact(data)
+        return result
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._synced_workers = set()
 
 
 class CrudNodesSecretsRedactorCache:
@@ -136,12 +323,17 @@ class CrudNodesSecretsRedactorCache:
         log: logging.Logger,
         coll: AsyncIOMotorCollection,
         redactor: NodesSecretsRedactor,
+        rebuild_delay: float = 1.0,
     ):
         self._coll = coll
         self._log = log
         self._redactor = redactor
         self._cache: dict[str, str] = {}
         self._initialized = False
+        self._rebuild_delay = rebuild_delay
+        self._rebuild_pending = False
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._rebuild_lock = asyncio.Lock()
 
     @property
     def coll(self):
@@ -194,8 +386,7 @@ class CrudNodesSecretsRedactorCache:
                 try:
                     clear = self._redactor.decrypt(doc["value_encrypted"])
                     self._cache[doc_id] = clear
-                    # Optimize: Just add the new word to the automaton
-                    self._redactor.add_secret(clear)
+                    self._schedule_rebuild()
                 except Exception:
                     self.log.error(
                         f"Failed to decrypt secret in change stream: {doc_id}"
@@ -205,12 +396,36 @@ class CrudNodesSecretsRedactorCache:
 
         elif operation == "delete":
             self._cache.pop(doc_id, None)
-            # Must rebuild because we can't remove words from ahocorasick automaton easily
-            self._redactor.rebuild(list(self._cache.values()))
+            self._schedule_rebuild()
 
         else:
             self.log.warning(f"Unhandled operation type: {operation}")
 
+    def _schedule_rebuild(self):
+        # change events are collected for rebuild_delay seconds and applied
+        # with a single rebuild
+        self._rebuild_pending = True
+        if self._rebuild_task is None:
+            self._rebuild_task = asyncio.create_task(self._rebuild_worker())
+
+    async def _rebuild_worker(self):
+        try:
+            while self._rebuild_pending:
+                await asyncio.sleep(self._rebuild_delay)
+                self._rebuild_pending = False
+                await self._rebuild()
+        except Exception as err:
+            self.log.error(f"Failed to rebuild secrets automaton: {err}")
+        finally:
+            self._rebuild_task = None
+
+    async def _rebuild(self):
+        # the initial load and change events rebuild independently, the cache
+        # is snapshotted under the lock so an older snapshot can never be
+        # swapped in after a newer one
+        async with self._rebuild_lock:
+            await self._redactor.rebuild_async(list(self._cache.values()))
+
     async def _load_initial_data(self):
         try:
             cursor = self.coll.find({}, {"id": 1, "_id": 1, "value_encrypted": 1})
@@ -224,7 +439,7 @@ class CrudNodesSecretsRedactorCache:
                         f"Failed to decrypt secret during initial load: {doc_id}"
                     )
 
-            self._redactor.rebuild(list(self._cache.values()))
+            await self._rebuild()
             self.log.info(
                 f"Loaded {len(self._cache)} initial secrets into redaction cache"
             )
@@ -256,7 +471,10 @@ class CrudNodesSecretsRedactor(CrudMongo):
         )
         self._redactor = redactor
         self._cache = CrudNodesSecretsRedactorCache(
-            log=log, coll=coll, redactor=redactor
+            log=log,
+            coll=coll,
+            redactor=redactor,
+            rebuild_delay=config.app.main.redaction.rebuildDelay,
         )
         self._indices.append(
             pymongo.IndexModel([("id", pymongo.ASCENDING)], unique=True, name="idx_id")
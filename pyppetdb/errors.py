@@ -96,11 +96,21 @@ class QueryParamValidationError(HTTPException):
         super(QueryParamValidationError, self).__init__(status_code=422, detail=msg)
 
 
+class InvalidQuery(HTTPException):
+    def __init__(self, msg="Invalid query"):
+        super(InvalidQuery, self).__init__(status_code=400, detail=msg)
+
+
 class ResourceInUse(HTTPException):
     def __init__(self, msg="Resource is still in use"):
         super(ResourceInUse, self).__init__(status_code=409, detail=msg)
 
 
+class FeatureUnavailable(HTTPException):
+    def __init__(self, msg="Feature not available"):
+        super(FeatureUnavailable, self).__init__(status_code=501, detail=msg)
+
+
 class MissingSecretReference(Exception):
     def __init__(self, secret_id: str):
         self.secret_id = secret_id
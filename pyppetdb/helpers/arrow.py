@@ -0,0 +1,226 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import json
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import Literal
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from pyppetdb.errors import FeatureUnavailable
+from pyppetdb.errors import QueryParamValidationError
+from pyppetdb.helpers.ndjson import json_default
+
+ARROW_BATCH_SIZE = 10000
+
+arrow_format_literal = Literal["arrow", "parquet"]
+
+ARROW_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+ARROW_COLUMN_TYPES = ("str", "int", "float", "bool")
+
+ARROW_FIXED_COLUMNS = ("id", "environment")
+
+
+def arrow_required() -> None:
+    if pyarrow is None:
+        raise FeatureUnavailable("columnar export requires the pyarrow package")
+
+
+def arrow_columns(specs: list[str]) -> list[tuple[str, str]]:
+    columns = []
+    seen = set(ARROW_FIXED_COLUMNS)
+    for spec in specs:
+        path, _, column_type = spec.partition(":")
+        column_type = column_type or "str"
+        if column_type not in ARROW_COLUMN_TYPES:
+            raise QueryParamValidationError(f"invalid column type: {spec}")
+        if not path or "$" in path or "" in path.split("."):
+            raise QueryParamValidationError(f"invalid fact path: {spec}")
+        if path in seen:
+            raise QueryParamValidationError(f"duplicate column: {path}")
+        seen.add(path)
+        columns.append((path, column_type))
+    return columns
+
+
+def _to_str(value: Any) -> Any:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=json_default, separators=(",", ":"))
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _to_int(value: Any) -> Any:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _to_float(value: Any) -> Any:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _to_bool(value: Any) -> Any:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    return None
+
+
+CONVERTERS: dict[str, Callable[[Any], Any]] = {
+    "str": _to_str,
+    "int": _to_int,
+    "float": _to_float,
+    "bool": _to_bool,
+}
+
+
+def _lookup(facts: Any, path: str) -> Any:
+    for key in path.split("."):
+        if not isinstance(facts, dict):
+            return None
+        facts = facts.get(key)
+    return facts
+
+
+def arrow_schema(columns: list[tuple[str, str]]):
+    types = {
+        "str": pyarrow.string(),
+        "int": pyarrow.int64(),
+        "float": pyarrow.float64(),
+        "bool": pyarrow.bool_(),
+    }
+    fields = [pyarrow.field(name, pyarrow.string()) for name in ARROW_FIXED_COLUMNS]
+    fields.extend(pyarrow.field(path, types[kind]) for path, kind in columns)
+    return pyarrow.schema(fields)
+
+
+def arrow_batch(schema, columns: list[tuple[str, str]], docs: list[dict]):
+    arrays = [
+        pyarrow.array([doc.get(name) for doc in docs], type=pyarrow.string())
+        for name in ARROW_FIXED_COLUMNS
+    ]
+    types = schema.types[len(ARROW_FIXED_COLUMNS) :]
+    for (path, kind), column_type in zip(columns, types):
+        convert = CONVERTERS[kind]
+        arrays.append(
+            pyarrow.array(
+                [convert(_lookup(doc.get("facts"), path)) for doc in docs],
+                type=column_type,
+            )
+        )
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ChunkSink:
+    def __init__(self):
+        self.buffer = bytearray()
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.buffer += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        chunk = bytes(self.buffer)
+        self.buffer.clear()
+        return chunk
+
+
+def _write_batch(writer, sink: _ChunkSink, schema, columns, docs: list[dict]) -> bytes:
+    writer.write_batch(arrow_batch(schema, columns, docs))
+    return sink.drain()
+
+
+def _close(writer, sink: _ChunkSink) -> bytes:
+    writer.close()
+    return sink.drain()
+
+
+async def arrow_stream(
+    docs: AsyncIterator[dict],
+    columns: list[tuple[str, str]],
+    export_format: arrow_format_literal,
+    batch_size: int = ARROW_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    arrow_required()
+    schema = arrow_schema(columns)
+    sink = _ChunkSink()
+    output = pyarrow.PythonFile(sink, mode="w")
+    if export_format == "parquet":
+        writer = pyarrow.parquet.ParquetWriter(output, schema, compression="zstd")
+    else:
+        writer = pyarrow.ipc.new_stream(output, schema)
+
+    # building the columns and encoding them is CPU bound, it runs in a
+    # thread so the event loop keeps serving requests during large exports
+    batch = []
+    async for doc in docs:
+        batch.append(doc)
+        if len(batch) < batch_size:
+            continue
+        chunk = await asyncio.to_thread(
+            _write_batch, writer, sink, schema, columns, batch
+        )
+        batch = []
+        if chunk:
+            yield chunk
+    if batch:
+        chunk = await asyncio.to_thread(
+            _write_batch, writer, sink, schema, columns, batch
+        )
+        if chunk:
+            yield chunk
+    chunk = await asyncio.to_thread(_close, writer, sink)
+    if chunk:
+        yield chunk
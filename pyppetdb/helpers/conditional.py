@@ -0,0 +1,89 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+
+from starlette.datastructures import Headers
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+
+def etag(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, value: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return value in tags or value[2:] in tags
+
+
+class ConditionalGetMiddleware:
+    def __init__(self, app: ASGIApp, prefixes: tuple[str, ...] = ("/api/",)) -> None:
+        self.app = app
+        self.prefixes = prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not scope["path"].startswith(self.prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start: Message = {}
+        started = False
+
+        async def send_with_etag(message: Message) -> None:
+            nonlocal start, started
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if started or message["type"] != "http.response.body":
+                if not started:
+                    started = True
+                    await send(start)
+                await send(message)
+                return
+            started = True
+            headers = MutableHeaders(raw=start["headers"])
+            if (
+                start["status"] != 200
+                or message.get("more_body", False)
+                or "etag" in headers
+            ):
+                await send(start)
+                await send(message)
+                return
+            value = etag(message.get("body", b""))
+            headers["ETag"] = value
+            if if_none_match and etag_matches(if_none_match, value):
+                for header in ("content-length", "content-type"):
+                    if header in headers:
+                        del headers[header]
+                start["status"] = 304
+                await send(start)
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,55 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any
+
+
+def _escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def json_patch_diff(old: dict, new: dict, path: str = "") -> list[dict]:
+    ops = []
+    for key in sorted(old.keys() - new.keys()):
+        ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+    for key, value in new.items():
+        pointer = f"{path}/{_escape(key)}"
+        if key not in old:
+            ops.append({"op": "add", "path": pointer, "value": value})
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            ops.extend(json_patch_diff(old[key], value, pointer))
+        elif type(old[key]) is not type(value) or old[key] != value:
+            ops.append({"op": "replace", "path": pointer, "value": value})
+    return ops
+
+
+def json_patch_apply(doc: dict, ops: list[dict]) -> dict:
+    for op in ops:
+        *parents, last = [_unescape(token) for token in op["path"].split("/")[1:]]
+        target: Any = doc
+        for token in parents:
+            target = target.setdefault(token, {})
+        if op["op"] == "remove":
+            target.pop(last, None)
+        else:
+            target[last] = op["value"]
+    return doc
+
+
+def json_pointer(path: str) -> str:
+    return "".join(f"/{_escape(key)}" for key in path.split("."))
@@ -0,0 +1,63 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from datetime import date
+from datetime import datetime
+import json
+from typing import Any
+from typing import AsyncIterator
+import zlib
+
+from bson.objectid import ObjectId
+
+NDJSON_CHUNK_SIZE = 64 * 1024
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode(errors="replace")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def ndjson_line(doc: Any) -> bytes:
+    return (
+        json.dumps(doc, default=json_default, separators=(",", ":")).encode() + b"\n"
+    )
+
+
+async def ndjson_stream(
+    docs: AsyncIterator[Any],
+    compress: bool = False,
+    chunk_size: int = NDJSON_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = bytearray()
+    async for doc in docs:
+        buffer += ndjson_line(doc)
+        if len(buffer) < chunk_size:
+            continue
+        chunk = bytes(buffer)
+        buffer.clear()
+        if compressor:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            yield chunk
+    chunk = bytes(buffer)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
@@ -43,6 +43,7 @@ import httpx
 from fastapi import FastAPI
 from motor.motor_asyncio import AsyncIOMotorClient
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from starlette.middleware.gzip import GZipMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 import uvicorn
 import structlog
@@ -60,6 +61,7 @@ from pyppetdb.crud.oauth import CrudOAuthGitHub
 from pyppetdb.container import AppContainer
 from pyppetdb.errors import ResourceNotFound
 from pyppetdb.errors import DuplicateResource
+from pyppetdb.helpers.conditional import ConditionalGetMiddleware
 from pyppetdb.model.users import UserPost
 from pyppetdb.model.ca_spaces import CASpacePost
 from pyppetdb.model.ca_spaces import CASpacePutInternal
@@ -134,10 +136,18 @@ async def lifespan(app: FastAPI):
         crud_nodes=container.crud_nodes,
         crud_nodes_catalog_cache=container.crud_nodes_catalog_cache,
         crud_nodes_catalogs=container.crud_nodes_catalogs,
+        crud_nodes_placement_migrations=container.crud_nodes_placement_migrations,
         crud_nodes_groups=container.crud_nodes_groups,
+        crud_nodes_groups_reevaluations=container.crud_nodes_groups_reevaluations,
         crud_nodes_reports=container.crud_nodes_reports,
+        crud_nodes_reports_rollups=container.crud_nodes_reports_rollups,
         crud_nodes_secrets_redactor=container.crud_nodes_secrets_redactor,
         crud_pyppetdb_nodes=container.crud_pyppetdb_nodes,
+        crud_nodes_resources_exported=container.crud_nodes_resources_exported,
+        crud_nodes_facts_histogram=container.crud_nodes_facts_histogram,
+        crud_nodes_facts_keys=container.crud_nodes_facts_keys,
+        crud_nodes_facts_history=container.crud_nodes_facts_history,
+        crud_nodes_facts_queries=container.crud_nodes_facts_queries,
         crud_teams=container.crud_teams,
         crud_users=container.crud_users,
         crud_users_credentials=container.crud_users_credentials,
@@ -151,6 +161,7 @@ async def lifespan(app: FastAPI):
         config=settings,
         pyhiera=container.pyhiera,
         redactor=container.nodes_secrets_redactor,
+        pql_engine=container.pql_engine,
         ws_hub=container.ws_hub,
     )
 
@@ -177,6 +188,38 @@ async def lifespan(app: FastAPI):
         coro=container.ws_hub.run(),
         name="ws-hub-background",
     )
+    index_advisor_task = None
+    if settings.app.main.facts.indexAdvisor.enable:
+        index_advisor_task = asyncio.create_task(
+            coro=container.crud_nodes_facts_queries.index_advisor_worker(),
+            name="nodes-facts-index-advisor",
+        )
+    facts_histogram_task = None
+    if settings.app.main.facts.histogram:
+        facts_histogram_task = asyncio.create_task(
+            coro=container.crud_nodes_facts_histogram.rebuild_worker(),
+            name="nodes-facts-histogram-rebuild",
+        )
+    facts_keys_task = None
+    if settings.app.main.facts.keys.enable:
+        facts_keys_task = asyncio.create_task(
+            coro=container.crud_nodes_facts_keys.rebuild_worker(),
+            name="nodes-facts-keys-rebuild",
+        )
+    nodes_groups_reevaluation_task = asyncio.create_task(
+        coro=container.crud_nodes_groups_reevaluations.worker(),
+        name="nodes-groups-reevaluation",
+    )
+    nodes_placement_migration_task = asyncio.create_task(
+        coro=container.crud_nodes_placement_migrations.worker(),
+        name="nodes-placement-migration",
+    )
+    reports_bucket_task = None
+    if settings.app.main.storeHistory.reportsBucket:
+        reports_bucket_task = asyncio.create_task(
+            coro=container.crud_nodes_reports.bucket_retention_worker(),
+            name="nodes-reports-bucket-retention",
+        )
     if settings.ca.enableCrlRefresh:
         refresh_task = asyncio.create_task(
             coro=container.ca_service.crl_refresh_worker(),
@@ -189,8 +232,18 @@ async def lifespan(app: FastAPI):
     expire_jobs_task.cancel()
     container.ws_hub.stop()
     ws_hub_task.cancel()
+    nodes_groups_reevaluation_task.cancel()
+    nodes_placement_migration_task.cancel()
     if refresh_task:
         refresh_task.cancel()
+    if index_advisor_task:
+        index_advisor_task.cancel()
+    if facts_histogram_task:
+        facts_histogram_task.cancel()
+    if facts_keys_task:
+        facts_keys_task.cancel()
+    if reports_bucket_task:
+        reports_bucket_task.cancel()
 
     await container.close()
 
@@ -574,6 +627,14 @@ app.add_middleware(
     secret_key=settings.app.secretkey,
     max_age=3600,
 )
+if settings.app.main.http.etag:
+    app.add_middleware(middleware_class=ConditionalGetMiddleware)
+if settings.app.main.http.compress:
+    app.add_middleware(
+        middleware_class=GZipMiddleware,
+        minimum_size=settings.app.main.http.compressMinSize,
+        compresslevel=settings.app.main.http.compressLevel,
+    )
 
 
 @app.middleware("http")
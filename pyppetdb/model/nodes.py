@@ -29,6 +29,7 @@ from pyppetdb.model.common import MetaMulti
 filter_literal = Literal[
     "id",
     "catalog_cached",
+    "catalog_cache_expires_at",
     "catalog.catalog_uuid",
     "catalog.num_resources",
     "catalog.num_resources_exported",
@@ -56,8 +57,16 @@ filter_literal = Literal[
 
 filter_list = set(typing_get_args(filter_literal))
 
+export_kind_literal = Literal[
+    "nodes",
+    "facts",
+    "reports",
+    "catalogs",
+]
+
 sort_literal = Literal[
     "id",
+    "catalog_cache_expires_at",
     "change_catalog",
     "change_facts",
     "change_last",
@@ -159,6 +168,7 @@ class NodeGet(BaseModel):
     id: Optional[StrictStr] = None
     catalog: NodeGetCatalog = None
     catalog_cached: Optional[bool] = None
+    catalog_cache_expires_at: Optional[datetime] = None
     change_catalog: Optional[datetime] = None
     change_facts: Optional[datetime] = None
     change_last: Optional[datetime] = None
@@ -185,6 +195,12 @@ class NodeGetMulti(BaseModel):
     meta: NodeGetMultiMeta
 
 
+class NodeGetGroupBy(BaseModel):
+    columns: List[str]
+    rows: List[List[Any]]
+    meta: MetaMulti
+
+
 class NodePut(BaseModel):
     disabled: Optional[bool] = False
     facts_inject: Optional[Dict[str, str]] = None
@@ -213,3 +229,40 @@ class NodeDistinctFactValue(BaseModel):
 class NodeGetDistinctFactValues(BaseModel):
     result: List[NodeDistinctFactValue]
     meta: MetaMulti
+
+
+fact_key_type_literal = Literal[
+    "bool",
+    "dict",
+    "float",
+    "int",
+    "list",
+    "null",
+    "str",
+]
+
+fact_key_filter_literal = Literal[
+    "path",
+    "type",
+    "count",
+    "samples",
+]
+
+fact_key_filter_list = set(typing_get_args(fact_key_filter_literal))
+
+fact_key_sort_literal = Literal[
+    "path",
+    "count",
+]
+
+
+class NodeFactKey(BaseModel):
+    path: Optional[str] = None
+    type: Optional[str] = None
+    count: Optional[int] = None
+    samples: Optional[List[Union[str, int, float, bool]]] = None
+
+
+class NodeGetFactKeys(BaseModel):
+    result: List[NodeFactKey]
+    meta: MetaMulti
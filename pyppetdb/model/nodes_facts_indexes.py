@@ -0,0 +1,43 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime
+from typing import List
+from typing import Literal
+from typing import Optional
+from pydantic import BaseModel
+
+from pyppetdb.model.common import MetaMulti
+
+suggestion_literal = Literal[
+    "create",
+    "drop",
+]
+
+
+class NodesFactsIndexGet(BaseModel):
+    fact: str
+    operators: List[str] = []
+    count: int = 0
+    duration_ms_avg: float = 0.0
+    duration_ms_max: float = 0.0
+    last_seen: Optional[datetime] = None
+    indexed: bool = False
+    managed: bool = False
+    suggestion: Optional[suggestion_literal] = None
+
+
+class NodesFactsIndexGetMulti(BaseModel):
+    result: List[NodesFactsIndexGet]
+    meta: MetaMulti
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from datetime import datetime
 from typing import get_args as typing_get_args
 from typing import List
 from typing import Literal
@@ -62,4 +63,23 @@ class NodeGroupUpdate(BaseModel):
 class NodeGroupUpdateInternal(BaseModel):
     filters: Optional[List[NodeGroupFilterRule]] = None
     teams: Optional[List[StrictStr]] = None
-    nodes: Optional[List[StrictStr]] = None
+
+
+reevaluation_status_literal = Literal[
+    "pending",
+    "running",
+    "done",
+]
+
+
+class NodeGroupReevaluationGet(BaseModel):
+    id: Optional[StrictStr] = None
+    status: Optional[reevaluation_status_literal] = None
+    total: Optional[int] = None
+    processed: Optional[int] = None
+    added: Optional[int] = None
+    removed: Optional[int] = None
+    last_node_id: Optional[StrictStr] = None
+    requested: Optional[datetime] = None
+    started: Optional[datetime] = None
+    finished: Optional[datetime] = None
@@ -0,0 +1,62 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime
+from typing import get_args as typing_get_args
+from typing import Dict
+from typing import List
+from typing import Literal
+from typing import Optional
+
+from pydantic import BaseModel
+from pydantic import StrictStr
+
+from pyppetdb.model.common import MetaMulti
+
+migration_filter_literal = Literal[
+    "id",
+    "status",
+    "placement",
+    "placements_old",
+    "migrated",
+    "requested",
+    "started",
+    "finished",
+]
+
+migration_filter_list = set(typing_get_args(migration_filter_literal))
+
+migration_sort_literal = Literal["id", "requested"]
+
+migration_status_literal = Literal[
+    "pending",
+    "running",
+    "done",
+]
+
+
+class NodePlacementMigrationGet(BaseModel):
+    id: Optional[StrictStr] = None
+    status: Optional[migration_status_literal] = None
+    placement: Optional[Dict[str, str]] = None
+    placements_old: Optional[List[Dict[str, str]]] = None
+    migrated: Optional[Dict[str, int]] = None
+    requested: Optional[datetime] = None
+    started: Optional[datetime] = None
+    finished: Optional[datetime] = None
+
+
+class NodePlacementMigrationGetMulti(BaseModel):
+    result: List[NodePlacementMigrationGet]
+    meta: MetaMulti
@@ -52,3 +52,46 @@ class NodeReportGetMulti(BaseModel):
 class NodeReportPostInternal(BaseModel):
     placement: Optional[Dict[str, str]] = None
     report: Optional[NodeGetReport] = None
+
+
+rollup_period_literal = Literal["hour", "day"]
+
+rollup_filter_literal = Literal[
+    "period",
+    "start",
+    "environment",
+    "status",
+    "count",
+    "noop",
+    "corrective_change",
+    "duration",
+    "resources",
+]
+
+rollup_filter_list = set(typing_get_args(rollup_filter_literal))
+
+rollup_sort_literal = Literal["start", "environment", "status"]
+
+
+class NodeReportRollupDuration(BaseModel):
+    sum: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    buckets: Optional[Dict[str, int]] = None
+
+
+class NodeReportRollupGet(BaseModel):
+    period: Optional[rollup_period_literal] = None
+    start: Optional[datetime] = None
+    environment: Optional[StrictStr] = None
+    status: Optional[StrictStr] = None
+    count: Optional[int] = None
+    noop: Optional[int] = None
+    corrective_change: Optional[int] = None
+    duration: Optional[NodeReportRollupDuration] = None
+    resources: Optional[Dict[str, float]] = None
+
+
+class NodeReportRollupGetMulti(BaseModel):
+    result: List[NodeReportRollupGet]
+    meta: MetaMulti
@@ -0,0 +1,106 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+from typing import Optional
+from typing import Union
+
+import pymongo.errors
+
+from pyppetdb.crud.nodes import CrudNodes
+from pyppetdb.crud.nodes_resources_exported import CrudNodesResourcesExported
+from pyppetdb.errors import BackendError
+from pyppetdb.errors import InvalidQuery
+from pyppetdb.pql.parser import PqlParser
+from pyppetdb.pql.planner import QueryPlan
+from pyppetdb.pql.planner import QueryPlanner
+
+
+class PqlEngine:
+    def __init__(
+        self,
+        log: logging.Logger,
+        crud_nodes: CrudNodes,
+        crud_nodes_resources_exported: CrudNodesResourcesExported,
+    ):
+        self._log = log
+        self._crud_nodes = crud_nodes
+        self._crud_nodes_resources_exported = crud_nodes_resources_exported
+        self._planner = QueryPlanner(subquery=self._distinct)
+
+    @property
+    def log(self):
+        return self._log
+
+    @property
+    def planner(self):
+        return self._planner
+
+    def _crud(self, plan: QueryPlan):
+        if plan.source == "resources":
+            return self._crud_nodes_resources_exported
+        return self._crud_nodes
+
+    @staticmethod
+    def parse(query: Union[str, list]) -> list:
+        if not isinstance(query, str):
+            return query
+        query = query.strip()
+        if query.startswith("["):
+            try:
+                return json.loads(query)
+            except json.JSONDecodeError as err:
+                raise InvalidQuery(f"invalid query json: {err}")
+        return PqlParser.parse(query)
+
+    async def query(
+        self,
+        query: Union[str, list],
+        entity: Optional[str] = None,
+    ) -> list:
+        plan = await self.planner.plan(self.parse(query), entity)
+        if plan.empty:
+            return [{"count": 0}] if plan.count_only else []
+        crud = self._crud(plan)
+        try:
+            if plan.count_only:
+                return [{"count": await crud.count(query=plan.match)}]
+            pipeline = plan.pipeline()
+            self.log.debug(f"executing pql pipeline on {plan.source}: {pipeline}")
+            return await crud.query_aggregate(query=plan.match, pipeline=pipeline)
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        except pymongo.errors.OperationFailure as err:
+            raise InvalidQuery(f"query failed: {err}")
+
+    async def _distinct(self, ast: list, field: str) -> list:
+        plan = await self.planner.plan(ast)
+        if plan.empty:
+            return []
+        crud = self._crud(plan)
+        path = plan.distinct_path(field)
+        try:
+            if path is not None:
+                return await crud.query_distinct(field=path, query=plan.match)
+            pipeline = plan.pipeline()
+            pipeline.append({"$group": {"_id": f"${field}"}})
+            result = await crud.query_aggregate(query=plan.match, pipeline=pipeline)
+        except pymongo.errors.ConnectionFailure as err:
+            self.log.error(f"backend error: {err}")
+            raise BackendError()
+        except pymongo.errors.OperationFailure as err:
+            raise InvalidQuery(f"subquery failed: {err}")
+        return [item["_id"] for item in result if item["_id"] is not None]
@@ -0,0 +1,246 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import re
+from typing import Any
+from typing import Optional
+
+from pyppetdb.errors import InvalidQuery
+
+TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+)
+    |(?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+    |(?P<number>-?\d+(?:\.\d+)?(?![\w.]))
+    |(?P<op>!=|!~|<=|>=|=|<|>|~|!)
+    |(?P<punct>[\[\]{}(),])
+    |(?P<ident>[A-Za-z_][A-Za-z0-9_.\-:?]*)
+    """,
+    re.VERBOSE,
+)
+
+FUNCTIONS = ("count", "avg", "sum", "min", "max")
+
+
+class PqlParser:
+    def __init__(self, query: str):
+        self._tokens = self._tokenize(query)
+        self._pos = 0
+
+    @staticmethod
+    def _tokenize(query: str) -> list[tuple[str, Any]]:
+        tokens = list()
+        pos = 0
+        while pos < len(query):
+            match = TOKEN_RE.match(query, pos)
+            if not match:
+                raise InvalidQuery(f"unexpected character at {pos}: {query[pos]}")
+            pos = match.end()
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind == "ws":
+                continue
+            if kind == "string":
+                if value.startswith("'"):
+                    value = '"' + value[1:-1].replace('"', '\\"') + '"'
+                value = json.loads(value)
+            elif kind == "number":
+                value = float(value) if "." in value else int(value)
+            tokens.append((kind, value))
+        return tokens
+
+    @classmethod
+    def parse(cls, query: str) -> list:
+        parser = cls(query)
+        result = parser._query()
+        if parser._peek() is not None:
+            raise InvalidQuery(f"unexpected token {parser._peek()[1]}")
+        return result
+
+    def _peek(self, offset: int = 0) -> Optional[tuple[str, Any]]:
+        if self._pos + offset < len(self._tokens):
+            return self._tokens[self._pos + offset]
+        return None
+
+    def _next(self) -> tuple[str, Any]:
+        token = self._peek()
+        if token is None:
+            raise InvalidQuery("unexpected end of query")
+        self._pos += 1
+        return token
+
+    def _accept(self, kind: str, value: Any = None) -> bool:
+        token = self._peek()
+        if token is None or token[0] != kind:
+            return False
+        if value is not None and token[1] != value:
+            return False
+        self._pos += 1
+        return True
+
+    def _expect(self, kind: str, value: Any = None) -> Any:
+        token = self._next()
+        if token[0] != kind or (value is not None and token[1] != value):
+            raise InvalidQuery(f"expected {value or kind}, got {token[1]}")
+        return token[1]
+
+    def _keyword(self, value: str) -> bool:
+        return self._accept("ident", value)
+
+    def _query(self) -> list:
+        entity = self._expect("ident")
+        fields = None
+        if self._accept("punct", "["):
+            fields = self._projection()
+        result = ["from", entity]
+        condition = None
+        group_by = None
+        paging = list()
+        if self._accept("punct", "{"):
+            token = self._peek()
+            if token is not None and not (
+                token[0] == "punct" and token[1] == "}"
+            ) and not self._paging_start():
+                condition = self._or()
+            if self._keyword("group"):
+                self._expect("ident", "by")
+                group_by = self._idents()
+            while self._paging_start():
+                paging.append(self._paging())
+            self._expect("punct", "}")
+        if fields is not None:
+            extract = ["extract", fields]
+            if condition is not None:
+                extract.append(condition)
+            if group_by:
+                extract.append(["group_by", *group_by])
+            result.append(extract)
+        elif group_by:
+            raise InvalidQuery("group by requires a projection")
+        elif condition is not None:
+            result.append(condition)
+        result.extend(paging)
+        return result
+
+    def _projection(self) -> list:
+        fields = list()
+        if self._accept("punct", "]"):
+            return fields
+        while True:
+            name = self._expect("ident")
+            if self._accept("punct", "("):
+                if name not in FUNCTIONS:
+                    raise InvalidQuery(f"unknown function {name}")
+                function = ["function", name]
+                if not self._accept("punct", ")"):
+                    function.append(self._expect("ident"))
+                    self._expect("punct", ")")
+                fields.append(function)
+            else:
+                fields.append(name)
+            if not self._accept("punct", ","):
+                break
+        self._expect("punct", "]")
+        return fields
+
+    def _idents(self) -> list[str]:
+        result = [self._expect("ident")]
+        while self._accept("punct", ","):
+            result.append(self._expect("ident"))
+        return result
+
+    def _paging_start(self) -> bool:
+        token = self._peek()
+        return token is not None and token[0] == "ident" and token[1] in (
+            "order",
+            "limit",
+            "offset",
+        )
+
+    def _paging(self) -> list:
+        keyword = self._expect("ident")
+        if keyword == "order":
+            self._expect("ident", "by")
+            order = list()
+            while True:
+                field = self._expect("ident")
+                direction = "asc"
+                if self._keyword("asc"):
+                    direction = "asc"
+                elif self._keyword("desc"):
+                    direction = "desc"
+                order.append([field, direction])
+                if not self._accept("punct", ","):
+                    break
+            return ["order_by", order]
+        value = self._expect("number")
+        if not isinstance(value, int) or value < 0:
+            raise InvalidQuery(f"{keyword} requires a positive integer")
+        return [keyword, value]
+
+    def _or(self) -> list:
+        items = [self._and()]
+        while self._keyword("or"):
+            items.append(self._and())
+        return items[0] if len(items) == 1 else ["or", *items]
+
+    def _and(self) -> list:
+        items = [self._not()]
+        while self._keyword("and"):
+            items.append(self._not())
+        return items[0] if len(items) == 1 else ["and", *items]
+
+    def _not(self) -> list:
+        if self._accept("op", "!"):
+            return ["not", self._not()]
+        if self._accept("punct", "("):
+            result = self._or()
+            self._expect("punct", ")")
+            return result
+        return self._condition()
+
+    def _value(self) -> Any:
+        kind, value = self._next()
+        if kind in ("string", "number"):
+            return value
+        if kind == "ident" and value in ("true", "false"):
+            return value == "true"
+        raise InvalidQuery(f"expected a value, got {value}")
+
+    def _condition(self) -> list:
+        field = self._expect("ident")
+        if self._keyword("is"):
+            negate = self._keyword("not")
+            self._expect("ident", "null")
+            return ["null?", field, not negate]
+        if self._keyword("in"):
+            if self._accept("punct", "["):
+                values = list()
+                if not self._accept("punct", "]"):
+                    values.append(self._value())
+                    while self._accept("punct", ","):
+                        values.append(self._value())
+                    self._expect("punct", "]")
+                return ["in", field, ["array", values]]
+            return ["in", field, self._query()]
+        op = self._expect("op")
+        if op == "!":
+            raise InvalidQuery(f"unexpected operator {op}")
+        value = self._value()
+        if op == "!=":
+            return ["not", ["=", field, value]]
+        if op == "!~":
+            return ["not", ["~", field, value]]
+        return [op, field, value]
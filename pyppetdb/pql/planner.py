@@ -0,0 +1,563 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Optional
+
+from pyppetdb.errors import InvalidQuery
+from pyppetdb.pql.parser import FUNCTIONS
+
+ENTITIES = {
+    "nodes": {
+        "source": "nodes",
+        "fields": {
+            "certname": "id",
+            "catalog_environment": "environment",
+            "facts_environment": "environment",
+            "report_environment": "environment",
+            "catalog_timestamp": "change_catalog",
+            "facts_timestamp": "change_facts",
+            "report_timestamp": "change_report",
+            "latest_report_status": "report.status",
+            "latest_report_noop": "report.noop",
+            "latest_report_noop_pending": "report.noop_pending",
+            "latest_report_corrective_change": "report.corrective_change",
+        },
+        "prefixes": {},
+        "rows": (),
+        "timestamps": ("catalog_timestamp", "facts_timestamp", "report_timestamp"),
+    },
+    "inventory": {
+        "source": "nodes",
+        "fields": {
+            "certname": "id",
+            "environment": "environment",
+            "timestamp": "change_facts",
+        },
+        "prefixes": {
+            "facts": "facts",
+            "trusted": "facts.trusted",
+        },
+        "rows": (),
+        "timestamps": ("timestamp",),
+    },
+    "facts": {
+        "source": "nodes",
+        "fields": {
+            "certname": "id",
+            "environment": "environment",
+        },
+        "prefixes": {},
+        "rows": ("name", "value"),
+        "timestamps": (),
+    },
+    "resources": {
+        "source": "resources",
+        "fields": {
+            "certname": "node_id",
+            "environment": "environment",
+            "type": "type",
+            "title": "title",
+            "exported": "exported",
+            "file": "file",
+            "line": "line",
+            "tag": "tags",
+            "tags": "tags",
+        },
+        "prefixes": {
+            "parameters": "parameters",
+        },
+        "rows": (),
+        "timestamps": (),
+    },
+}
+
+SELECTS = {
+    "select_nodes": "nodes",
+    "select_inventory": "inventory",
+    "select_facts": "facts",
+    "select_resources": "resources",
+}
+
+COMPARISONS = {
+    ">": "$gt",
+    ">=": "$gte",
+    "<": "$lt",
+    "<=": "$lte",
+}
+
+
+class QueryPlan:
+    def __init__(self, entity: str):
+        self.entity = entity
+        self.spec = ENTITIES[entity]
+        self.match: dict = {}
+        self.residual: dict = {}
+        self.fact_names: Optional[list[str]] = None
+        self.fields: Optional[list[str]] = None
+        self.functions: list[list] = []
+        self.group_by: list[str] = []
+        self.order_by: list[tuple[str, int]] = []
+        self.limit: Optional[int] = None
+        self.offset: Optional[int] = None
+
+    @property
+    def source(self) -> str:
+        return self.spec["source"]
+
+    @property
+    def rows(self) -> bool:
+        return bool(self.spec["rows"])
+
+    @property
+    def empty(self) -> bool:
+        return _matches_nothing(self.match) or _matches_nothing(self.residual)
+
+    @property
+    def count_only(self) -> bool:
+        return (
+            not self.rows
+            and not self.residual
+            and not self.fields
+            and not self.group_by
+            and not self.offset
+            and self.functions == [["function", "count"]]
+        )
+
+    def path(self, field) -> str:
+        spec = self.spec
+        if isinstance(field, list):
+            if (
+                len(field) == 2
+                and field[0] == "parameter"
+                and "parameters" in spec["prefixes"]
+            ):
+                return f"parameters.{field[1]}"
+            raise InvalidQuery(f"unsupported field {field} for {self.entity}")
+        if field in spec["fields"]:
+            return spec["fields"][field]
+        top, _, rest = field.partition(".")
+        if rest and top in spec["prefixes"]:
+            return f"{spec['prefixes'][top]}.{rest}"
+        if field in spec["prefixes"]:
+            return spec["prefixes"][field]
+        raise InvalidQuery(f"{field} is not a queryable field for {self.entity}")
+
+    def output(self, field: str) -> str:
+        spec = self.spec
+        top = field.split(".")[0]
+        if field in spec["fields"] or field in spec["rows"]:
+            return field
+        if top in spec["prefixes"]:
+            return field
+        raise InvalidQuery(f"{field} is not a field of {self.entity}")
+
+    def distinct_path(self, field: str) -> Optional[str]:
+        if self.rows and field in self.spec["rows"]:
+            return None
+        if self.residual or self.limit is not None or self.offset:
+            return None
+        return self.path(field)
+
+    def _needed(self) -> Optional[set[str]]:
+        if self.fields is None and not self.functions:
+            return None
+        needed = set(self.fields or [])
+        needed.update(self.group_by)
+        needed.update(field for field, _ in self.order_by)
+        needed.update(f[2] for f in self.functions if len(f) > 2)
+        return {field.split(".")[0] for field in needed}
+
+    def _shape(self) -> list[dict]:
+        spec = self.spec
+        if self.rows:
+            stages = list()
+            if self.fact_names is not None:
+                projection = {"id": 1, "environment": 1}
+                for name in self.fact_names:
+                    projection[f"facts.{name}"] = 1
+                stages.append({"$project": projection})
+            stages.extend(
+                [
+                    {
+                        "$project": {
+                            "_id": 0,
+                            "certname": "$id",
+                            "environment": "$environment",
+                            "facts": {"$objectToArray": {"$ifNull": ["$facts", {}]}},
+                        }
+                    },
+                    {"$unwind": "$facts"},
+                    {
+                        "$project": {
+                            "certname": 1,
+                            "environment": 1,
+                            "name": "$facts.k",
+                            "value": "$facts.v",
+                        }
+                    },
+                ]
+            )
+            return stages
+        shape = {"_id": 0}
+        needed = self._needed()
+        for output, raw in spec["fields"].items():
+            if needed is None or output in needed:
+                shape[output] = f"${raw}"
+        for output, raw in spec["prefixes"].items():
+            if needed is None or output in needed:
+                shape[output] = f"${raw}"
+        if needed is not None and len(shape) == 1:
+            return []
+        return [{"$project": shape}]
+
+    def _group(self) -> list[dict]:
+        key = {field.replace(".", "__"): f"${field}" for field in self.group_by}
+        group = {"_id": key or None}
+        project = {"_id": 0}
+        for field in self.group_by:
+            project[field] = f"$_id.{field.replace('.', '__')}"
+        for function in self.functions:
+            name = function[1]
+            arg = function[2] if len(function) > 2 else None
+            if name == "count" and arg is None:
+                group[name] = {"$sum": 1}
+            elif name == "count":
+                group[name] = {
+                    "$sum": {
+                        "$cond": [{"$ne": [{"$ifNull": [f"${arg}", None]}, None]}, 1, 0]
+                    }
+                }
+            else:
+                group[name] = {f"${name}": f"${arg}"}
+            project[name] = 1
+        return [{"$group": group}, {"$project": project}]
+
+    def _paging(self, sort: dict) -> list[dict]:
+        stages = list()
+        if sort:
+            stages.append({"$sort": sort})
+        if self.offset:
+            stages.append({"$skip": self.offset})
+        if self.limit is not None:
+            stages.append({"$limit": self.limit})
+        return stages
+
+    def pipeline(self) -> list[dict]:
+        stages = list()
+        if self.match:
+            stages.append({"$match": self.match})
+        grouped = bool(self.functions or self.group_by)
+        pushdown = not grouped and not self.rows
+        if pushdown:
+            sort = {self.path(field): order for field, order in self.order_by}
+            stages.extend(self._paging(sort))
+        stages.extend(self._shape())
+        if self.residual:
+            stages.append({"$match": self.residual})
+        if grouped:
+            stages.extend(self._group())
+        elif self.fields is not None:
+            projection = {"_id": 0}
+            for field in self.fields:
+                projection[field] = 1
+            stages.append({"$project": projection})
+        if not pushdown:
+            stages.extend(self._paging(dict(self.order_by)))
+        return stages
+
+
+def _matches_nothing(query: dict) -> bool:
+    for key, value in query.items():
+        if key == "$and":
+            if any(_matches_nothing(item) for item in value):
+                return True
+        elif isinstance(value, dict) and value == {"$in": []}:
+            return True
+    return False
+
+
+def _conjunction(items: list[dict]) -> dict:
+    items = [item for item in items if item]
+    if not items:
+        return {}
+    if len(items) == 1:
+        return items[0]
+    return {"$and": items}
+
+
+class QueryPlanner:
+    def __init__(self, subquery: Callable[[list, str], Awaitable[list]]):
+        self._subquery = subquery
+
+    @staticmethod
+    def normalize(ast: Any, entity: Optional[str] = None) -> list:
+        if not isinstance(ast, list) or not ast:
+            raise InvalidQuery("query must be a non empty array")
+        head = ast[0]
+        if head == "from":
+            return ast
+        if (
+            head == "extract"
+            and len(ast) > 2
+            and isinstance(ast[2], list)
+            and ast[2]
+            and ast[2][0] in SELECTS
+        ):
+            extract = ["extract", ast[1], *ast[2][1:]]
+            return ["from", SELECTS[ast[2][0]], extract, *ast[3:]]
+        if head in SELECTS:
+            return ["from", SELECTS[head], *ast[1:]]
+        if entity is None:
+            raise InvalidQuery("query does not name an entity")
+        return ["from", entity, ast]
+
+    async def plan(self, ast: Any, entity: Optional[str] = None) -> QueryPlan:
+        ast = self.normalize(ast, entity)
+        if len(ast) < 2 or ast[1] not in ENTITIES:
+            raise InvalidQuery(f"unknown entity {ast[1] if len(ast) > 1 else None}")
+        plan = QueryPlan(entity=ast[1])
+        condition = None
+        for item in ast[2:]:
+            if not isinstance(item, list) or not item:
+                raise InvalidQuery(f"invalid query clause {item}")
+            head = item[0]
+            if head == "extract":
+                self._extract(plan, item)
+                for clause in item[2:]:
+                    if isinstance(clause, list) and clause and clause[0] == "group_by":
+                        plan.group_by = [plan.output(field) for field in clause[1:]]
+                    else:
+                        condition = clause
+            elif head == "order_by":
+                self._order_by(plan, item)
+            elif head in ("limit", "offset"):
+                if len(item) != 2 or not isinstance(item[1], int) or item[1] < 0:
+                    raise InvalidQuery(f"{head} requires a positive integer")
+                setattr(plan, head, item[1])
+            else:
+                condition = item
+        if plan.functions and not set(plan.fields or []) <= set(plan.group_by):
+            raise InvalidQuery("fields must be grouped when combined with functions")
+        if condition is not None:
+            await self._where(plan, condition)
+        return plan
+
+    @staticmethod
+    def _extract(plan: QueryPlan, item: list) -> None:
+        if len(item) < 2:
+            raise InvalidQuery("extract requires fields")
+        fields = item[1]
+        if isinstance(fields, str) or (fields and fields[0] == "function"):
+            fields = [fields]
+        plan.fields = list()
+        for field in fields:
+            if isinstance(field, str):
+                plan.fields.append(plan.output(field))
+            elif isinstance(field, list) and len(field) > 1 and field[0] == "function":
+                if field[1] not in FUNCTIONS:
+                    raise InvalidQuery(f"unknown function {field[1]}")
+                if len(field) > 2:
+                    plan.output(field[2])
+                elif field[1] != "count":
+                    raise InvalidQuery(f"function {field[1]} requires a field")
+                plan.functions.append(field[:3])
+            else:
+                raise InvalidQuery(f"invalid extract field {field}")
+
+    @staticmethod
+    def _order_by(plan: QueryPlan, item: list) -> None:
+        if len(item) != 2 or not isinstance(item[1], list):
+            raise InvalidQuery("order_by requires a list of fields")
+        for order in item[1]:
+            if isinstance(order, str):
+                order = [order, "asc"]
+            if not isinstance(order, list) or len(order) != 2:
+                raise InvalidQuery(f"invalid order_by clause {order}")
+            if order[1] not in ("asc", "desc"):
+                raise InvalidQuery(f"invalid sort order {order[1]}")
+            field = order[0]
+            if field not in FUNCTIONS:
+                plan.output(field)
+            plan.order_by.append((field, 1 if order[1] == "asc" else -1))
+
+    def _row_level(self, plan: QueryPlan, node: Any) -> bool:
+        if not isinstance(node, list) or not node:
+            return False
+        if node[0] in ("and", "or", "not"):
+            return any(self._row_level(plan, item) for item in node[1:])
+        return len(node) > 1 and node[1] in plan.spec["rows"]
+
+    async def _where(self, plan: QueryPlan, condition: list) -> None:
+        if isinstance(condition, list) and condition and condition[0] == "and":
+            conditions = list(condition[1:])
+        else:
+            conditions = [condition]
+        match = list()
+        residual = list()
+        if plan.rows:
+            conditions = self._push_fact_names(plan, conditions, match)
+        for item in conditions:
+            if self._row_level(plan, item):
+                residual.append(await self._compile(plan, item, row=True))
+            else:
+                match.append(await self._compile(plan, item, row=False))
+        plan.match = _conjunction(match)
+        plan.residual = _conjunction(residual)
+
+    @staticmethod
+    def _push_fact_names(
+        plan: QueryPlan,
+        conditions: list,
+        match: list[dict],
+    ) -> list:
+        names = None
+        remaining = list()
+        for item in conditions:
+            values = None
+            if isinstance(item, list) and len(item) == 3 and item[1] == "name":
+                if item[0] == "=" and isinstance(item[2], str):
+                    values = [item[2]]
+                elif (
+                    item[0] == "in"
+                    and isinstance(item[2], list)
+                    and len(item[2]) == 2
+                    and item[2][0] == "array"
+                    and all(isinstance(value, str) for value in item[2][1])
+                ):
+                    values = list(item[2][1])
+            if values is None or any(
+                "." in value or value.startswith("$") for value in values
+            ):
+                remaining.append(item)
+                continue
+            names = values if names is None else [n for n in names if n in values]
+        if names is None:
+            return conditions
+        plan.fact_names = names
+        conditions = list()
+        for item in remaining:
+            if (
+                len(names) == 1
+                and isinstance(item, list)
+                and len(item) == 3
+                and item[0] == "="
+                and item[1] == "value"
+                and isinstance(item[2], (str, int, float, bool))
+            ):
+                match.append({f"facts.{names[0]}": item[2]})
+            else:
+                conditions.append(item)
+        if not names:
+            match.append({"id": {"$in": []}})
+        elif len(names) > 1:
+            match.append(
+                {"$or": [{f"facts.{name}": {"$exists": True}} for name in names]}
+            )
+        elif not any(f"facts.{names[0]}" in item for item in match):
+            match.append({f"facts.{names[0]}": {"$exists": True}})
+        return conditions
+
+    def _field(self, plan: QueryPlan, field: Any, row: bool) -> str:
+        if row:
+            if not isinstance(field, str):
+                raise InvalidQuery(f"unsupported field {field} for {plan.entity}")
+            return plan.output(field)
+        return plan.path(field)
+
+    @staticmethod
+    def _value(plan: QueryPlan, field: Any, value: Any) -> Any:
+        if isinstance(value, str) and field in plan.spec["timestamps"]:
+            try:
+                return datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError:
+                raise InvalidQuery(f"invalid timestamp {value} for {field}")
+        return value
+
+    async def _compile(self, plan: QueryPlan, node: Any, row: bool) -> dict:
+        if not isinstance(node, list) or not node:
+            raise InvalidQuery(f"invalid condition {node}")
+        op = node[0]
+        if op in ("and", "or"):
+            items = [await self._compile(plan, item, row) for item in node[1:]]
+            if not items:
+                raise InvalidQuery(f"{op} requires at least one condition")
+            return {f"${op}": items}
+        if op == "not":
+            if len(node) != 2:
+                raise InvalidQuery("not requires exactly one condition")
+            return {"$nor": [await self._compile(plan, node[1], row)]}
+        if op == "subquery":
+            if len(node) not in (2, 3) or node[1] not in ENTITIES:
+                raise InvalidQuery(f"invalid subquery {node}")
+            sub = ["from", node[1], ["extract", ["certname"], *node[2:]]]
+            values = await self._subquery(sub, "certname")
+            return {self._field(plan, "certname", row): {"$in": values}}
+        if len(node) != 3:
+            raise InvalidQuery(f"invalid condition {node}")
+        field, value = node[1], node[2]
+        if op == "in":
+            return await self._compile_in(plan, field, value, row)
+        path = self._field(plan, field, row)
+        value = self._value(plan, field, value)
+        if op == "=":
+            return {path: value}
+        if op in COMPARISONS:
+            return {path: {COMPARISONS[op]: value}}
+        if op == "~":
+            if not isinstance(value, str):
+                raise InvalidQuery("regular expression must be a string")
+            return {path: {"$regex": value}}
+        if op == "null?":
+            if not isinstance(value, bool):
+                raise InvalidQuery("null? requires a boolean")
+            return {path: None} if value else {path: {"$ne": None}}
+        raise InvalidQuery(f"unsupported operator {op}")
+
+    async def _compile_in(
+        self,
+        plan: QueryPlan,
+        field: Any,
+        value: Any,
+        row: bool,
+    ) -> dict:
+        if isinstance(field, list):
+            if len(field) != 1:
+                raise InvalidQuery("in only supports a single field")
+            field = field[0]
+        path = self._field(plan, field, row)
+        if not isinstance(value, list) or not value:
+            raise InvalidQuery("in requires an array or a subquery")
+        if value[0] == "array":
+            if len(value) != 2 or not isinstance(value[1], list):
+                raise InvalidQuery("array requires a list of values")
+            return {path: {"$in": [self._value(plan, field, v) for v in value[1]]}}
+        sub = self.normalize(value)
+        extract = [
+            item
+            for item in sub[2:]
+            if isinstance(item, list) and item and item[0] == "extract"
+        ]
+        if not extract or len(extract[0]) < 2:
+            raise InvalidQuery("subquery requires an extract clause")
+        fields = extract[0][1]
+        if isinstance(fields, list):
+            if len(fields) != 1 or not isinstance(fields[0], str):
+                raise InvalidQuery("subquery must extract exactly one field")
+            fields = fields[0]
+        values = await self._subquery(sub, fields)
+        return {path: {"$in": values}}
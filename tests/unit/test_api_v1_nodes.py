@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import unittest
-from unittest.mock import MagicMock, AsyncMock
+from unittest.mock import MagicMock, AsyncMock, patch
 import logging
 from pyppetdb.authorize import (
     PERM_NODES_CREATE,
@@ -22,6 +22,11 @@ from pyppetdb.authorize import (
     PERM_NODES_CATALOG_CACHE_DELETE,
 )
 from pyppetdb.controller.api.v1.nodes import ControllerApiV1Nodes
+from pyppetdb.crud.nodes_catalogs import CrudNodesCatalogs
+from pyppetdb.crud.nodes_catalogs import NodesCatalogsRedactor
+from pyppetdb.crud.nodes_secrets_redactor import NodesSecretsRedactor
+from pyppetdb.errors import FeatureUnavailable
+from pyppetdb.helpers import arrow
 from pyppetdb.model.nodes import NodePut
 
 
@@ -32,9 +37,19 @@ class TestApiV1NodesUnit(unittest.IsolatedAsyncioTestCase):
         self.mock_crud_nodes = MagicMock()
         self.mock_crud_nodes.get_placement = AsyncMock(return_value={})
         self.mock_crud_catalog_cache = MagicMock()
+        self.mock_crud_migrations = MagicMock()
+        self.mock_crud_migrations.read_placement = AsyncMock(
+            side_effect=lambda node_id, placement: placement
+        )
+        self.mock_crud_migrations.delete = AsyncMock()
         self.mock_crud_catalogs = MagicMock()
+        self.mock_crud_facts_histogram = MagicMock()
+        self.mock_crud_facts_keys = MagicMock()
         self.mock_crud_groups = MagicMock()
         self.mock_crud_reports = MagicMock()
+        self.mock_crud_rollups = MagicMock()
+        self.mock_crud_resources = MagicMock()
+        self.mock_crud_resources.delete_all_from_node = AsyncMock()
         self.mock_crud_teams = MagicMock()
         self.mock_crud_jobs = MagicMock()
         self.mock_crud_jobs.remove_node_from_jobs = AsyncMock()
@@ -47,9 +62,14 @@ class TestApiV1NodesUnit(unittest.IsolatedAsyncioTestCase):
             authorize=self.mock_authorize,
             crud_nodes=self.mock_crud_nodes,
             crud_nodes_catalog_cache=self.mock_crud_catalog_cache,
+            crud_nodes_placement_migrations=self.mock_crud_migrations,
             crud_nodes_catalogs=self.mock_crud_catalogs,
+            crud_nodes_facts_histogram=self.mock_crud_facts_histogram,
+            crud_nodes_facts_keys=self.mock_crud_facts_keys,
             crud_nodes_groups=self.mock_crud_groups,
             crud_nodes_reports=self.mock_crud_reports,
+            crud_nodes_reports_rollups=self.mock_crud_rollups,
+            crud_nodes_resources_exported=self.mock_crud_resources,
             crud_teams=self.mock_crud_teams,
             crud_jobs=self.mock_crud_jobs,
             crud_node_jobs=self.mock_crud_node_jobs,
@@ -88,9 +108,7 @@ class TestApiV1NodesUnit(unittest.IsolatedAsyncioTestCase):
             request=mock_request, permission=PERM_NODES_DELETE
         )
         self.mock_ca_service.update_certificate_status.assert_called_once()
-        self.mock_crud_groups.delete_node_from_nodes_groups.assert_called_once_with(
-            node_id="node1"
-        )
+        self.mock_crud_groups.delete_node_from_nodes_groups.assert_not_called()
         self.mock_crud_catalogs.delete_all_from_node.assert_called_once_with(
             node_id="node1",
             placement={},
@@ -103,8 +121,96 @@ class TestApiV1NodesUnit(unittest.IsolatedAsyncioTestCase):
             node_id="node1"
         )
         self.mock_crud_node_jobs.delete_by_node.assert_called_once_with(node_id="node1")
+        self.mock_crud_migrations.delete.assert_called_once_with(node_id="node1")
         self.mock_crud_nodes.delete.assert_called_once_with(_id="node1")
 
+    async def test_delete_node_during_placement_migration(self):
+        self.mock_authorize.require_perm = AsyncMock()
+        self.mock_ca_service.update_certificate_status = AsyncMock()
+        self.mock_crud_catalogs.delete_all_from_node = AsyncMock()
+        self.mock_crud_reports.delete_all_from_node = AsyncMock()
+        self.mock_crud_nodes.delete = AsyncMock()
+        self.mock_crud_nodes.get_placement = AsyncMock(return_value={"dc": "b"})
+        self.mock_crud_migrations.read_placement = AsyncMock(
+            return_value=[{"dc": "b"}, {"dc": "a"}]
+        )
+
+        await self.controller.delete(node_id="node1", request=MagicMock())
+
+        self.mock_crud_migrations.read_placement.assert_called_once_with(
+            node_id="node1", placement={"dc": "b"}
+        )
+        self.mock_crud_reports.delete_all_from_node.assert_called_once_with(
+            node_id="node1",
+            placement=[{"dc": "b"}, {"dc": "a"}],
+        )
+
+    async def test_placement_migrations_admin_required(self):
+        self.mock_authorize.require_admin = AsyncMock()
+        self.mock_crud_migrations.search = AsyncMock(return_value={"ok": True})
+
+        mock_request = MagicMock()
+        result = await self.controller.placement_migrations(
+            request=mock_request,
+            node_id=None,
+            status="running",
+            fields={"id"},
+            sort="requested",
+            sort_order="ascending",
+            page=0,
+            limit=100,
+        )
+
+        self.assertEqual(result, {"ok": True})
+        self.mock_authorize.require_admin.assert_called_once_with(
+            request=mock_request
+        )
+        self.mock_crud_migrations.search.assert_called_once_with(
+            node_id=None,
+            status="running",
+            fields=["id"],
+            sort="requested",
+            sort_order="ascending",
+            page=0,
+            limit=100,
+        )
+
+    async def test_report_rollups_admin_required(self):
+        self.mock_authorize.require_admin = AsyncMock()
+        self.mock_crud_rollups.search = AsyncMock(return_value={"ok": True})
+
+        mock_request = MagicMock()
+        result = await self.controller.report_rollups(
+            request=mock_request,
+            period="day",
+            start=None,
+            end=None,
+            environment="prod",
+            status=None,
+            fields={"count"},
+            sort="start",
+            sort_order="ascending",
+            page=0,
+            limit=100,
+        )
+
+        self.assertEqual(result, {"ok": True})
+        self.mock_authorize.require_admin.assert_called_once_with(
+            request=mock_request
+        )
+        self.mock_crud_rollups.search.assert_called_once_with(
+            period="day",
+            start=None,
+            end=None,
+            environment="prod",
+            status=None,
+            fields=["count"],
+            sort="start",
+            sort_order="ascending",
+            page=0,
+            limit=100,
+        )
+
     async def test_update_node_perm_required(self):
         self.mock_authorize.require_perm = AsyncMock()
         self.mock_crud_nodes.update = AsyncMock()
@@ -160,8 +266,7 @@ class TestApiV1NodesUnit(unittest.IsolatedAsyncioTestCase):
 
 class TestApiV1NodesEnrichmentUnit(unittest.IsolatedAsyncioTestCase):
     """Coverage for the exported_resources handler and the catalog_cached
-    enrichment branches in get()/search(), none of which were previously
-    exercised."""
+    handling in get()/search()."""
 
     def setUp(self):
         self.log = logging.getLogger("test")
@@ -170,15 +275,24 @@ class TestApiV1NodesEnrichmentUnit(unittest.IsolatedAsyncioTestCase):
         self.mock_authorize.get_user_node_groups = AsyncMock(return_value=["group-a"])
         self.mock_crud_nodes = MagicMock()
         self.mock_crud_catalog_cache = MagicMock()
+        self.mock_crud_migrations = MagicMock()
+        self.mock_crud_facts_histogram = MagicMock()
+        self.mock_crud_facts_keys = MagicMock()
+        self.mock_crud_resources = MagicMock()
 
         self.controller = ControllerApiV1Nodes(
             log=self.log,
             authorize=self.mock_authorize,
             crud_nodes=self.mock_crud_nodes,
             crud_nodes_catalog_cache=self.mock_crud_catalog_cache,
+            crud_nodes_placement_migrations=self.mock_crud_migrations,
             crud_nodes_catalogs=MagicMock(),
+            crud_nodes_facts_histogram=self.mock_crud_facts_histogram,
+            crud_nodes_facts_keys=self.mock_crud_facts_keys,
             crud_nodes_groups=MagicMock(),
             crud_nodes_reports=MagicMock(),
+            crud_nodes_reports_rollups=MagicMock(),
+            crud_nodes_resources_exported=self.mock_crud_resources,
             crud_teams=MagicMock(),
             crud_jobs=MagicMock(),
             crud_node_jobs=MagicMock(),
@@ -186,7 +300,8 @@ class TestApiV1NodesEnrichmentUnit(unittest.IsolatedAsyncioTestCase):
         )
 
     async def test_exported_resources(self):
-        self.mock_crud_nodes.exported_resources = AsyncMock(return_value={"ok": True})
+        self.mock_crud_nodes.search = AsyncMock()
+        self.mock_crud_resources.search = AsyncMock(return_value={"ok": True})
         request = MagicMock()
 
         result = await self.controller.exported_resources(
@@ -200,69 +315,265 @@ class TestApiV1NodesEnrichmentUnit(unittest.IsolatedAsyncioTestCase):
         )
 
         self.mock_authorize.require_user.assert_called_once_with(request=request)
-        self.mock_crud_nodes.exported_resources.assert_called_once()
-        _, kwargs = self.mock_crud_nodes.exported_resources.call_args
+        self.mock_crud_nodes.search.assert_not_called()
+        self.mock_crud_resources.search.assert_called_once()
+        _, kwargs = self.mock_crud_resources.search.call_args
         self.assertEqual(kwargs["resource_type"], "Nginx::Vhost")
         self.assertEqual(kwargs["user_node_groups"], ["group-a"])
         self.assertEqual(result, {"ok": True})
 
-    async def test_get_sets_catalog_cached_true(self):
+    async def test_get_catalog_cached_from_node(self):
         node = MagicMock()
         self.mock_crud_nodes.get = AsyncMock(return_value=node)
-        self.mock_crud_catalog_cache.get_cached_node_ids = AsyncMock(
-            return_value=["node1"]
-        )
+        self.mock_crud_catalog_cache.get_cached_node_ids = AsyncMock()
 
         result = await self.controller.get(
             node_id="node1", request=MagicMock(), fields={"id", "catalog_cached"}
         )
-        self.assertTrue(result.catalog_cached)
+        self.assertIs(result, node)
+        _, kwargs = self.mock_crud_nodes.get.call_args
+        self.assertIn("catalog_cached", kwargs["fields"])
+        self.mock_crud_catalog_cache.get_cached_node_ids.assert_not_called()
 
-    async def test_get_sets_catalog_cached_false(self):
-        node = MagicMock()
-        self.mock_crud_nodes.get = AsyncMock(return_value=node)
-        self.mock_crud_catalog_cache.get_cached_node_ids = AsyncMock(return_value=[])
+    async def test_search_filters_catalog_cached(self):
+        result_obj = MagicMock()
+        self.mock_crud_nodes.search = AsyncMock(return_value=result_obj)
+        self.mock_crud_catalog_cache.get_cached_node_ids = AsyncMock()
 
-        result = await self.controller.get(
-            node_id="node1", request=MagicMock(), fields={"id", "catalog_cached"}
+        result = await self.controller.search(
+            request=MagicMock(),
+            catalog_cached=False,
+            fields={"id", "catalog_cached"},
+            sort="catalog_cache_expires_at",
         )
-        self.assertFalse(result.catalog_cached)
 
-    async def test_get_without_catalog_cached_field_skips_cache(self):
-        node = MagicMock()
-        self.mock_crud_nodes.get = AsyncMock(return_value=node)
-        self.mock_crud_catalog_cache.get_cached_node_ids = AsyncMock()
+        self.assertIs(result, result_obj)
+        _, kwargs = self.mock_crud_nodes.search.call_args
+        self.assertFalse(kwargs["catalog_cached"])
+        self.assertEqual(kwargs["sort"], "catalog_cache_expires_at")
+        self.mock_crud_catalog_cache.get_cached_node_ids.assert_not_called()
 
-        await self.controller.get(
-            node_id="node1", request=MagicMock(), fields={"id"}
+    async def test_distinct_fact_values_uses_histogram(self):
+        self.mock_authorize.require_user = AsyncMock()
+        self.mock_authorize.get_user_node_groups = AsyncMock(return_value=None)
+        histogram = MagicMock()
+        self.mock_crud_facts_histogram.distinct_fact_values = AsyncMock(
+            return_value=histogram
         )
-        self.mock_crud_catalog_cache.get_cached_node_ids.assert_not_called()
+        self.mock_crud_nodes.distinct_fact_values = AsyncMock()
 
-    async def test_search_enriches_catalog_cached(self):
-        n1 = MagicMock(id="node1")
-        n2 = MagicMock(id="node2")
-        result_obj = MagicMock()
-        result_obj.result = [n1, n2]
-        self.mock_crud_nodes.search = AsyncMock(return_value=result_obj)
-        self.mock_crud_catalog_cache.get_cached_node_ids = AsyncMock(
-            return_value=["node1"]
+        result = await self.controller.distinct_fact_values(
+            request=MagicMock(),
+            fact_id="os.family",
+            disabled=None,
+            environment=None,
+            fact=None,
+            report_status=None,
         )
 
-        await self.controller.search(
-            request=MagicMock(), fields={"id", "catalog_cached"}
+        self.assertIs(result, histogram)
+        self.mock_crud_nodes.distinct_fact_values.assert_not_called()
+
+    async def test_distinct_fact_values_scoped_skips_histogram(self):
+        self.mock_authorize.require_user = AsyncMock()
+        self.mock_authorize.get_user_node_groups = AsyncMock(return_value=["g1"])
+        self.mock_crud_facts_histogram.distinct_fact_values = AsyncMock()
+        self.mock_crud_nodes.distinct_fact_values = AsyncMock()
+
+        await self.controller.distinct_fact_values(
+            request=MagicMock(),
+            fact_id="os.family",
+            disabled=None,
+            environment=None,
+            fact=None,
+            report_status=None,
         )
 
-        self.assertTrue(n1.catalog_cached)
-        self.assertFalse(n2.catalog_cached)
+        self.mock_crud_facts_histogram.distinct_fact_values.assert_not_called()
+        self.mock_crud_nodes.distinct_fact_values.assert_called_once()
 
-    async def test_search_catalog_cached_requires_id_field(self):
-        result_obj = MagicMock()
-        result_obj.result = [MagicMock(id="node1")]
-        self.mock_crud_nodes.search = AsyncMock(return_value=result_obj)
-        self.mock_crud_catalog_cache.get_cached_node_ids = AsyncMock()
+    async def test_fact_keys(self):
+        self.mock_authorize.require_user = AsyncMock()
+        self.mock_authorize.get_user_node_groups = AsyncMock(return_value=None)
+        self.mock_crud_facts_keys.search = AsyncMock()
+
+        await self.controller.fact_keys(
+            request=MagicMock(),
+            prefix="os.",
+            fact_type="str",
+            fields={"path", "samples"},
+            sort="path",
+            sort_order="ascending",
+            page=0,
+            limit=100,
+        )
+
+        _, kwargs = self.mock_crud_facts_keys.search.call_args
+        self.assertEqual(kwargs["prefix"], "os.")
+        self.assertEqual(kwargs["_type"], "str")
+        self.assertEqual(sorted(kwargs["fields"]), ["path", "samples"])
 
-        # guard: catalog_cached without id must NOT trigger the cache lookup
-        await self.controller.search(
-            request=MagicMock(), fields={"catalog_cached"}
+    async def test_fact_keys_scoped_hides_samples(self):
+        self.mock_authorize.require_user = AsyncMock()
+        self.mock_authorize.get_user_node_groups = AsyncMock(return_value=["g1"])
+        self.mock_crud_facts_keys.search = AsyncMock()
+
+        await self.controller.fact_keys(
+            request=MagicMock(),
+            prefix=None,
+            fact_type=None,
+            fields={"path", "samples"},
+            sort="path",
+            sort_order="ascending",
+            page=0,
+            limit=100,
+        )
+
+        _, kwargs = self.mock_crud_facts_keys.search.call_args
+        self.assertEqual(kwargs["fields"], ["path"])
+
+    async def test_exported_resources_scoped_by_node_groups(self):
+        self.mock_authorize.require_user = AsyncMock()
+        self.mock_authorize.get_user_node_groups = AsyncMock(return_value=["g1"])
+        self.mock_crud_nodes.search = AsyncMock()
+        self.mock_crud_resources.search = AsyncMock()
+
+        await self.controller.exported_resources(
+            request=MagicMock(),
+            resource_type="Nagios_host",
+            resource_title=None,
+            resource_tags=["monitoring"],
+            disabled=False,
+            environment="production",
+            fact=None,
+        )
+
+        self.mock_crud_nodes.search.assert_not_called()
+        self.mock_crud_resources.search.assert_called_once_with(
+            resource_type="Nagios_host",
+            resource_title=None,
+            resource_tags=["monitoring"],
+            environment="production",
+            user_node_groups=["g1"],
+            disabled=False,
+            fact=None,
+        )
+
+    async def test_group_by_pivot_table(self):
+        async def rows():
+            yield {"environment": "prod", "facts.os.family": "Debian", "count": 2}
+
+        self.mock_crud_nodes.group_by = MagicMock(return_value=rows())
+
+        result = await self.controller.group_by(
+            request=MagicMock(),
+            group_by=["environment", "facts.os.family"],
+            stream=False,
+        )
+
+        self.assertEqual(result.columns, ["environment", "facts.os.family", "count"])
+        self.assertEqual(result.rows, [["prod", "Debian", 2]])
+        self.assertEqual(result.meta.result_size, 1)
+        _, kwargs = self.mock_crud_nodes.group_by.call_args
+        self.assertEqual(kwargs["user_node_groups"], ["group-a"])
+
+    async def test_group_by_stream(self):
+        async def rows():
+            yield {"environment": "prod", "count": 2}
+
+        self.mock_crud_nodes.group_by = MagicMock(return_value=rows())
+
+        result = await self.controller.group_by(
+            request=MagicMock(),
+            group_by=["environment"],
+            stream=True,
+            compress=False,
+        )
+
+        self.assertEqual(result.media_type, "application/x-ndjson")
+        body = b"".join([chunk async for chunk in result.body_iterator])
+        self.assertEqual(body, b'{"environment":"prod","count":2}\n')
+
+    async def test_export_catalogs_redacted(self):
+        redactor = NodesSecretsRedactor(self.log, MagicMock())
+        redactor.rebuild(["PASSWORD"])
+        self.controller._crud_nodes_catalogs = CrudNodesCatalogs(
+            config=MagicMock(),
+            log=self.log,
+            coll=MagicMock(),
+            secret_manager=NodesCatalogsRedactor(self.log, redactor),
+        )
+
+        async def docs():
+            yield {
+                "id": "node1",
+                "catalog": {
+                    "resources_exported": [
+                        {"type": "User", "parameters": {"password": "PASSWORD"}}
+                    ]
+                },
+            }
+
+        self.mock_crud_nodes.export = MagicMock(return_value=docs())
+
+        result = await self.controller.export(
+            request=MagicMock(),
+            kind="catalogs",
+            node_id=None,
+            disabled=None,
+            environment=None,
+            fact=None,
+            report_status=None,
+            fields=set(),
+            compress=False,
+        )
+
+        body = b"".join([chunk async for chunk in result.body_iterator])
+        self.assertIn(b'"password":"XXXXX"', body)
+        self.assertNotIn(b"PASSWORD", body)
+
+    async def test_export_facts(self):
+        self.mock_crud_nodes.export = MagicMock()
+
+        with patch.object(arrow, "pyarrow", MagicMock()):
+            result = await self.controller.export_facts(
+                request=MagicMock(),
+                export_format="parquet",
+                columns=["os.family", "processorcount:int"],
+            )
+
+        self.assertEqual(result.media_type, "application/vnd.apache.parquet")
+        _, kwargs = self.mock_crud_nodes.export.call_args
+        self.assertEqual(kwargs["kind"], "facts")
+        self.assertEqual(kwargs["facts"], ["os.family", "processorcount"])
+        self.assertEqual(kwargs["user_node_groups"], ["group-a"])
+
+    async def test_export_facts_without_pyarrow(self):
+        with patch.object(arrow, "pyarrow", None):
+            with self.assertRaises(FeatureUnavailable):
+                await self.controller.export_facts(
+                    request=MagicMock(),
+                    export_format="arrow",
+                    columns=["os.family"],
+                )
+
+    async def test_exported_resources_unscoped(self):
+        self.mock_authorize.require_user = AsyncMock()
+        self.mock_authorize.get_user_node_groups = AsyncMock(return_value=None)
+        self.mock_crud_nodes.search = AsyncMock()
+        self.mock_crud_resources.search = AsyncMock()
+
+        await self.controller.exported_resources(
+            request=MagicMock(),
+            resource_type="Nagios_host",
+            resource_title=None,
+            resource_tags=None,
+            disabled=None,
+            environment=None,
+            fact=None,
+        )
+
+        self.mock_crud_nodes.search.assert_not_called()
+        self.assertIsNone(
+            self.mock_crud_resources.search.call_args[1]["user_node_groups"]
         )
-        self.mock_crud_catalog_cache.get_cached_node_ids.assert_not_called()
@@ -28,11 +28,16 @@ class TestApiV1NodesCatalogsReportsUnit(unittest.IsolatedAsyncioTestCase):
         self.mock_crud_nodes.get_placement = AsyncMock(return_value={})
         self.mock_crud_catalogs = MagicMock()
         self.mock_crud_reports = MagicMock()
+        self.mock_crud_migrations = MagicMock()
+        self.mock_crud_migrations.read_placement = AsyncMock(
+            side_effect=lambda node_id, placement: placement
+        )
 
         self.catalogs_controller = ControllerApiV1NodesCatalogs(
             log=self.log,
             authorize=self.mock_authorize,
             crud_nodes=self.mock_crud_nodes,
+            crud_nodes_placement_migrations=self.mock_crud_migrations,
             crud_nodes_catalogs=self.mock_crud_catalogs,
         )
 
@@ -40,6 +45,7 @@ class TestApiV1NodesCatalogsReportsUnit(unittest.IsolatedAsyncioTestCase):
             log=self.log,
             authorize=self.mock_authorize,
             crud_nodes=self.mock_crud_nodes,
+            crud_nodes_placement_migrations=self.mock_crud_migrations,
             crud_nodes_reports=self.mock_crud_reports,
         )
 
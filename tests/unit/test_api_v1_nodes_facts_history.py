@@ -0,0 +1,77 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime
+import logging
+import unittest
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+
+from pyppetdb.controller.api.v1.nodes_facts_history import (
+    ControllerApiV1NodesFactsHistory,
+)
+
+
+class TestApiV1NodesFactsHistoryUnit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.mock_authorize = MagicMock()
+        self.mock_authorize.require_user = AsyncMock()
+        self.mock_authorize.get_user_node_groups = AsyncMock(return_value=["g1"])
+        self.mock_crud_nodes = MagicMock()
+        self.mock_crud_nodes.resource_exists = AsyncMock()
+        self.mock_crud_history = MagicMock()
+        self.controller = ControllerApiV1NodesFactsHistory(
+            log=logging.getLogger("test"),
+            authorize=self.mock_authorize,
+            crud_nodes=self.mock_crud_nodes,
+            crud_nodes_facts_history=self.mock_crud_history,
+        )
+
+    async def test_get_state(self):
+        self.mock_crud_history.get_state = AsyncMock()
+        at = datetime(2026, 3, 1)
+
+        await self.controller.get_state(node_id="node1", request=MagicMock(), at=at)
+
+        self.mock_crud_nodes.resource_exists.assert_awaited_once_with(
+            _id="node1", user_node_groups=["g1"]
+        )
+        self.mock_crud_history.get_state.assert_awaited_once_with(
+            node_id="node1", at=at
+        )
+
+    async def test_search(self):
+        self.mock_crud_history.search = AsyncMock()
+
+        await self.controller.search(
+            request=MagicMock(),
+            node_id="node1",
+            fact="os.family",
+            fields={"id"},
+            sort="id",
+            sort_order="descending",
+            page=0,
+            limit=10,
+        )
+
+        self.mock_crud_nodes.resource_exists.assert_awaited_once()
+        self.mock_crud_history.search.assert_awaited_once_with(
+            node_id="node1",
+            fact="os.family",
+            fields=["id"],
+            sort="id",
+            sort_order="descending",
+            page=0,
+            limit=10,
+        )
@@ -22,6 +22,7 @@ from pyppetdb.authorize import (
     PERM_NODES_GROUPS_GET,
 )
 from pyppetdb.controller.api.v1.nodes_groups import ControllerApiV1NodesGroups
+from pyppetdb.model.nodes_groups import NodeGroupGet
 from pyppetdb.model.nodes_groups import NodeGroupUpdate
 
 
@@ -31,6 +32,9 @@ class TestApiV1NodesGroupsUnit(unittest.IsolatedAsyncioTestCase):
         self.mock_authorize = MagicMock()
         self.mock_crud_nodes = MagicMock()
         self.mock_crud_groups = MagicMock()
+        self.mock_crud_reevaluations = MagicMock()
+        self.mock_crud_reevaluations.schedule = AsyncMock()
+        self.mock_crud_reevaluations.delete = AsyncMock()
         self.mock_crud_teams = MagicMock()
 
         self.controller = ControllerApiV1NodesGroups(
@@ -38,6 +42,7 @@ class TestApiV1NodesGroupsUnit(unittest.IsolatedAsyncioTestCase):
             authorize=self.mock_authorize,
             crud_nodes=self.mock_crud_nodes,
             crud_nodes_groups=self.mock_crud_groups,
+            crud_nodes_groups_reevaluations=self.mock_crud_reevaluations,
             crud_teams=self.mock_crud_teams,
         )
 
@@ -57,10 +62,12 @@ class TestApiV1NodesGroupsUnit(unittest.IsolatedAsyncioTestCase):
         )
         self.controller._upsert_data.assert_called_once()
         self.mock_crud_groups.create.assert_called_once()
+        self.mock_crud_reevaluations.schedule.assert_awaited_once_with(
+            node_group_id="group1"
+        )
 
     async def test_upsert_data_logic(self):
-        # Mocking sub-calls of _upsert_data
-        self.controller.add_nodes_from_filter = AsyncMock()
+        # membership is re-evaluated in the background, not while upserting
         self.mock_crud_teams.resource_exists = AsyncMock()
         self.mock_crud_nodes.update_nodegroup = AsyncMock()
 
@@ -68,9 +75,8 @@ class TestApiV1NodesGroupsUnit(unittest.IsolatedAsyncioTestCase):
 
         await self.controller._upsert_data(node_group_id="group1", data=data)
 
-        self.controller.add_nodes_from_filter.assert_called_once()
         self.mock_crud_teams.resource_exists.assert_called_once_with(_id="team1")
-        self.mock_crud_nodes.update_nodegroup.assert_called_once()
+        self.mock_crud_nodes.update_nodegroup.assert_not_called()
 
     async def test_delete_group(self):
         self.mock_authorize.require_perm = AsyncMock()
@@ -87,6 +93,9 @@ class TestApiV1NodesGroupsUnit(unittest.IsolatedAsyncioTestCase):
             node_group_id="group1"
         )
         self.mock_crud_groups.delete.assert_called_once_with(_id="group1")
+        self.mock_crud_reevaluations.delete.assert_awaited_once_with(
+            node_group_id="group1"
+        )
 
     async def test_get_group(self):
         self.mock_authorize.require_perm = AsyncMock()
@@ -101,6 +110,21 @@ class TestApiV1NodesGroupsUnit(unittest.IsolatedAsyncioTestCase):
         )
         self.mock_crud_groups.get.assert_called_once()
 
+    async def test_get_reevaluation(self):
+        self.mock_authorize.require_perm = AsyncMock()
+        self.mock_crud_reevaluations.get = AsyncMock(return_value="status")
+
+        mock_request = MagicMock()
+        result = await self.controller.get_reevaluation(
+            node_group_id="group1", request=mock_request
+        )
+
+        self.assertEqual(result, "status")
+        self.mock_authorize.require_perm.assert_called_once_with(
+            request=mock_request, permission=PERM_NODES_GROUPS_GET
+        )
+        self.mock_crud_reevaluations.get.assert_awaited_once_with(_id="group1")
+
     async def test_search_groups(self):
         self.mock_authorize.require_perm = AsyncMock()
         self.mock_authorize.get_user_teams = AsyncMock(return_value=[])
@@ -125,7 +149,8 @@ class TestApiV1NodesGroupsUnit(unittest.IsolatedAsyncioTestCase):
 
     async def test_update_group(self):
         self.mock_authorize.require_perm = AsyncMock()
-        self.controller._upsert_data = AsyncMock()
+        self.mock_crud_teams.resource_exists = AsyncMock()
+        self.mock_crud_groups.get = AsyncMock()
         self.mock_crud_groups.update = AsyncMock()
 
         data = NodeGroupUpdate(teams=["team1"])
@@ -137,3 +162,36 @@ class TestApiV1NodesGroupsUnit(unittest.IsolatedAsyncioTestCase):
             request=mock_request, permission=PERM_NODES_GROUPS_UPDATE
         )
         self.mock_crud_groups.update.assert_called_once()
+        # a teams only update leaves membership alone
+        self.mock_crud_groups.get.assert_not_called()
+        self.mock_crud_reevaluations.schedule.assert_not_awaited()
+
+    async def test_update_group_filters(self):
+        self.mock_authorize.require_perm = AsyncMock()
+        self.mock_crud_groups.update = AsyncMock()
+        filters = [{"part": [{"fact": "role", "values": ["web"]}]}]
+        self.mock_crud_groups.get = AsyncMock(
+            return_value=NodeGroupGet(id="group1", filters=filters)
+        )
+
+        await self.controller.update(
+            node_group_id="group1",
+            request=MagicMock(),
+            data=NodeGroupUpdate(filters=filters),
+            fields=set(),
+        )
+        self.mock_crud_groups.get.assert_awaited_once_with(
+            _id="group1", fields=["filters"]
+        )
+        self.mock_crud_reevaluations.schedule.assert_not_awaited()
+
+        filters = [{"part": [{"fact": "role", "values": ["db"]}]}]
+        await self.controller.update(
+            node_group_id="group1",
+            request=MagicMock(),
+            data=NodeGroupUpdate(filters=filters),
+            fields=set(),
+        )
+        self.mock_crud_reevaluations.schedule.assert_awaited_once_with(
+            node_group_id="group1"
+        )
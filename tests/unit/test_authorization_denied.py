@@ -67,6 +67,7 @@ class TestAuthorizationDenied(unittest.IsolatedAsyncioTestCase):
             authorize=self.authorize,
             crud_nodes=crud_nodes,
             crud_nodes_groups=crud_groups,
+            crud_nodes_groups_reevaluations=MagicMock(),
             crud_teams=MagicMock(),
         )
 
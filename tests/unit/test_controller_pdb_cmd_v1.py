@@ -38,10 +38,17 @@ class TestControllerPdbCmdV1Unit(unittest.IsolatedAsyncioTestCase):
         self.mock_catalogs = MagicMock()
         self.mock_groups = MagicMock()
         self.mock_reports = MagicMock()
+        self.mock_rollups = MagicMock()
+        self.mock_rollups.enabled = True
+        self.mock_rollups.record = AsyncMock()
+        self.mock_resources = MagicMock()
+        self.mock_resources.replace = AsyncMock()
         self.mock_auth_cert = MagicMock()
         self.mock_auth_cert.require_cn_trusted = AsyncMock()
 
         self.mock_cache = MagicMock()
+        self.mock_migrations = MagicMock()
+        self.mock_migrations.schedule = AsyncMock()
         self.mock_cache.update_placement = AsyncMock()
         self.mock_catalogs.update_placement = AsyncMock()
         self.mock_reports.update_placement = AsyncMock()
@@ -50,10 +57,13 @@ class TestControllerPdbCmdV1Unit(unittest.IsolatedAsyncioTestCase):
             log=self.log,
             config=self.mock_config,
             crud_nodes=self.mock_nodes,
+            crud_nodes_resources_exported=self.mock_resources,
             crud_nodes_catalog_cache=self.mock_cache,
+            crud_nodes_placement_migrations=self.mock_migrations,
             crud_nodes_catalogs=self.mock_catalogs,
             crud_nodes_groups=self.mock_groups,
             crud_nodes_reports=self.mock_reports,
+            crud_nodes_reports_rollups=self.mock_rollups,
             authorize_client_cert=self.mock_auth_cert,
         )
 
@@ -119,6 +129,12 @@ class TestControllerPdbCmdV1Unit(unittest.IsolatedAsyncioTestCase):
         await asyncio.sleep(0.1)
         self.mock_nodes.update.assert_called_once()
         self.mock_catalogs.create.assert_called_once()
+        self.mock_resources.replace.assert_called_once_with(
+            node_id="node1",
+            environment="prod",
+            catalog_uuid="uuid1",
+            resources=data["resources"],
+        )
 
     async def test_store_report(self):
         mock_request = MagicMock()
@@ -164,6 +180,10 @@ class TestControllerPdbCmdV1Unit(unittest.IsolatedAsyncioTestCase):
         self.mock_nodes.update.assert_called_once()
         self.mock_reports.create.assert_called_once()
         self.mock_catalogs.drop_created_no_report_ttl.assert_called_once()
+        self.mock_rollups.record.assert_awaited_once()
+        kwargs = self.mock_rollups.record.call_args.kwargs
+        self.assertEqual(kwargs["environment"], "prod")
+        self.assertEqual(kwargs["report"]["status"], "changed")
 
     async def test_create_gzip(self):
         mock_request = MagicMock()
@@ -224,18 +244,14 @@ class TestControllerPdbCmdV1Unit(unittest.IsolatedAsyncioTestCase):
 
         await asyncio.sleep(0.1)
         self.mock_nodes.update.assert_called_once()
-        self.mock_reports.update_placement.assert_called_once_with(
-            node_id="node1",
-            placement={"provider": "gcp"},
-        )
-        self.mock_catalogs.update_placement.assert_called_once_with(
-            node_id="node1",
-            placement={"provider": "gcp"},
-        )
-        self.mock_cache.update_placement.assert_called_once_with(
+        self.mock_migrations.schedule.assert_awaited_once_with(
             node_id="node1",
             placement={"provider": "gcp"},
+            placement_old={"provider": "aws"},
         )
+        self.mock_reports.update_placement.assert_not_called()
+        self.mock_catalogs.update_placement.assert_not_called()
+        self.mock_cache.update_placement.assert_not_called()
         # Should not raise
 
     async def test_proxy_to_puppetdb_strips_hop_headers(self):
@@ -15,9 +15,11 @@
 import unittest
 from unittest.mock import PropertyMock
 from unittest.mock import MagicMock, AsyncMock, patch
+import json
 import logging
 import httpx
 from pyppetdb.controller.pdb.query.v4.resources import ControllerPdbQueryV4Resources
+from pyppetdb.errors import InvalidQuery
 
 
 class TestControllerPdbQueryV4ResourcesUnit(unittest.IsolatedAsyncioTestCase):
@@ -25,18 +27,42 @@ class TestControllerPdbQueryV4ResourcesUnit(unittest.IsolatedAsyncioTestCase):
         self.log = logging.getLogger("test")
         self.mock_config = MagicMock()
         self.mock_crud_nodes = MagicMock()
+        self.mock_crud_resources = MagicMock()
+        self.mock_crud_resources.query = AsyncMock(return_value=None)
         self.mock_auth_cert = MagicMock()
         self.mock_auth_cert.require_cn_trusted = AsyncMock()
+        self.mock_pql_engine = MagicMock()
+        self.mock_pql_engine.query = AsyncMock(return_value=[])
 
         self.mock_config.app.puppetdb.serverurl = "http://puppetdb"
         self.mock_config.app.puppetdb.ssl = None
 
         self.controller = ControllerPdbQueryV4Resources(
-            self.log, self.mock_config, self.mock_crud_nodes, self.mock_auth_cert
+            self.log,
+            self.mock_config,
+            self.mock_crud_nodes,
+            self.mock_crud_resources,
+            self.mock_auth_cert,
+            self.mock_pql_engine,
         )
 
+    async def test_get_exported_resources_collection(self):
+        self.mock_config.app.puppetdb.resourceQueryInternal = True
+        mock_request = MagicMock()
+        mock_request.query_params = {"query": '["=", "type", "Nagios_host"]'}
+
+        self.mock_crud_resources.query.return_value = [{"certname": "node1"}]
+
+        result = await self.controller.get(mock_request)
+
+        self.assertEqual(result, [{"certname": "node1"}])
+        self.mock_crud_resources.query.assert_awaited_once_with(
+            ["=", "type", "Nagios_host"]
+        )
+        self.mock_crud_nodes.translate_resource_query.assert_not_called()
+
     async def test_get_local_translation(self):
-        # All queries are now translated locally when resourceQueryInternal is True
+        # fact based queries fall back to the nodes collection
         self.mock_config.app.puppetdb.resourceQueryInternal = True
         mock_request = MagicMock()
         mock_request.query_params = {"query": '["=", "type", "File"]'}
@@ -68,6 +94,36 @@ class TestControllerPdbQueryV4ResourcesUnit(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result, [])
         self.mock_crud_nodes.translate_resource_query.assert_called_once()
 
+    async def test_get_internal_falls_back_to_pql_engine(self):
+        self.mock_config.app.puppetdb.resourceQueryInternal = True
+        mock_request = MagicMock()
+        query = [
+            "extract",
+            ["certname", "title"],
+            ["select_resources", ["=", "type", "Class"]],
+        ]
+        mock_request.query_params = {"query": json.dumps(query)}
+        self.mock_crud_nodes.translate_resource_query.return_value = None
+        self.mock_pql_engine.query.return_value = [{"certname": "node1"}]
+
+        result = await self.controller.get(mock_request)
+
+        self.assertEqual(result, [{"certname": "node1"}])
+        self.mock_pql_engine.query.assert_awaited_once_with(
+            query=query, entity="resources"
+        )
+
+    async def test_get_internal_invalid_pql_query(self):
+        self.mock_config.app.puppetdb.resourceQueryInternal = True
+        mock_request = MagicMock()
+        mock_request.query_params = {"query": '["=", "unsupported", "val"]'}
+        self.mock_crud_nodes.translate_resource_query.return_value = None
+        self.mock_pql_engine.query.side_effect = InvalidQuery("unknown field")
+
+        result = await self.controller.get(mock_request)
+
+        self.assertEqual(result, [])
+
     async def test_get_forward_to_puppetdb(self):
         # When resourceQueryInternal is False, it should forward
         self.mock_config.app.puppetdb.resourceQueryInternal = False
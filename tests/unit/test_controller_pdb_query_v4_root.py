@@ -0,0 +1,107 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import PropertyMock
+from unittest.mock import patch
+
+import httpx
+
+from pyppetdb.controller.pdb.query.v4.root import ControllerPdbQueryV4Root
+from pyppetdb.errors import InvalidQuery
+
+
+class TestControllerPdbQueryV4RootUnit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.mock_config = MagicMock()
+        self.mock_config.app.puppetdb.serverurl = "http://puppetdb"
+        self.mock_config.app.puppetdb.queryInternal = True
+        self.mock_pql_engine = MagicMock()
+        self.mock_pql_engine.query = AsyncMock(return_value=[{"certname": "node1"}])
+        self.mock_auth_cert = MagicMock()
+        self.mock_auth_cert.require_cn_trusted = AsyncMock()
+
+        self.controller = ControllerPdbQueryV4Root(
+            log=logging.getLogger("test"),
+            config=self.mock_config,
+            pql_engine=self.mock_pql_engine,
+            authorize_client_cert=self.mock_auth_cert,
+        )
+
+    async def test_root_query(self):
+        mock_request = MagicMock()
+        mock_request.query_params = {"query": "nodes[certname] {}"}
+
+        result = await self.controller.get_root(mock_request)
+
+        self.assertEqual(result, [{"certname": "node1"}])
+        self.mock_auth_cert.require_cn_trusted.assert_awaited_once_with(mock_request)
+        self.mock_pql_engine.query.assert_awaited_once_with(
+            query="nodes[certname] {}", entity=None
+        )
+
+    async def test_root_query_missing(self):
+        mock_request = MagicMock()
+        mock_request.query_params = {}
+
+        with self.assertRaises(InvalidQuery):
+            await self.controller.get_root(mock_request)
+
+    async def test_entity_without_query(self):
+        mock_request = MagicMock()
+        mock_request.query_params = {}
+
+        await self.controller.get_inventory(mock_request)
+
+        self.mock_pql_engine.query.assert_awaited_once_with(
+            query=["from", "inventory"], entity="inventory"
+        )
+
+    async def test_entity_query(self):
+        mock_request = MagicMock()
+        mock_request.query_params = {"query": '["=", "name", "os"]'}
+
+        await self.controller.get_facts(mock_request)
+
+        self.mock_pql_engine.query.assert_awaited_once_with(
+            query='["=", "name", "os"]', entity="facts"
+        )
+
+    async def test_forward_to_puppetdb(self):
+        self.mock_config.app.puppetdb.queryInternal = False
+        mock_request = MagicMock()
+        mock_request.query_params = {"query": '["=", "certname", "node1"]'}
+        mock_request.headers = {}
+        mock_response = MagicMock()
+        mock_response.json.return_value = [{"certname": "node1"}]
+
+        with patch.object(
+            ControllerPdbQueryV4Root, "http", new_callable=PropertyMock
+        ) as mock_http_prop:
+            mock_http_client = AsyncMock(spec=httpx.AsyncClient)
+            mock_http_client.get.return_value = mock_response
+            mock_http_prop.return_value = mock_http_client
+
+            result = await self.controller.get_nodes(mock_request)
+
+            self.assertEqual(result, [{"certname": "node1"}])
+            mock_http_client.get.assert_called_once_with(
+                url="http://puppetdb/pdb/query/v4/nodes",
+                params=mock_request.query_params,
+                headers=mock_request.headers,
+            )
+        self.mock_pql_engine.query.assert_not_awaited()
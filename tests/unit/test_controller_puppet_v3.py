@@ -43,6 +43,10 @@ class TestControllerPuppetV3Unit(unittest.IsolatedAsyncioTestCase):
         self.mock_crud_catalog_cache = AsyncMock()
         self.mock_crud_nodes = AsyncMock()
         self.mock_crud_nodes.get_placement = AsyncMock(return_value={})
+        self.mock_crud_migrations = MagicMock()
+        self.mock_crud_migrations.read_placement = AsyncMock(
+            side_effect=lambda node_id, placement: placement
+        )
 
         self.mock_config.app.puppet.serverurl = "http://puppetmaster"
         self.mock_config.app.puppet.catalogCache = True
@@ -56,6 +60,7 @@ class TestControllerPuppetV3Unit(unittest.IsolatedAsyncioTestCase):
             authorize_client_cert=self.mock_auth_cert,
             crud_nodes=self.mock_crud_nodes,
             crud_nodes_catalog_cache=self.mock_crud_catalog_cache,
+            crud_nodes_placement_migrations=self.mock_crud_migrations,
         )
         mock_request = MagicMock()
         self.mock_crud_catalog_cache.get.return_value = {
@@ -81,6 +86,7 @@ class TestControllerPuppetV3Unit(unittest.IsolatedAsyncioTestCase):
             authorize_client_cert=self.mock_auth_cert,
             crud_nodes=mock_crud_nodes,
             crud_nodes_catalog_cache=self.mock_crud_catalog_cache,
+            crud_nodes_placement_migrations=self.mock_crud_migrations,
         )
         mock_request = MagicMock()
         mock_request.query_params = {}
@@ -124,6 +130,7 @@ class TestControllerPuppetV3Unit(unittest.IsolatedAsyncioTestCase):
             authorize_client_cert=self.mock_auth_cert,
             crud_nodes=self.mock_crud_nodes,
             crud_nodes_catalog_cache=self.mock_crud_catalog_cache,
+            crud_nodes_placement_migrations=self.mock_crud_migrations,
         )
         mock_request = MagicMock()
         with self.assertRaises(HTTPException) as cm:
@@ -31,6 +31,10 @@ class TestControllerPuppetV3CatalogUnit(unittest.IsolatedAsyncioTestCase):
         self.mock_cache.upsert = AsyncMock()
         self.mock_nodes = AsyncMock()
         self.mock_nodes.get_placement = AsyncMock(return_value={})
+        self.mock_migrations = MagicMock()
+        self.mock_migrations.read_placement = AsyncMock(
+            side_effect=lambda node_id, placement: placement
+        )
         self.mock_auth_cert = MagicMock()
         self.mock_auth_cert.require_cn_trusted = AsyncMock()
         self.mock_auth_cert.require_cn_match = AsyncMock()
@@ -48,6 +52,7 @@ class TestControllerPuppetV3CatalogUnit(unittest.IsolatedAsyncioTestCase):
             self.mock_auth_cert,
             self.mock_nodes,
             self.mock_cache,
+            self.mock_migrations,
         )
 
     async def test_post_cached(self):
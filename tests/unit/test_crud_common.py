@@ -108,6 +108,42 @@ class TestCrudCommon(unittest.IsolatedAsyncioTestCase):
         with self.assertRaises(ResourceNotFound):
             await self.crud._update({"id": "r1"}, {"val": "new"}, fields=[])
 
+    async def test_update_placement_batch(self):
+        cursor = MagicMock()
+        cursor.to_list = AsyncMock(return_value=[{"_id": "a"}, {"_id": "b"}])
+        self.mock_coll.find = MagicMock(return_value=cursor)
+        self.mock_coll.update_many = AsyncMock(
+            return_value=MagicMock(modified_count=2)
+        )
+
+        result = await self.crud._update_placement(
+            query={"node_id": "n1"}, placement={"dc": "b"}, limit=2
+        )
+
+        self.assertEqual(result, 2)
+        self.mock_coll.find.assert_called_once_with(
+            filter={"node_id": "n1", "placement": {"$ne": {"dc": "b"}}},
+            projection={"_id": 1},
+            limit=2,
+        )
+        self.mock_coll.update_many.assert_called_once_with(
+            filter={"_id": {"$in": ["a", "b"]}},
+            update={"$set": {"placement": {"dc": "b"}}},
+        )
+
+    async def test_update_placement_batch_done(self):
+        cursor = MagicMock()
+        cursor.to_list = AsyncMock(return_value=[])
+        self.mock_coll.find = MagicMock(return_value=cursor)
+        self.mock_coll.update_many = AsyncMock()
+
+        result = await self.crud._update_placement(
+            query={"node_id": "n1"}, placement={"dc": "b"}, limit=2
+        )
+
+        self.assertEqual(result, 0)
+        self.mock_coll.update_many.assert_not_called()
+
     async def test_create_ttl_index(self):
         self.mock_coll.list_indexes.return_value.to_list = AsyncMock(return_value=[])
         self.mock_coll.create_index = AsyncMock()
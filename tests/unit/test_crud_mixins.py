@@ -56,6 +56,17 @@ class TestCrudMixinsUnit(unittest.TestCase):
         FilterMixIn._filter_re(query, "id", "node.*", list_filter=["node1"])
         self.assertEqual(query["id"], {"$regex": "node.*", "$in": ["node1"]})
 
+    def test_filter_placement(self):
+        query = {}
+        FilterMixIn._filter_placement(query, {})
+        self.assertEqual(query, {})
+
+        FilterMixIn._filter_placement(query, {"dc": "a"})
+        self.assertEqual(query["placement"], {"dc": "a"})
+
+        FilterMixIn._filter_placement(query, [{"dc": "b"}, {"dc": "a"}])
+        self.assertEqual(query["placement"], {"$in": [{"dc": "b"}, {"dc": "a"}]})
+
     def test_filter_literal(self):
         query = {}
         FilterMixIn._filter_literal(query, "status", "active")
@@ -15,8 +15,13 @@
 import unittest
 from unittest.mock import MagicMock, AsyncMock
 import logging
+
+import pymongo
+
 from pyppetdb.crud.nodes import CrudNodes
 from pyppetdb.crud.nodes import NodePutInternal
+from pyppetdb.errors import QueryParamValidationError
+from datetime import datetime, timedelta, UTC
 
 
 class TestCrudNodesUnit(unittest.IsolatedAsyncioTestCase):
@@ -26,12 +31,20 @@ class TestCrudNodesUnit(unittest.IsolatedAsyncioTestCase):
         self.mock_config = MagicMock()
         # Setup basic config structure if needed
         self.mock_config.app.main.facts.index = []
-        self.crud = CrudNodes(self.log, self.mock_config, self.mock_coll)
+        self.mock_config.app.main.search.cacheSize = 0
+        self.mock_config.app.main.search.cacheTtl = 0
+        self.mock_generation = MagicMock()
+        self.mock_generation.get = AsyncMock(return_value=0)
+        self.mock_generation.bump = AsyncMock()
+        self.crud = CrudNodes(
+            self.log, self.mock_config, self.mock_coll, self.mock_generation
+        )
 
     async def test_delete(self):
         self.crud._delete = AsyncMock()
         await self.crud.delete(_id="node1")
         self.crud._delete.assert_called_once_with(query={"id": "node1"})
+        self.mock_generation.bump.assert_awaited_once()
 
     async def test_delete_node_group_from_all(self):
         self.mock_coll.update_many = AsyncMock()
@@ -49,6 +62,74 @@ class TestCrudNodesUnit(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(query["id"], "node1")
         self.assertEqual(query["node_groups"], {"$in": ["g1"]})
 
+    async def test_get_catalog_cached(self):
+        expires_at = datetime.now(UTC) + timedelta(hours=1)
+        self.crud._get = AsyncMock(
+            return_value={"id": "node1", "catalog_cache_expires_at": expires_at}
+        )
+        result = await self.crud.get(_id="node1", fields=["id", "catalog_cached"])
+        fields = self.crud._get.call_args[1]["fields"]
+        self.assertIn("catalog_cache_expires_at", fields)
+        self.assertTrue(result.catalog_cached)
+        self.assertIsNone(result.catalog_cache_expires_at)
+
+    async def test_get_catalog_cached_expired(self):
+        expires_at = datetime.now(UTC).replace(tzinfo=None) - timedelta(hours=1)
+        self.crud._get = AsyncMock(
+            return_value={"id": "node1", "catalog_cache_expires_at": expires_at}
+        )
+        result = await self.crud.get(
+            _id="node1",
+            fields=["id", "catalog_cached", "catalog_cache_expires_at"],
+        )
+        self.assertFalse(result.catalog_cached)
+        self.assertIsNotNone(result.catalog_cache_expires_at)
+
+    async def test_search_catalog_cached(self):
+        mock_cursor = MagicMock()
+        mock_cursor.to_list = AsyncMock(
+            return_value=[
+                {
+                    "meta_counts": [],
+                    "total_results": [{"count": 1}],
+                    "paginated_results": [{"id": "node1", "catalog_cached": False}],
+                }
+            ]
+        )
+        self.mock_coll.aggregate.return_value = mock_cursor
+
+        result = await self.crud.search(
+            catalog_cached=False,
+            fields=["id", "catalog_cached"],
+            sort="catalog_cache_expires_at",
+            sort_order="ascending",
+        )
+
+        pipeline = self.mock_coll.aggregate.call_args[0][0]
+        match = pipeline[0]["$match"]
+        self.assertIn("$not", match["catalog_cache_expires_at"])
+        self.assertIn("catalog_cached", pipeline[1]["$addFields"])
+        paginated = pipeline[-1]["$facet"]["paginated_results"]
+        self.assertEqual(paginated[0], {"$sort": {"catalog_cache_expires_at": 1}})
+        self.assertFalse(result.result[0].catalog_cached)
+
+    async def test_update_catalog_cache_expires_at(self):
+        self.mock_coll.update_many = AsyncMock()
+        expires_at = datetime.now(UTC)
+        await self.crud.update_catalog_cache_expires_at(["node1"], expires_at)
+        await self.crud.update_catalog_cache_expires_at(["node1"], None)
+        await self.crud.update_catalog_cache_expires_at([], None)
+
+        self.assertEqual(self.mock_coll.update_many.call_count, 2)
+        first, second = self.mock_coll.update_many.call_args_list
+        self.assertEqual(first[1]["filter"], {"id": {"$in": ["node1"]}})
+        self.assertEqual(
+            first[1]["update"], {"$set": {"catalog_cache_expires_at": expires_at}}
+        )
+        self.assertEqual(
+            second[1]["update"], {"$unset": {"catalog_cache_expires_at": ""}}
+        )
+
     async def test_resource_exists(self):
         self.crud._resource_exists = AsyncMock(return_value=MagicMock())
         await self.crud.resource_exists(_id="node1", user_node_groups=["g1"])
@@ -173,11 +254,143 @@ class TestCrudNodesUnit(unittest.IsolatedAsyncioTestCase):
         )
         self.crud._update.assert_called_once()
 
+    async def test_update_upsert_sets_id_trigrams(self):
+        self.crud._update = AsyncMock(return_value={"id": "web01"})
+        await self.crud.update(
+            _id="web01",
+            payload=NodePutInternal(disabled=True),
+            fields=[],
+            upsert=True,
+        )
+        self.assertEqual(
+            self.crud._update.call_args[1]["set_on_insert"],
+            {"id_trigrams": ["b01", "eb0", "web"]},
+        )
+
+    def test_trigrams(self):
+        self.assertEqual(self.crud._trigrams("Web01"), ["b01", "eb0", "web"])
+        self.assertEqual(self.crud._trigrams("ab"), [])
+
+    def test_filter_id(self):
+        query = {}
+        self.crud._filter_id(query, "eb01.exa")
+        self.assertEqual(
+            query,
+            {
+                "id": {"$regex": "eb01.exa"},
+                "id_trigrams": {"$all": ["b01", "eb0", "exa"]},
+            },
+        )
+
+        query = {}
+        self.crud._filter_id(query, "^web")
+        self.assertEqual(query, {"id": {"$regex": "^web"}})
+
+        query = {}
+        self.crud._filter_id(query, "we")
+        self.assertEqual(query, {"id": {"$regex": "we"}})
+
+        query = {}
+        self.crud._filter_id(query, None)
+        self.assertEqual(query, {})
+
+    async def test_migrate_id_trigrams(self):
+        batches = [[{"_id": 1, "id": "web01"}], []]
+        cursor = MagicMock()
+        cursor.to_list = AsyncMock(side_effect=batches)
+        self.mock_coll.count_documents = AsyncMock(return_value=1)
+        self.mock_coll.find = MagicMock(return_value=cursor)
+        self.mock_coll.bulk_write = AsyncMock()
+
+        await self.crud._migrate_id_trigrams()
+
+        requests = self.mock_coll.bulk_write.call_args[0][0]
+        self.assertEqual(requests[0]._filter, {"_id": 1})
+        self.assertEqual(
+            requests[0]._doc, {"$set": {"id_trigrams": ["b01", "eb0", "web"]}}
+        )
+
+    async def test_update_notifies_facts_listeners(self):
+        listener = AsyncMock()
+        self.crud.add_facts_listener(listener, facts=["os.family"])
+        self.mock_coll.find_one_and_update = AsyncMock(
+            return_value={"id": "node1", "facts": {"os": {"family": "Debian"}}}
+        )
+        payload = NodePutInternal(facts={"os": {"family": "RedHat"}})
+        result = await self.crud.update(
+            _id="node1",
+            payload=payload,
+            fields=["id"],
+            upsert=True,
+            return_none=True,
+        )
+
+        self.assertIsNone(result)
+        call_args = self.mock_coll.find_one_and_update.call_args[1]
+        self.assertEqual(call_args["projection"], {"facts.os.family": 1, "id": 1})
+        listener.assert_called_once_with(
+            "node1",
+            {"os": {"family": "Debian"}},
+            {"os": {"family": "RedHat"}},
+        )
+
+    async def test_delete_notifies_facts_listeners(self):
+        listener = AsyncMock()
+        self.crud.add_facts_listener(listener)
+        self.mock_coll.find_one_and_delete = AsyncMock(
+            return_value={"id": "node1", "facts": {"kernel": "Linux"}}
+        )
+        await self.crud.delete(_id="node1")
+        listener.assert_called_once_with("node1", {"kernel": "Linux"}, None)
+
     async def test_update_nodegroup(self):
-        self.mock_coll.update_many = AsyncMock()
-        await self.crud.update_nodegroup(node_group_id="g1", nodes=["node1", "node2"])
-        # Should be called twice: once for $pull (remove others) and once for $addToSet (add these)
-        self.assertEqual(self.mock_coll.update_many.call_count, 2)
+        self.mock_coll.bulk_write = AsyncMock()
+        await self.crud.update_nodegroup(
+            node_group_id="g1", add=["node1"], remove=["node2"]
+        )
+        self.mock_coll.bulk_write.assert_awaited_once_with(
+            [
+                pymongo.UpdateMany(
+                    filter={"id": {"$in": ["node1"]}},
+                    update={"$addToSet": {"node_groups": "g1"}},
+                ),
+                pymongo.UpdateMany(
+                    filter={"id": {"$in": ["node2"]}},
+                    update={"$pull": {"node_groups": "g1"}},
+                ),
+            ],
+            ordered=False,
+        )
+        self.mock_generation.bump.assert_awaited_once()
+
+    async def test_update_nodegroup_unchanged(self):
+        self.mock_coll.bulk_write = AsyncMock()
+        await self.crud.update_nodegroup(node_group_id="g1", add=[], remove=[])
+        self.mock_coll.bulk_write.assert_not_called()
+
+    async def test_node_groups_chunk(self):
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.limit.return_value = cursor
+        cursor.to_list = AsyncMock(return_value=[{"id": "node2"}])
+        self.mock_coll.find.return_value = cursor
+
+        result = await self.crud.node_groups_chunk(
+            after="node1", limit=100, facts=["os", "os.family", "role"]
+        )
+
+        self.assertEqual(result, [{"id": "node2"}])
+        self.mock_coll.find.assert_called_once_with(
+            filter={"id": {"$gt": "node1"}},
+            projection={
+                "_id": 0,
+                "facts.os": 1,
+                "facts.role": 1,
+                "id": 1,
+                "node_groups": 1,
+            },
+        )
+        cursor.limit.assert_called_once_with(100)
 
     async def test_distinct_fact_values(self):
         mock_cursor = MagicMock()
@@ -225,6 +438,149 @@ class TestCrudNodesUnit(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(result.result), 1)
         self.assertEqual(result.result[0].type, "File")
 
+    async def test_export_facts_projection(self):
+        self.mock_config.app.main.export.batchSize = 500
+
+        class _Cursor:
+            def __init__(self, docs):
+                self._docs = docs
+                self.close = AsyncMock()
+
+            def sort(self, *args, **kwargs):
+                return self
+
+            def __aiter__(self):
+                self._iter = iter(self._docs)
+                return self
+
+            async def __anext__(self):
+                try:
+                    return next(self._iter)
+                except StopIteration:
+                    raise StopAsyncIteration
+
+        cursor = _Cursor([{"_id": 1, "id": "node1", "facts": {"os": "linux"}}])
+        self.mock_coll.find.return_value = cursor
+
+        docs = [
+            doc
+            async for doc in self.crud.export(
+                kind="facts", user_node_groups=["g1"], fields=["report"]
+            )
+        ]
+
+        self.assertEqual(docs, [{"id": "node1", "facts": {"os": "linux"}}])
+        call_args = self.mock_coll.find.call_args[1]
+        self.assertEqual(call_args["filter"], {"node_groups": {"$in": ["g1"]}})
+        self.assertEqual(
+            set(call_args["projection"]),
+            {"id", "environment", "change_facts", "facts"},
+        )
+        self.assertEqual(call_args["batch_size"], 500)
+        cursor.close.assert_awaited_once()
+
+    async def test_export_catalogs_projection_and_report_status(self):
+        self.mock_config.app.main.export.batchSize = 500
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.__aiter__.return_value = []
+        cursor.close = AsyncMock()
+        self.mock_coll.find.return_value = cursor
+
+        docs = [
+            doc
+            async for doc in self.crud.export(kind="catalogs", report_status="outdated")
+        ]
+
+        self.assertEqual(docs, [])
+        call_args = self.mock_coll.find.call_args[1]
+        self.assertNotIn("catalog", call_args["projection"])
+        self.assertNotIn("catalog.resources", call_args["projection"])
+        self.assertIn("catalog.resources_exported", call_args["projection"])
+        match = call_args["filter"]["$expr"]["$regexMatch"]
+        self.assertEqual(match["regex"], "outdated")
+        self.assertEqual(match["input"]["$cond"]["then"], "outdated")
+
+    async def test_export_fact_columns_projection(self):
+        self.mock_config.app.main.export.batchSize = 500
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.__aiter__.return_value = []
+        cursor.close = AsyncMock()
+        self.mock_coll.find.return_value = cursor
+
+        docs = [
+            doc
+            async for doc in self.crud.export(
+                kind="facts", facts=["os.family", "os", "processorcount"]
+            )
+        ]
+
+        self.assertEqual(docs, [])
+        self.assertEqual(
+            set(self.mock_coll.find.call_args[1]["projection"]),
+            {"id", "environment", "facts.os", "facts.processorcount"},
+        )
+
+    async def test_group_by(self):
+        self.mock_config.app.main.export.batchSize = 500
+        self.mock_config.app.main.search.groupByTimeout = 30
+        cursor = MagicMock()
+        cursor.__aiter__.return_value = [
+            {"_id": {"g0": "prod", "g1": "Debian", "g2": "changed"}, "count": 3},
+            {"_id": {"g0": "prod", "g2": "failed"}, "count": 1},
+        ]
+        cursor.close = AsyncMock()
+        self.mock_coll.aggregate.return_value = cursor
+
+        rows = [
+            row
+            async for row in self.crud.group_by(
+                group_by=["environment", "facts.os.family", "report_status"],
+                user_node_groups=["g1"],
+                report_status="changed|failed",
+            )
+        ]
+
+        self.assertEqual(
+            rows,
+            [
+                {
+                    "environment": "prod",
+                    "facts.os.family": "Debian",
+                    "report_status": "changed",
+                    "count": 3,
+                },
+                {
+                    "environment": "prod",
+                    "facts.os.family": None,
+                    "report_status": "failed",
+                    "count": 1,
+                },
+            ],
+        )
+        pipeline = self.mock_coll.aggregate.call_args[0][0]
+        kwargs = self.mock_coll.aggregate.call_args[1]
+        self.assertEqual(pipeline[0], {"$match": {"node_groups": {"$in": ["g1"]}}})
+        self.assertIn("report_status_computed", pipeline[1]["$addFields"])
+        self.assertEqual(
+            pipeline[3]["$group"]["_id"],
+            {
+                "g0": "$environment",
+                "g1": "$facts.os.family",
+                "g2": "$report_status_computed",
+            },
+        )
+        self.assertTrue(kwargs["allowDiskUse"])
+        self.assertEqual(kwargs["maxTimeMS"], 30000)
+        cursor.close.assert_awaited_once()
+
+    def test_group_by_invalid_field(self):
+        for field in ("facts", "facts.", "facts.os..family", "facts.$x", "id"):
+            with self.subTest(field=field):
+                with self.assertRaises(QueryParamValidationError):
+                    self.crud.group_by(group_by=[field])
+
     def test_translate_resource_query_basic(self):
         ast = ["and", ["=", "type", "File"], ["=", "exported", True]]
         expected = {"catalog.resources_exported.type": "File"}
@@ -275,3 +631,86 @@ class TestCrudNodesUnit(unittest.IsolatedAsyncioTestCase):
         ast = ["=", "tag", "foo"]
         expected = {"catalog.resources_exported.tags": "foo"}
         self.assertEqual(self.crud.translate_resource_query(ast), expected)
+
+    async def test_node_groups_members(self):
+        cursor = MagicMock()
+        cursor.__aiter__.return_value = [{"_id": "g1", "nodes": ["n1", "n2"]}]
+        self.mock_coll.aggregate = MagicMock(return_value=cursor)
+
+        result = await self.crud.node_groups_members(node_group_ids=["g1", "g2"])
+
+        self.assertEqual(result, {"g1": ["n1", "n2"], "g2": []})
+        pipeline = self.mock_coll.aggregate.call_args[0][0]
+        self.assertEqual(pipeline[0], {"$match": {"node_groups": {"$in": ["g1", "g2"]}}})
+
+    async def test_node_groups_of_nodes(self):
+        self.mock_coll.distinct = AsyncMock(return_value=["g1"])
+
+        result = await self.crud.node_groups_of_nodes(node_id_regex="^web")
+
+        self.assertEqual(result, ["g1"])
+        self.mock_coll.distinct.assert_awaited_once_with(
+            "node_groups", filter={"id": {"$regex": "^web"}}
+        )
+
+
+class TestCrudNodesSearchCacheUnit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.mock_coll = MagicMock()
+        self.mock_config = MagicMock()
+        self.mock_config.app.main.facts.index = []
+        self.mock_config.app.main.search.cacheSize = 10
+        self.mock_config.app.main.search.cacheTtl = 60
+        self.mock_generation = MagicMock()
+        self.mock_generation.get = AsyncMock(return_value=1)
+        self.mock_generation.bump = AsyncMock()
+        self.crud = CrudNodes(
+            logging.getLogger("test"),
+            self.mock_config,
+            self.mock_coll,
+            self.mock_generation,
+        )
+        mock_cursor = MagicMock()
+        mock_cursor.to_list = AsyncMock(
+            return_value=[
+                {
+                    "meta_counts": [],
+                    "total_results": [{"count": 1}],
+                    "paginated_results": [{"id": "node1"}],
+                }
+            ]
+        )
+        self.mock_coll.aggregate.return_value = mock_cursor
+
+    async def test_search_reuses_result(self):
+        facts = ["os:eq:str:linux", "role:eq:str:web"]
+        first = await self.crud.search(fields=["id", "disabled"], fact=set(facts))
+        second = await self.crud.search(
+            fields=["disabled", "id"], fact=set(reversed(facts))
+        )
+
+        self.assertIs(first, second)
+        self.assertEqual(self.mock_coll.aggregate.call_count, 1)
+        self.assertEqual(self.mock_generation.get.await_count, 2)
+
+    async def test_search_different_page(self):
+        await self.crud.search(page=0, limit=10)
+        await self.crud.search(page=1, limit=10)
+
+        self.assertEqual(self.mock_coll.aggregate.call_count, 2)
+
+    async def test_search_generation_changed(self):
+        await self.crud.search(fields=["id"])
+        self.mock_generation.get.return_value = 2
+        await self.crud.search(fields=["id"])
+
+        self.assertEqual(self.mock_coll.aggregate.call_count, 2)
+
+    async def test_update_bumps_generation(self):
+        self.crud._update = AsyncMock(return_value={"id": "node1"})
+
+        await self.crud.update(
+            _id="node1", payload=NodePutInternal(), fields=[], return_none=True
+        )
+
+        self.mock_generation.bump.assert_awaited_once()
@@ -27,11 +27,15 @@ class TestCrudNodesCatalogCacheUnit(unittest.IsolatedAsyncioTestCase):
         self.mock_config.mongodb.placementFacts = []
         self.mock_coll = MagicMock()
         self.mock_protector = MagicMock()
+        self.mock_crud_nodes = MagicMock()
+        self.mock_crud_nodes.update_catalog_cache_expires_at = AsyncMock()
+        self.mock_crud_nodes.backfill_catalog_cache_expires_at = AsyncMock()
         self.crud = CrudNodesCatalogCache(
             config=self.mock_config,
             log=self.log,
             coll=self.mock_coll,
             protector=self.mock_protector,
+            crud_nodes=self.mock_crud_nodes,
         )
 
 
@@ -67,17 +71,39 @@ class TestCrudNodesCatalogCacheUnit(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(call_args["filter"], {"id": "node1"})
         self.assertEqual(call_args["update"]["$set"]["catalog"], "encrypted")
         self.assertEqual(call_args["update"]["$set"]["placement"], {"provider": "aws"})
+        self.mock_crud_nodes.update_catalog_cache_expires_at.assert_awaited_once_with(
+            node_ids=["node1"],
+            expires_at=call_args["update"]["$set"]["ttl"],
+        )
 
-    async def test_get_cached_node_ids(self):
-        mock_cursor = MagicMock()
-        mock_cursor.__aiter__.return_value = [{"id": "n1"}, {"id": "n2"}]
-        self.mock_coll.find.return_value = mock_cursor
-
-        ids = await self.crud.get_cached_node_ids(["n1", "n2", "n3"])
-        self.assertEqual(ids, {"n1", "n2"})
+    async def test_delete(self):
+        self.crud._delete = AsyncMock()
+        await self.crud.delete(node_id="node1", placement={})
+        self.crud._delete.assert_awaited_once_with(query={"id": "node1"})
+        self.mock_crud_nodes.update_catalog_cache_expires_at.assert_awaited_once_with(
+            node_ids=["node1"],
+            expires_at=None,
+        )
 
     async def test_delete_many_by_filter(self):
+        self.mock_coll.distinct = AsyncMock(return_value=["node1", "node2"])
         self.mock_coll.delete_many = AsyncMock(return_value=MagicMock(deleted_count=5))
         count = await self.crud.delete_many_by_filter(node_id="node.*")
         self.assertEqual(count, 5)
         self.mock_coll.delete_many.assert_called_once()
+        self.mock_crud_nodes.update_catalog_cache_expires_at.assert_awaited_once_with(
+            node_ids=["node1", "node2"],
+            expires_at=None,
+        )
+
+    async def test_migrate_catalog_cache_expires_at(self):
+        ttl = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.__aiter__.return_value = [{"id": "node1", "ttl": ttl}]
+        self.mock_coll.find.return_value = mock_cursor
+
+        await self.crud._migrate_catalog_cache_expires_at()
+
+        self.mock_crud_nodes.backfill_catalog_cache_expires_at.assert_awaited_once_with(
+            {"node1": ttl}
+        )
@@ -42,7 +42,7 @@ class TestCrudNodesCatalogsUnit(unittest.IsolatedAsyncioTestCase):
 
         now = datetime.now()
         self.crud._create = AsyncMock(return_value={"id": now})
-        self.mock_redactor.redact.side_effect = lambda x: x
+        self.mock_redactor.redact_async = AsyncMock(side_effect=lambda x: x)
 
         from pyppetdb.model.nodes_catalogs import NodeCatalogPostInternal
 
@@ -52,7 +52,7 @@ class TestCrudNodesCatalogsUnit(unittest.IsolatedAsyncioTestCase):
             _id=now, node_id="node1", payload=payload, fields=[]
         )
         self.assertEqual(result.id, now)
-        self.mock_redactor.redact.assert_called_once()
+        self.mock_redactor.redact_async.assert_awaited_once()
 
     async def test_get(self):
         self.crud._get = AsyncMock(return_value={"id": "cat1", "node_id": "node1"})
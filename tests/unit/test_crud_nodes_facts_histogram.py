@@ -0,0 +1,171 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest.mock import MagicMock, AsyncMock
+import logging
+
+from pyppetdb.crud.nodes_facts_histogram import CrudNodesFactsHistogram
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = list(docs)
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._docs:
+            raise StopAsyncIteration
+        return self._docs.pop(0)
+
+
+class TestCrudNodesFactsHistogramUnit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.log = logging.getLogger("test")
+        self.mock_coll = MagicMock()
+        self.mock_coll.bulk_write = AsyncMock()
+        self.mock_config = MagicMock()
+        self.mock_config.app.main.facts.histogram = ["os.family", "kernel"]
+        self.crud_nodes = MagicMock()
+        self.crud_pyppetdb_nodes = MagicMock()
+        self.crud = CrudNodesFactsHistogram(
+            config=self.mock_config,
+            log=self.log,
+            coll=self.mock_coll,
+            crud_nodes=self.crud_nodes,
+            crud_pyppetdb_nodes=self.crud_pyppetdb_nodes,
+        )
+
+    async def test_rebuild_overwrites_counts(self):
+        self.crud_nodes.coll.aggregate = MagicMock(
+            return_value=_Cursor(
+                [{"_id": "Debian", "count": 3}, {"_id": "RedHat", "count": 5}]
+            )
+        )
+
+        await self.crud.rebuild(fact="os.family")
+
+        requests = self.mock_coll.bulk_write.call_args[0][0]
+        self.assertEqual(len(requests), 3)
+        self.assertEqual(
+            requests[0]._filter, {"fact": "os.family", "value": "Debian"}
+        )
+        self.assertEqual(requests[0]._doc, {"$set": {"count": 3}})
+        self.assertTrue(requests[0]._upsert)
+        self.assertEqual(
+            requests[2]._filter,
+            {
+                "fact": "os.family",
+                "value": {"$nin": ["Debian", "RedHat"]},
+                "built": {"$exists": False},
+            },
+        )
+
+    async def test_create_index_builds_new_facts_only(self):
+        self.mock_coll.create_indexes = AsyncMock()
+        self.mock_coll.delete_many = AsyncMock()
+        self.mock_coll.update_one = AsyncMock(
+            side_effect=[
+                MagicMock(upserted_id=None),
+                MagicMock(upserted_id="new"),
+            ]
+        )
+        self.crud.rebuild = AsyncMock()
+
+        await self.crud._create_index()
+
+        self.mock_coll.delete_many.assert_awaited_once_with(
+            filter={"fact": {"$nin": ["os.family", "kernel"]}}
+        )
+        self.crud.rebuild.assert_awaited_once_with(fact="kernel")
+
+    async def test_update_facts_moves_count(self):
+        await self.crud.update_facts(
+            node_id="node1",
+            old_facts={"os": {"family": "Debian"}, "kernel": "Linux"},
+            new_facts={"os": {"family": "RedHat"}, "kernel": "Linux"},
+        )
+
+        requests = self.mock_coll.bulk_write.call_args[0][0]
+        self.assertEqual(len(requests), 3)
+        self.assertEqual(
+            requests[0]._filter, {"fact": "os.family", "value": "Debian"}
+        )
+        self.assertEqual(requests[0]._doc, {"$inc": {"count": -1}})
+        self.assertEqual(
+            requests[1]._filter,
+            {"fact": "os.family", "value": "Debian", "count": {"$lte": 0}},
+        )
+        self.assertEqual(
+            requests[2]._filter, {"fact": "os.family", "value": "RedHat"}
+        )
+        self.assertEqual(requests[2]._doc, {"$inc": {"count": 1}})
+        self.assertTrue(requests[2]._upsert)
+
+    async def test_update_facts_new_node(self):
+        await self.crud.update_facts(
+            node_id="node1",
+            old_facts=None,
+            new_facts={"os": {"family": "RedHat"}, "kernel": {"nested": 1}},
+        )
+
+        requests = self.mock_coll.bulk_write.call_args[0][0]
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(
+            requests[0]._filter, {"fact": "os.family", "value": "RedHat"}
+        )
+
+    async def test_update_facts_unchanged(self):
+        facts = {"os": {"family": "RedHat"}, "kernel": "Linux"}
+        await self.crud.update_facts(
+            node_id="node1", old_facts=facts, new_facts=facts
+        )
+        self.mock_coll.bulk_write.assert_not_called()
+
+    async def test_update_facts_deleted_node(self):
+        await self.crud.update_facts(
+            node_id="node1",
+            old_facts={"kernel": "Linux"},
+            new_facts=None,
+        )
+
+        requests = self.mock_coll.bulk_write.call_args[0][0]
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(requests[0]._filter, {"fact": "kernel", "value": "Linux"})
+
+    async def test_distinct_fact_values(self):
+        self.mock_coll.find = MagicMock(
+            return_value=_Cursor(
+                [{"value": "Debian", "count": 3}, {"value": "RedHat", "count": 5}]
+            )
+        )
+
+        result = await self.crud.distinct_fact_values(fact_id="os.family")
+
+        self.assertEqual(result.meta.result_size, 2)
+        self.assertEqual(result.result[1].value, "RedHat")
+        self.assertEqual(result.result[1].count, 5)
+
+    async def test_distinct_fact_values_untracked(self):
+        result = await self.crud.distinct_fact_values(fact_id="memory")
+        self.assertIsNone(result)
+
+
+if __name__ == "__main__":
+    unittest.main()
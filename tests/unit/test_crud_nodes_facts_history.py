@@ -0,0 +1,165 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime
+import logging
+import unittest
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+
+from pyppetdb.crud.nodes_facts_history import CrudNodesFactsHistory
+from pyppetdb.errors import ResourceNotFound
+
+
+class TestCrudNodesFactsHistoryUnit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.mock_coll = MagicMock()
+        self.mock_coll.insert_one = AsyncMock()
+        self.mock_coll.delete_many = AsyncMock()
+        self.mock_config = MagicMock()
+        self.mock_config.app.main.storeHistory.factsExclude = ["uptime", "memory.free"]
+        self.mock_config.app.main.storeHistory.factsKeyframeInterval = 3
+        self.crud = CrudNodesFactsHistory(
+            config=self.mock_config,
+            log=logging.getLogger("test"),
+            coll=self.mock_coll,
+        )
+
+    def _latest(self, facts, since_keyframe=0):
+        stripped = self.crud._strip(facts)
+        return {"since_keyframe": since_keyframe, "digest": self.crud._digest(stripped)}
+
+    def test_strip(self):
+        facts = {"uptime": "1 day", "memory": {"free": 1, "total": 2}, "os": "linux"}
+        self.assertEqual(
+            self.crud._strip(facts), {"memory": {"total": 2}, "os": "linux"}
+        )
+        self.assertIn("uptime", facts)
+
+    async def test_first_entry_is_keyframe(self):
+        self.mock_coll.find_one = AsyncMock(return_value=None)
+
+        await self.crud.update_facts("node1", None, {"os": "linux", "uptime": "1"})
+
+        doc = self.mock_coll.insert_one.call_args[0][0]
+        self.assertTrue(doc["keyframe"])
+        self.assertEqual(doc["facts"], {"os": "linux"})
+        self.assertEqual(doc["patch"], [])
+        self.assertEqual(doc["node_id"], "node1")
+
+    async def test_delta(self):
+        old = {"os": "linux", "kernel": "6.1", "uptime": "1"}
+        new = {"os": "linux", "kernel": "6.2", "uptime": "2"}
+        self.mock_coll.find_one = AsyncMock(return_value=self._latest(old))
+
+        await self.crud.update_facts("node1", old, new)
+
+        doc = self.mock_coll.insert_one.call_args[0][0]
+        self.assertFalse(doc["keyframe"])
+        self.assertNotIn("facts", doc)
+        self.assertEqual(doc["since_keyframe"], 1)
+        self.assertEqual(
+            doc["patch"], [{"op": "replace", "path": "/kernel", "value": "6.2"}]
+        )
+
+    async def test_volatile_change_is_skipped(self):
+        old = {"os": "linux", "uptime": "1"}
+        self.mock_coll.find_one = AsyncMock(return_value=self._latest(old))
+
+        await self.crud.update_facts("node1", old, {"os": "linux", "uptime": "2"})
+
+        self.mock_coll.insert_one.assert_not_called()
+
+    async def test_keyframe_interval(self):
+        old = {"kernel": "6.1"}
+        self.mock_coll.find_one = AsyncMock(return_value=self._latest(old, 2))
+
+        await self.crud.update_facts("node1", old, {"kernel": "6.2"})
+
+        doc = self.mock_coll.insert_one.call_args[0][0]
+        self.assertTrue(doc["keyframe"])
+        self.assertEqual(doc["since_keyframe"], 0)
+        self.assertEqual(doc["facts"], {"kernel": "6.2"})
+        self.assertEqual(len(doc["patch"]), 1)
+
+    async def test_broken_chain_writes_keyframe(self):
+        self.mock_coll.find_one = AsyncMock(
+            return_value=self._latest({"kernel": "5.10"})
+        )
+
+        await self.crud.update_facts("node1", {"kernel": "6.1"}, {"kernel": "6.1"})
+
+        doc = self.mock_coll.insert_one.call_args[0][0]
+        self.assertTrue(doc["keyframe"])
+        self.assertEqual(doc["patch"], [])
+
+    async def test_node_deleted(self):
+        await self.crud.update_facts("node1", {"kernel": "6.1"}, None)
+
+        self.mock_coll.delete_many.assert_awaited_once_with(
+            filter={"node_id": "node1"}
+        )
+        self.mock_coll.insert_one.assert_not_called()
+
+    async def test_get_state(self):
+        at = datetime(2026, 3, 1)
+        self.mock_coll.find_one = AsyncMock(
+            return_value={"id": datetime(2026, 1, 1), "facts": {"kernel": "6.1"}}
+        )
+        cursor = MagicMock()
+        cursor.__aiter__.return_value = [
+            {
+                "id": datetime(2026, 2, 1),
+                "patch": [{"op": "replace", "path": "/kernel", "value": "6.2"}],
+            },
+            {
+                "id": datetime(2026, 2, 2),
+                "patch": [{"op": "add", "path": "/os", "value": "linux"}],
+            },
+        ]
+        self.mock_coll.find.return_value = cursor
+
+        state = await self.crud.get_state(node_id="node1", at=at)
+
+        self.assertEqual(state.facts, {"kernel": "6.2", "os": "linux"})
+        self.assertEqual(state.id, datetime(2026, 2, 2))
+        keyframe_query = self.mock_coll.find_one.call_args[1]["filter"]
+        self.assertEqual(
+            keyframe_query,
+            {"node_id": "node1", "id": {"$lte": at}, "keyframe": True},
+        )
+        query = self.mock_coll.find.call_args[1]["filter"]
+        self.assertEqual(
+            query,
+            {"node_id": "node1", "id": {"$lte": at, "$gt": datetime(2026, 1, 1)}},
+        )
+
+    async def test_get_state_without_keyframe(self):
+        self.mock_coll.find_one = AsyncMock(return_value=None)
+
+        with self.assertRaises(ResourceNotFound):
+            await self.crud.get_state(node_id="node1")
+
+    async def test_search_by_fact(self):
+        self.crud._search = AsyncMock(
+            return_value={"result": [], "meta": {"result_size": 0}}
+        )
+
+        await self.crud.search(node_id="node1", fact="os.family")
+
+        query = self.crud._search.call_args[1]["query"]
+        self.assertEqual(
+            query,
+            {"node_id": "node1", "patch.path": {"$regex": "^/os/family(/|$)"}},
+        )
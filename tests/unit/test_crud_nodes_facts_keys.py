@@ -0,0 +1,196 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest.mock import MagicMock, AsyncMock
+import logging
+
+import pymongo
+
+from pyppetdb.crud.nodes_facts_keys import CrudNodesFactsKeys
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = list(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._docs:
+            raise StopAsyncIteration
+        return self._docs.pop(0)
+
+
+class TestCrudNodesFactsKeysUnit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.log = logging.getLogger("test")
+        self.mock_coll = MagicMock()
+        self.mock_coll.bulk_write = AsyncMock()
+        self.mock_config = MagicMock()
+        self.mock_config.app.main.facts.keys.enable = True
+        self.mock_config.app.main.facts.keys.maxDepth = 2
+        self.mock_config.app.main.facts.keys.samples = 3
+        self.crud_nodes = MagicMock()
+        self.crud = CrudNodesFactsKeys(
+            config=self.mock_config,
+            log=self.log,
+            coll=self.mock_coll,
+            crud_nodes=self.crud_nodes,
+            crud_pyppetdb_nodes=MagicMock(),
+        )
+
+    def test_keys(self):
+        keys = self.crud._keys(
+            {
+                "os": {"family": "Debian", "release": {"major": "12"}},
+                "is_virtual": True,
+                "processorcount": 4,
+                "uptime_hours": 1.5,
+                "ips": ["10.0.0.1"],
+                "empty": {},
+                "nothing": None,
+            }
+        )
+
+        self.assertEqual(
+            set(keys),
+            {
+                ("os.family", "str"),
+                ("os.release", "dict"),
+                ("is_virtual", "bool"),
+                ("processorcount", "int"),
+                ("uptime_hours", "float"),
+                ("ips", "list"),
+                ("empty", "dict"),
+                ("nothing", "null"),
+            },
+        )
+
+    async def test_update_facts_diffs_key_sets(self):
+        await self.crud.update_facts(
+            node_id="node1",
+            old_facts={"os": {"family": "Debian"}, "kernel": "Linux", "a": 1},
+            new_facts={"os": {"family": "RedHat"}, "kernel": "Linux", "a": "1"},
+        )
+
+        requests = self.mock_coll.bulk_write.call_args[0][0]
+        self.assertEqual(
+            requests,
+            [
+                pymongo.UpdateOne(
+                    filter={"path": "a", "type": "int"},
+                    update={"$inc": {"count": -1}},
+                ),
+                pymongo.DeleteOne(
+                    filter={"path": "a", "type": "int", "count": {"$lte": 0}}
+                ),
+                pymongo.UpdateOne(
+                    filter={"path": "a", "type": "str"},
+                    update={"$inc": {"count": 1}},
+                    upsert=True,
+                ),
+                pymongo.UpdateOne(
+                    filter={
+                        "path": "a",
+                        "type": "str",
+                        "samples.2": {"$exists": False},
+                    },
+                    update={"$addToSet": {"samples": "1"}},
+                ),
+            ],
+        )
+
+    async def test_update_facts_unchanged_keys(self):
+        await self.crud.update_facts(
+            node_id="node1",
+            old_facts={"os": {"family": "Debian"}},
+            new_facts={"os": {"family": "RedHat"}},
+        )
+
+        self.mock_coll.bulk_write.assert_not_called()
+
+    async def test_update_facts_node_deleted(self):
+        await self.crud.update_facts(
+            node_id="node1",
+            old_facts={"ips": ["10.0.0.1"]},
+            new_facts=None,
+        )
+
+        requests = self.mock_coll.bulk_write.call_args[0][0]
+        self.assertEqual(len(requests), 2)
+        self.assertIsInstance(requests[1], pymongo.DeleteOne)
+
+    async def test_rebuild(self):
+        self.mock_coll.find = MagicMock(
+            return_value=_Cursor(
+                [{"path": "kernel", "type": "str"}, {"path": "gone", "type": "int"}]
+            )
+        )
+        self.crud_nodes.coll.find.return_value = _Cursor(
+            [
+                {"facts": {"kernel": "Linux", "ips": ["a"]}},
+                {"facts": {"kernel": "Linux"}},
+                {"facts": {"kernel": "Darwin"}},
+            ]
+        )
+
+        await self.crud.rebuild()
+
+        requests = self.mock_coll.bulk_write.call_args[0][0]
+        self.assertIn(
+            pymongo.UpdateOne(
+                filter={"path": "kernel", "type": "str"},
+                update={"$set": {"count": 3, "samples": ["Linux", "Darwin"]}},
+                upsert=True,
+            ),
+            requests,
+        )
+        self.assertIn(
+            pymongo.UpdateOne(
+                filter={"path": "ips", "type": "list"},
+                update={"$set": {"count": 1, "samples": []}},
+                upsert=True,
+            ),
+            requests,
+        )
+        self.assertIn(
+            pymongo.DeleteOne(filter={"path": "gone", "type": "int"}), requests
+        )
+        self.assertEqual(len(requests), 3)
+
+    async def test_create_index_builds_once(self):
+        self.mock_coll.create_indexes = AsyncMock()
+        self.mock_coll.update_one = AsyncMock(
+            return_value=MagicMock(upserted_id=None)
+        )
+        self.crud.rebuild = AsyncMock()
+
+        await self.crud._create_index()
+
+        self.crud.rebuild.assert_not_called()
+
+    async def test_search(self):
+        self.crud._search = AsyncMock(
+            return_value={"result": [], "meta": {"result_size": 0}}
+        )
+
+        await self.crud.search(prefix="os.", _type="str")
+
+        query = self.crud._search.call_args[1]["query"]
+        self.assertEqual(
+            query,
+            {"count": {"$gt": 0}, "path": {"$regex": "^os\\."}, "type": "str"},
+        )
@@ -0,0 +1,166 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from unittest.mock import MagicMock, AsyncMock
+import logging
+
+from pyppetdb.config import ConfigAppFactsIndexAdvisor
+from pyppetdb.crud.nodes_facts_queries import CrudNodesFactsQueries
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = list(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._docs:
+            raise StopAsyncIteration
+        return self._docs.pop(0)
+
+
+class TestCrudNodesFactsQueriesUnit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.log = logging.getLogger("test")
+        self.mock_coll = MagicMock()
+        self.mock_config = MagicMock()
+        self.mock_config.app.main.port = 8000
+        self.mock_config.app.main.facts.indexAdvisor = ConfigAppFactsIndexAdvisor(
+            minQueries=2,
+            maxIndexes=1,
+        )
+        self.crud_nodes = MagicMock()
+        self.crud = CrudNodesFactsQueries(
+            config=self.mock_config,
+            log=self.log,
+            coll=self.mock_coll,
+            crud_nodes=self.crud_nodes,
+            crud_pyppetdb_nodes=MagicMock(),
+        )
+
+    def test_extract_fact_predicates(self):
+        query = {
+            "node_groups": {"$in": ["g1"]},
+            "facts.os.family": "RedHat",
+            "$or": [
+                {"facts.kernel": {"$regex": "^Li", "$options": "i"}},
+                {"facts.memory": {"$gt": 4, "$lt": 8}},
+            ],
+        }
+        result = sorted(self.crud._extract_fact_predicates(query))
+        self.assertEqual(
+            result,
+            [
+                ("kernel", "regex"),
+                ("memory", "gt"),
+                ("memory", "lt"),
+                ("os.family", "eq"),
+            ],
+        )
+
+    async def test_record_and_flush(self):
+        self.mock_coll.bulk_write = AsyncMock()
+        self.crud.record({"facts.kernel": {"$eq": "Linux"}}, 10.0)
+        self.crud.record({"facts.kernel": {"$eq": "Linux"}}, 30.0)
+        self.crud.record({"id": {"$regex": "node"}}, 5.0)
+        await self.crud.flush()
+
+        requests = self.mock_coll.bulk_write.call_args[0][0]
+        self.assertEqual(len(requests), 1)
+        update = requests[0]._doc
+        self.assertEqual(update["$inc"], {"count": 2, "duration_ms_total": 40.0})
+        self.assertEqual(update["$max"], {"duration_ms_max": 30.0})
+        self.assertEqual(self.crud._pending, {})
+
+        self.mock_coll.bulk_write.reset_mock()
+        await self.crud.flush()
+        self.mock_coll.bulk_write.assert_not_called()
+
+    async def test_get_advice(self):
+        now = datetime.now(tz=timezone.utc)
+        stale = now - timedelta(days=30)
+        self.mock_coll.aggregate.return_value.to_list = AsyncMock(
+            return_value=[
+                {
+                    "_id": "kernel",
+                    "operators": ["eq"],
+                    "count": 10,
+                    "duration_ms_total": 100.0,
+                    "duration_ms_max": 20.0,
+                    "last_seen": now,
+                },
+                {
+                    "_id": "memory",
+                    "operators": ["gt"],
+                    "count": 5,
+                    "duration_ms_total": 5.0,
+                    "duration_ms_max": 1.0,
+                    "last_seen": now,
+                },
+                {
+                    "_id": "uptime",
+                    "operators": ["lt"],
+                    "count": 50,
+                    "duration_ms_total": 50.0,
+                    "duration_ms_max": 1.0,
+                    "last_seen": stale,
+                },
+                {
+                    "_id": "os.family",
+                    "operators": ["eq"],
+                    "count": 1,
+                    "duration_ms_total": 1.0,
+                    "duration_ms_max": 1.0,
+                    "last_seen": now,
+                },
+            ]
+        )
+        self.crud_nodes.coll.list_indexes = MagicMock(
+            return_value=_Cursor(
+                [
+                    {"name": "_id_", "key": {"_id": 1}},
+                    {
+                        "name": "idx_fact_auto_uptime",
+                        "key": {"facts.uptime": 1, "node_groups": 1},
+                    },
+                    {
+                        "name": "idx_fact_auto_unused",
+                        "key": {"facts.unused": 1, "node_groups": 1},
+                    },
+                ]
+            )
+        )
+        self.mock_config.app.main.facts.indexAdvisor.maxIndexes = 3
+
+        advice = await self.crud.get_advice()
+        by_fact = {item.fact: item for item in advice.result}
+
+        self.assertEqual(by_fact["kernel"].suggestion, "create")
+        self.assertEqual(by_fact["kernel"].duration_ms_avg, 10.0)
+        self.assertIsNone(by_fact["memory"].suggestion)
+        self.assertEqual(by_fact["uptime"].suggestion, "drop")
+        self.assertTrue(by_fact["uptime"].managed)
+        self.assertIsNone(by_fact["os.family"].suggestion)
+        self.assertEqual(by_fact["unused"].suggestion, "drop")
+        self.assertEqual(advice.meta.result_size, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
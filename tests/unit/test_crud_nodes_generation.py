@@ -0,0 +1,50 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+
+from pyppetdb.crud.nodes_generation import CrudNodesGeneration
+
+
+class TestCrudNodesGenerationUnit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.mock_coll = MagicMock()
+        self.crud = CrudNodesGeneration(
+            config=MagicMock(),
+            log=logging.getLogger("test"),
+            coll=self.mock_coll,
+        )
+
+    async def test_get(self):
+        self.mock_coll.find_one = AsyncMock(return_value={"generation": 4})
+        self.assertEqual(await self.crud.get(), 4)
+        self.assertEqual(
+            self.mock_coll.find_one.call_args.kwargs["filter"], {"id": "nodes"}
+        )
+
+    async def test_get_missing(self):
+        self.mock_coll.find_one = AsyncMock(return_value=None)
+        self.assertEqual(await self.crud.get(), 0)
+
+    async def test_bump(self):
+        self.mock_coll.update_one = AsyncMock()
+        await self.crud.bump()
+        self.mock_coll.update_one.assert_awaited_once_with(
+            filter={"id": "nodes"},
+            update={"$inc": {"generation": 1}},
+            upsert=True,
+        )
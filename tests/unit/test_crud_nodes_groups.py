@@ -16,6 +16,10 @@ import unittest
 from unittest.mock import MagicMock, AsyncMock, patch
 import logging
 from pyppetdb.crud.nodes_groups import CrudNodesGroups, NodeGroupUpdateInternal
+from pyppetdb.crud.nodes_groups import CrudNodesGroupsMatcher
+from pyppetdb.model.nodes_groups import NodeGroupFilterRule
+from pyppetdb.model.nodes_groups import NodeGroupFilterRulePart
+from pyppetdb.model.nodes_groups import NodeGroupGet
 
 
 class TestCrudNodesGroupsUnit(unittest.IsolatedAsyncioTestCase):
@@ -29,7 +33,11 @@ class TestCrudNodesGroupsUnit(unittest.IsolatedAsyncioTestCase):
         ) as mock_cache_class:
             self.mock_cache = mock_cache_class.return_value
             self.mock_cache.cache = {}
-            self.crud = CrudNodesGroups(self.mock_config, self.log, self.mock_coll)
+            self.mock_crud_nodes = MagicMock()
+            self.mock_crud_nodes.node_groups_members = AsyncMock(return_value={})
+            self.crud = CrudNodesGroups(
+                self.mock_config, self.log, self.mock_coll, self.mock_crud_nodes
+            )
 
     async def test_create(self):
         self.crud._create = AsyncMock(return_value={"id": "g1"})
@@ -42,11 +50,6 @@ class TestCrudNodesGroupsUnit(unittest.IsolatedAsyncioTestCase):
         await self.crud.delete(_id="g1")
         self.crud._delete.assert_called_once_with(query={"id": "g1"})
 
-    async def test_delete_node_from_nodes_groups(self):
-        self.mock_coll.update_many = AsyncMock()
-        await self.crud.delete_node_from_nodes_groups(node_id="n1")
-        self.mock_coll.update_many.assert_called_once()
-
     async def test_delete_team_from_nodes_groups(self):
         self.mock_coll.update_many = AsyncMock()
         await self.crud.delete_team_from_nodes_groups(team_id="t1")
@@ -69,6 +72,69 @@ class TestCrudNodesGroupsUnit(unittest.IsolatedAsyncioTestCase):
         await self.crud.search(_id="g1")
         self.crud._search.assert_called_once()
 
+    async def test_get_adds_nodes(self):
+        self.crud._get = AsyncMock(return_value={"id": "g1"})
+        self.mock_crud_nodes.node_groups_members = AsyncMock(
+            return_value={"g1": ["n1", "n2"]}
+        )
+
+        result = await self.crud.get(_id="g1", fields=["nodes"])
+
+        self.assertEqual(result.nodes, ["n1", "n2"])
+        self.assertIsNone(result.id)
+        self.assertEqual(
+            self.crud._get.call_args[1]["fields"], ["nodes", "id"]
+        )
+
+    async def test_get_without_nodes(self):
+        self.crud._get = AsyncMock(return_value={"id": "g1"})
+        self.mock_crud_nodes.node_groups_members = AsyncMock()
+
+        await self.crud.get(_id="g1", fields=["id", "teams"])
+
+        self.mock_crud_nodes.node_groups_members.assert_not_called()
+
+    async def test_search_by_nodes(self):
+        self.crud._search = AsyncMock(
+            return_value={
+                "result": [{"id": "g1"}, {"id": "g2"}],
+                "meta": {"result_size": 2},
+            }
+        )
+        self.mock_crud_nodes.node_groups_of_nodes = AsyncMock(
+            return_value=["g1", "g2"]
+        )
+        self.mock_crud_nodes.node_groups_members = AsyncMock(
+            return_value={"g1": ["web1"], "g2": []}
+        )
+
+        result = await self.crud.search(nodes="^web", fields=["id", "nodes"])
+
+        self.mock_crud_nodes.node_groups_of_nodes.assert_awaited_once_with(
+            node_id_regex="^web"
+        )
+        query = self.crud._search.call_args[1]["query"]
+        self.assertEqual(query, {"id": {"$in": ["g1", "g2"]}})
+        self.assertEqual(result.result[0].nodes, ["web1"])
+        self.assertEqual(result.result[1].nodes, [])
+
+    async def test_migrate_nodes_membership(self):
+        self.mock_coll.update_many = AsyncMock(
+            return_value=MagicMock(modified_count=2)
+        )
+        self.mock_coll.index_information = AsyncMock(
+            return_value={"idx_id": {}, "idx_nodes": {}}
+        )
+        self.mock_coll.drop_index = AsyncMock()
+
+        await self.crud._migrate_nodes_membership()
+
+        self.mock_coll.update_many.assert_awaited_once_with(
+            filter={"nodes": {"$exists": True}},
+            update={"$unset": {"nodes": ""}},
+        )
+        self.mock_coll.drop_index.assert_awaited_once_with("idx_nodes")
+
     async def test_search_scopes_by_teams(self):
         self.crud._search = AsyncMock(
             return_value={"result": [], "meta": {"result_size": 0}}
@@ -100,7 +166,7 @@ class TestCrudNodesGroupsUnit(unittest.IsolatedAsyncioTestCase):
                 )
             ],
         )
-        self.mock_cache.cache = {"doc1": group1}
+        self.mock_cache.matcher = CrudNodesGroupsMatcher(groups=[group1])
 
         facts = PuppetDBFacts(
             certname="node1",
@@ -117,37 +183,85 @@ class TestCrudNodesGroupsUnit(unittest.IsolatedAsyncioTestCase):
         )
 
         self.assertEqual(matched_groups, ["g1"])
-        self.mock_coll.bulk_write.assert_called_once()
+        self.mock_coll.bulk_write.assert_not_called()
 
-    def test_evaluate_filter_part(self):
-        from pyppetdb.model.nodes_groups import NodeGroupFilterRulePart
 
-        part = NodeGroupFilterRulePart(fact="os.family", values=["RedHat", "CentOS"])
+def _group(_id, *rules):
+    return NodeGroupGet(
+        id=_id,
+        filters=[
+            NodeGroupFilterRule(
+                part=[
+                    NodeGroupFilterRulePart(fact=fact, values=values)
+                    for fact, values in rule
+                ]
+            )
+            for rule in rules
+        ],
+    )
 
-        self.assertTrue(
-            self.crud._evaluate_filter_part(part, {"os": {"family": "RedHat"}})
-        )
-        self.assertFalse(
-            self.crud._evaluate_filter_part(part, {"os": {"family": "Debian"}})
+
+class TestCrudNodesGroupsMatcherUnit(unittest.TestCase):
+    def test_match(self):
+        matcher = CrudNodesGroupsMatcher(
+            groups=[
+                _group("debian", [("os.family", ["Debian"])]),
+                _group(
+                    "prod_web",
+                    [("stage", ["prod"]), ("role", ["web", "proxy"])],
+                ),
+                _group(
+                    "prod_or_db",
+                    [("stage", ["prod"])],
+                    [("role", ["db"])],
+                ),
+                _group("all", []),
+                NodeGroupGet(id="empty", filters=[]),
+                NodeGroupGet(id="none"),
+            ]
         )
-        self.assertFalse(self.crud._evaluate_filter_part(part, {"other": "val"}))
 
-    def test_compile_filters_from_node_group(self):
-        from pyppetdb.model.nodes_groups import (
-            NodeGroupGet,
-            NodeGroupFilterRule,
-            NodeGroupFilterRulePart,
+        self.assertEqual(
+            matcher.match(
+                {"os": {"family": "Debian"}, "stage": "prod", "role": "proxy"}
+            ),
+            ["all", "debian", "prod_or_db", "prod_web"],
         )
+        self.assertEqual(
+            matcher.match({"stage": "dev", "role": "db"}), ["all", "prod_or_db"]
+        )
+        self.assertEqual(matcher.match({"os": "Debian"}), ["all"])
 
-        group = NodeGroupGet(
-            filters=[
-                NodeGroupFilterRule(
-                    part=[NodeGroupFilterRulePart(fact="f1", values=["v1"])]
-                )
+    def test_match_requires_all_parts(self):
+        matcher = CrudNodesGroupsMatcher(
+            groups=[
+                _group("g1", [("role", ["web"]), ("role", ["web", "db"])]),
+                _group("g2", [("role", ["db"]), ("stage", ["prod"])]),
             ]
         )
-        res = self.crud.compile_filters_from_node_group(group)
-        self.assertIn("$or", res)
+
+        self.assertEqual(matcher.match({"role": "web"}), ["g1"])
+        self.assertEqual(matcher.match({"role": "db"}), [])
+
+    def test_match_only_strings(self):
+        matcher = CrudNodesGroupsMatcher(
+            groups=[_group("g1", [("count", ["4"])])],
+        )
+
+        self.assertEqual(matcher.match({"count": 4}), [])
+        self.assertEqual(matcher.match({"count": ["4"]}), [])
+        self.assertEqual(matcher.match({"count": "4"}), ["g1"])
+
+    def test_match_missing_path(self):
+        matcher = CrudNodesGroupsMatcher(
+            groups=[_group("g1", [("os.name", ["Debian", "Ubuntu"])])],
+        )
+
+        self.assertEqual(matcher.match({"os": {"name": "Ubuntu"}}), ["g1"])
+        self.assertEqual(matcher.match({"os": {"name": "CentOS"}}), [])
+        self.assertEqual(matcher.match({"os": {"other": "Debian"}}), [])
+        self.assertEqual(matcher.match({"other": "value"}), [])
+        self.assertEqual(matcher.match({"os": "Debian"}), [])
 
 
 class TestCrudNodesGroupsCacheUnit(unittest.IsolatedAsyncioTestCase):
@@ -168,6 +282,28 @@ class TestCrudNodesGroupsCacheUnit(unittest.IsolatedAsyncioTestCase):
         self.assertIn("doc1", self.cache.cache)
         self.assertEqual(self.cache.cache["doc1"].id, "g1")
 
+    async def test_handle_change_resets_matcher(self):
+        self.cache.cache["doc1"] = _group("g1", [("role", ["web"])])
+        self.assertEqual(self.cache.matcher.match({"role": "db"}), [])
+
+        change = {
+            "operationType": "update",
+            "documentKey": {"_id": "doc1"},
+            "fullDocument": {
+                "id": "g1",
+                "filters": [{"part": [{"fact": "role", "values": ["db"]}]}],
+            },
+        }
+        await self.cache._handle_change(change)
+
+        self.assertEqual(self.cache.matcher.match({"role": "db"}), ["g1"])
+
+        await self.cache._handle_change(
+            {"operationType": "delete", "documentKey": {"_id": "doc1"}}
+        )
+
+        self.assertEqual(self.cache.matcher.match({"role": "db"}), [])
+
     async def test_load_initial_data(self):
         mock_cursor = MagicMock()
         mock_cursor.__aiter__.return_value = iter([{"_id": "d1", "id": "g1"}])
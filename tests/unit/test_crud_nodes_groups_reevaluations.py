@@ -0,0 +1,162 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest.mock import MagicMock, AsyncMock
+import logging
+
+from bson.objectid import ObjectId
+
+from pyppetdb.config import ConfigAppNodesGroups
+from pyppetdb.crud.nodes_groups_reevaluations import CrudNodesGroupsReevaluations
+from pyppetdb.errors import ResourceNotFound
+from pyppetdb.model.nodes_groups import NodeGroupGet
+
+
+class TestCrudNodesGroupsReevaluationsUnit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.log = logging.getLogger("test")
+        self.mock_coll = MagicMock()
+        self.mock_coll.update_one = AsyncMock(
+            return_value=MagicMock(matched_count=1)
+        )
+        self.mock_coll.delete_many = AsyncMock()
+        self.mock_config = MagicMock()
+        self.mock_config.app.main.port = 8000
+        self.crud_pyppetdb_nodes = MagicMock()
+        self.crud_pyppetdb_nodes.get_leader = AsyncMock(return_value="me:8000")
+        self.mock_config.app.main.nodesGroups = ConfigAppNodesGroups(
+            reevaluationBatchSize=2
+        )
+        self.crud_nodes = MagicMock()
+        self.crud_nodes.count = AsyncMock(return_value=3)
+        self.crud_nodes.update_nodegroup = AsyncMock()
+        self.crud_nodes_groups = MagicMock()
+        self.crud_nodes_groups.get = AsyncMock(
+            return_value=NodeGroupGet(
+                id="web",
+                filters=[{"part": [{"fact": "role", "values": ["web"]}]}],
+            )
+        )
+        self.crud = CrudNodesGroupsReevaluations(
+            config=self.mock_config,
+            log=self.log,
+            coll=self.mock_coll,
+            crud_nodes=self.crud_nodes,
+            crud_nodes_groups=self.crud_nodes_groups,
+            crud_pyppetdb_nodes=self.crud_pyppetdb_nodes,
+        )
+        self.crud._instance_id = "me:8000"
+
+    @staticmethod
+    def _node(_id, role, node_groups=None):
+        return {"id": _id, "facts": {"role": role}, "node_groups": node_groups}
+
+    async def test_schedule_resets_progress(self):
+        await self.crud.schedule(node_group_id="web")
+
+        kwargs = self.mock_coll.update_one.call_args.kwargs
+        self.assertEqual(kwargs["filter"], {"id": "web"})
+        self.assertTrue(kwargs["upsert"])
+        update = kwargs["update"]["$set"]
+        self.assertEqual(update["status"], "pending")
+        self.assertIsNone(update["last_node_id"])
+        self.assertEqual(update["processed"], 0)
+        self.assertIsInstance(update["run"], ObjectId)
+
+    async def test_reevaluate_in_chunks(self):
+        run = {"id": "web", "run": ObjectId(), "status": "pending"}
+        self.crud_nodes.node_groups_chunk = AsyncMock(
+            side_effect=[
+                [self._node("a", "web"), self._node("b", "db", ["web"])],
+                [self._node("c", "web", ["web"])],
+            ]
+        )
+
+        await self.crud.reevaluate(run=run)
+
+        self.crud_nodes.node_groups_chunk.assert_any_await(
+            after=None, limit=2, facts=["role"]
+        )
+        self.crud_nodes.node_groups_chunk.assert_any_await(
+            after="b", limit=2, facts=["role"]
+        )
+        self.crud_nodes.update_nodegroup.assert_any_await(
+            node_group_id="web", add=["a"], remove=["b"]
+        )
+        self.crud_nodes.update_nodegroup.assert_any_await(
+            node_group_id="web", add=[], remove=[]
+        )
+        calls = self.mock_coll.update_one.call_args_list
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(calls[0].kwargs["update"]["$set"]["total"], 3)
+        first = calls[1].kwargs["update"]
+        self.assertEqual(first["$set"], {"last_node_id": "b"})
+        self.assertEqual(first["$inc"], {"processed": 2, "added": 1, "removed": 1})
+        last = calls[2].kwargs["update"]
+        self.assertEqual(last["$set"]["status"], "done")
+        self.assertEqual(last["$set"]["last_node_id"], "c")
+        for call in calls:
+            self.assertEqual(
+                call.kwargs["filter"],
+                {"id": "web", "run": run["run"], "owner": "me:8000"},
+            )
+
+    async def test_reevaluate_resumes_from_checkpoint(self):
+        run = {"id": "web", "run": ObjectId(), "status": "running"}
+        run["last_node_id"] = "b"
+        self.crud_nodes.node_groups_chunk = AsyncMock(return_value=[])
+
+        await self.crud.reevaluate(run=run)
+
+        self.crud_nodes.count.assert_not_awaited()
+        self.crud_nodes.node_groups_chunk.assert_awaited_once_with(
+            after="b", limit=2, facts=["role"]
+        )
+        update = self.mock_coll.update_one.call_args.kwargs["update"]
+        self.assertEqual(update["$set"]["status"], "done")
+        self.assertEqual(update["$set"]["last_node_id"], "b")
+
+    async def test_reevaluate_superseded_run_stops(self):
+        run = {"id": "web", "run": ObjectId(), "status": "running"}
+        self.mock_coll.update_one.return_value = MagicMock(matched_count=0)
+        self.crud_nodes.node_groups_chunk = AsyncMock(
+            return_value=[self._node("a", "web"), self._node("b", "web")]
+        )
+
+        await self.crud.reevaluate(run=run)
+
+        self.crud_nodes.node_groups_chunk.assert_awaited_once()
+        self.mock_coll.update_one.assert_awaited_once()
+
+    async def test_reevaluate_stops_without_leadership(self):
+        run = {"id": "web", "run": ObjectId(), "status": "running"}
+        self.crud_pyppetdb_nodes.get_leader.side_effect = ["me:8000", "other:8000"]
+        self.crud_nodes.node_groups_chunk = AsyncMock(
+            return_value=[self._node("a", "web"), self._node("b", "web")]
+        )
+
+        await self.crud.reevaluate(run=run)
+
+        self.crud_nodes.node_groups_chunk.assert_awaited_once()
+        self.mock_coll.update_one.assert_awaited_once()
+
+    async def test_reevaluate_deleted_group(self):
+        self.crud_nodes_groups.get.side_effect = ResourceNotFound
+        self.crud_nodes.node_groups_chunk = AsyncMock()
+
+        await self.crud.reevaluate(run={"id": "web", "run": ObjectId()})
+
+        self.mock_coll.delete_many.assert_awaited_once_with(filter={"id": "web"})
+        self.crud_nodes.node_groups_chunk.assert_not_called()
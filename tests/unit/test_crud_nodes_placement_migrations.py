@@ -0,0 +1,238 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest.mock import MagicMock, AsyncMock, patch
+import logging
+
+from bson.objectid import ObjectId
+
+from pyppetdb.config import ConfigAppPlacementMigration
+from pyppetdb.crud.nodes_placement_migrations import CrudNodesPlacementMigrations
+
+
+class TestCrudNodesPlacementMigrationsUnit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.log = logging.getLogger("test")
+        self.mock_coll = MagicMock()
+        self.mock_coll.update_one = AsyncMock(
+            return_value=MagicMock(matched_count=1)
+        )
+        self.mock_coll.delete_many = AsyncMock()
+        self.mock_config = MagicMock()
+        self.mock_config.app.main.port = 8000
+        self.crud_pyppetdb_nodes = MagicMock()
+        self.crud_pyppetdb_nodes.get_leader = AsyncMock(return_value="me:8000")
+        self.mock_config.app.main.placementMigration = ConfigAppPlacementMigration(
+            batchSize=2, rate=0
+        )
+        self.mock_config.mongodb.placementFacts = ["dc"]
+        self.crud_cache = MagicMock()
+        self.crud_cache.update_placement = AsyncMock(return_value=0)
+        self.crud_catalogs = MagicMock()
+        self.crud_catalogs.update_placement = AsyncMock(return_value=0)
+        self.crud_reports = MagicMock()
+        self.crud_reports.update_placement = AsyncMock(return_value=0)
+        self.crud = CrudNodesPlacementMigrations(
+            config=self.mock_config,
+            log=self.log,
+            coll=self.mock_coll,
+            crud_nodes_catalog_cache=self.crud_cache,
+            crud_nodes_catalogs=self.crud_catalogs,
+            crud_nodes_reports=self.crud_reports,
+            crud_pyppetdb_nodes=self.crud_pyppetdb_nodes,
+        )
+        self.crud._instance_id = "me:8000"
+
+    @staticmethod
+    def _run(status="pending"):
+        return {
+            "id": "node1",
+            "run": ObjectId(),
+            "status": status,
+            "placement": {"dc": "b"},
+        }
+
+    async def test_schedule_resets_progress(self):
+        await self.crud.schedule(
+            node_id="node1", placement={"dc": "b"}, placement_old={"dc": "a"}
+        )
+
+        kwargs = self.mock_coll.update_one.call_args.kwargs
+        self.assertEqual(kwargs["filter"], {"id": "node1"})
+        self.assertTrue(kwargs["upsert"])
+        update = kwargs["update"]
+        self.assertEqual(update["$set"]["status"], "pending")
+        self.assertEqual(update["$set"]["placement"], {"dc": "b"})
+        self.assertEqual(
+            update["$set"]["migrated"],
+            {"nodes_catalog_cache": 0, "nodes_catalogs": 0, "nodes_reports": 0},
+        )
+        self.assertIsInstance(update["$set"]["run"], ObjectId)
+        self.assertEqual(update["$addToSet"], {"placements_old": {"dc": "a"}})
+
+    async def test_read_placement_without_placement_facts(self):
+        self.mock_config.mongodb.placementFacts = []
+        self.mock_coll.find_one = AsyncMock()
+
+        result = await self.crud.read_placement(node_id="node1", placement={})
+
+        self.assertEqual(result, {})
+        self.mock_coll.find_one.assert_not_called()
+
+    async def test_read_placement_settled(self):
+        self.mock_coll.find_one = AsyncMock(return_value=None)
+
+        result = await self.crud.read_placement(
+            node_id="node1", placement={"dc": "b"}
+        )
+
+        self.assertEqual(result, {"dc": "b"})
+        self.assertEqual(
+            self.mock_coll.find_one.call_args.kwargs["filter"],
+            {"id": "node1", "status": {"$in": ["pending", "running"]}},
+        )
+
+    async def test_read_placement_in_flight(self):
+        self.mock_coll.find_one = AsyncMock(
+            return_value={
+                "placement": {"dc": "b"},
+                "placements_old": [{"dc": "a"}, {"dc": "b"}, {"dc": "c"}],
+            }
+        )
+
+        result = await self.crud.read_placement(
+            node_id="node1", placement={"dc": "b"}
+        )
+
+        self.assertEqual(result, [{"dc": "b"}, {"dc": "a"}, {"dc": "c"}])
+
+    async def test_migrate_in_batches(self):
+        self.crud_cache.update_placement.side_effect = [1, 0]
+        self.crud_reports.update_placement.side_effect = [2, 2, 1, 0]
+        run = self._run()
+
+        await self.crud.migrate(run=run)
+
+        self.crud_reports.update_placement.assert_called_with(
+            node_id="node1", placement={"dc": "b"}, limit=2
+        )
+        self.assertEqual(self.crud_catalogs.update_placement.call_count, 1)
+        updates = [c.kwargs["update"] for c in self.mock_coll.update_one.call_args_list]
+        self.assertEqual(updates[0]["$set"]["status"], "running")
+        self.assertEqual(
+            [u["$inc"] for u in updates if "$inc" in u],
+            [
+                {"migrated.nodes_catalog_cache": 1},
+                {"migrated.nodes_reports": 2},
+                {"migrated.nodes_reports": 2},
+                {"migrated.nodes_reports": 1},
+            ],
+        )
+        self.assertEqual(updates[-1]["$set"]["status"], "done")
+        self.assertEqual(updates[-1]["$set"]["placements_old"], [])
+        for call in self.mock_coll.update_one.call_args_list:
+            self.assertEqual(
+                call.kwargs["filter"],
+                {"id": "node1", "run": run["run"], "owner": "me:8000"},
+            )
+
+    async def test_migrate_throttles_writes(self):
+        self.mock_config.app.main.placementMigration.rate = 4
+        self.crud_catalogs.update_placement.side_effect = [2, 1, 0]
+
+        with patch(
+            "pyppetdb.crud.nodes_placement_migrations.asyncio.sleep",
+            new=AsyncMock(),
+        ) as mock_sleep:
+            await self.crud.migrate(run=self._run(status="running"))
+
+        self.assertEqual(
+            [c.args[0] for c in mock_sleep.await_args_list], [0.5, 0.25]
+        )
+
+    async def test_migrate_superseded(self):
+        self.mock_coll.update_one.return_value = MagicMock(matched_count=0)
+
+        await self.crud.migrate(run=self._run())
+
+        self.assertEqual(self.mock_coll.update_one.call_count, 1)
+        self.crud_cache.update_placement.assert_not_called()
+
+    async def test_migrate_superseded_mid_batch(self):
+        self.crud_cache.update_placement.side_effect = [2, 2]
+        self.mock_coll.update_one.return_value = MagicMock(matched_count=0)
+
+        await self.crud.migrate(run=self._run(status="running"))
+
+        self.assertEqual(self.crud_cache.update_placement.call_count, 1)
+        self.crud_catalogs.update_placement.assert_not_called()
+
+    async def test_migrate_stops_without_leadership(self):
+        self.crud_cache.update_placement.side_effect = [2, 2]
+        self.crud_pyppetdb_nodes.get_leader.side_effect = ["me:8000", "other:8000"]
+
+        await self.crud.migrate(run=self._run(status="running"))
+
+        self.assertEqual(self.crud_cache.update_placement.call_count, 1)
+        self.assertEqual(self.mock_coll.update_one.call_count, 1)
+
+    async def test_run_pending(self):
+        runs = [self._run(), self._run(status="running")]
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.to_list = AsyncMock(return_value=runs)
+        self.mock_coll.find = MagicMock(return_value=cursor)
+        self.crud.migrate = AsyncMock()
+
+        await self.crud.run_pending()
+
+        self.assertEqual(
+            self.mock_coll.find.call_args.kwargs["filter"],
+            {"status": {"$in": ["pending", "running"]}},
+        )
+        self.assertEqual(self.crud.migrate.await_count, 2)
+        claim = self.mock_coll.update_one.call_args_list[0].kwargs
+        self.assertEqual(claim["filter"], {"id": "node1", "run": runs[0]["run"]})
+        self.assertEqual(claim["update"], {"$set": {"owner": "me:8000"}})
+
+    async def test_run_pending_skips_superseded_claim(self):
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.to_list = AsyncMock(return_value=[self._run()])
+        self.mock_coll.find = MagicMock(return_value=cursor)
+        self.mock_coll.update_one.return_value = MagicMock(matched_count=0)
+        self.crud.migrate = AsyncMock()
+
+        await self.crud.run_pending()
+
+        self.crud.migrate.assert_not_called()
+
+    async def test_delete(self):
+        await self.crud.delete(node_id="node1")
+        self.mock_coll.delete_many.assert_called_once_with(filter={"id": "node1"})
+
+    async def test_search(self):
+        self.crud._search = AsyncMock(
+            return_value={"result": [], "meta": {"result_size": 0}}
+        )
+        await self.crud.search(status="running", fields=["id"], limit=10)
+        self.crud._search.assert_called_once_with(
+            query={"status": "running"},
+            fields=["id"],
+            sort=None,
+            sort_order=None,
+            page=None,
+            limit=10,
+        )
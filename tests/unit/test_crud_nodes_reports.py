@@ -13,10 +13,14 @@
 # limitations under the License.
 
 import unittest
-from unittest.mock import MagicMock, AsyncMock
+from unittest.mock import MagicMock, AsyncMock, patch
 import logging
 from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
 from pyppetdb.crud.nodes_reports import CrudNodesReports
+from pyppetdb.model.nodes_reports import NodeReportPostInternal
+from pyppetdb.errors import ResourceNotFound
 
 
 class TestCrudNodesReportsUnit(unittest.IsolatedAsyncioTestCase):
@@ -24,6 +28,7 @@ class TestCrudNodesReportsUnit(unittest.IsolatedAsyncioTestCase):
         self.log = logging.getLogger("test")
         self.mock_coll = MagicMock()
         self.mock_config = MagicMock()
+        self.mock_config.app.main.storeHistory.reportsBucket = None
         self.mock_redactor = MagicMock()
         self.crud = CrudNodesReports(
             self.mock_config, self.log, self.mock_coll, self.mock_redactor
@@ -50,7 +55,7 @@ class TestCrudNodesReportsUnit(unittest.IsolatedAsyncioTestCase):
     async def test_create(self):
         now = datetime.now()
         self.crud._create = AsyncMock(return_value={"id": now})
-        self.mock_redactor.redact.side_effect = lambda x: x
+        self.mock_redactor.redact_async = AsyncMock(side_effect=lambda x: x)
 
         from pyppetdb.model.nodes_reports import NodeReportPostInternal
 
@@ -60,7 +65,29 @@ class TestCrudNodesReportsUnit(unittest.IsolatedAsyncioTestCase):
             _id=now, node_id="node1", payload=payload, fields=[]
         )
         self.assertEqual(result.id, now)
-        self.mock_redactor.redact.assert_called_once()
+        self.mock_redactor.redact_async.assert_awaited_once()
+
+    async def test_update_placement(self):
+        self.crud._update_placement = AsyncMock(return_value=5)
+        result = await self.crud.update_placement(
+            node_id="node1", placement={"dc": "b"}, limit=10
+        )
+        self.assertEqual(result, 5)
+        self.crud._update_placement.assert_called_once_with(
+            query={"node_id": "node1"}, placement={"dc": "b"}, limit=10
+        )
+
+    async def test_search_in_flight_placement(self):
+        self.crud._search = AsyncMock(
+            return_value={"result": [], "meta": {"result_size": 0}}
+        )
+        await self.crud.search(
+            node_id="node1", placement=[{"dc": "b"}, {"dc": "a"}]
+        )
+        self.assertEqual(
+            self.crud._search.call_args.kwargs["query"],
+            {"node_id": "node1", "placement": {"$in": [{"dc": "b"}, {"dc": "a"}]}},
+        )
 
     async def test_get(self):
         now = datetime.now()
@@ -92,3 +119,278 @@ class TestCrudNodesReportsUnit(unittest.IsolatedAsyncioTestCase):
             placement={},
         )
         self.crud._search.assert_called_once()
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+        self._skip = 0
+        self._limit = None
+        self.sorted_by = None
+
+    def sort(self, sort):
+        self.sorted_by = sort
+        return self
+
+    def skip(self, skip):
+        self._skip = skip
+        return self
+
+    def limit(self, limit):
+        self._limit = limit
+        return self
+
+    async def to_list(self, length):
+        docs = self._docs[self._skip :]
+        return docs if self._limit is None else docs[: self._limit]
+
+
+class _AsyncIter:
+    def __init__(self, docs):
+        self._docs = list(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._docs:
+            raise StopAsyncIteration
+        return self._docs.pop(0)
+
+
+class TestCrudNodesReportsBucketsUnit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.log = logging.getLogger("test")
+        self.colls = {}
+        self.mock_db = MagicMock()
+        self.mock_db.__getitem__.side_effect = self._coll
+        self.mock_db.drop_collection = AsyncMock()
+        self.mock_config = MagicMock()
+        self.mock_config.app.main.storeHistory.reportsBucket = "day"
+        self.mock_config.app.main.storeHistory.ttl = 86400 * 7
+        self.mock_redactor = MagicMock()
+        self.mock_redactor.redact_async = AsyncMock(side_effect=lambda x: x)
+        self.count_pipelines = []
+        self.crud = CrudNodesReports(
+            self.mock_config,
+            self.log,
+            self._coll("nodes_reports"),
+            self.mock_redactor,
+        )
+        self.current = f"nodes_reports_{datetime.now(timezone.utc):%Y%m%d}"
+
+    def _coll(self, name, docs=()):
+        if name not in self.colls:
+            coll = MagicMock()
+            coll.name = name
+            coll.database = self.mock_db
+            coll.create_indexes = AsyncMock()
+            coll.insert_one = AsyncMock()
+            coll.find_one = AsyncMock(return_value=None)
+            coll.aggregate = MagicMock(
+                side_effect=lambda pipeline, name=name: self._count_buckets(
+                    name, pipeline
+                )
+            )
+            coll.docs = []
+            self.colls[name] = coll
+        coll = self.colls[name]
+        if docs:
+            coll.docs = list(docs)
+            coll.find.return_value = _Cursor(list(docs))
+        return coll
+
+    def _count_buckets(self, first, pipeline):
+        # the leading stages count the collection the pipeline runs on
+        self.count_pipelines.append(pipeline)
+        counts = []
+        for stage in pipeline:
+            if "$unionWith" in stage:
+                name = stage["$unionWith"]["coll"]
+                index = stage["$unionWith"]["pipeline"][2]["$addFields"]["bucket"]
+            elif "$addFields" in stage:
+                name = first
+                index = stage["$addFields"]["bucket"]
+            else:
+                continue
+            count = len(self._coll(name).docs)
+            if count:
+                counts.append({"count": count, "bucket": index})
+        return _AsyncIter(counts)
+
+    def _buckets(self, *names):
+        self.mock_db.list_collection_names = AsyncMock(
+            return_value=["nodes_reports", "nodes_reports_hiera", *names]
+        )
+
+    async def test_update_placement_one_bucket_per_batch(self):
+        newest, older, legacy = MagicMock(), MagicMock(), MagicMock()
+        newest._update_placement = AsyncMock(return_value=0)
+        older._update_placement = AsyncMock(return_value=3)
+        legacy._update_placement = AsyncMock(return_value=4)
+        self.crud._read_cruds = AsyncMock(return_value=[newest, older, legacy])
+
+        result = await self.crud.update_placement(
+            node_id="node1", placement={"dc": "b"}, limit=10
+        )
+
+        self.assertEqual(result, 3)
+        legacy._update_placement.assert_not_called()
+
+    def test_bucket_name(self):
+        ts = datetime(2026, 3, 4, 23, 30, tzinfo=timezone(timedelta(hours=-2)))
+        self.assertEqual(self.crud._bucket_name(ts), "nodes_reports_20260305")
+        self.mock_config.app.main.storeHistory.reportsBucket = "hour"
+        self.assertEqual(self.crud._bucket_name(ts), "nodes_reports_2026030501")
+        self.assertIsNone(self.crud._bucket_range("nodes_reports_hiera"))
+
+    async def test_create_writes_to_bucket(self):
+        from pyppetdb.model.nodes_reports import NodeReportPostInternal
+
+        payload = NodeReportPostInternal(report={"status": "changed"})
+        for _ in range(2):
+            await self.crud.create(
+                _id=datetime(2026, 3, 4, 10),
+                node_id="node1",
+                payload=payload,
+                fields=[],
+                return_none=True,
+            )
+
+        bucket = self.colls["nodes_reports_20260304"]
+        self.assertEqual(bucket.insert_one.await_count, 2)
+        self.assertEqual(bucket.create_indexes.await_count, len(self.crud._indices))
+        self.colls["nodes_reports"].insert_one.assert_not_called()
+
+    async def test_get_routes_by_time_and_falls_back(self):
+        self._buckets("nodes_reports_20260304", "nodes_reports_20260305")
+        ts = datetime(2026, 3, 4, 10)
+        self.colls["nodes_reports"].find_one.return_value = {"id": ts}
+
+        result = await self.crud.get(_id=ts, node_id="node1", placement={}, fields=[])
+
+        self.assertEqual(result.id, ts)
+        self._coll("nodes_reports_20260304").find_one.assert_awaited_once()
+        self._coll("nodes_reports_20260305").find_one.assert_not_called()
+
+    async def test_get_not_found(self):
+        self._buckets()
+        with self.assertRaises(ResourceNotFound):
+            await self.crud.get(
+                _id=datetime(2026, 3, 4), node_id="node1", placement={}, fields=[]
+            )
+
+    async def test_search_pages_across_buckets(self):
+        reports = [
+            {"id": datetime(2026, 3, day, hour, tzinfo=timezone.utc)}
+            for day, hour in [(5, 9), (5, 8), (4, 7), (4, 6), (4, 5), (3, 4)]
+        ]
+        self._buckets("nodes_reports_20260305", "nodes_reports_20260304")
+        self._coll("nodes_reports_20260305", reports[:2])
+        self._coll("nodes_reports_20260304", reports[2:5])
+        self._coll("nodes_reports", reports[5:])
+
+        result = await self.crud.search(
+            node_id="node1",
+            placement={},
+            sort="id",
+            sort_order="descending",
+            page=1,
+            limit=2,
+        )
+
+        self.assertEqual([r.id for r in result.result], [r["id"] for r in reports[2:4]])
+        self.assertEqual(result.meta.result_size, 6)
+        self._coll("nodes_reports").find.assert_not_called()
+        self.assertEqual(len(self.count_pipelines), 1)
+
+    async def test_count_buckets_chunks_unions(self):
+        cruds = [self.crud._bucket_crud(f"nodes_reports_{i}") for i in range(3)]
+        self._coll("nodes_reports_0", [{}, {}])
+        self._coll("nodes_reports_2", [{}])
+
+        with patch("pyppetdb.crud.nodes_reports.BUCKET_UNION_CHUNK", 2):
+            counts = await self.crud._count_buckets(cruds=cruds, query={})
+
+        self.assertEqual(counts, [2, 0, 1])
+        self.assertEqual(len(self.count_pipelines), 2)
+        self.assertEqual(
+            self.count_pipelines[0][3]["$unionWith"]["coll"], "nodes_reports_1"
+        )
+
+    async def test_search_union_merges_chunks(self):
+        cruds = []
+        for index in range(501):
+            crud = MagicMock()
+            crud.resource_type = f"nodes_reports_{index}"
+            cruds.append(crud)
+        # the first chunk holds 500 buckets, the second one the last bucket
+        first = [
+            {"id": datetime(2026, 3, 4, 1), "_sort": "unchanged"},
+            {"id": datetime(2026, 3, 4, 2), "_sort": "failed"},
+        ]
+        second = [
+            {"id": datetime(2026, 3, 4, 3), "_sort": "changed"},
+            {"id": datetime(2026, 3, 4, 4)},
+        ]
+        cruds[0].coll.aggregate.return_value.to_list = AsyncMock(return_value=first)
+        cruds[500].coll.aggregate.return_value.to_list = AsyncMock(
+            return_value=second
+        )
+        self.crud._count_buckets = AsyncMock(return_value=[1] * 501)
+
+        result = await self.crud._search_union(
+            cruds=cruds,
+            query={"node_id": "node1"},
+            fields=["id", "report"],
+            sort="report.status",
+            sort_order="ascending",
+            page=1,
+            limit=2,
+        )
+
+        pipeline = cruds[0].coll.aggregate.call_args[0][0]
+        self.assertEqual(
+            len([stage for stage in pipeline if "$unionWith" in stage]), 499
+        )
+        self.assertIn({"$limit": 4}, pipeline)
+        pipeline = cruds[500].coll.aggregate.call_args[0][0]
+        self.assertNotIn("$unionWith", str(pipeline))
+        self.assertEqual(
+            [doc["id"] for doc in result["result"]],
+            [datetime(2026, 3, 4, 2), datetime(2026, 3, 4, 1)],
+        )
+        self.assertNotIn("_sort", result["result"][0])
+        self.assertEqual(result["meta"]["result_size"], 501)
+
+    async def test_bucket_names_cached(self):
+        self._buckets("nodes_reports_20260304")
+
+        first = await self.crud._bucket_names()
+        await self.crud.create(
+            _id=datetime(2026, 3, 5, 10),
+            node_id="node1",
+            payload=NodeReportPostInternal(report={"status": "changed"}),
+            fields=[],
+            return_none=True,
+        )
+        second = await self.crud._bucket_names()
+
+        self.assertEqual(first, ["nodes_reports_20260304", self.current])
+        self.assertEqual(
+            second,
+            ["nodes_reports_20260304", "nodes_reports_20260305", self.current],
+        )
+        self.mock_db.list_collection_names.assert_awaited_once()
+
+    async def test_expire_buckets(self):
+        now = datetime.now(timezone.utc)
+        old = f"nodes_reports_{(now - timedelta(days=9)):%Y%m%d}"
+        recent = f"nodes_reports_{(now - timedelta(days=1)):%Y%m%d}"
+        hourly = f"nodes_reports_{(now - timedelta(days=8)):%Y%m%d%H}"
+        self._buckets(recent, old, hourly)
+
+        await self.crud.expire_buckets()
+
+        dropped = [c.args[0] for c in self.mock_db.drop_collection.await_args_list]
+        self.assertEqual(dropped, [old, hourly])
@@ -0,0 +1,196 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest.mock import MagicMock, AsyncMock
+import logging
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pymongo.errors
+
+from pyppetdb.crud.nodes_reports_rollups import CrudNodesReportsRollups
+from pyppetdb.errors import BackendError
+
+
+class TestCrudNodesReportsRollupsUnit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.log = logging.getLogger("test")
+        self.mock_coll = MagicMock()
+        self.mock_coll.bulk_write = AsyncMock()
+        self.mock_config = MagicMock()
+        self.mock_config.app.main.reportsRollups.enable = True
+        self.mock_config.app.main.reportsRollups.hourTtl = 3600
+        self.mock_config.app.main.reportsRollups.dayTtl = 86400
+        self.mock_config.app.main.reportsRollups.durationBuckets = [10, 60]
+        self.crud = CrudNodesReportsRollups(
+            self.mock_config, self.log, self.mock_coll
+        )
+        self.report = {
+            "status": "changed",
+            "noop": False,
+            "corrective_change": True,
+            "metrics": [
+                {"category": "time", "name": "total", "value": 42.5},
+                {"category": "time", "name": "file", "value": 1.0},
+                {"category": "resources", "name": "changed", "value": 3},
+                {"category": "resources", "name": "total", "value": 120},
+                {"category": "events", "name": "success", "value": 3},
+            ],
+        }
+
+    def test_enabled(self):
+        self.assertTrue(self.crud.enabled)
+        self.mock_config.app.main.reportsRollups.enable = False
+        self.assertFalse(self.crud.enabled)
+
+    def test_start(self):
+        ts = datetime(2026, 3, 6, 13, 45, 12, 5, tzinfo=timezone.utc)
+        self.assertEqual(
+            self.crud._start(ts, "hour"),
+            datetime(2026, 3, 6, 13, tzinfo=timezone.utc),
+        )
+        self.assertEqual(
+            self.crud._start(ts, "day"),
+            datetime(2026, 3, 6, tzinfo=timezone.utc),
+        )
+
+    def test_start_naive_is_utc(self):
+        ts = datetime(2026, 3, 6, 13, 45)
+        self.assertEqual(
+            self.crud._start(ts, "hour"),
+            datetime(2026, 3, 6, 13, tzinfo=timezone.utc),
+        )
+
+    def test_duration_bucket(self):
+        self.assertEqual(self.crud._duration_bucket(10), "le_10")
+        self.assertEqual(self.crud._duration_bucket(10.5), "le_60")
+        self.assertEqual(self.crud._duration_bucket(61), "le_inf")
+
+    def test_increments(self):
+        inc, duration = self.crud._increments(self.report)
+        self.assertEqual(duration, 42.5)
+        self.assertEqual(
+            inc,
+            {
+                "count": 1,
+                "noop": 0,
+                "corrective_change": 1,
+                "resources.changed": 3,
+                "resources.total": 120,
+                "duration.sum": 42.5,
+                "duration.buckets.le_60": 1,
+            },
+        )
+
+    def test_increments_without_metrics(self):
+        inc, duration = self.crud._increments({"status": "failed", "noop": True})
+        self.assertIsNone(duration)
+        self.assertEqual(inc, {"count": 1, "noop": 1, "corrective_change": 0})
+
+    async def test_record(self):
+        ts = datetime(2026, 3, 6, 13, 45, tzinfo=timezone.utc)
+        await self.crud.record(timestamp=ts, environment="prod", report=self.report)
+
+        self.mock_coll.bulk_write.assert_awaited_once()
+        requests = self.mock_coll.bulk_write.call_args.args[0]
+        self.assertFalse(self.mock_coll.bulk_write.call_args.kwargs["ordered"])
+        hour, day = [request._doc for request in requests]
+        hour_filter, day_filter = [request._filter for request in requests]
+        self.assertEqual(
+            hour_filter,
+            {
+                "period": "hour",
+                "start": datetime(2026, 3, 6, 13, tzinfo=timezone.utc),
+                "environment": "prod",
+                "status": "changed",
+            },
+        )
+        self.assertEqual(day_filter["period"], "day")
+        self.assertEqual(
+            day_filter["start"], datetime(2026, 3, 6, tzinfo=timezone.utc)
+        )
+        self.assertEqual(
+            hour["$set"]["expires"],
+            datetime(2026, 3, 6, 14, tzinfo=timezone.utc) + timedelta(hours=1),
+        )
+        self.assertEqual(
+            day["$set"]["expires"],
+            datetime(2026, 3, 8, tzinfo=timezone.utc),
+        )
+        self.assertEqual(hour["$min"], {"duration.min": 42.5})
+        self.assertEqual(hour["$max"], {"duration.max": 42.5})
+        self.assertEqual(hour["$inc"]["count"], 1)
+
+    async def test_record_without_duration(self):
+        ts = datetime(2026, 3, 6, 13, 45, tzinfo=timezone.utc)
+        await self.crud.record(
+            timestamp=ts, environment="prod", report={"status": "unchanged"}
+        )
+        requests = self.mock_coll.bulk_write.call_args.args[0]
+        self.assertNotIn("$min", requests[0]._doc)
+        self.assertNotIn("$max", requests[0]._doc)
+
+    async def test_record_backend_error(self):
+        self.mock_coll.bulk_write.side_effect = pymongo.errors.ConnectionFailure()
+        with self.assertRaises(BackendError):
+            await self.crud.record(
+                timestamp=datetime.now(timezone.utc),
+                environment="prod",
+                report=self.report,
+            )
+
+    async def test_search(self):
+        self.crud._search = AsyncMock(
+            return_value={"result": [], "meta": {"result_size": 0}}
+        )
+        start = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        end = datetime(2026, 3, 2, tzinfo=timezone.utc)
+        await self.crud.search(
+            period="hour",
+            start=start,
+            end=end,
+            environment="prod",
+            fields=["count"],
+            sort="start",
+            sort_order="ascending",
+            page=0,
+            limit=100,
+        )
+        self.crud._search.assert_called_once_with(
+            query={
+                "period": "hour",
+                "start": {"$gte": start, "$lt": end},
+                "environment": {"$regex": "prod"},
+            },
+            fields=["count"],
+            sort="start",
+            sort_order="ascending",
+            page=0,
+            limit=100,
+        )
+
+    async def test_create_index_adds_ttl(self):
+        self.mock_coll.create_index = AsyncMock()
+        self.mock_coll.list_indexes = MagicMock()
+        self.mock_coll.list_indexes.return_value.to_list = AsyncMock(
+            return_value=[]
+        )
+        self.mock_coll.index_information = AsyncMock(return_value={})
+        self.crud._create_ttl_index = AsyncMock()
+        await self.crud._create_index()
+        self.crud._create_ttl_index.assert_awaited_once_with(
+            field="expires", ttl_seconds=0, index_name="ttl_expires"
+        )
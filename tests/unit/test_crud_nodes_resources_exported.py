@@ -0,0 +1,375 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest.mock import MagicMock, AsyncMock
+import logging
+
+import pymongo
+import pymongo.errors
+
+from pyppetdb.crud.nodes_resources_exported import CrudNodesResourcesExported
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = list(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._docs:
+            raise StopAsyncIteration
+        return self._docs.pop(0)
+
+
+class TestCrudNodesResourcesExportedUnit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.log = logging.getLogger("test")
+        self.mock_coll = MagicMock()
+        self.mock_coll.bulk_write = AsyncMock()
+        session = MagicMock()
+        session.__aenter__.return_value = session
+
+        async def _with_transaction(callback):
+            await callback(session)
+
+        session.with_transaction = AsyncMock(side_effect=_with_transaction)
+        self.session = session
+        self.mock_coll.database.client.start_session = AsyncMock(
+            return_value=session
+        )
+        self.mock_coll.find = MagicMock(return_value=_Cursor([]))
+        self.mock_config = MagicMock()
+        self.mock_config.app.puppetdb.resourceQueryCacheSize = 100
+        self.mock_generations = MagicMock()
+        self.mock_generations.get = MagicMock(return_value=(("Nagios_host", 1),))
+        self.mock_generations.bump = AsyncMock()
+        self.crud = CrudNodesResourcesExported(
+            config=self.mock_config,
+            log=self.log,
+            coll=self.mock_coll,
+            crud_nodes=MagicMock(),
+            crud_nodes_resources_generations=self.mock_generations,
+        )
+
+    def test_translate_resource_query(self):
+        ast = [
+            "and",
+            ["=", "type", "Nagios_host"],
+            ["=", "exported", True],
+            ["=", "tag", "monitoring"],
+            ["=", ["parameter", "ensure"], "present"],
+            ["not", ["=", "certname", "node1"]],
+        ]
+        result = self.crud.translate_resource_query(ast)
+        self.assertEqual(
+            result,
+            {
+                "$and": [
+                    {"type": "Nagios_host"},
+                    {"tags": "monitoring"},
+                    {"parameters.ensure": "present"},
+                    {"node_id": {"$ne": "node1"}},
+                ]
+            },
+        )
+
+    def test_translate_resource_query_with_facts(self):
+        ast = ["and", ["=", "type", "File"], ["=", "fact_role", "web"]]
+        self.assertIsNone(self.crud.translate_resource_query(ast))
+
+    async def test_replace(self):
+        await self.crud.replace(
+            node_id="node1",
+            environment="production",
+            catalog_uuid="uuid2",
+            resources=[
+                {
+                    "type": "Nagios_host",
+                    "title": "node1",
+                    "exported": True,
+                    "tags": ["monitoring"],
+                    "parameters": {"address": "10.0.0.1"},
+                }
+            ],
+        )
+
+        requests = self.mock_coll.bulk_write.call_args[0][0]
+        self.assertTrue(self.mock_coll.bulk_write.call_args[1]["ordered"])
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(
+            requests[0]._filter,
+            {"node_id": "node1", "type": "Nagios_host", "title": "node1"},
+        )
+        self.assertEqual(requests[0]._doc["catalog_uuid"], "uuid2")
+        self.assertEqual(requests[0]._doc["parameters"], {"address": "10.0.0.1"})
+        self.mock_generations.bump.assert_awaited_once_with({"Nagios_host"})
+
+    async def test_replace_without_transactions(self):
+        self.session.with_transaction = AsyncMock(
+            side_effect=pymongo.errors.OperationFailure("standalone", code=20)
+        )
+
+        await self.crud.replace(
+            node_id="node1",
+            environment="production",
+            catalog_uuid="uuid2",
+            resources=[{"type": "Nagios_host", "title": "node1"}],
+        )
+
+        self.mock_coll.bulk_write.assert_awaited_once()
+        self.assertNotIn("session", self.mock_coll.bulk_write.call_args[1])
+        self.mock_generations.bump.assert_awaited_once_with({"Nagios_host"})
+
+    async def test_replace_backend_error_still_bumps(self):
+        self.session.with_transaction = AsyncMock(
+            side_effect=pymongo.errors.OperationFailure("conflict", code=112)
+        )
+
+        with self.assertLogs("test", level="ERROR"):
+            await self.crud.replace(
+                node_id="node1",
+                environment="production",
+                catalog_uuid="uuid2",
+                resources=[{"type": "Nagios_host", "title": "node1"}],
+            )
+
+        self.mock_coll.bulk_write.assert_not_awaited()
+        self.mock_generations.bump.assert_awaited_once_with({"Nagios_host"})
+
+    async def test_replace_only_bumps_changed_types(self):
+        self.mock_coll.find = MagicMock(
+            return_value=_Cursor(
+                [
+                    {
+                        "environment": "production",
+                        "type": "Nagios_host",
+                        "title": "node1",
+                        "tags": ["monitoring"],
+                        "parameters": {"address": "10.0.0.1"},
+                        "exported": True,
+                        "file": None,
+                        "line": None,
+                    },
+                    {
+                        "environment": "production",
+                        "type": "Sshkey",
+                        "title": "node1",
+                        "tags": [],
+                        "parameters": {},
+                        "exported": True,
+                        "file": None,
+                        "line": None,
+                    },
+                ]
+            )
+        )
+
+        await self.crud.replace(
+            node_id="node1",
+            environment="production",
+            catalog_uuid="uuid2",
+            resources=[
+                {
+                    "type": "Nagios_host",
+                    "title": "node1",
+                    "exported": True,
+                    "tags": ["monitoring"],
+                    "parameters": {"address": "10.0.0.1"},
+                }
+            ],
+        )
+
+        self.mock_coll.bulk_write.assert_awaited_once()
+        requests = self.mock_coll.bulk_write.call_args[0][0]
+        self.assertIsInstance(requests[-1], pymongo.DeleteOne)
+        self.assertEqual(
+            requests[-1]._filter,
+            {"node_id": "node1", "type": "Sshkey", "title": "node1"},
+        )
+        self.mock_generations.bump.assert_awaited_once_with({"Sshkey"})
+
+    async def test_replace_without_uuid_drops_removed(self):
+        self.mock_coll.find = MagicMock(
+            return_value=_Cursor(
+                [
+                    {
+                        "environment": "production",
+                        "type": "Sshkey",
+                        "title": "node1",
+                        "tags": [],
+                        "parameters": {},
+                        "exported": True,
+                        "file": None,
+                        "line": None,
+                    }
+                ]
+            )
+        )
+
+        await self.crud.replace(
+            node_id="node1",
+            environment="production",
+            catalog_uuid=None,
+            resources=[],
+        )
+
+        requests = self.mock_coll.bulk_write.call_args[0][0]
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(
+            requests[0]._filter,
+            {"node_id": "node1", "type": "Sshkey", "title": "node1"},
+        )
+        self.mock_generations.bump.assert_awaited_once_with({"Sshkey"})
+
+    async def test_replace_unchanged(self):
+        self.mock_coll.find = MagicMock(
+            return_value=_Cursor(
+                [
+                    {
+                        "environment": "production",
+                        "type": "Nagios_host",
+                        "title": "node1",
+                        "tags": [],
+                        "parameters": {},
+                        "exported": True,
+                        "file": None,
+                        "line": None,
+                    }
+                ]
+            )
+        )
+
+        await self.crud.replace(
+            node_id="node1",
+            environment="production",
+            catalog_uuid="uuid2",
+            resources=[{"type": "Nagios_host", "title": "node1"}],
+        )
+
+        self.mock_coll.bulk_write.assert_not_awaited()
+        self.mock_generations.bump.assert_not_awaited()
+
+    async def test_delete_all_from_node(self):
+        self.mock_coll.distinct = AsyncMock(return_value=["Nagios_host"])
+        self.mock_coll.delete_many = AsyncMock()
+
+        await self.crud.delete_all_from_node("node1")
+
+        self.mock_coll.delete_many.assert_awaited_once_with(filter={"node_id": "node1"})
+        self.mock_generations.bump.assert_awaited_once_with(["Nagios_host"])
+
+    async def test_query_cached(self):
+        self.crud.query_exported_resources = AsyncMock(
+            return_value=[{"certname": "node1"}]
+        )
+        ast = ["and", ["=", "type", "Nagios_host"], ["=", "tag", "monitoring"]]
+
+        first = await self.crud.query(ast)
+        second = await self.crud.query(
+            ["and", ["=", "tag", "monitoring"], ["=", "type", "Nagios_host"]]
+        )
+
+        self.assertEqual(first, [{"certname": "node1"}])
+        self.assertEqual(second, [{"certname": "node1"}])
+        self.crud.query_exported_resources.assert_awaited_once()
+        self.mock_generations.get.assert_called_with({"Nagios_host"})
+
+        self.mock_generations.get.return_value = (("Nagios_host", 2),)
+        await self.crud.query(ast)
+        self.assertEqual(self.crud.query_exported_resources.await_count, 2)
+
+    async def test_query_without_type_uses_global_generation(self):
+        self.crud.query_exported_resources = AsyncMock(return_value=[])
+
+        await self.crud.query(["=", "tag", "monitoring"])
+
+        self.mock_generations.get.assert_called_with(None)
+
+    async def test_query_untranslatable(self):
+        self.crud.query_exported_resources = AsyncMock()
+
+        result = await self.crud.query(["=", "fact_role", "web"])
+
+        self.assertIsNone(result)
+        self.crud.query_exported_resources.assert_not_awaited()
+
+    async def test_query_exported_resources(self):
+        self.mock_coll.find = MagicMock(
+            return_value=_Cursor(
+                [{"node_id": "node1", "type": "Nagios_host", "title": "node1"}]
+            )
+        )
+
+        result = await self.crud.query_exported_resources({"type": "Nagios_host"})
+
+        self.assertEqual(
+            result,
+            [{"certname": "node1", "type": "Nagios_host", "title": "node1"}],
+        )
+
+    async def test_search(self):
+        self.mock_coll.aggregate = MagicMock(
+            return_value=_Cursor(
+                [
+                    {
+                        "exported": True,
+                        "type": "Nagios_host",
+                        "title": "node1",
+                        "tags": ["monitoring"],
+                        "parameters": {},
+                    }
+                ]
+            )
+        )
+
+        result = await self.crud.search(
+            resource_type="Nagios_host",
+            resource_tags=["monitoring"],
+        )
+
+        pipeline = self.mock_coll.aggregate.call_args[0][0]
+        self.assertEqual(len(pipeline), 2)
+        self.assertEqual(
+            pipeline[0],
+            {"$match": {"type": "Nagios_host", "tags": {"$all": ["monitoring"]}}},
+        )
+        self.assertEqual(result.meta.result_size, 1)
+
+    async def test_search_node_filters_use_lookup(self):
+        self.crud._crud_nodes.coll.name = "nodes"
+        self.mock_coll.aggregate = MagicMock(return_value=_Cursor([]))
+
+        await self.crud.search(
+            resource_type="Nagios_host",
+            user_node_groups=["group-a"],
+            disabled=False,
+        )
+
+        pipeline = self.mock_coll.aggregate.call_args[0][0]
+        lookup = pipeline[1]["$lookup"]
+        self.assertEqual(lookup["from"], "nodes")
+        self.assertEqual(lookup["localField"], "node_id")
+        self.assertEqual(lookup["foreignField"], "id")
+        self.assertEqual(
+            lookup["pipeline"][0],
+            {"$match": {"node_groups": {"$in": ["group-a"]}, "disabled": False}},
+        )
+        self.assertEqual(pipeline[2], {"$match": {"node": {"$ne": []}}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+
+from pyppetdb.crud.nodes_resources_generations import CrudNodesResourcesGenerations
+
+
+class TestCrudNodesResourcesGenerationsUnit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.mock_coll = MagicMock()
+        self.crud = CrudNodesResourcesGenerations(
+            config=MagicMock(),
+            log=logging.getLogger("test"),
+            coll=self.mock_coll,
+        )
+
+    def test_get(self):
+        self.crud.cache.set("Nagios_host", 3)
+
+        self.assertEqual(
+            self.crud.get({"Sshkey", "Nagios_host"}),
+            (("Nagios_host", 3), ("Sshkey", 0)),
+        )
+        self.assertEqual(self.crud.get(None), (("*", 0),))
+
+    async def test_bump(self):
+        self.mock_coll.find_one_and_update = AsyncMock(
+            side_effect=[
+                {"type": "*", "generation": 7},
+                {"type": "Nagios_host", "generation": 2},
+            ]
+        )
+
+        await self.crud.bump(["Nagios_host"])
+
+        filters = [
+            call.kwargs["filter"]
+            for call in self.mock_coll.find_one_and_update.await_args_list
+        ]
+        self.assertEqual(filters, [{"type": "*"}, {"type": "Nagios_host"}])
+        self.assertEqual(self.crud.get(["Nagios_host"]), (("Nagios_host", 2),))
+        self.assertEqual(self.crud.get(None), (("*", 7),))
+
+    async def test_bump_nothing(self):
+        self.mock_coll.find_one_and_update = AsyncMock()
+
+        await self.crud.bump([])
+
+        self.mock_coll.find_one_and_update.assert_not_awaited()
+
+    async def test_handle_change_never_goes_backwards(self):
+        self.crud.cache.set("Nagios_host", 5)
+
+        await self.crud.cache._handle_change(
+            {
+                "operationType": "update",
+                "fullDocument": {"type": "Nagios_host", "generation": 4},
+            }
+        )
+        self.assertEqual(self.crud.cache.cache["Nagios_host"], 5)
+
+        await self.crud.cache._handle_change(
+            {
+                "operationType": "update",
+                "fullDocument": {"type": "Nagios_host", "generation": 6},
+            }
+        )
+        self.assertEqual(self.crud.cache.cache["Nagios_host"], 6)
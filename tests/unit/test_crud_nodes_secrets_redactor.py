@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import unittest
 from datetime import datetime
 from datetime import timezone
@@ -69,10 +70,11 @@ class TestCrudNodesSecretsRedactorCacheUnit(unittest.IsolatedAsyncioTestCase):
         self.log = logging.getLogger("test")
         self.mock_coll = MagicMock()
         self.mock_redactor = MagicMock()
+        self.mock_redactor.rebuild_async = AsyncMock()
         from pyppetdb.crud.nodes_secrets_redactor import CrudNodesSecretsRedactorCache
 
         self.cache = CrudNodesSecretsRedactorCache(
-            self.log, self.mock_coll, self.mock_redactor
+            self.log, self.mock_coll, self.mock_redactor, rebuild_delay=0
         )
 
     async def test_handle_change_insert(self):
@@ -83,18 +85,35 @@ class TestCrudNodesSecretsRedactorCacheUnit(unittest.IsolatedAsyncioTestCase):
         }
         self.mock_redactor.decrypt.return_value = "secret123"
         await self.cache._handle_change(change)
+        await self.cache._rebuild_task
 
         self.mock_redactor.decrypt.assert_called_once_with("encrypted")
-        self.mock_redactor.add_secret.assert_called_once_with("secret123")
+        self.mock_redactor.rebuild_async.assert_awaited_once_with(["secret123"])
         self.assertEqual(self.cache._cache["doc1"], "secret123")
 
     async def test_handle_change_delete(self):
         self.cache._cache["doc1"] = "secret123"
         change = {"operationType": "delete", "documentKey": {"_id": "doc1"}}
         await self.cache._handle_change(change)
+        await self.cache._rebuild_task
 
         self.assertNotIn("doc1", self.cache._cache)
-        self.mock_redactor.rebuild.assert_called_once()
+        self.mock_redactor.rebuild_async.assert_awaited_once_with([])
+
+    async def test_handle_change_batches_rebuilds(self):
+        self.mock_redactor.decrypt.side_effect = lambda value: value
+        for idx in range(5):
+            change = {
+                "operationType": "insert",
+                "documentKey": {"_id": f"doc{idx}"},
+                "fullDocument": {"value_encrypted": f"secret{idx}"},
+            }
+            await self.cache._handle_change(change)
+        await self.cache._rebuild_task
+
+        self.mock_redactor.rebuild_async.assert_awaited_once()
+        self.assertEqual(len(self.mock_redactor.rebuild_async.call_args.args[0]), 5)
+        self.assertIsNone(self.cache._rebuild_task)
 
     async def test_handle_change_error(self):
         change = {
@@ -105,6 +124,7 @@ class TestCrudNodesSecretsRedactorCacheUnit(unittest.IsolatedAsyncioTestCase):
         self.mock_redactor.decrypt.side_effect = Exception("fail")
         await self.cache._handle_change(change)
         self.assertNotIn("doc1", self.cache._cache)
+        self.assertIsNone(self.cache._rebuild_task)
 
     async def test_load_initial_data(self):
         mock_cursor = MagicMock()
@@ -116,4 +136,34 @@ class TestCrudNodesSecretsRedactorCacheUnit(unittest.IsolatedAsyncioTestCase):
 
         await self.cache._load_initial_data()
         self.assertEqual(self.cache._cache["d1"], "s1")
-        self.mock_redactor.rebuild.assert_called_with(["s1"])
+        self.mock_redactor.rebuild_async.assert_awaited_with(["s1"])
+
+    async def test_rebuilds_are_serialized(self):
+        running = []
+        snapshots = []
+
+        async def rebuild_async(secrets):
+            running.append(1)
+            self.assertEqual(len(running), 1)
+            await asyncio.sleep(0.01)
+            snapshots.append(sorted(secrets))
+            running.pop()
+
+        self.mock_redactor.rebuild_async = rebuild_async
+        self.mock_redactor.decrypt.side_effect = lambda value: value
+        self.cache._cache["d1"] = "s1"
+
+        # a change event arriving while the initial rebuild is running
+        initial = asyncio.create_task(self.cache._rebuild())
+        await asyncio.sleep(0)
+        await self.cache._handle_change(
+            {
+                "operationType": "insert",
+                "documentKey": {"_id": "d2"},
+                "fullDocument": {"value_encrypted": "s2"},
+            }
+        )
+        await initial
+        await self.cache._rebuild_task
+
+        self.assertEqual(snapshots[-1], ["s1", "s2"])
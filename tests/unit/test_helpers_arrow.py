@@ -0,0 +1,155 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import unittest
+from unittest.mock import patch
+
+from pyppetdb.errors import FeatureUnavailable
+from pyppetdb.errors import QueryParamValidationError
+from pyppetdb.helpers import arrow
+from pyppetdb.helpers.arrow import arrow_columns
+from pyppetdb.helpers.arrow import arrow_stream
+from pyppetdb.helpers.arrow import CONVERTERS
+
+
+async def _docs(docs):
+    for doc in docs:
+        yield doc
+
+
+DOCS = [
+    {
+        "id": f"node{i}",
+        "environment": "production",
+        "facts": {
+            "os": {"family": "Debian", "release": {"major": "12"}},
+            "processorcount": i,
+            "is_virtual": i % 2 == 0,
+        },
+    }
+    for i in range(25)
+]
+
+COLUMNS = [
+    ("os.family", "str"),
+    ("os.release", "str"),
+    ("processorcount", "int"),
+    ("is_virtual", "bool"),
+    ("missing", "float"),
+]
+
+
+class TestHelpersArrowUnit(unittest.IsolatedAsyncioTestCase):
+    def test_columns(self):
+        self.assertEqual(
+            arrow_columns(["os.family", "processorcount:int"]),
+            [("os.family", "str"), ("processorcount", "int")],
+        )
+
+    def test_columns_invalid(self):
+        for specs in (
+            ["os.family:date"],
+            ["os..family"],
+            ["$where"],
+            ["id"],
+            ["os", "os:int"],
+        ):
+            with self.subTest(specs=specs):
+                with self.assertRaises(QueryParamValidationError):
+                    arrow_columns(specs)
+
+    def test_converters(self):
+        self.assertEqual(CONVERTERS["str"]({"a": 1}), '{"a":1}')
+        self.assertEqual(CONVERTERS["str"](True), "true")
+        self.assertEqual(CONVERTERS["int"]("42"), 42)
+        self.assertEqual(CONVERTERS["int"](4.0), 4)
+        self.assertIsNone(CONVERTERS["int"](True))
+        self.assertIsNone(CONVERTERS["int"]("4.5"))
+        self.assertEqual(CONVERTERS["float"]("4.5"), 4.5)
+        self.assertEqual(CONVERTERS["bool"]("True"), True)
+        self.assertIsNone(CONVERTERS["bool"]("yes"))
+
+    async def test_missing_pyarrow(self):
+        with patch.object(arrow, "pyarrow", None):
+            with self.assertRaises(FeatureUnavailable):
+                async for _ in arrow_stream(_docs(DOCS), COLUMNS, "arrow"):
+                    pass
+
+    @unittest.skipIf(arrow.pyarrow is None, "pyarrow not installed")
+    async def test_arrow_stream(self):
+        chunks = [
+            chunk
+            async for chunk in arrow_stream(
+                _docs(DOCS), COLUMNS, "arrow", batch_size=10
+            )
+        ]
+        self.assertGreater(len(chunks), 1)
+        table = arrow.pyarrow.ipc.open_stream(b"".join(chunks)).read_all()
+        self.assertEqual(table.num_rows, 25)
+        self.assertEqual(
+            table.column_names,
+            [
+                "id",
+                "environment",
+                "os.family",
+                "os.release",
+                "processorcount",
+                "is_virtual",
+                "missing",
+            ],
+        )
+        row = table.slice(3, 1).to_pylist()[0]
+        self.assertEqual(row["id"], "node3")
+        self.assertEqual(row["os.release"], '{"major":"12"}')
+        self.assertEqual(row["processorcount"], 3)
+        self.assertFalse(row["is_virtual"])
+        self.assertIsNone(row["missing"])
+
+    @unittest.skipIf(arrow.pyarrow is None, "pyarrow not installed")
+    async def test_parquet_stream(self):
+        chunks = [
+            chunk
+            async for chunk in arrow_stream(
+                _docs(DOCS), COLUMNS, "parquet", batch_size=10
+            )
+        ]
+        table = arrow.pyarrow.parquet.read_table(io.BytesIO(b"".join(chunks)))
+        self.assertEqual(table.num_rows, 25)
+        self.assertEqual(table.column("processorcount").to_pylist(), list(range(25)))
+
+    @unittest.skipIf(arrow.pyarrow is None, "pyarrow not installed")
+    async def test_empty_stream(self):
+        chunks = [
+            chunk async for chunk in arrow_stream(_docs([]), COLUMNS, "arrow")
+        ]
+        table = arrow.pyarrow.ipc.open_stream(b"".join(chunks)).read_all()
+        self.assertEqual(table.num_rows, 0)
+
+    @unittest.skipIf(arrow.pyarrow is None, "pyarrow not installed")
+    async def test_stream_writes_in_thread(self):
+        with patch.object(
+            arrow.asyncio, "to_thread", wraps=arrow.asyncio.to_thread
+        ) as to_thread:
+            chunks = [
+                chunk
+                async for chunk in arrow_stream(
+                    _docs(DOCS), COLUMNS, "parquet", batch_size=10
+                )
+            ]
+
+        # three batches and the footer
+        self.assertEqual(to_thread.call_count, 4)
+        table = arrow.pyarrow.parquet.read_table(io.BytesIO(b"".join(chunks)))
+        self.assertEqual(table.num_rows, 25)
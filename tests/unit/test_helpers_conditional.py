@@ -0,0 +1,105 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from starlette.middleware.gzip import GZipMiddleware
+
+from pyppetdb.helpers.conditional import ConditionalGetMiddleware
+from pyppetdb.helpers.conditional import etag
+from pyppetdb.helpers.conditional import etag_matches
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware_class=ConditionalGetMiddleware)
+    app.add_middleware(middleware_class=GZipMiddleware, minimum_size=100)
+
+    @app.get("/api/v1/nodes")
+    async def nodes():
+        return {"result": [{"id": f"node{i}"} for i in range(50)]}
+
+    @app.get("/api/v1/missing")
+    async def missing():
+        return StreamingResponse(iter([b"a", b"b"]), status_code=404)
+
+    @app.get("/api/v1/stream")
+    async def stream():
+        return StreamingResponse(iter([b"a", b"b"]))
+
+    @app.get("/puppet/v3/node")
+    async def puppet():
+        return {"name": "node1"}
+
+    return app
+
+
+class TestHelpersConditionalUnit(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(_app())
+
+    def test_etag(self):
+        self.assertTrue(etag(b"abc").startswith('W/"'))
+        self.assertEqual(etag(b"abc"), etag(b"abc"))
+        self.assertNotEqual(etag(b"abc"), etag(b"abd"))
+
+    def test_etag_matches(self):
+        value = etag(b"abc")
+        self.assertTrue(etag_matches(value, value))
+        self.assertTrue(etag_matches(f'"other", {value}', value))
+        self.assertTrue(etag_matches(value[2:], value))
+        self.assertTrue(etag_matches("*", value))
+        self.assertFalse(etag_matches('"other"', value))
+
+    def test_not_modified(self):
+        response = self.client.get("/api/v1/nodes")
+        self.assertEqual(response.status_code, 200)
+        value = response.headers["etag"]
+
+        response = self.client.get(
+            "/api/v1/nodes", headers={"If-None-Match": value}
+        )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.headers["etag"], value)
+
+    def test_modified(self):
+        response = self.client.get(
+            "/api/v1/nodes", headers={"If-None-Match": 'W/"stale"'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["result"]), 50)
+
+    def test_compressed(self):
+        response = self.client.get(
+            "/api/v1/nodes", headers={"Accept-Encoding": "gzip"}
+        )
+
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertIn("etag", response.headers)
+
+    def test_skipped(self):
+        for path, status_code in (
+            ("/api/v1/missing", 404),
+            ("/api/v1/stream", 200),
+            ("/puppet/v3/node", 200),
+        ):
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, status_code)
+            self.assertNotIn("etag", response.headers)
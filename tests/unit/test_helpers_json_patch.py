@@ -0,0 +1,52 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import unittest
+
+from pyppetdb.helpers.json_patch import json_patch_apply
+from pyppetdb.helpers.json_patch import json_patch_diff
+from pyppetdb.helpers.json_patch import json_pointer
+
+
+class TestHelpersJsonPatchUnit(unittest.TestCase):
+    def test_diff(self):
+        old = {"os": {"family": "Debian", "release": "11"}, "gone": 1, "tags": [1]}
+        new = {"os": {"family": "Debian", "release": "12"}, "new": True, "tags": [2]}
+        self.assertEqual(
+            json_patch_diff(old, new),
+            [
+                {"op": "remove", "path": "/gone"},
+                {"op": "replace", "path": "/os/release", "value": "12"},
+                {"op": "add", "path": "/new", "value": True},
+                {"op": "replace", "path": "/tags", "value": [2]},
+            ],
+        )
+
+    def test_diff_type_change(self):
+        self.assertEqual(
+            json_patch_diff({"a": 1}, {"a": True}),
+            [{"op": "replace", "path": "/a", "value": True}],
+        )
+        self.assertEqual(json_patch_diff({"a": {"b": 1}}, {"a": {"b": 1}}), [])
+
+    def test_round_trip(self):
+        old = {"a/b": {"c~d": 1, "e": {"f": 2}}, "x": [1, 2], "y": "z"}
+        new = {"a/b": {"c~d": 2, "g": {"h": 3}}, "x": [1], "w": None}
+        patch = json_patch_diff(old, new)
+        self.assertEqual(json_patch_apply(copy.deepcopy(old), patch), new)
+
+    def test_pointer(self):
+        self.assertEqual(json_pointer("os.family"), "/os/family")
+        self.assertEqual(json_pointer("a/b"), "/a~1b")
@@ -0,0 +1,49 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime
+import gzip
+import json
+import unittest
+
+from pyppetdb.helpers.ndjson import ndjson_stream
+
+
+async def _docs(docs):
+    for doc in docs:
+        yield doc
+
+
+class TestHelpersNdjsonUnit(unittest.IsolatedAsyncioTestCase):
+    async def test_plain_stream(self):
+        docs = [{"id": "n1", "ts": datetime(2026, 1, 1)}, {"id": "n2"}]
+        chunks = [chunk async for chunk in ndjson_stream(_docs(docs))]
+        lines = b"".join(chunks).decode().splitlines()
+        self.assertEqual(json.loads(lines[0]), {"id": "n1", "ts": "2026-01-01T00:00:00"})
+        self.assertEqual(json.loads(lines[1]), {"id": "n2"})
+
+    async def test_chunked_gzip_stream(self):
+        docs = [{"id": f"node{i}"} for i in range(100)]
+        chunks = [
+            chunk
+            async for chunk in ndjson_stream(_docs(docs), compress=True, chunk_size=64)
+        ]
+        self.assertGreater(len(chunks), 1)
+        lines = gzip.decompress(b"".join(chunks)).decode().splitlines()
+        self.assertEqual(len(lines), 100)
+        self.assertEqual(json.loads(lines[-1]), {"id": "node99"})
+
+    async def test_empty_stream(self):
+        chunks = [chunk async for chunk in ndjson_stream(_docs([]))]
+        self.assertEqual(chunks, [])
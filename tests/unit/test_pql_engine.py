@@ -0,0 +1,282 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+
+import pymongo.errors
+
+from pyppetdb.errors import BackendError
+from pyppetdb.errors import InvalidQuery
+from pyppetdb.pql.engine import PqlEngine
+from pyppetdb.pql.planner import QueryPlanner
+
+
+class TestQueryPlanner(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.subquery = AsyncMock(return_value=["node1", "node2"])
+        self.planner = QueryPlanner(subquery=self.subquery)
+
+    def test_normalize_legacy_select(self):
+        self.assertEqual(
+            QueryPlanner.normalize(
+                ["extract", ["certname"], ["select_facts", ["=", "name", "os"]]]
+            ),
+            ["from", "facts", ["extract", ["certname"], ["=", "name", "os"]]],
+        )
+        self.assertEqual(
+            QueryPlanner.normalize(["=", "certname", "a"], "nodes"),
+            ["from", "nodes", ["=", "certname", "a"]],
+        )
+        with self.assertRaises(InvalidQuery):
+            QueryPlanner.normalize(["=", "certname", "a"])
+
+    async def test_nodes_mapping_and_sort_pushdown(self):
+        plan = await self.planner.plan(
+            [
+                "from",
+                "nodes",
+                [
+                    "extract",
+                    ["certname"],
+                    [
+                        "and",
+                        ["=", "latest_report_status", "failed"],
+                        [">", "report_timestamp", "2026-01-01T00:00:00Z"],
+                    ],
+                ],
+                ["order_by", [["certname", "desc"]]],
+                ["limit", 10],
+            ]
+        )
+        self.assertEqual(plan.match["$and"][0], {"report.status": "failed"})
+        self.assertEqual(
+            plan.match["$and"][1]["change_report"]["$gt"].isoformat(),
+            "2026-01-01T00:00:00+00:00",
+        )
+        self.assertEqual(
+            plan.pipeline(),
+            [
+                {"$match": plan.match},
+                {"$sort": {"id": -1}},
+                {"$limit": 10},
+                {"$project": {"_id": 0, "certname": "$id"}},
+                {"$project": {"_id": 0, "certname": 1}},
+            ],
+        )
+
+    async def test_subquery_resolved_to_in(self):
+        plan = await self.planner.plan(
+            [
+                "from",
+                "nodes",
+                [
+                    "in",
+                    "certname",
+                    [
+                        "extract",
+                        "certname",
+                        ["select_inventory", ["=", "facts.os.family", "RedHat"]],
+                    ],
+                ],
+            ]
+        )
+        self.assertEqual(plan.match, {"id": {"$in": ["node1", "node2"]}})
+        self.subquery.assert_awaited_once_with(
+            [
+                "from",
+                "inventory",
+                ["extract", "certname", ["=", "facts.os.family", "RedHat"]],
+            ],
+            "certname",
+        )
+
+    async def test_empty_subquery_short_circuits(self):
+        self.subquery.return_value = []
+        plan = await self.planner.plan(
+            [
+                "and",
+                ["=", "type", "Class"],
+                ["subquery", "nodes", ["=", "latest_report_status", "failed"]],
+            ],
+            "resources",
+        )
+        self.assertTrue(plan.empty)
+
+    async def test_facts_name_pushdown(self):
+        plan = await self.planner.plan(
+            [
+                "and",
+                ["=", "name", "os"],
+                ["=", "value", "Linux"],
+                ["~", "certname", "^web"],
+            ],
+            "facts",
+        )
+        self.assertEqual(plan.fact_names, ["os"])
+        self.assertEqual(
+            plan.match,
+            {"$and": [{"facts.os": "Linux"}, {"id": {"$regex": "^web"}}]},
+        )
+        self.assertEqual(plan.residual, {})
+        self.assertEqual(
+            plan.pipeline()[1],
+            {"$project": {"id": 1, "environment": 1, "facts.os": 1}},
+        )
+        self.assertEqual(plan.distinct_path("certname"), "id")
+
+    async def test_facts_row_level_residual(self):
+        plan = await self.planner.plan(
+            ["or", ["=", "name", "os"], [">", "value", 3]],
+            "facts",
+        )
+        self.assertIsNone(plan.fact_names)
+        self.assertEqual(plan.match, {})
+        self.assertEqual(plan.residual, {"$or": [{"name": "os"}, {"value": {"$gt": 3}}]})
+        self.assertIsNone(plan.distinct_path("certname"))
+
+    async def test_group_by_functions(self):
+        plan = await self.planner.plan(
+            [
+                "from",
+                "inventory",
+                [
+                    "extract",
+                    ["facts.os.family", ["function", "count"]],
+                    ["group_by", "facts.os.family"],
+                ],
+            ]
+        )
+        self.assertFalse(plan.count_only)
+        self.assertEqual(
+            plan.pipeline(),
+            [
+                {"$project": {"_id": 0, "facts": "$facts"}},
+                {
+                    "$group": {
+                        "_id": {"facts__os__family": "$facts.os.family"},
+                        "count": {"$sum": 1},
+                    }
+                },
+                {
+                    "$project": {
+                        "_id": 0,
+                        "facts.os.family": "$_id.facts__os__family",
+                        "count": 1,
+                    }
+                },
+            ],
+        )
+
+    async def test_count_only(self):
+        plan = await self.planner.plan(
+            ["extract", [["function", "count"]], ["=", "type", "Class"]],
+            "resources",
+        )
+        self.assertTrue(plan.count_only)
+        self.assertEqual(plan.match, {"type": "Class"})
+
+    async def test_invalid(self):
+        for ast, entity in [
+            (["from", "catalogs"], None),
+            (["=", "unknown", "x"], "nodes"),
+            (["extract", ["certname", ["function", "count"]]], "nodes"),
+            (["extract", [["function", "avg"]]], "nodes"),
+            (["~", "certname", 1], "nodes"),
+            (["in", "certname", ["from", "nodes"]], "nodes"),
+            (["from", "nodes", ["limit", -1]], None),
+        ]:
+            with self.subTest(ast=ast):
+                with self.assertRaises(InvalidQuery):
+                    await self.planner.plan(ast, entity)
+
+
+class TestPqlEngine(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.crud_nodes = MagicMock()
+        self.crud_nodes.query_aggregate = AsyncMock(return_value=[])
+        self.crud_nodes.query_distinct = AsyncMock(return_value=[])
+        self.crud_nodes.count = AsyncMock(return_value=0)
+        self.crud_resources = MagicMock()
+        self.crud_resources.query_aggregate = AsyncMock(return_value=[])
+        self.crud_resources.query_distinct = AsyncMock(return_value=[])
+        self.crud_resources.count = AsyncMock(return_value=0)
+        self.engine = PqlEngine(
+            log=logging.getLogger("test"),
+            crud_nodes=self.crud_nodes,
+            crud_nodes_resources_exported=self.crud_resources,
+        )
+
+    async def test_pql_string(self):
+        self.crud_nodes.query_aggregate.return_value = [{"certname": "node1"}]
+        result = await self.engine.query('nodes[certname] { certname ~ "^node" }')
+        self.assertEqual(result, [{"certname": "node1"}])
+        kwargs = self.crud_nodes.query_aggregate.await_args.kwargs
+        self.assertEqual(kwargs["query"], {"id": {"$regex": "^node"}})
+
+    async def test_json_string(self):
+        await self.engine.query('["=", "type", "Class"]', entity="resources")
+        kwargs = self.crud_resources.query_aggregate.await_args.kwargs
+        self.assertEqual(kwargs["query"], {"type": "Class"})
+
+    async def test_invalid_json(self):
+        with self.assertRaises(InvalidQuery):
+            await self.engine.query('["=", "type"', entity="resources")
+
+    async def test_count_uses_count_documents(self):
+        self.crud_resources.count.return_value = 42
+        result = await self.engine.query("resources[count()] { type = 'Class' }")
+        self.assertEqual(result, [{"count": 42}])
+        self.crud_resources.count.assert_awaited_once_with(query={"type": "Class"})
+        self.crud_resources.query_aggregate.assert_not_awaited()
+
+    async def test_subquery_uses_distinct(self):
+        self.crud_nodes.query_distinct.return_value = ["node1"]
+        await self.engine.query(
+            'resources { certname in facts[certname] { name = "os" and value = "Linux" } }'
+        )
+        self.crud_nodes.query_distinct.assert_awaited_once_with(
+            field="id", query={"facts.os": "Linux"}
+        )
+        kwargs = self.crud_resources.query_aggregate.await_args.kwargs
+        self.assertEqual(kwargs["query"], {"node_id": {"$in": ["node1"]}})
+
+    async def test_subquery_with_residual_uses_pipeline(self):
+        self.crud_nodes.query_aggregate.return_value = [{"_id": "node1"}, {"_id": None}]
+        await self.engine.query(
+            'resources { certname in facts[certname] { value = "Linux" } }'
+        )
+        first = self.crud_nodes.query_aggregate.await_args_list[0].kwargs
+        self.assertEqual(first["pipeline"][-1], {"$group": {"_id": "$certname"}})
+        kwargs = self.crud_resources.query_aggregate.await_args.kwargs
+        self.assertEqual(kwargs["query"], {"node_id": {"$in": ["node1"]}})
+
+    async def test_empty_subquery_skips_query(self):
+        result = await self.engine.query(
+            'nodes { certname in resources[certname] { type = "Nagios_host" } }'
+        )
+        self.assertEqual(result, [])
+        self.crud_nodes.query_aggregate.assert_not_awaited()
+
+    async def test_backend_errors(self):
+        self.crud_nodes.query_aggregate.side_effect = pymongo.errors.ConnectionFailure()
+        with self.assertRaises(BackendError):
+            await self.engine.query("nodes {}")
+        self.crud_nodes.query_aggregate.side_effect = pymongo.errors.OperationFailure(
+            "bad regex"
+        )
+        with self.assertRaises(InvalidQuery):
+            await self.engine.query("nodes {}")
@@ -0,0 +1,146 @@
+# Copyright 2026 Stephan Schultchen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from pyppetdb.errors import InvalidQuery
+from pyppetdb.pql.parser import PqlParser
+
+
+class TestPqlParser(unittest.TestCase):
+    def test_entity_only(self):
+        self.assertEqual(PqlParser.parse("nodes {}"), ["from", "nodes"])
+        self.assertEqual(PqlParser.parse("nodes"), ["from", "nodes"])
+
+    def test_condition(self):
+        result = PqlParser.parse('nodes { certname = "node1" }')
+        self.assertEqual(result, ["from", "nodes", ["=", "certname", "node1"]])
+
+    def test_projection_and_paging(self):
+        result = PqlParser.parse(
+            "nodes[certname, report_timestamp] "
+            "{ order by certname desc, report_timestamp limit 10 offset 5 }"
+        )
+        self.assertEqual(
+            result,
+            [
+                "from",
+                "nodes",
+                ["extract", ["certname", "report_timestamp"]],
+                ["order_by", [["certname", "desc"], ["report_timestamp", "asc"]]],
+                ["limit", 10],
+                ["offset", 5],
+            ],
+        )
+
+    def test_operators_and_precedence(self):
+        result = PqlParser.parse(
+            "facts { name != 'os' and !(value ~ \"^x\" or certname is null) "
+            "or certname is not null }"
+        )
+        self.assertEqual(
+            result,
+            [
+                "from",
+                "facts",
+                [
+                    "or",
+                    [
+                        "and",
+                        ["not", ["=", "name", "os"]],
+                        [
+                            "not",
+                            ["or", ["~", "value", "^x"], ["null?", "certname", True]],
+                        ],
+                    ],
+                    ["null?", "certname", False],
+                ],
+            ],
+        )
+
+    def test_in_array_and_subquery(self):
+        result = PqlParser.parse(
+            'nodes { certname in ["a", "b"] and certname in '
+            'inventory[certname] { facts.os.family = "RedHat" } }'
+        )
+        self.assertEqual(
+            result,
+            [
+                "from",
+                "nodes",
+                [
+                    "and",
+                    ["in", "certname", ["array", ["a", "b"]]],
+                    [
+                        "in",
+                        "certname",
+                        [
+                            "from",
+                            "inventory",
+                            [
+                                "extract",
+                                ["certname"],
+                                ["=", "facts.os.family", "RedHat"],
+                            ],
+                        ],
+                    ],
+                ],
+            ],
+        )
+
+    def test_functions_and_group_by(self):
+        result = PqlParser.parse(
+            'facts[name, count(), avg(value)] { name = "uptime" group by name }'
+        )
+        self.assertEqual(
+            result,
+            [
+                "from",
+                "facts",
+                [
+                    "extract",
+                    ["name", ["function", "count"], ["function", "avg", "value"]],
+                    ["=", "name", "uptime"],
+                    ["group_by", "name"],
+                ],
+            ],
+        )
+
+    def test_values(self):
+        result = PqlParser.parse(
+            "resources { line >= 10 and exported = true and parameters.x < -1.5 }"
+        )
+        self.assertEqual(
+            result[2],
+            [
+                "and",
+                [">=", "line", 10],
+                ["=", "exported", True],
+                ["<", "parameters.x", -1.5],
+            ],
+        )
+
+    def test_invalid(self):
+        for query in [
+            "nodes { certname = }",
+            "nodes { certname = 'a'",
+            "nodes[foo()] {}",
+            "nodes { limit x }",
+            "nodes { certname = 'a' } trailing",
+            "nodes { certname # 'a' }",
+            "nodes { group by certname }",
+        ]:
+            with self.subTest(query=query):
+                with self.assertRaises(InvalidQuery):
+                    PqlParser.parse(query)
@@ -12,10 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import os
 import unittest
 from unittest.mock import MagicMock
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pyppetdb.crud import nodes_secrets_redactor
 from pyppetdb.crud.nodes_secrets_redactor import NodesSecretsRedactor
+from pyppetdb.crud.nodes_secrets_redactor import NodesSecretsRedactorPool
 from pyppetdb.crud.nodes_reports import NodesReportsRedactor
 from pyppetdb.crud.nodes_catalogs import NodesCatalogsRedactor
 
@@ -46,6 +52,22 @@ class TestRedactorsUnit(unittest.TestCase):
         expected = {"key1": "XXXXX", "key_XXXXX": "normal", "list": ["XXXXX", "other"]}
         self.assertEqual(self.base_redactor.redact(data), expected)
 
+    def test_base_redactor_clean_document_untouched(self):
+        data = {"a": ["clean", {"b": "text"}], "c": ("x", 1), "d": None}
+        self.assertIs(self.base_redactor.redact(data), data)
+
+    def test_base_redactor_copies_only_affected_path(self):
+        clean = {"b": ["text"]}
+        data = {"clean": clean, "dirty": {"x": 1, "y": ["ok", "PASSWORD"]}}
+        result = self.base_redactor.redact(data)
+
+        self.assertEqual(
+            result, {"clean": clean, "dirty": {"x": 1, "y": ["ok", "XXXXX"]}}
+        )
+        self.assertIs(result["clean"], clean)
+        self.assertEqual(data["dirty"]["y"], ["ok", "PASSWORD"])
+        self.assertEqual(list(result), ["clean", "dirty"])
+
     def test_base_redactor_overlapping(self):
         self.base_redactor.rebuild(["SECRET", "SECRET123"])
         self.assertEqual(
@@ -58,10 +80,53 @@ class TestRedactorsUnit(unittest.TestCase):
         # Old secret should be gone
         self.assertEqual(self.base_redactor.redact("SECRET123"), "SECRET123")
 
+    def test_base_redactor_rebuild_async_swaps_complete_automaton(self):
+        automaton = self.base_redactor._automaton
+        asyncio.run(self.base_redactor.rebuild_async(["ROTATED", "ROTATED", ""]))
+        self.assertIsNot(self.base_redactor._automaton, automaton)
+        self.assertEqual(
+            self.base_redactor.redact("ROTATED PASSWORD"), "XXXXX PASSWORD"
+        )
+
+    def test_base_redactor_add_secret_known(self):
+        generation = self.base_redactor.generation
+        self.base_redactor.add_secret("PASSWORD")
+        self.assertEqual(self.base_redactor.generation, generation)
+
     def test_base_redactor_other_types(self):
         self.assertEqual(self.base_redactor.redact(123), 123)
         self.assertEqual(self.base_redactor.redact(("SECRET123",)), ("XXXXX",))
 
+    def test_base_redactor_memoizes_strings(self):
+        self.base_redactor._scan = MagicMock(wraps=self.base_redactor._scan)
+        for _ in range(3):
+            self.assertEqual(
+                self.base_redactor.redact("login PASSWORD"), "login XXXXX"
+            )
+        self.base_redactor._scan.assert_called_once_with("login PASSWORD")
+
+    def test_base_redactor_memo_cleared_on_change(self):
+        self.assertEqual(self.base_redactor.redact("OTHER_KEY"), "OTHER_KEY")
+        generation = self.base_redactor.generation
+        self.base_redactor.add_secret("OTHER_KEY")
+        self.assertGreater(self.base_redactor.generation, generation)
+        self.assertEqual(self.base_redactor.redact("OTHER_KEY"), "XXXXX")
+        self.base_redactor.rebuild(["SECRET123"])
+        self.assertEqual(self.base_redactor.redact("OTHER_KEY"), "OTHER_KEY")
+
+    def test_base_redactor_short_strings_skip_scan(self):
+        self.base_redactor._scan = MagicMock()
+        self.assertEqual(self.base_redactor.redact("PASS"), "PASS")
+        self.base_redactor._scan.assert_not_called()
+
+    def test_base_redactor_memo_disabled(self):
+        redactor = NodesSecretsRedactor(self.log, self.mock_protector, cache_size=0)
+        redactor.add_secret("PASSWORD")
+        redactor._scan = MagicMock(wraps=redactor._scan)
+        redactor.redact("PASSWORD")
+        redactor.redact("PASSWORD")
+        self.assertEqual(redactor._scan.call_count, 2)
+
     def test_reports_redactor(self):
         reports_redactor = NodesReportsRedactor(self.log, self.base_redactor)
 
@@ -134,3 +199,119 @@ class TestRedactorsUnit(unittest.TestCase):
         params = redacted["catalog"]["resources"][0]["parameters"]
         self.assertEqual(params["content"], "My XXXXX")
         self.assertEqual(params["owner"], "XXXXX")
+
+    def test_redact_async_without_pool(self):
+        reports_redactor = NodesReportsRedactor(self.log, self.base_redactor)
+        data = {"report": {"logs": [{"message": "PASSWORD"}]}}
+        result = asyncio.run(reports_redactor.redact_async(data))
+        self.assertEqual(result["report"]["logs"][0]["message"], "XXXXX")
+
+
+class TestRedactorPoolUnit(unittest.TestCase):
+    def setUp(self):
+        self.log = logging.getLogger("test")
+        self.redactor = NodesSecretsRedactor(self.log, MagicMock())
+        self.redactor.rebuild(["PASSWORD"])
+        nodes_secrets_redactor._pool_init(cache_size=10, cache_max_length=100)
+        self.addCleanup(setattr, nodes_secrets_redactor, "_pool_redactor", None)
+        self.addCleanup(setattr, nodes_secrets_redactor, "_pool_generation", None)
+
+    def test_pool_redact_requires_secrets_for_new_generation(self):
+        data = {"catalog": {"resources": [{"parameters": {"p": "PASSWORD"}}]}}
+        generation = self.redactor.generation
+
+        pid, done, result = nodes_secrets_redactor._pool_redact(
+            NodesCatalogsRedactor, generation, None, data
+        )
+        self.assertEqual(pid, os.getpid())
+        self.assertFalse(done)
+        self.assertIsNone(result)
+
+        _, done, result = nodes_secrets_redactor._pool_redact(
+            NodesCatalogsRedactor, generation, self.redactor.secrets, data
+        )
+        self.assertTrue(done)
+        self.assertEqual(
+            result["catalog"]["resources"][0]["parameters"]["p"], "XXXXX"
+        )
+
+        _, done, _ = nodes_secrets_redactor._pool_redact(
+            NodesCatalogsRedactor, generation, None, data
+        )
+        self.assertTrue(done)
+
+    def test_pool_syncs_workers_by_generation(self):
+        pool = NodesSecretsRedactorPool(self.log, self.redactor, processes=1)
+        pool._executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(pool.close)
+        reports_redactor = NodesReportsRedactor(self.log, self.redactor, pool=pool)
+
+        def data():
+            return {"report": {"logs": [{"message": "PASSWORD ROTATED"}]}}
+
+        result = asyncio.run(reports_redactor.redact_async(data()))
+        self.assertEqual(result["report"]["logs"][0]["message"], "XXXXX ROTATED")
+
+        self.redactor.rebuild(["ROTATED"])
+        result = asyncio.run(reports_redactor.redact_async(data()))
+        self.assertEqual(result["report"]["logs"][0]["message"], "PASSWORD XXXXX")
+        self.assertEqual(
+            nodes_secrets_redactor._pool_generation, self.redactor.generation
+        )
+
+    def test_pool_ships_payload_once(self):
+        pool = NodesSecretsRedactorPool(self.log, self.redactor, processes=1)
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        tasks = []
+
+        def submit(fn, *args):
+            tasks.append(args)
+            return executor.submit(fn, *args)
+
+        pool._executor = MagicMock()
+        pool._executor.submit.side_effect = submit
+
+        def data():
+            return {"report": {"logs": [{"message": "PASSWORD"}]}}
+
+        for _ in range(2):
+            asyncio.run(pool.redact(redact_cls=NodesReportsRedactor, data=data()))
+        self.redactor.rebuild(["ROTATED"])
+        result = asyncio.run(
+            pool.redact(redact_cls=NodesReportsRedactor, data=data())
+        )
+
+        # secrets go along with the first task of each generation only, and
+        # no payload is sent twice
+        self.assertEqual(
+            [task[2] for task in tasks],
+            [frozenset(["PASSWORD"]), None, frozenset(["ROTATED"])],
+        )
+        self.assertEqual(result["report"]["logs"][0]["message"], "PASSWORD")
+
+    def test_pool_broken_redacts_inline_and_restarts(self):
+        pool = NodesSecretsRedactorPool(self.log, self.redactor, processes=1)
+        broken = MagicMock()
+        broken.submit.side_effect = BrokenProcessPool("worker died")
+        pool._executor = broken
+        data = {"report": {"logs": [{"message": "PASSWORD"}]}}
+
+        with self.assertLogs("test", level="ERROR"):
+            result = asyncio.run(
+                pool.redact(redact_cls=NodesReportsRedactor, data=data)
+            )
+
+        self.assertEqual(result["report"]["logs"][0]["message"], "XXXXX")
+        self.assertIsNone(pool._executor)
+        broken.shutdown.assert_called_once()
+
+    def test_pool_skipped_without_secrets(self):
+        self.redactor.rebuild([])
+        pool = NodesSecretsRedactorPool(self.log, self.redactor, processes=1)
+        data = {"report": {}}
+        result = asyncio.run(
+            pool.redact(redact_cls=NodesReportsRedactor, data=data)
+        )
+        self.assertIs(result, data)
+        self.assertIsNone(pool._executor)